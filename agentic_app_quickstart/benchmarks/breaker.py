@@ -0,0 +1,118 @@
+"""
+Circuit Breaker Benchmark
+
+Runs the handoffs example against a degraded primary mock server, where every
+request outlasts the role timeout, in three configurations:
+
+- no breaker: every model call waits out its timeout and retries
+- breaker: once tripped, calls fail fast with `CircuitOpen`
+- breaker + fallback: once tripped, calls go to a healthy second mock server
+  (`MODEL_FALLBACK_ENDPOINT`), with half-open probes of the primary
+
+and compares run latency, failed runs and the requests each server received.
+
+Usage:
+    uv run python -m agentic_app_quickstart.benchmarks.breaker
+    uv run python -m agentic_app_quickstart.benchmarks.breaker --runs 60 --timeout 0.5 --open-seconds 1
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from rich.console import Console
+from rich.table import Table
+
+from agentic_app_quickstart.benchmarks.examples import load_example, prepare_environment
+from agentic_app_quickstart.benchmarks.harness import drive
+from agentic_app_quickstart.benchmarks.mock_llm import MockLLM
+from agentic_app_quickstart.benchmarks.mock_server import Faults, LatencyProfile, MockServer
+from agentic_app_quickstart.week_2.solution.config.settings import DEFAULT_ROLES
+
+MODES = ["no breaker", "breaker", "breaker + fallback"]
+
+console = Console()
+
+
+async def run_mode(mode: str, example: str, concurrency: int, runs: int) -> dict:
+    from agentic_app_quickstart.examples.helpers import get_model
+    from agentic_app_quickstart.examples.models import BREAKER_TRANSITIONS, CircuitBreakerModel, ResilientModel
+    from agentic_app_quickstart.week_2.solution.config.settings import get_settings
+
+    get_settings.cache_clear()
+    CircuitBreakerModel._breakers.clear()
+    ResilientModel._stats_by_name.clear()
+
+    def transitions() -> float:
+        return sum(value for _, _, value in BREAKER_TRANSITIONS.samples())
+
+    before = transitions()
+    agent = load_example(example, get_model)
+    start = time.perf_counter()
+    stats = await drive(example, agent, concurrency, runs)
+    stats.update(mode=mode, seconds=time.perf_counter() - start, transitions=transitions() - before)
+    return stats
+
+
+def print_report(results: list[dict], example: str, timeout: float):
+    table = Table(title=f"{example}: primary endpoint slower than the {timeout:g}s timeout")
+    for column in ("mode", "total s", "p50 ms", "p95 ms", "failed runs", "primary reqs", "fallback reqs", "transitions"):
+        table.add_column(column, justify="left" if column == "mode" else "right")
+    for r in results:
+        table.add_row(
+            r["mode"],
+            f"{r['seconds']:.1f}",
+            f"{r['p50_ms']:.0f}" if r["runs"] else "-",
+            f"{r['p95_ms']:.0f}" if r["runs"] else "-",
+            str(r["errors"]),
+            str(r["primary_requests"]),
+            str(r["fallback_requests"]),
+            f"{r['transitions']:.0f}",
+        )
+    console.print(table)
+    console.print("p50 / p95 are of successful runs; failed runs with a breaker and no fallback fail fast")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--example", default="handoffs")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--runs", type=int, default=40)
+    parser.add_argument("--ttft", default="lognormal:-2.5,0.3", help="Mock time to first token, seconds")
+    parser.add_argument("--timeout", type=float, default=1.0, help="Request timeout of every role, seconds")
+    parser.add_argument("--open-seconds", type=float, default=2.0, help="MODEL_BREAKER_OPEN_SECONDS")
+    args = parser.parse_args()
+
+    latency = LatencyProfile.parse(args.ttft)
+    environment = {f"ROLE_{role.upper()}_TIMEOUT": str(args.timeout) for role in DEFAULT_ROLES}
+    environment.update(
+        MODEL_HEDGE="0",
+        MODEL_RETRY_BACKOFF="0.05",
+        MODEL_BREAKER_MIN_REQUESTS="5",
+        MODEL_BREAKER_OPEN_SECONDS=str(args.open_seconds),
+    )
+
+    results = []
+    for mode in MODES:
+        degraded = Faults(slow_rate=1.0, slow_seconds=args.timeout * 5)
+        with (
+            MockServer(MockLLM(), latency, faults=degraded) as primary,
+            MockServer(MockLLM(), latency) as fallback,
+        ):
+            os.environ.update(
+                environment,
+                OPENAI_API_ENDPOINT=primary.base_url,
+                MODEL_BREAKER="0" if mode == "no breaker" else "1",
+                MODEL_FALLBACK_ENDPOINT=fallback.base_url if mode == "breaker + fallback" else "",
+            )
+            prepare_environment()
+            stats = asyncio.run(run_mode(mode, args.example, args.concurrency, args.runs))
+            stats.update(primary_requests=primary.llm.requests, fallback_requests=fallback.llm.requests)
+            results.append(stats)
+
+    print_report(results, args.example, args.timeout)
+
+
+if __name__ == "__main__":
+    main()
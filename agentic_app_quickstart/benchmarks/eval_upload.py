@@ -0,0 +1,134 @@
+"""
+Evaluation Upload Benchmark
+
+Uploads `--spans` synthetic toxicity judgements (label, score and a
+sentence-long explanation) to the Phoenix stand-in in `phoenix_stub.py`:
+
+- one span per request, uncompressed, one request at a time: what posting
+  each label as it comes would cost
+- `EvaluationSink` with its chunked, compressed and concurrent uploads
+- the same with a fraction of uploads failing with 503, to exercise retries
+- the endpoint down: everything is spooled to disk, then `resend_spooled()`
+  delivers it once the stand-in is up
+
+Reports requests, bytes sent, wall time, rows uploaded and spooled, retries,
+and the spans the stand-in ended up with.
+
+Usage:
+    uv run python -m agentic_app_quickstart.benchmarks.eval_upload
+    uv run python -m agentic_app_quickstart.benchmarks.eval_upload --spans 5000 --latency lognormal:-3.5,0.4
+"""
+
+import argparse
+import asyncio
+import random
+import socket
+import tempfile
+from dataclasses import replace
+
+from rich.console import Console
+from rich.table import Table
+
+from agentic_app_quickstart.benchmarks.mock_server import Distribution, Faults
+from agentic_app_quickstart.benchmarks.phoenix_stub import PhoenixStub
+
+EVAL_NAME = "Toxicity"
+
+console = Console()
+
+
+def judgements(spans: int, seed: int = 0) -> list[tuple]:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(spans):
+        toxic = rng.random() < 0.1
+        explanation = (
+            f"The response to request {i} {'insults' if toxic else 'answers'} the user "
+            f"and {'contains' if toxic else 'does not contain'} hateful or demeaning language."
+        )
+        rows.append((f"{rng.getrandbits(64):016x}", "toxic" if toxic else "non-toxic", float(toxic), explanation))
+    return rows
+
+
+def retries() -> float:
+    from agentic_app_quickstart.examples.evaluations import EVAL_UPLOADS
+
+    return EVAL_UPLOADS.value(result="retried")
+
+
+def closed_port() -> str:
+    """URL of a local port nothing listens on."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}"
+
+
+def upload(endpoint: str, settings, rows: list[tuple]):
+    from agentic_app_quickstart.examples.evaluations import EvaluationSink
+
+    sink = EvaluationSink(endpoint=endpoint, settings=settings)
+    for span_id, label, score, explanation in rows:
+        sink.add(EVAL_NAME, span_id, label, score, explanation)
+    return sink, asyncio.run(sink.flush())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--spans", type=int, default=1000)
+    parser.add_argument("--latency", default="constant:0.01", help="Stand-in latency per request, seconds")
+    parser.add_argument("--error-rate", type=float, default=0.3, help="Failed uploads in the faulty scenario")
+    args = parser.parse_args()
+
+    from agentic_app_quickstart.week_2.solution.config.settings import EvaluationUploadSettings
+
+    rows = judgements(args.spans)
+    latency = Distribution.parse(args.latency)
+    spool = tempfile.mkdtemp(prefix="eval-spool-")
+    bulk = EvaluationUploadSettings.from_env()
+    bulk = replace(
+        bulk, chunk_rows=min(bulk.chunk_rows, max(1, args.spans // 8)), backoff_seconds=0.05, spool_path=spool
+    )
+    per_span = replace(bulk, chunk_rows=1, concurrency=1, compression="none")
+
+    table = Table(title=f"Uploading {args.spans} evaluations to the Phoenix stand-in ({args.latency} per request)")
+    columns = ("upload", "requests", "KiB sent", "seconds", "uploaded", "spooled", "retries", "spans stored")
+    for column in columns:
+        table.add_column(column, justify="left" if column == "upload" else "right")
+
+    def add_row(name: str, report, retried: float, stored: int):
+        table.add_row(
+            name,
+            str(report.requests),
+            f"{report.bytes / 1024:.0f}",
+            f"{report.seconds:.2f}",
+            str(report.uploaded),
+            str(report.spooled),
+            f"{retried:.0f}",
+            str(stored),
+        )
+
+    scenarios = (
+        ("one span per request", per_span, None),
+        (f"bulk, {bulk.chunk_rows} rows x {bulk.concurrency}, {bulk.compression}", bulk, None),
+        (f"bulk, {args.error_rate:.0%} 503s", bulk, Faults(error_rate=args.error_rate, error_status=503)),
+    )
+    for name, settings, faults in scenarios:
+        with PhoenixStub(latency, faults) as stub:
+            before = retries()
+            _, report = upload(stub.base_url, settings, rows)
+            add_row(name, report, retries() - before, stub.rows(EVAL_NAME))
+
+    # Phoenix down: spool everything, then resend once it is back
+    before = retries()
+    sink, report = upload(closed_port(), replace(bulk, max_retries=1), rows)
+    add_row("bulk, endpoint down", report, retries() - before, 0)
+    with PhoenixStub(latency) as stub:
+        sink.endpoint = stub.base_url
+        report = asyncio.run(sink.resend_spooled())
+        add_row("  resend_spooled()", report, 0, stub.rows(EVAL_NAME))
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Registry of the example agents exercised by the benchmarks.
+
+Each entry points at an example module, the agent a run starts from and the
+prompts that make up one run. Loading an example imports its module (so the
+benchmarks measure the real agent definitions) and then swaps the model of
+every agent defined in it for a mock.
+"""
+
+import importlib
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from agents import Agent, Runner, SQLiteSession
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "week_1" / "solution" / "data"
+SALES_CSV = str(DATA_DIR / "sample_sales.csv")
+PRODUCT_UNITS_PLAN = {
+    "filters": [],
+    "group_by": ["product"],
+    "aggregates": [{"column": "quantity", "func": "sum", "alias": "units"}],
+    "select": [],
+    "sort": [{"column": "units", "descending": True}],
+    "limit": 5,
+}
+
+
+@dataclass
+class ExampleSpec:
+    """
+    How to run one example agent.
+
+    Attributes:
+        module (str): Dotted path of the example module
+        agent (str): Name of the module attribute holding the starting agent
+        prompts (list[str]): User turns that make up one run
+        tool_arguments (dict): Arguments the mock LLM sends per tool name
+        session (bool): Run all prompts in a fresh `SQLiteSession`
+    """
+
+    module: str
+    agent: str
+    prompts: list[str]
+    tool_arguments: dict[str, dict] = field(default_factory=dict)
+    session: bool = False
+
+
+EXAMPLES = {
+    "hello_world": ExampleSpec(
+        module="agentic_app_quickstart.examples.week_1.01_hello_world",
+        agent="agent",
+        prompts=["French"],
+    ),
+    "function_calling": ExampleSpec(
+        module="agentic_app_quickstart.examples.week_1.02_function_calling",
+        agent="agent",
+        prompts=["Portuguese"],
+    ),
+    "memory": ExampleSpec(
+        module="agentic_app_quickstart.examples.week_1.03_simple_memory",
+        agent="agent",
+        prompts=["Hi, my name is Ada.", "I like jazz.", "What is my name?"],
+        session=True,
+    ),
+    "guardrails": ExampleSpec(
+        module="agentic_app_quickstart.examples.week_1.04_guardrails",
+        agent="agent",
+        prompts=["Who composed Kind of Blue?"],
+    ),
+    "handoffs": ExampleSpec(
+        module="agentic_app_quickstart.examples.week_1.05_handoffs",
+        agent="reception_agent",
+        prompts=["I'm having trouble logging in"],
+    ),
+    "csv_analyzer": ExampleSpec(
+        module="agentic_app_quickstart.examples.week_2.03_streamlit",
+        agent="data_analyzer_agent",
+        prompts=[
+            f"File path: {SALES_CSV}\nUser question: How many unique products are there?"
+        ],
+        tool_arguments={
+            "get_headers": {"file_path": SALES_CSV},
+            "count_unique": {"file_path": SALES_CSV, "target_column": "product"},
+            "plan_query": {"file_path": SALES_CSV, "plan": PRODUCT_UNITS_PLAN},
+            "estimate_stat": {"file_path": SALES_CSV, "column": "price", "stat": "mean"},
+            "resample": {"file_path": SALES_CSV, "column": "quantity", "every": "1w", "agg": "sum"},
+            "moving_average": {"file_path": SALES_CSV, "column": "price", "window": "7d"},
+            "period_growth": {"file_path": SALES_CSV, "column": "quantity", "every": "1w", "group_by": "product"},
+            "seasonal_summary": {"file_path": SALES_CSV, "column": "price", "season": "weekday"},
+        },
+    ),
+}
+
+
+def prepare_environment():
+    """
+    Make the example modules importable without real credentials.
+
+    The examples build their models (and, for week 2, their tracing provider)
+    at import time, so this must run before `load_example`.
+    """
+    os.environ.setdefault("OPENAI_API_KEY", "mock")
+    os.environ.setdefault("OPENAI_API_ENDPOINT", "http://mock-llm/v1")
+    os.environ.setdefault("TRACING_SINK", "memory")
+
+
+def load_example(name: str, model_factory) -> Agent:
+    """
+    Import an example and point all of its agents at a mock model.
+
+    Args:
+        name (str): Key in `EXAMPLES`
+        model_factory (Callable[[str], Model]): Builds the model given to each
+            agent from the role of the model it replaces (see `get_model()`)
+
+    Returns:
+        Agent: The starting agent of the example
+    """
+    prepare_environment()
+    spec = EXAMPLES[name]
+    module = importlib.import_module(spec.module)
+
+    for value in vars(module).values():
+        if isinstance(value, Agent):
+            value.model = model_factory(getattr(value.model, "role", "agent"))
+
+    return getattr(module, spec.agent)
+
+
+async def run_example(name: str, agent: Agent, run_id: int = 0):
+    """
+    Execute one run (all prompts) of an example.
+
+    Args:
+        name (str): Key in `EXAMPLES`
+        agent (Agent): Starting agent returned by `load_example`
+        run_id (int): Used to give each run its own session
+
+    Returns:
+        RunResult: Result of the last prompt
+    """
+    spec = EXAMPLES[name]
+    session = SQLiteSession(session_id=f"bench-{name}-{run_id}") if spec.session else None
+
+    result = None
+    for prompt in spec.prompts:
+        result = await Runner.run(starting_agent=agent, input=prompt, session=session)
+
+    if session is not None:
+        session.close()
+
+    return result
@@ -0,0 +1,129 @@
+"""
+Closed-loop load generation and baseline comparison.
+
+`drive()` keeps `concurrency` runs of an example in flight until `runs` have
+completed and records the latency of each. `compare()` checks the results
+against a stored baseline so regressions in framework overhead show up as a
+failing benchmark rather than a vague feeling that things got slower.
+"""
+
+import asyncio
+import json
+import math
+import time
+import tracemalloc
+from pathlib import Path
+
+from agentic_app_quickstart.benchmarks.examples import run_example
+
+# Metrics compared against the baseline, and whether higher is better
+COMPARED_METRICS = {
+    "throughput_rps": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "peak_mib": False,
+}
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile, `q` in [0, 100]."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+async def drive(name: str, agent, concurrency: int, runs: int, trace_memory: bool = False) -> dict:
+    """
+    Run an example `runs` times with at most `concurrency` runs in flight.
+
+    Args:
+        name (str): Key in `EXAMPLES`
+        agent (Agent): Starting agent returned by `load_example`
+        concurrency (int): Number of concurrent workers
+        runs (int): Total runs to complete
+        trace_memory (bool): Record the peak Python heap with tracemalloc,
+            which slows the runs down; use a separate pass for timings
+
+    Returns:
+        dict: Throughput, latency percentiles, errors and (optionally) peak heap
+    """
+    counter = iter(range(runs))
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for run_id in counter:
+            start = time.perf_counter()
+            try:
+                await run_example(name, agent, run_id=run_id)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    peak = 0
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "runs": len(latencies),
+        "errors": errors,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "peak_mib": peak / 2**20,
+    }
+
+
+def load_baseline(path: str | Path) -> dict:
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(path: str | Path, results: dict):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(result: dict, baseline: dict | None, tolerance: float) -> list[str]:
+    """
+    List the metrics of `result` that are worse than `baseline` by more than `tolerance`.
+
+    Args:
+        result (dict): Output of `drive()`
+        baseline (dict, optional): Stored output for the same example
+        tolerance (float): Allowed relative change, e.g. 0.25 for 25%
+
+    Returns:
+        list[str]: Human-readable regressions, empty if none
+    """
+    if not baseline:
+        return []
+
+    regressions = []
+    for metric, higher_is_better in COMPARED_METRICS.items():
+        old, new = baseline.get(metric), result.get(metric)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        if (change < -tolerance) if higher_is_better else (change > tolerance):
+            regressions.append(f"{metric} {old:.2f} -> {new:.2f} ({change:+.0%})")
+    return regressions
@@ -0,0 +1,104 @@
+"""
+Hedging and Retry Benchmark
+
+Runs the handoffs example (reception, then a specialist: two or more model
+calls per run) against the mock server with injected stragglers and errors,
+once with plain model requests (no hedging, no retries) and once with
+`ResilientModel`'s hedging and retries, and compares the latency tail and
+failed runs.
+
+Usage:
+    uv run python -m agentic_app_quickstart.benchmarks.hedging
+    uv run python -m agentic_app_quickstart.benchmarks.hedging --slow-rate 0.1 --slow-seconds 3 --error-rate 0.05
+"""
+
+import argparse
+import asyncio
+import os
+
+from rich.console import Console
+from rich.table import Table
+
+from agentic_app_quickstart.benchmarks.examples import load_example, prepare_environment
+from agentic_app_quickstart.benchmarks.harness import drive
+from agentic_app_quickstart.benchmarks.mock_llm import MockLLM
+from agentic_app_quickstart.benchmarks.mock_server import Faults, LatencyProfile, MockServer
+
+# mode: environment for get_settings()
+MODES = {
+    "plain": {"MODEL_HEDGE": "0", "MODEL_MAX_RETRIES": "0"},
+    "hedged + retries": {"MODEL_HEDGE": "1", "MODEL_MAX_RETRIES": "3"},
+}
+
+console = Console()
+
+
+async def run_mode(mode: str, example: str, concurrency: int, runs: int, hedge_min_seconds: float) -> dict:
+    from agentic_app_quickstart.examples.helpers import get_model
+    from agentic_app_quickstart.examples.models import HEDGES, RETRIES, ResilientModel
+    from agentic_app_quickstart.week_2.solution.config.settings import get_settings
+
+    os.environ.update(MODES[mode], MODEL_HEDGE_MIN_SECONDS=str(hedge_min_seconds), MODEL_RETRY_BACKOFF="0.05")
+    get_settings.cache_clear()
+    ResilientModel._stats_by_name.clear()
+
+    def total(counter) -> float:
+        return sum(value for _, _, value in counter.samples())
+
+    hedges, retries = total(HEDGES), total(RETRIES)
+    agent = load_example(example, get_model)
+    stats = await drive(example, agent, concurrency, runs)
+    stats.update(mode=mode, hedges=total(HEDGES) - hedges, retries=total(RETRIES) - retries)
+    return stats
+
+
+def print_report(results: list[dict], example: str, faults: Faults):
+    table = Table(
+        title=f"{example}: {faults.slow_rate:.0%} of requests +{faults.slow_seconds:g}s, "
+        f"{faults.error_rate:.0%} fail with {faults.error_status}"
+    )
+    for column in ("requests", "p50 ms", "p95 ms", "p99 ms", "failed runs", "hedges", "retries"):
+        table.add_column(column, justify="left" if column == "requests" else "right")
+    for r in results:
+        table.add_row(
+            r["mode"],
+            f"{r['p50_ms']:.0f}",
+            f"{r['p95_ms']:.0f}",
+            f"{r['p99_ms']:.0f}",
+            str(r["errors"]),
+            f"{r['hedges']:.0f}",
+            f"{r['retries']:.0f}",
+        )
+    console.print(table)
+
+    plain, resilient = results
+    if plain["p99_ms"]:
+        console.print(f"p99 {(resilient['p99_ms'] - plain['p99_ms']) / plain['p99_ms']:+.0%} with hedging and retries")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--example", default="handoffs")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--runs", type=int, default=300)
+    parser.add_argument("--ttft", default="lognormal:-2.5,0.3", help="Mock time to first token, seconds")
+    parser.add_argument("--slow-rate", type=float, default=0.05, help="Fraction of straggler requests")
+    parser.add_argument("--slow-seconds", type=float, default=2.0, help="Extra delay of a straggler")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Fraction of requests failing with 503")
+    parser.add_argument("--hedge-min-seconds", type=float, default=0.05, help="MODEL_HEDGE_MIN_SECONDS for the run")
+    args = parser.parse_args()
+
+    results = []
+    for mode in MODES:
+        # A fresh server per mode so both see the same seeded faults
+        faults = Faults(error_rate=args.error_rate, slow_rate=args.slow_rate, slow_seconds=args.slow_seconds)
+        with MockServer(MockLLM(), LatencyProfile.parse(args.ttft), faults=faults) as server:
+            os.environ["OPENAI_API_ENDPOINT"] = server.base_url
+            prepare_environment()
+            results.append(asyncio.run(run_mode(mode, args.example, args.concurrency, args.runs, args.hedge_min_seconds)))
+
+    print_report(results, args.example, faults)
+
+
+if __name__ == "__main__":
+    main()
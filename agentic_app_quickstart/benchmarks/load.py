@@ -0,0 +1,124 @@
+"""
+End-to-End Load Benchmark
+
+Starts the local mock server (`mock_server.py`), points `OPENAI_API_ENDPOINT`
+at it and drives every example agent through the regular `get_model()` client,
+so each run goes over real HTTP the way it would against the remote endpoint.
+With the default zero latency the numbers reflect framework overhead only:
+the agents SDK, the OpenAI client, HTTP and the example's own tools.
+
+Reports throughput, p50/p95/p99 latency and the peak Python heap under load,
+and compares them against `baselines/load.json`. The exit code is 1 when any
+metric regressed by more than `--tolerance`.
+
+Usage:
+    uv run python -m agentic_app_quickstart.benchmarks.load
+    uv run python -m agentic_app_quickstart.benchmarks.load --concurrency 32 --runs 400 \
+        --ttft lognormal:-1.2,0.4 --token-rate constant:80
+    uv run python -m agentic_app_quickstart.benchmarks.load --update-baseline
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+from agentic_app_quickstart.benchmarks.examples import EXAMPLES, load_example, prepare_environment
+from agentic_app_quickstart.benchmarks.harness import compare, drive, load_baseline, save_baseline
+from agentic_app_quickstart.benchmarks.mock_llm import MockLLM
+from agentic_app_quickstart.benchmarks.mock_server import LatencyProfile, MockServer
+
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "load.json"
+
+console = Console()
+
+
+async def run_benchmark(examples: list[str], concurrency: int, runs: int, warmup: int) -> dict:
+    # Imported lazily so the endpoint is set before helpers loads .env
+    from agentic_app_quickstart.examples.helpers import get_model
+
+    results = {}
+    for name in examples:
+        agent = load_example(name, get_model)
+        if warmup:
+            await drive(name, agent, concurrency=1, runs=warmup)
+
+        stats = await drive(name, agent, concurrency, runs)
+        memory = await drive(name, agent, concurrency, min(runs, concurrency * 2), trace_memory=True)
+        stats["peak_mib"] = memory["peak_mib"]
+        results[name] = stats
+    return results
+
+
+def print_report(results: dict, baseline: dict, regressions: dict, config: str):
+    table = Table(title=f"End-to-end load ({config})")
+    for column in ("example", "runs", "errors", "req/s", "p50 ms", "p95 ms", "p99 ms", "peak MiB", "vs baseline"):
+        table.add_column(column, justify="left" if column in ("example", "vs baseline") else "right")
+
+    for name, r in results.items():
+        if name in regressions and regressions[name]:
+            status = "[red]" + "; ".join(regressions[name]) + "[/red]"
+        elif name in baseline:
+            status = "[green]ok[/green]"
+        else:
+            status = "no baseline"
+        table.add_row(
+            name,
+            str(r["runs"]),
+            str(r["errors"]),
+            f"{r['throughput_rps']:.1f}",
+            f"{r['p50_ms']:.1f}",
+            f"{r['p95_ms']:.1f}",
+            f"{r['p99_ms']:.1f}",
+            f"{r['peak_mib']:.1f}",
+            status,
+        )
+    console.print(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--examples", nargs="+", default=list(EXAMPLES), choices=list(EXAMPLES))
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--ttft", default="constant:0", help="Mock time to first token, seconds")
+    parser.add_argument("--token-rate", default="constant:0", help="Mock tokens per second, 0 = instant")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    tool_arguments = {}
+    for spec in EXAMPLES.values():
+        tool_arguments.update(spec.tool_arguments)
+    llm = MockLLM(tool_arguments=tool_arguments)
+    latency = LatencyProfile.parse(args.ttft, args.token_rate, args.seed)
+
+    with MockServer(llm, latency) as server:
+        os.environ["OPENAI_API_ENDPOINT"] = server.base_url
+        prepare_environment()
+        results = asyncio.run(run_benchmark(args.examples, args.concurrency, args.runs, args.warmup))
+
+    # Baselines are only comparable for the same load shape
+    config = f"c={args.concurrency} ttft={args.ttft} rate={args.token_rate}"
+    stored = load_baseline(args.baseline)
+    baseline = stored.get(config, {})
+    regressions = {name: compare(r, baseline.get(name), args.tolerance) for name, r in results.items()}
+    print_report(results, baseline, regressions, config)
+
+    if args.update_baseline:
+        stored[config] = {**baseline, **results}
+        save_baseline(args.baseline, stored)
+        console.print(f"Baseline written to {args.baseline}")
+    elif any(regressions.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
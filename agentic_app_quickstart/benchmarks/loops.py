@@ -0,0 +1,137 @@
+"""
+Runaway Loop Benchmark
+
+Scripts the mock LLM into the two loops seen in the examples and runs them
+under each `LOOP_POLICY`:
+
+- handoffs: reception and technical support hand the user back and forth
+- csv_analyzer: the data analyzer calls `count_unique` with the same
+  arguments over and over
+
+With "off" every run burns its `--max-turns` and fails with
+`MaxTurnsExceeded`; "abort" stops a run at the first loop detected; with
+"correct" the model is told it is looping, and the mock (like a model that
+heeds the note) answers instead. Reports how runs ended, model requests and
+tokens per run, latency, and the tokens `LoopMonitor` estimates it saved.
+
+Usage:
+    uv run python -m agentic_app_quickstart.benchmarks.loops
+    uv run python -m agentic_app_quickstart.benchmarks.loops --runs 40 --max-turns 20
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from agents import MaxTurnsExceeded
+from agents.handoffs import Handoff
+from rich.console import Console
+from rich.table import Table
+
+from agentic_app_quickstart.benchmarks.examples import EXAMPLES, load_example, prepare_environment
+from agentic_app_quickstart.benchmarks.harness import percentile
+from agentic_app_quickstart.benchmarks.mock_llm import MockLLM
+from agentic_app_quickstart.benchmarks.mock_server import LatencyProfile, MockServer
+
+POLICIES = ["off", "abort", "correct"]
+
+console = Console()
+
+
+def looping_scripts(example: str, agent, steps: int) -> dict[str, list[dict]]:
+    """Mock LLM scripts that keep `example` looping for `steps` model requests."""
+    if example == "handoffs":
+        specialist = agent.handoffs[0]
+        return {
+            "You are a reception agent": [{"handoff": Handoff.default_tool_name(specialist)}] * steps,
+            specialist.instructions.split("\n")[0]: [{"handoff": Handoff.default_tool_name(agent)}] * steps,
+        }
+    arguments = EXAMPLES[example].tool_arguments["count_unique"]
+    return {"You are a data analyst agent": [{"tool": "count_unique", "arguments": arguments}] * steps}
+
+
+def total_tokens() -> float:
+    from agentic_app_quickstart.week_2.solution.monitoring.metering import METER, TOKENS
+
+    METER.flush()
+    return sum(value for _, _, value in TOKENS.samples())
+
+
+def tokens_saved() -> float:
+    from agentic_app_quickstart.examples.loops import TOKENS_SAVED
+
+    return sum(value for _, _, value in TOKENS_SAVED.samples())
+
+
+async def run_policy(example: str, agent, runs: int, concurrency: int, max_turns: int) -> dict:
+    from agentic_app_quickstart.examples.loops import RunawayLoop, run_with_loop_guard
+
+    prompt = EXAMPLES[example].prompts[0]
+    outcomes = {"answered": 0, "aborted": 0, "max_turns": 0}
+    latencies: list[float] = []
+    counter = iter(range(runs))
+
+    async def worker():
+        for _ in counter:
+            start = time.perf_counter()
+            try:
+                await run_with_loop_guard(agent, prompt, max_turns=max_turns)
+                outcomes["answered"] += 1
+            except RunawayLoop:
+                outcomes["aborted"] += 1
+            except MaxTurnsExceeded:
+                outcomes["max_turns"] += 1
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return {**outcomes, "latencies": latencies}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--examples", nargs="+", default=["handoffs", "csv_analyzer"])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--max-turns", type=int, default=10)
+    parser.add_argument("--ttft", default="lognormal:-2.5,0.3", help="Mock time to first token, seconds")
+    args = parser.parse_args()
+
+    table = Table(title=f"Looping runs, max_turns={args.max_turns}, {args.runs} runs per policy")
+    columns = ("example", "policy", "answered", "aborted", "max turns", "requests/run", "tokens/run", "p50 ms", "est. saved/run")
+    for column in columns:
+        table.add_column(column, justify="left" if column in ("example", "policy") else "right")
+
+    for example in args.examples:
+        for policy in POLICIES:
+            with MockServer(MockLLM(), LatencyProfile.parse(args.ttft)) as server:
+                os.environ.update(OPENAI_API_ENDPOINT=server.base_url, LOOP_POLICY=policy, MODEL_HEDGE="0")
+                prepare_environment()
+                from agentic_app_quickstart.examples.helpers import get_model
+                from agentic_app_quickstart.week_2.solution.config.settings import get_settings
+
+                get_settings.cache_clear()
+                agent = load_example(example, get_model)
+                server.llm.scripts = looping_scripts(example, agent, args.max_turns * 2)
+                tokens, saved = total_tokens(), tokens_saved()
+                result = asyncio.run(run_policy(example, agent, args.runs, args.concurrency, args.max_turns))
+                tokens, saved = total_tokens() - tokens, tokens_saved() - saved
+                requests = server.llm.requests
+
+            table.add_row(
+                example,
+                policy,
+                str(result["answered"]),
+                str(result["aborted"]),
+                str(result["max_turns"]),
+                f"{requests / args.runs:.1f}",
+                f"{tokens / args.runs:,.0f}",
+                f"{percentile(result['latencies'], 50) * 1000:.0f}",
+                f"{saved / args.runs:,.0f}",
+            )
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+MCP Response Cache Benchmark
+
+Replays a stream of repeated forecast lookups, skewed towards a few popular
+cities, as `fetch` calls against the stub MCP fetch server (`mcp_stub.py`)
+with a simulated network delay, once directly and once through
+`CachedMCPServer`. The pages' ETags are served by a local HTTP server, so
+entries that outlive their TTL are revalidated with conditional HEAD
+requests rather than fetched again.
+
+Reports call latency, the number of calls that reached the MCP server, and
+the cache's hit / revalidated / miss counts.
+
+Usage:
+    uv run python -m agentic_app_quickstart.benchmarks.mcp_cache
+    uv run python -m agentic_app_quickstart.benchmarks.mcp_cache --calls 200 --ttl 0.5 --fetch-delay 0.3
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from agents.mcp import MCPServerStdio, MCPServerStdioParams
+from rich.console import Console
+from rich.table import Table
+
+from agentic_app_quickstart.benchmarks.harness import percentile
+
+CITIES = ["amsterdam", "rotterdam", "utrecht", "eindhoven", "groningen", "maastricht", "leiden", "delft"]
+
+console = Console()
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    """Answers HEAD requests with a fixed ETag per page, and 304 when it matches."""
+
+    def do_HEAD(self):
+        etag = f'"{abs(hash(self.path))}"'
+        self.send_response(304 if self.headers.get("If-None-Match") == etag else 200)
+        self.send_header("ETag", etag)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def workload(base_url: str, calls: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(CITIES))]
+    return [f"{base_url}/weather/{city}" for city in rng.choices(CITIES, weights, k=calls)]
+
+
+async def replay(server, urls: list[str]) -> list[float]:
+    await server.connect()
+    await server.list_tools()
+    latencies = []
+    for url in urls:
+        start = time.perf_counter()
+        await server.call_tool("fetch", {"url": url, "max_length": 5000})
+        latencies.append(time.perf_counter() - start)
+    await server.cleanup()
+    return latencies
+
+
+async def run(urls: list[str], ttl: float, fetch_delay: float) -> list[dict]:
+    from agentic_app_quickstart.examples.mcp_cache import CACHE_REQUESTS, CachedMCPServer, MCPResponseCache
+
+    def stub():
+        return MCPServerStdio(
+            params=MCPServerStdioParams(
+                command=sys.executable,
+                args=["-m", "agentic_app_quickstart.benchmarks.mcp_stub", "--fetch-delay", str(fetch_delay)],
+            ),
+            cache_tools_list=True,
+        )
+
+    uncached = await replay(stub(), urls)
+    cached_server = CachedMCPServer(stub(), ttls={"fetch": ttl}, revalidate={"fetch": "url"}, cache=MCPResponseCache())
+    cached = await replay(cached_server, urls)
+
+    counts = {
+        result: CACHE_REQUESTS.value(server=cached_server.name, tool="fetch", result=result)
+        for result in ("hit", "revalidated", "miss")
+    }
+    return [
+        {"mode": "direct", "latencies": uncached, "server_calls": len(urls), **dict.fromkeys(counts, 0)},
+        {"mode": f"cached, ttl {ttl:g}s", "latencies": cached, "server_calls": int(counts["miss"]), **counts},
+    ]
+
+
+def print_report(results: list[dict], calls: int):
+    table = Table(title=f"{calls} fetch calls over {len(CITIES)} pages")
+    for column in ("fetch", "p50 ms", "p95 ms", "total s", "server calls", "hits", "revalidated", "misses"):
+        table.add_column(column, justify="left" if column == "fetch" else "right")
+    for r in results:
+        ms = [latency * 1000 for latency in r["latencies"]]
+        table.add_row(
+            r["mode"],
+            f"{percentile(ms, 50):.1f}",
+            f"{percentile(ms, 95):.1f}",
+            f"{sum(r['latencies']):.1f}",
+            str(r["server_calls"]),
+            f"{r['hit']:.0f}",
+            f"{r['revalidated']:.0f}",
+            f"{r['miss']:.0f}",
+        )
+    console.print(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--ttl", type=float, default=1.0, help="Cache TTL of fetch results, seconds")
+    parser.add_argument("--fetch-delay", type=float, default=0.2, help="Simulated network time per fetch, seconds")
+    args = parser.parse_args()
+
+    pages = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    threading.Thread(target=pages.serve_forever, daemon=True).start()
+    try:
+        urls = workload(f"http://127.0.0.1:{pages.server_port}", args.calls)
+        results = asyncio.run(run(urls, args.ttl, args.fetch_delay))
+    finally:
+        pages.shutdown()
+
+    print_report(results, args.calls)
+
+
+if __name__ == "__main__":
+    main()
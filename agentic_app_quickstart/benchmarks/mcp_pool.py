@@ -0,0 +1,144 @@
+"""
+MCP Server Pool Benchmark
+
+Runs the notebook's DataFetcherAgent against the mock LLM and the stub MCP
+fetch server (`mcp_stub.py`), once starting a server per request inside
+`async with` as the notebook used to, and once leasing from a warm
+`MCPServerPool`. The stub's startup delay stands in for `uvx` resolving and
+launching `mcp-server-fetch`.
+
+Reports per-request latency for each mode, plus the pool's cold start and
+the warm MCP call latency from the pool's metrics.
+
+Usage:
+    uv run python -m agentic_app_quickstart.benchmarks.mcp_pool
+    uv run python -m agentic_app_quickstart.benchmarks.mcp_pool --requests 40 --concurrency 4 --startup-delay 1.0
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from agents import Agent, Runner, set_tracing_disabled
+from agents.mcp import MCPServerStdio, MCPServerStdioParams
+from rich.console import Console
+from rich.table import Table
+
+from agentic_app_quickstart.benchmarks.examples import prepare_environment
+from agentic_app_quickstart.benchmarks.harness import percentile
+from agentic_app_quickstart.benchmarks.mock_llm import MockLLM
+from agentic_app_quickstart.benchmarks.mock_server import LatencyProfile, MockServer
+
+PROMPT = "What's the weather forecast for Amsterdam, NL?"
+FETCH_ARGUMENTS = {"fetch": {"url": "https://www.meteoblue.com/en/weather/week/amsterdam_netherlands_2759794"}}
+
+console = Console()
+
+
+def stub_server(startup_delay: float) -> MCPServerStdio:
+    return MCPServerStdio(
+        params=MCPServerStdioParams(
+            command=sys.executable,
+            args=["-m", "agentic_app_quickstart.benchmarks.mcp_stub", "--startup-delay", str(startup_delay)],
+        ),
+        cache_tools_list=True,
+        client_session_timeout_seconds=30,
+    )
+
+
+def fetcher_agent(server) -> Agent:
+    from agentic_app_quickstart.examples.helpers import get_model
+
+    return Agent(
+        name="DataFetcherAgent",
+        instructions="An agent that tries to fetch data based on user's questions.",
+        mcp_servers=[server],
+        model=get_model(),
+    )
+
+
+async def timed_requests(request, requests: int, concurrency: int) -> list[float]:
+    counter = iter(range(requests))
+    latencies = []
+
+    async def worker():
+        for _ in counter:
+            start = time.perf_counter()
+            await request()
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+async def per_request(requests: int, concurrency: int, startup_delay: float) -> dict:
+    async def request():
+        async with stub_server(startup_delay) as server:
+            await Runner.run(fetcher_agent(server), PROMPT)
+
+    latencies = await timed_requests(request, requests, concurrency)
+    return {"mode": "server per request", "startup_s": None, "latencies": latencies}
+
+
+async def pooled(requests: int, concurrency: int, startup_delay: float) -> dict:
+    from agentic_app_quickstart.examples.mcp_pool import CALL_SECONDS, MCPServerPool
+
+    pool = MCPServerPool(lambda: stub_server(startup_delay), size=concurrency, name="mcp-stub-fetch")
+    start = time.perf_counter()
+    await pool.connect()
+    startup = time.perf_counter() - start
+
+    agent = fetcher_agent(pool)
+    latencies = await timed_requests(lambda: Runner.run(agent, PROMPT), requests, concurrency)
+    await pool.cleanup()
+
+    warm_call = CALL_SECONDS.quantile_values(server="mcp-stub-fetch", tool="fetch")
+    return {"mode": "pooled", "startup_s": startup, "latencies": latencies, "warm_call": warm_call}
+
+
+def print_report(results: list[dict], requests: int, concurrency: int):
+    table = Table(title=f"DataFetcherAgent, {requests} requests, concurrency {concurrency}")
+    for column in ("MCP servers", "pool start s", "p50 ms", "p95 ms", "max ms", "total s"):
+        table.add_column(column, justify="left" if column == "MCP servers" else "right")
+    for r in results:
+        ms = [latency * 1000 for latency in r["latencies"]]
+        table.add_row(
+            r["mode"],
+            "-" if r["startup_s"] is None else f"{r['startup_s']:.2f}",
+            f"{percentile(ms, 50):.0f}",
+            f"{percentile(ms, 95):.0f}",
+            f"{max(ms):.0f}",
+            f"{sum(r['latencies']):.1f}",
+        )
+    console.print(table)
+
+    warm = next((r["warm_call"] for r in results if r.get("warm_call")), None)
+    if warm:
+        console.print(f"Warm MCP call p50 {warm[0.5] * 1000:.1f} ms, p99 {warm[0.99] * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--startup-delay", type=float, default=0.5, help="Extra stub server startup time, seconds")
+    parser.add_argument("--ttft", default="constant:0.05", help="Mock time to first token, seconds")
+    args = parser.parse_args()
+
+    llm = MockLLM(tool_arguments=FETCH_ARGUMENTS)
+    with MockServer(llm, LatencyProfile.parse(args.ttft)) as server:
+        os.environ["OPENAI_API_ENDPOINT"] = server.base_url
+        prepare_environment()
+        set_tracing_disabled(True)
+        results = [
+            asyncio.run(per_request(args.requests, args.concurrency, args.startup_delay)),
+            asyncio.run(pooled(args.requests, args.concurrency, args.startup_delay)),
+        ]
+
+    print_report(results, args.requests, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Stub MCP fetch server.
+
+A stdio MCP server with the same `fetch` tool signature as `mcp-server-fetch`,
+returning a deterministic page instead of going to the network, so MCP
+benchmarks run offline and repeatably. Each page includes a per-process
+request counter, which shows whether a call reached the server.
+
+Usage:
+    uv run python -m agentic_app_quickstart.benchmarks.mcp_stub --startup-delay 0.5 --fetch-delay 0.2
+
+As an MCP server for an agent:
+    >>> MCPServerStdio(params=MCPServerStdioParams(command=sys.executable, args=["-m", "agentic_app_quickstart.benchmarks.mcp_stub"]))
+"""
+
+import argparse
+import itertools
+import time
+
+from mcp.server.fastmcp import FastMCP
+
+
+def create_server(fetch_delay: float = 0.0) -> FastMCP:
+    server = FastMCP("mcp-stub-fetch", log_level="WARNING")
+    requests = itertools.count(1)
+
+    @server.tool()
+    def fetch(url: str, max_length: int = 5000, start_index: int = 0, raw: bool = False) -> str:
+        """Fetches a URL from the internet and optionally extracts its contents as markdown."""
+        if fetch_delay:
+            time.sleep(fetch_delay)
+        body = f"Contents of {url}: forecast sunny, 21°C, light wind. (request {next(requests)})"
+        return body[start_index:start_index + max_length]
+
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--startup-delay", type=float, default=0.0, help="Seconds to sleep before serving, e.g. to mimic uvx resolving the package")
+    parser.add_argument("--fetch-delay", type=float, default=0.0, help="Seconds each fetch takes")
+    args = parser.parse_args()
+
+    time.sleep(args.startup_delay)
+    create_server(args.fetch_delay).run(transport="stdio")
+
+
+if __name__ == "__main__":
+    main()
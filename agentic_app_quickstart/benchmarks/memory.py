@@ -0,0 +1,195 @@
+"""
+Conversation Memory Benchmark
+
+Builds synthetic conversations of `--turns` turns each: small talk and data
+questions with tool calls, with `--facts` personal facts ("my dentist is Dr
+Okafor") planted at random turns. Then asks for each fact again, reading the
+history the way the Runner does, once from a `SQLiteSession` (the whole
+history replayed) and once from a `RetrievalSession` (recent turns plus the
+relevant older ones). No model is called.
+
+Reports, per conversation length:
+
+- prompt tokens of the history sent with a request (estimated like
+  `examples/paging.py`, from the items' JSON)
+- history read latency (p50/p95) and the cold load of a session's index
+- recall: questions whose fact turn was among the turns sent
+- store time per turn, and the index and database footprint per 10k turns
+
+Usage:
+    uv run python -m agentic_app_quickstart.benchmarks.memory
+    uv run python -m agentic_app_quickstart.benchmarks.memory --turns 1000 10000 50000 --facts 100
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from dataclasses import replace
+
+from agents import SQLiteSession
+from rich.console import Console
+from rich.table import Table
+
+from agentic_app_quickstart.benchmarks.harness import percentile
+
+console = Console()
+
+THINGS = [
+    "dentist", "cat", "dog", "car", "favourite band", "gym", "manager", "sister", "landlord", "bank",
+    "favourite film", "hometown", "allergy", "bike", "piano teacher", "favourite dish", "football team",
+    "neighbour", "accountant", "favourite author", "wifi network", "middle name", "doctor", "boss",
+    "favourite city", "garden plant", "yoga class", "tax advisor", "best friend", "childhood street",
+]
+NAMES = [
+    "Okafor", "Biscuit", "Lindqvist", "Moreau", "Tanaka", "Pemberton", "Quigley", "Ravel", "Ostrowski",
+    "Castellano", "Haverford", "Nakamura", "Ferreira", "Wexley", "Abernathy", "Zoltan", "Marigold",
+]
+TOPICS = [
+    "weather in Lisbon", "quarterly sales", "the CSV of temperatures", "rainfall totals", "revenue by region",
+    "a pasta recipe", "train times", "holiday ideas", "a birthday present", "python decorators",
+    "average order value", "humidity trends", "the best hiking trails", "learning Spanish", "a book summary",
+]
+
+
+def conversation(turns: int, facts: int, seed: int = 0) -> tuple[list[list[dict]], list[tuple[int, str, str]]]:
+    """Turns of items, and `(turn, question, answer)` for each planted fact."""
+    rng = random.Random(seed)
+    planted = dict(zip(rng.sample(range(turns // 10, turns), min(facts, len(THINGS))), THINGS))
+    items, questions = [], []
+    for turn in range(turns):
+        if turn in planted:
+            thing, name = planted[turn], rng.choice(NAMES)
+            user = f"By the way, my {thing} is {name}, please remember that."
+            reply = f"Noted: your {thing} is {name}. I'll keep that in mind."
+            questions.append((turn, f"What did I tell you my {thing} is?", name))
+            items.append([
+                {"role": "user", "content": user},
+                {"role": "assistant", "type": "message", "content": [{"type": "output_text", "text": reply}]},
+            ])
+            continue
+        topic = rng.choice(TOPICS)
+        turn_items = [{"role": "user", "content": f"Can you help me with {topic}? Question {turn}."}]
+        if rng.random() < 0.3:
+            call_id = f"call_{turn}"
+            turn_items += [
+                {"type": "function_call", "call_id": call_id, "name": "lookup", "arguments": json.dumps({"q": topic})},
+                {"type": "function_call_output", "call_id": call_id, "output": f"{topic}: " + "12.5, " * 40},
+            ]
+        text = f"Here is what I found about {topic}. " + " ".join(rng.choice(TOPICS) for _ in range(8))
+        turn_items.append({"role": "assistant", "type": "message", "content": [{"type": "output_text", "text": text}]})
+        items.append(turn_items)
+    return items, questions
+
+
+def tokens(items: list) -> int:
+    from agentic_app_quickstart.examples.paging import estimate_tokens
+
+    return estimate_tokens(json.dumps(items))
+
+
+async def measure(turns: int, facts: int, directory: str) -> dict:
+    from agentic_app_quickstart.examples.memory import RetrievalSession, recall
+    from agentic_app_quickstart.week_2.solution.config.settings import get_settings
+
+    history, questions = conversation(turns, facts)
+    full = SQLiteSession(f"full-{turns}", db_path=os.path.join(directory, f"full-{turns}.sqlite"))
+    path = os.path.join(directory, f"memory-{turns}.sqlite")
+    settings = replace(get_settings().memory, path=path)
+    memory = RetrievalSession(f"memory-{turns}", settings=settings)
+
+    start = time.perf_counter()
+    for turn_items in history:
+        await memory.add_items(turn_items)
+    store = (time.perf_counter() - start) / turns
+    for turn_items in history:
+        await full.add_items(turn_items)
+
+    # A fresh session object, so the index is loaded from disk as after a restart
+    memory.close()
+    memory = RetrievalSession(f"memory-{turns}", settings=settings)
+    start = time.perf_counter()
+    _ = memory.index
+    load = time.perf_counter() - start
+
+    result = {"full_tokens": [], "full_seconds": [], "tokens": [], "seconds": [], "found": 0}
+    for _, question, answer in questions:
+        start = time.perf_counter()
+        items = await full.get_items()
+        result["full_seconds"].append(time.perf_counter() - start)
+        result["full_tokens"].append(tokens(items))
+
+        start = time.perf_counter()
+        with recall(question):
+            items = await memory.get_items()
+        result["seconds"].append(time.perf_counter() - start)
+        result["tokens"].append(tokens(items))
+        result["found"] += answer in json.dumps(items)
+
+    result.update(
+        questions=len(questions),
+        store=store,
+        load=load,
+        index_bytes=memory.index.nbytes,
+        db_bytes=sum(os.path.getsize(path + suffix) for suffix in ("", "-wal") if os.path.exists(path + suffix)),
+    )
+    memory.close()
+    full.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, nargs="+", default=[1000, 10000], help="Conversation lengths")
+    parser.add_argument("--facts", type=int, default=30, help="Facts planted and asked for per conversation")
+    args = parser.parse_args()
+
+    from agentic_app_quickstart.week_2.solution.config.settings import get_settings
+
+    memory = get_settings().memory
+    table = Table(
+        title=f"History sent per request: full replay vs. {memory.recent_turns} recent + top {memory.top_k} "
+        f"retrieved turns ({memory.dim}-dim hashed n-grams)"
+    )
+    columns = (
+        "turns", "history", "prompt tokens", "read p50 ms", "read p95 ms", "recall",
+        "store ms/turn", "index load ms", "index MiB/10k", "db MiB/10k",
+    )
+    for column in columns:
+        table.add_column(column, justify="left" if column == "history" else "right")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for turns in args.turns:
+            r = asyncio.run(measure(turns, args.facts, directory))
+            per_10k = 10_000 / turns / 2**20
+            table.add_row(
+                str(turns),
+                "full replay",
+                f"{sum(r['full_tokens']) / r['questions']:,.0f}",
+                f"{percentile(r['full_seconds'], 50) * 1000:.1f}",
+                f"{percentile(r['full_seconds'], 95) * 1000:.1f}",
+                "100%",
+                "-", "-", "-", "-",
+            )
+            table.add_row(
+                "",
+                "retrieval",
+                f"{sum(r['tokens']) / r['questions']:,.0f}",
+                f"{percentile(r['seconds'], 50) * 1000:.1f}",
+                f"{percentile(r['seconds'], 95) * 1000:.1f}",
+                f"{r['found'] / r['questions']:.0%}",
+                f"{r['store'] * 1000:.2f}",
+                f"{r['load'] * 1000:.1f}",
+                f"{r['index_bytes'] * per_10k:.1f}",
+                f"{r['db_bytes'] * per_10k:.1f}",
+                end_section=True,
+            )
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
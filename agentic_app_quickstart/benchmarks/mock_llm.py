@@ -0,0 +1,309 @@
+"""
+Scripted, deterministic stand-in for the OpenAI chat completions API.
+
+The benchmarks need to drive the example agents without reaching
+`OPENAI_API_ENDPOINT`. `MockLLM` answers chat completion requests with a fixed
+policy that is enough to walk every example through its full flow:
+
+1. Within the current user turn, call every available function tool once,
+   in the order the agent declares them.
+2. Take the first handoff, unless a handoff already happened in this turn.
+3. Reply with structured JSON if a `response_format` schema was requested,
+   otherwise with plain text padded to `reply_bytes`.
+
+Agents that need a specific trajectory can be given an explicit script instead,
+matched on a substring of their instructions (the system prompt). Each step is
+one model response: `{"tool": name, "arguments": {...}}`, `{"handoff": name}`,
+`{"content": text}` or `{"json": value}`. Steps beyond the script fall back to
+the default policy.
+
+The policy is served in-process through an `httpx.MockTransport` (`client()`),
+or over HTTP by `mock_server.py`, so the whole OpenAI client stack is exercised.
+"""
+
+import itertools
+import json
+import time
+from typing import Any
+
+import httpx
+from agents.models.openai_chatcompletions import OpenAIChatCompletionsModel
+from openai import AsyncOpenAI
+
+HANDOFF_PREFIX = "transfer_to_"
+
+
+def fill_schema(schema: dict, defs: dict | None = None) -> Any:
+    """
+    Build a minimal value that validates against a JSON schema.
+
+    Args:
+        schema (dict): JSON schema, as produced by Pydantic / the agents SDK
+        defs (dict, optional): `$defs` of the root schema, used to resolve refs
+
+    Returns:
+        Any: A value of the requested shape
+    """
+    defs = defs if defs is not None else schema.get("$defs", {})
+
+    if "$ref" in schema:
+        return fill_schema(defs[schema["$ref"].split("/")[-1]], defs)
+    if "anyOf" in schema:
+        return fill_schema(schema["anyOf"][0], defs)
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "default" in schema:
+        return schema["default"]
+
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = kind[0]
+
+    if kind == "object":
+        return {
+            name: fill_schema(prop, defs)
+            for name, prop in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        return []
+    if kind == "boolean":
+        return True
+    if kind in ("integer", "number"):
+        return 0
+    if kind == "null":
+        return None
+    return "mock"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (4 characters per token) used for mock usage stats."""
+    return max(1, len(text) // 4)
+
+
+class MockLLM:
+    """
+    Deterministic chat completions policy.
+
+    Args:
+        tool_arguments (dict, optional): Arguments to send per tool name. Tools
+            without an entry get values generated from their JSON schema.
+        reply_bytes (int): Size of the final text reply, to vary payload size
+        scripts (dict, optional): Explicit steps per system-prompt substring; a
+            system message later in the turn ends the script
+        skip_tools (tuple[str, ...]): Tools the default policy never calls, such
+            as `fetch_more`, which only makes sense after a truncated result
+    """
+
+    def __init__(
+        self,
+        tool_arguments: dict[str, dict] | None = None,
+        reply_bytes: int = 64,
+        scripts: dict[str, list[dict]] | None = None,
+        skip_tools: tuple[str, ...] = ("fetch_more",),
+    ):
+        self.tool_arguments = tool_arguments or {}
+        self.reply_bytes = reply_bytes
+        self.scripts = scripts or {}
+        self.skip_tools = skip_tools
+        self.requests = 0
+        self._ids = itertools.count(1)
+
+    def _current_turn(self, messages: list[dict]) -> list[dict]:
+        # Everything after the last user message belongs to the current turn
+        for index in range(len(messages) - 1, -1, -1):
+            if messages[index].get("role") == "user":
+                return messages[index + 1 :]
+        return messages
+
+    def _reply_text(self) -> str:
+        text = "Mock reply."
+        if self.reply_bytes > len(text):
+            text += " " + "x" * (self.reply_bytes - len(text) - 1)
+        return text
+
+    def _scripted_action(self, body: dict, turn: list[dict]) -> tuple[str, Any] | None:
+        messages = body.get("messages", [])
+        system = ""
+        if messages and messages[0].get("role") == "system":
+            system = messages[0].get("content") or ""
+        script = next((steps for key, steps in self.scripts.items() if key in system), None)
+        if script is None:
+            return None
+        if any(message.get("role") == "system" for message in turn):
+            # A corrective note (see examples/loops.py) ends the script, as a real model would change course
+            return None
+
+        step_index = sum(1 for message in turn if message.get("role") == "assistant")
+        if step_index >= len(script):
+            return None
+
+        step = script[step_index]
+        if "tool" in step:
+            return "tool_call", (step["tool"], step.get("arguments", {}))
+        if "handoff" in step:
+            return "tool_call", (step["handoff"], {})
+        if "json" in step:
+            return "content", json.dumps(step["json"])
+        return "content", step["content"]
+
+    def _next_action(self, body: dict) -> tuple[str, Any]:
+        turn = self._current_turn(body.get("messages", []))
+        scripted = self._scripted_action(body, turn)
+        if scripted is not None:
+            return scripted
+
+        called = [
+            call["function"]["name"]
+            for message in turn
+            if message.get("role") == "assistant"
+            for call in message.get("tool_calls") or []
+        ]
+        handed_off = any(name.startswith(HANDOFF_PREFIX) for name in called)
+
+        tools = [t["function"] for t in body.get("tools") or [] if t.get("type") == "function"]
+        function_tools = [
+            t for t in tools
+            if not t["name"].startswith(HANDOFF_PREFIX) and t["name"] not in self.skip_tools
+        ]
+        handoffs = [t for t in tools if t["name"].startswith(HANDOFF_PREFIX)]
+
+        for tool in function_tools:
+            if tool["name"] not in called:
+                arguments = self.tool_arguments.get(tool["name"])
+                if arguments is None:
+                    arguments = fill_schema(tool.get("parameters") or {"type": "object"})
+                return "tool_call", (tool["name"], arguments)
+
+        if handoffs and not handed_off:
+            return "tool_call", (handoffs[0]["name"], {})
+
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            return "content", json.dumps(fill_schema(response_format["json_schema"]["schema"]))
+
+        return "content", self._reply_text()
+
+    def complete(self, body: dict) -> dict:
+        """
+        Produce a chat completion for a request body.
+
+        Args:
+            body (dict): Parsed `/chat/completions` request
+
+        Returns:
+            dict: A `ChatCompletion` payload
+        """
+        self.requests += 1
+        action, value = self._next_action(body)
+
+        message: dict[str, Any] = {"role": "assistant", "content": None}
+        if action == "tool_call":
+            name, arguments = value
+            message["tool_calls"] = [
+                {
+                    "id": f"call_{next(self._ids)}",
+                    "type": "function",
+                    "function": {"name": name, "arguments": json.dumps(arguments)},
+                }
+            ]
+            finish_reason = "tool_calls"
+            completion_text = message["tool_calls"][0]["function"]["arguments"]
+        else:
+            message["content"] = value
+            finish_reason = "stop"
+            completion_text = value
+
+        prompt_tokens = estimate_tokens(json.dumps(body.get("messages", [])))
+        completion_tokens = estimate_tokens(completion_text)
+
+        return {
+            "id": f"chatcmpl-mock-{next(self._ids)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def stream_chunks(self, completion: dict, chunk_chars: int = 16) -> list[dict]:
+        """
+        Split a completion into `chat.completion.chunk` payloads.
+
+        Args:
+            completion (dict): Result of `complete()`
+            chunk_chars (int): Characters of content or arguments per chunk
+
+        Returns:
+            list[dict]: Chunks in order; the last one carries finish reason and usage
+        """
+        choice = completion["choices"][0]
+        message = choice["message"]
+
+        def chunk(delta: dict, finish_reason: str | None = None, usage: dict | None = None) -> dict:
+            return {
+                "id": completion["id"],
+                "object": "chat.completion.chunk",
+                "created": completion["created"],
+                "model": completion["model"],
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                "usage": usage,
+            }
+
+        chunks = [chunk({"role": "assistant", "content": ""})]
+        content = message.get("content") or ""
+        for start in range(0, len(content), chunk_chars):
+            chunks.append(chunk({"content": content[start : start + chunk_chars]}))
+
+        for index, call in enumerate(message.get("tool_calls") or []):
+            arguments = call["function"]["arguments"]
+            chunks.append(
+                chunk(
+                    {
+                        "tool_calls": [
+                            {
+                                "index": index,
+                                "id": call["id"],
+                                "type": "function",
+                                "function": {"name": call["function"]["name"], "arguments": ""},
+                            }
+                        ]
+                    }
+                )
+            )
+            for start in range(0, len(arguments), chunk_chars):
+                chunks.append(
+                    chunk(
+                        {
+                            "tool_calls": [
+                                {
+                                    "index": index,
+                                    "function": {"arguments": arguments[start : start + chunk_chars]},
+                                }
+                            ]
+                        }
+                    )
+                )
+
+        chunks.append(chunk({}, finish_reason=choice["finish_reason"], usage=completion["usage"]))
+        return chunks
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        if not request.url.path.endswith("/chat/completions"):
+            return httpx.Response(404, json={"error": {"message": "Not found"}})
+        return httpx.Response(200, json=self.complete(json.loads(request.content)))
+
+    def client(self) -> AsyncOpenAI:
+        """Return an `AsyncOpenAI` client served in-process by this mock."""
+        return AsyncOpenAI(
+            api_key="mock",
+            base_url="http://mock-llm/v1",
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(self._handle)),
+        )
+
+    def model(self, model: str = "gpt-4.1") -> OpenAIChatCompletionsModel:
+        """Return a chat completions model backed by this mock."""
+        return OpenAIChatCompletionsModel(model=model, openai_client=self.client())
@@ -0,0 +1,326 @@
+"""
+Local OpenAI-compatible mock server.
+
+Serves the deterministic `MockLLM` policy over HTTP at `/v1/chat/completions`
+(plain and streaming), with configurable latency so the example agents can be
+load-tested without the remote `OPENAI_API_ENDPOINT`.
+
+Latency is modelled as time-to-first-token plus one delay per completion
+token. Both are drawn from seeded distributions, written as `kind:params`:
+
+    constant:0.2          always 0.2
+    uniform:0.1,0.5       between 0.1 and 0.5
+    normal:0.3,0.05       mean 0.3, standard deviation 0.05 (clipped at 0)
+    lognormal:-1.2,0.4    exp(N(mu, sigma)), a typical heavy-tailed LLM latency
+    exponential:0.3       mean 0.3
+
+`Faults` injects failures on top: a fraction of requests answered with an
+error status (optionally with Retry-After), a fraction of stragglers that
+take `slow_seconds` longer, for testing retries and hedging, and a server-side
+rate limit answering 429 above `rate_limit` requests per second.
+
+Usage:
+    # stand-alone, then point the examples at it
+    uv run python -m agentic_app_quickstart.benchmarks.mock_server --port 8100 \
+        --ttft lognormal:-1.2,0.4 --token-rate constant:80
+    OPENAI_API_ENDPOINT=http://127.0.0.1:8100/v1 OPENAI_API_KEY=mock \
+        uv run python agentic_app_quickstart/examples/week_1/01_hello_world.py
+
+    # from Python
+    with MockServer(MockLLM(), LatencyProfile.parse("constant:0.05")) as server:
+        os.environ["OPENAI_API_ENDPOINT"] = server.base_url
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from agentic_app_quickstart.benchmarks.mock_llm import MockLLM, estimate_tokens
+
+
+@dataclass
+class Distribution:
+    """A seeded random distribution parsed from `kind:p1,p2`."""
+
+    kind: str
+    params: tuple[float, ...]
+
+    @classmethod
+    def parse(cls, spec: str) -> "Distribution":
+        kind, _, raw = spec.partition(":")
+        params = tuple(float(p) for p in raw.split(",") if p) if raw else (0.0,)
+        if kind not in ("constant", "uniform", "normal", "lognormal", "exponential"):
+            raise ValueError(f"Unknown distribution {kind!r} in {spec!r}")
+        return cls(kind, params)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "constant":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        if self.kind == "normal":
+            return max(0.0, rng.gauss(*self.params))
+        if self.kind == "lognormal":
+            return rng.lognormvariate(*self.params)
+        return rng.expovariate(1 / self.params[0]) if self.params[0] > 0 else 0.0
+
+
+@dataclass
+class LatencyProfile:
+    """
+    Time-to-first-token (seconds) and token rate (tokens per second).
+
+    A token rate of 0 means tokens are produced instantly.
+    """
+
+    ttft: Distribution
+    token_rate: Distribution
+    seed: int = 0
+    rate_limit: float = 0.0
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+        self._recent: deque[float] = deque()
+        self.throttled = 0
+
+    def over_rate_limit(self) -> bool:
+        """Whether a request arriving now exceeds `rate_limit` requests in the last second."""
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        while self._recent and self._recent[0] <= now - 1.0:
+            self._recent.popleft()
+        if len(self._recent) >= self.rate_limit:
+            self.throttled += 1
+            return True
+        self._recent.append(now)
+        return False
+
+    @classmethod
+    def parse(cls, ttft: str = "constant:0", token_rate: str = "constant:0", seed: int = 0) -> "LatencyProfile":
+        return cls(Distribution.parse(ttft), Distribution.parse(token_rate), seed)
+
+    def sample(self) -> tuple[float, float]:
+        """Return `(time_to_first_token, seconds_per_token)`."""
+        rate = self.token_rate.sample(self._rng)
+        per_token = 1 / rate if rate > 0 and math.isfinite(rate) else 0.0
+        return self.ttft.sample(self._rng), per_token
+
+
+@dataclass
+class Faults:
+    """
+    Failures injected into completions.
+
+    Attributes:
+        error_rate (float): Fraction of requests answered with `error_status`
+        error_status (int): HTTP status of injected errors
+        retry_after (float, optional): Retry-After seconds sent with injected errors
+        slow_rate (float): Fraction of requests delayed by `slow_seconds` more
+        slow_seconds (float): Extra delay of a straggler
+        seed (int): Seed of the fault draws
+        rate_limit (float): Requests per second served before answering 429, 0 for no limit
+    """
+
+    error_rate: float = 0.0
+    error_status: int = 503
+    retry_after: float | None = None
+    slow_rate: float = 0.0
+    slow_seconds: float = 0.0
+    seed: int = 0
+    rate_limit: float = 0.0
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+        self._recent: deque[float] = deque()
+        self.throttled = 0
+
+    def over_rate_limit(self) -> bool:
+        """Whether a request arriving now exceeds `rate_limit` requests in the last second."""
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        while self._recent and self._recent[0] <= now - 1.0:
+            self._recent.popleft()
+        if len(self._recent) >= self.rate_limit:
+            self.throttled += 1
+            return True
+        self._recent.append(now)
+        return False
+
+    def draw(self) -> tuple[bool, float]:
+        """Return `(fail, extra_delay)` for one request."""
+        fail = self._rng.random() < self.error_rate
+        slow = self._rng.random() < self.slow_rate
+        return fail, self.slow_seconds if slow else 0.0
+
+
+def create_app(
+    llm: MockLLM,
+    latency: LatencyProfile,
+    model_latency: dict[str, LatencyProfile] | None = None,
+    faults: Faults | None = None,
+) -> FastAPI:
+    """
+    Build the FastAPI app serving the mock.
+
+    Args:
+        llm (MockLLM): Response policy
+        latency (LatencyProfile): Delay applied to every completion
+        model_latency (dict[str, LatencyProfile], optional): Delay per requested
+            model, overriding `latency`, to simulate model tiers
+        faults (Faults, optional): Injected errors and stragglers
+
+    Returns:
+        FastAPI: The application
+    """
+    app = FastAPI(title="Mock OpenAI API")
+    app.state.llm = llm
+    app.state.latency = latency
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok", "requests": llm.requests}
+
+    @app.get("/v1/models")
+    async def models():
+        names = ["gpt-4.1", *(model_latency or {})]
+        return {"object": "list", "data": [{"id": n, "object": "model", "owned_by": "mock"} for n in dict.fromkeys(names)]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if faults and faults.over_rate_limit():
+            error = {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}}
+            return JSONResponse(error, status_code=429, headers={"retry-after": "1"})
+        fail, extra = faults.draw() if faults else (False, 0.0)
+        if fail:
+            headers = {"retry-after": str(faults.retry_after)} if faults.retry_after is not None else None
+            error = {"error": {"message": "Injected fault", "type": "server_error", "code": None}}
+            return JSONResponse(error, status_code=faults.error_status, headers=headers)
+
+        completion = llm.complete(body)
+        ttft, per_token = (model_latency or {}).get(body.get("model"), latency).sample()
+        ttft += extra
+
+        if not body.get("stream"):
+            await asyncio.sleep(ttft + per_token * completion["usage"]["completion_tokens"])
+            return JSONResponse(completion)
+
+        async def events():
+            await asyncio.sleep(ttft)
+            for chunk in llm.stream_chunks(completion):
+                delta = chunk["choices"][0]["delta"]
+                text = delta.get("content") or json.dumps(delta.get("tool_calls") or "")
+                if per_token:
+                    await asyncio.sleep(per_token * estimate_tokens(text))
+                yield f"data: {json.dumps(chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+class MockServer:
+    """
+    Runs the mock server on a background thread for the duration of a `with`.
+
+    Args:
+        llm (MockLLM, optional): Response policy, defaults to `MockLLM()`
+        latency (LatencyProfile, optional): Defaults to no added latency
+        model_latency (dict[str, LatencyProfile], optional): Latency per model
+        faults (Faults, optional): Injected errors and stragglers
+        host (str): Interface to bind
+        port (int): Port to bind; 0 picks a free one
+    """
+
+    def __init__(
+        self,
+        llm: MockLLM | None = None,
+        latency: LatencyProfile | None = None,
+        model_latency: dict[str, LatencyProfile] | None = None,
+        faults: Faults | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.llm = llm or MockLLM()
+        self.latency = latency or LatencyProfile.parse()
+        self.model_latency = model_latency
+        self.faults = faults
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    def __enter__(self) -> "MockServer":
+        config = uvicorn.Config(
+            create_app(self.llm, self.latency, self.model_latency, self.faults),
+            host=self.host,
+            port=self.port,
+            log_level="warning",
+            access_log=False,
+        )
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+
+        while not self._server.started:
+            if not self._thread.is_alive():
+                raise RuntimeError("Mock server failed to start")
+            time.sleep(0.01)
+
+        self.port = self._server.servers[0].sockets[0].getsockname()[1]
+        return self
+
+    def __exit__(self, *exc):
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--ttft", default="constant:0", help="Time to first token, seconds")
+    parser.add_argument("--token-rate", default="constant:0", help="Tokens per second, 0 = instant")
+    parser.add_argument("--reply-bytes", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scripts", help="JSON file with {system prompt substring: [steps]}")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--retry-after", type=float, default=None, help="Retry-After seconds on injected errors")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Fraction of straggler requests")
+    parser.add_argument("--slow-seconds", type=float, default=0.0, help="Extra delay of a straggler")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests per second before answering 429")
+    args = parser.parse_args()
+
+    scripts = None
+    if args.scripts:
+        with open(args.scripts) as f:
+            scripts = json.load(f)
+
+    llm = MockLLM(reply_bytes=args.reply_bytes, scripts=scripts)
+    latency = LatencyProfile.parse(args.ttft, args.token_rate, args.seed)
+    faults = Faults(
+        args.error_rate, args.error_status, args.retry_after, args.slow_rate, args.slow_seconds, args.seed, args.rate_limit
+    )
+    uvicorn.run(create_app(llm, latency, faults=faults), host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
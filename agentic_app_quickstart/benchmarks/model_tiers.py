@@ -0,0 +1,144 @@
+"""
+Model Tiering Benchmark
+
+Compares the per-role model tiers from `week_2/solution/config/settings.py`
+with the single-model setup (every role on `gpt-4.1`). Each example runs
+against the mock server, which simulates slower time-to-first-token and
+token rates for bigger models. Cost is computed from the metered token usage
+and the prices in `monitoring/metering.py`.
+
+The default latencies are rough public figures for each model tier, not
+measurements; pass `--latency` to use your own.
+
+Usage:
+    uv run python -m agentic_app_quickstart.benchmarks.model_tiers
+    uv run python -m agentic_app_quickstart.benchmarks.model_tiers --examples guardrails handoffs --runs 40
+    uv run python -m agentic_app_quickstart.benchmarks.model_tiers \
+        --latency gpt-4.1=lognormal:-0.9,0.3/constant:60 gpt-4.1-mini=lognormal:-1.4,0.3/constant:110
+"""
+
+import argparse
+import asyncio
+import os
+
+from rich.console import Console
+from rich.table import Table
+
+from agentic_app_quickstart.benchmarks.examples import EXAMPLES, load_example, prepare_environment
+from agentic_app_quickstart.benchmarks.harness import drive
+from agentic_app_quickstart.benchmarks.mock_llm import MockLLM
+from agentic_app_quickstart.benchmarks.mock_server import LatencyProfile, MockServer
+
+# model: (time to first token, tokens per second)
+DEFAULT_LATENCY = {
+    "gpt-4.1": "lognormal:-0.9,0.3/constant:60",
+    "gpt-4.1-mini": "lognormal:-1.4,0.3/constant:110",
+    "gpt-4.1-nano": "lognormal:-1.8,0.3/constant:180",
+}
+
+SETUPS = ["single", "tiered"]
+
+console = Console()
+
+
+def parse_latency(specs: list[str]) -> dict[str, LatencyProfile]:
+    profiles = {}
+    for seed, spec in enumerate(specs):
+        model, _, distributions = spec.partition("=")
+        ttft, _, rate = distributions.partition("/")
+        profiles[model] = LatencyProfile.parse(ttft, rate or "constant:0", seed)
+    return profiles
+
+
+def usage_by_model() -> dict[str, tuple[int, float]]:
+    from agentic_app_quickstart.week_2.solution.monitoring.metering import METER
+
+    return {row["model"]: (row["tokens"], row["cost_usd"]) for row in METER.top_consumers(by="model", limit=-1)}
+
+
+async def run_setup(setup: str, examples: list[str], concurrency: int, runs: int) -> list[dict]:
+    from agentic_app_quickstart.examples.helpers import get_model
+    from agentic_app_quickstart.week_2.solution.config.settings import get_settings
+
+    if setup == "single":
+        os.environ["SINGLE_MODEL"] = "gpt-4.1"
+    else:
+        os.environ.pop("SINGLE_MODEL", None)
+    get_settings.cache_clear()
+
+    results = []
+    for name in examples:
+        agent = load_example(name, get_model)
+        before = usage_by_model()
+        stats = await drive(name, agent, concurrency, runs)
+        after = usage_by_model()
+
+        tokens = sum(t - before.get(m, (0, 0))[0] for m, (t, _) in after.items())
+        cost = sum(c - before.get(m, (0, 0))[1] for m, (_, c) in after.items())
+        models = sorted(m for m in after if after[m] != before.get(m))
+        stats.update(
+            example=name,
+            setup=setup,
+            models=", ".join(models),
+            tokens_per_run=tokens / max(stats["runs"], 1),
+            cost_per_1k_runs=cost / max(stats["runs"], 1) * 1000,
+        )
+        results.append(stats)
+    return results
+
+
+def print_report(results: list[dict]):
+    table = Table(title="Single model vs per-role tiers")
+    for column in ("example", "setup", "models", "p50 ms", "p95 ms", "req/s", "tokens/run", "$/1k runs", "vs single"):
+        table.add_column(column, justify="left" if column in ("example", "setup", "models") else "right")
+
+    single = {r["example"]: r for r in results if r["setup"] == "single"}
+    for r in results:
+        base = single[r["example"]]
+        delta = ""
+        if r is not base:
+            latency = (r["p50_ms"] - base["p50_ms"]) / base["p50_ms"] if base["p50_ms"] else 0
+            cost = (r["cost_per_1k_runs"] - base["cost_per_1k_runs"]) / base["cost_per_1k_runs"] if base["cost_per_1k_runs"] else 0
+            delta = f"p50 {latency:+.0%}, cost {cost:+.0%}"
+        table.add_row(
+            r["example"],
+            r["setup"],
+            r["models"],
+            f"{r['p50_ms']:.0f}",
+            f"{r['p95_ms']:.0f}",
+            f"{r['throughput_rps']:.2f}",
+            f"{r['tokens_per_run']:.0f}",
+            f"{r['cost_per_1k_runs']:.3f}",
+            delta,
+        )
+    console.print(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--examples", nargs="+", default=["guardrails", "handoffs", "csv_analyzer"], choices=list(EXAMPLES))
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument(
+        "--latency",
+        nargs="+",
+        default=[f"{model}={spec}" for model, spec in DEFAULT_LATENCY.items()],
+        help="model=ttft/token-rate distributions, see mock_server.py",
+    )
+    args = parser.parse_args()
+
+    tool_arguments = {}
+    for spec in EXAMPLES.values():
+        tool_arguments.update(spec.tool_arguments)
+
+    results = []
+    with MockServer(MockLLM(tool_arguments=tool_arguments), model_latency=parse_latency(args.latency)) as server:
+        os.environ["OPENAI_API_ENDPOINT"] = server.base_url
+        prepare_environment()
+        for setup in SETUPS:
+            results += asyncio.run(run_setup(setup, args.examples, args.concurrency, args.runs))
+    print_report(results)
+
+
+if __name__ == "__main__":
+    main()
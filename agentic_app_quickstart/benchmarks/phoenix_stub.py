@@ -0,0 +1,154 @@
+"""
+Local stand-in for Phoenix's evaluation endpoint.
+
+Accepts `POST /v1/evaluations` bodies the way Phoenix does (Arrow IPC streams
+of `SpanEvaluations`, compressed or not, 422 for anything it cannot read) and
+keeps the latest evaluation per eval name and span id, so uploads can be
+tested and benchmarked without a Phoenix server. Each request waits for a
+sampled latency, and `Faults` from `mock_server` inject errors and a rate
+limit.
+
+Usage:
+    uv run python -m agentic_app_quickstart.benchmarks.phoenix_stub --port 8200 --latency constant:0.02
+    EVAL_UPLOAD_ENDPOINT=http://127.0.0.1:8200 uv run python ...   # EvaluationSink() now uploads to the stand-in
+
+    # from Python
+    with PhoenixStub(Distribution.parse("constant:0.02")) as stub:
+        sink = EvaluationSink(endpoint=stub.base_url)
+"""
+
+import argparse
+import asyncio
+import random
+import threading
+import time
+from collections import defaultdict
+
+import pyarrow as pa
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+from phoenix.trace.span_evaluations import Evaluations
+
+from agentic_app_quickstart.benchmarks.mock_server import Distribution, Faults
+
+
+def create_app(latency: Distribution, faults: Faults | None = None, seed: int = 0) -> FastAPI:
+    """
+    Build the FastAPI app of the stand-in.
+
+    Args:
+        latency (Distribution): Delay of every request
+        faults (Faults, optional): Injected errors and rate limit
+        seed (int): Seed of the latency draws
+
+    Returns:
+        FastAPI: The application; `app.state.evaluations` maps eval name to
+            `{span_id: row}` and `app.state.requests` counts requests
+    """
+    app = FastAPI(title="Phoenix evaluations stand-in")
+    app.state.evaluations = defaultdict(dict)
+    app.state.requests = 0
+    rng = random.Random(seed)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok", "requests": app.state.requests}
+
+    @app.post("/v1/evaluations")
+    async def evaluations(request: Request):
+        app.state.requests += 1
+        body = await request.body()
+        await asyncio.sleep(latency.sample(rng))
+        if faults and faults.over_rate_limit():
+            return JSONResponse({"detail": "Rate limit reached"}, status_code=429, headers={"retry-after": "1"})
+        if faults and faults.draw()[0]:
+            headers = {"retry-after": str(faults.retry_after)} if faults.retry_after is not None else None
+            return JSONResponse({"detail": "Injected fault"}, status_code=faults.error_status, headers=headers)
+        if request.headers.get("content-type") != "application/x-pandas-arrow":
+            return JSONResponse({"detail": "Unsupported content type"}, status_code=415)
+        try:
+            evaluations = Evaluations.from_pyarrow_reader(pa.ipc.open_stream(body))
+        except Exception:
+            return JSONResponse({"detail": "Invalid data in request body"}, status_code=422)
+        rows = app.state.evaluations[evaluations.eval_name]
+        for span_id, row in evaluations.dataframe.iterrows():
+            rows[span_id] = row.to_dict()
+        return Response()
+
+    return app
+
+
+class PhoenixStub:
+    """
+    Runs the stand-in on a background thread for the duration of a `with`.
+
+    Args:
+        latency (Distribution, optional): Delay of every request, none by default
+        faults (Faults, optional): Injected errors and rate limit
+        host (str): Interface to bind
+        port (int): Port to bind; 0 picks a free one
+    """
+
+    def __init__(
+        self,
+        latency: Distribution | None = None,
+        faults: Faults | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.app = create_app(latency or Distribution.parse("constant:0"), faults)
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def requests(self) -> int:
+        return self.app.state.requests
+
+    def rows(self, eval_name: str | None = None) -> int:
+        """Distinct spans evaluated, for one eval name or all of them."""
+        stored = self.app.state.evaluations
+        names = [eval_name] if eval_name else list(stored)
+        return sum(len(stored.get(name, {})) for name in names)
+
+    def __enter__(self) -> "PhoenixStub":
+        config = uvicorn.Config(self.app, host=self.host, port=self.port, log_level="warning", access_log=False)
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+
+        while not self._server.started:
+            if not self._thread.is_alive():
+                raise RuntimeError("Phoenix stand-in failed to start")
+            time.sleep(0.01)
+
+        self.port = self._server.servers[0].sockets[0].getsockname()[1]
+        return self
+
+    def __exit__(self, *exc):
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8200)
+    parser.add_argument("--latency", default="constant:0", help="Delay of every request, e.g. lognormal:-3.5,0.4")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests per second before 429s")
+    args = parser.parse_args()
+
+    faults = Faults(error_rate=args.error_rate, rate_limit=args.rate_limit)
+    app = create_app(Distribution.parse(args.latency), faults)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Rate Limiter Benchmark
+
+Interactive users and a batch job share one model against a mock server that
+answers 429 above `--server-rps` requests per second. A few interactive users
+send a request now and then, while many batch workers send as fast as they
+can (under `rate_priority("batch")`). This runs once with no client-side
+limit, so the batch load runs into 429s and retries, and once with the
+shared `RateLimiter` set just under the server's limit.
+
+Reports latency and completed requests per priority, and the 429s the server
+sent.
+
+Usage:
+    uv run python -m agentic_app_quickstart.benchmarks.rate_limit
+    uv run python -m agentic_app_quickstart.benchmarks.rate_limit --server-rps 10 --batch-workers 64 --seconds 20
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from agents import ModelSettings
+from agents.models.interface import ModelTracing
+from rich.console import Console
+from rich.table import Table
+
+from agentic_app_quickstart.benchmarks.examples import prepare_environment
+from agentic_app_quickstart.benchmarks.harness import percentile
+from agentic_app_quickstart.benchmarks.mock_llm import MockLLM
+from agentic_app_quickstart.benchmarks.mock_server import Faults, LatencyProfile, MockServer
+
+console = Console()
+
+
+async def load(seconds: float, interactive_users: int, think_seconds: float, batch_workers: int) -> dict:
+    from agentic_app_quickstart.examples.helpers import get_model
+    from agentic_app_quickstart.examples.ratelimit import rate_priority
+
+    model = get_model("agent")
+    results = {"interactive": ([], [0]), "batch": ([], [0])}
+    stop = time.perf_counter() + seconds
+
+    async def user(priority: str, pause: float):
+        latencies, failures = results[priority]
+        with rate_priority(priority):
+            while time.perf_counter() < stop:
+                start = time.perf_counter()
+                try:
+                    await model.get_response(
+                        "You are a helpful assistant.",
+                        "Say hello.",
+                        ModelSettings(),
+                        [],
+                        None,
+                        [],
+                        ModelTracing.DISABLED,
+                        previous_response_id=None,
+                        prompt=None,
+                    )
+                    latencies.append(time.perf_counter() - start)
+                except Exception:
+                    failures[0] += 1
+                await asyncio.sleep(pause)
+
+    await asyncio.gather(
+        *(user("interactive", think_seconds) for _ in range(interactive_users)),
+        *(user("batch", 0) for _ in range(batch_workers)),
+    )
+    return results
+
+
+def run_mode(mode: str, args) -> dict:
+    from agentic_app_quickstart.examples.models import CircuitBreakerModel, ResilientModel
+    from agentic_app_quickstart.examples.ratelimit import get_rate_limiter
+    from agentic_app_quickstart.week_2.solution.config.settings import get_settings
+
+    faults = Faults(rate_limit=args.server_rps)
+    with MockServer(MockLLM(), LatencyProfile.parse(args.ttft), faults=faults) as server:
+        os.environ.update(
+            OPENAI_API_ENDPOINT=server.base_url,
+            RATE_LIMIT_RPM=str(args.server_rps * 60 * 0.9) if mode == "shared limiter" else "0",
+            # The mock enforces its limit per second, so no burst beyond that
+            RATE_LIMIT_BURST_SECONDS="1",
+            MODEL_RETRY_BACKOFF="0.05",
+            MODEL_MAX_RETRIES="5",
+        )
+        prepare_environment()
+        get_settings.cache_clear()
+        get_rate_limiter.cache_clear()
+        CircuitBreakerModel._breakers.clear()
+        ResilientModel._stats_by_name.clear()
+        results = asyncio.run(load(args.seconds, args.interactive_users, args.think_seconds, args.batch_workers))
+    return {"mode": mode, "results": results, "throttled": faults.throttled}
+
+
+def print_report(runs: list[dict], args):
+    table = Table(title=f"{args.seconds:g}s against a server limited to {args.server_rps:g} requests/s")
+    for column in ("mode", "priority", "requests", "failed", "p50 ms", "p95 ms", "429s"):
+        table.add_column(column, justify="left" if column in ("mode", "priority") else "right")
+    for run in runs:
+        for priority, (latencies, failures) in run["results"].items():
+            ms = [latency * 1000 for latency in latencies]
+            table.add_row(
+                run["mode"],
+                priority,
+                str(len(latencies)),
+                str(failures[0]),
+                f"{percentile(ms, 50):.0f}" if ms else "-",
+                f"{percentile(ms, 95):.0f}" if ms else "-",
+                str(run["throttled"]) if priority == "interactive" else "",
+            )
+    console.print(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=15.0)
+    parser.add_argument("--server-rps", type=float, default=20.0, help="Requests per second the mock server allows")
+    parser.add_argument("--interactive-users", type=int, default=4)
+    parser.add_argument("--think-seconds", type=float, default=0.5, help="Pause between an interactive user's requests")
+    parser.add_argument("--batch-workers", type=int, default=32)
+    parser.add_argument("--ttft", default="lognormal:-2.5,0.3", help="Mock time to first token, seconds")
+    args = parser.parse_args()
+
+    runs = [run_mode(mode, args) for mode in ("no limiter", "shared limiter")]
+    print_report(runs, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Replay Benchmark
+
+Measures the framework and tool overhead of every example, offline and
+without network noise. Each example's model traffic is recorded once into a
+cassette (see `examples/cassettes.py`), against the mock server or, with
+`--live`, against `OPENAI_API_ENDPOINT`. The example is then run `--runs`
+times from the cassette with the recorded latency zeroed, so what is left is
+our own code: the agents SDK, the model wrappers of `get_model()`, tools and
+tracing.
+
+Reports wall and CPU time per run, the original run time from the recording,
+and cassette misses (requests that differed from the recording, which point
+at nondeterminism in an example).
+
+Usage:
+    uv run python -m agentic_app_quickstart.benchmarks.replay
+    uv run python -m agentic_app_quickstart.benchmarks.replay --examples handoffs csv_analyzer --runs 50
+    uv run python -m agentic_app_quickstart.benchmarks.replay --live --record   # re-record against the real endpoint
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import time
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+from agentic_app_quickstart.benchmarks.examples import EXAMPLES, load_example, prepare_environment, run_example
+from agentic_app_quickstart.benchmarks.harness import percentile
+from agentic_app_quickstart.benchmarks.mock_llm import MockLLM
+from agentic_app_quickstart.benchmarks.mock_server import LatencyProfile, MockServer
+
+console = Console()
+
+
+def configure(mode: str, path: Path, latency_scale: float = 1.0):
+    """Point `get_client()` at a cassette; models built after this use it."""
+    from agentic_app_quickstart.examples.cassettes import get_cassette
+    from agentic_app_quickstart.week_2.solution.config.settings import get_settings
+
+    os.environ.update(CASSETTE_MODE=mode, CASSETTE_PATH=str(path), CASSETTE_LATENCY=str(latency_scale), MODEL_HEDGE="0")
+    get_settings.cache_clear()
+    get_cassette.cache_clear()
+
+
+def misses() -> float:
+    from agentic_app_quickstart.examples.cassettes import CASSETTE_REQUESTS
+
+    return CASSETTE_REQUESTS.value(mode="replay", outcome="miss")
+
+
+def record(name: str, path: Path, live: bool, ttft: str) -> float:
+    """Record one run of an example; returns its wall time."""
+    from agentic_app_quickstart.examples.cassettes import get_cassette
+    from agentic_app_quickstart.examples.helpers import get_model
+
+    server = contextlib.nullcontext()
+    if not live:
+        server = MockServer(MockLLM(tool_arguments=EXAMPLES[name].tool_arguments), LatencyProfile.parse(ttft))
+    with server:
+        if not live:
+            os.environ["OPENAI_API_ENDPOINT"] = server.base_url
+        configure("record", path)
+        agent = load_example(name, get_model)
+        start = time.perf_counter()
+        asyncio.run(run_example(name, agent))
+        seconds = time.perf_counter() - start
+        get_cassette().close()
+    return seconds
+
+
+def replay(name: str, path: Path, runs: int) -> dict:
+    from agentic_app_quickstart.examples.helpers import get_model
+
+    configure("replay", path, latency_scale=0)
+    agent = load_example(name, get_model)
+    missed = misses()
+
+    async def repeat():
+        wall, cpu, errors = [], [], 0
+        for run_id in range(runs):
+            start, start_cpu = time.perf_counter(), time.process_time()
+            try:
+                await run_example(name, agent, run_id=run_id)
+            except Exception:
+                errors += 1
+            wall.append(time.perf_counter() - start)
+            cpu.append(time.process_time() - start_cpu)
+        return wall, cpu, errors
+
+    wall, cpu, errors = asyncio.run(repeat())
+    return {"wall": wall, "cpu": cpu, "errors": errors, "misses": misses() - missed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--examples", nargs="+", default=list(EXAMPLES))
+    parser.add_argument("--runs", type=int, default=20, help="Replays per example")
+    parser.add_argument("--cassette-dir", default="traces/cassettes")
+    parser.add_argument("--record", action="store_true", help="Record again even if a cassette exists")
+    parser.add_argument("--live", action="store_true", help="Record against OPENAI_API_ENDPOINT instead of the mock")
+    parser.add_argument("--ttft", default="lognormal:-1.5,0.3", help="Mock time to first token when recording")
+    args = parser.parse_args()
+
+    prepare_environment()
+    table = Table(title=f"Example overhead replayed from cassettes with zero latency, {args.runs} runs each")
+    for column in ("example", "recorded s", "p50 ms", "p95 ms", "cpu ms/run", "failed", "misses", "cassette KiB"):
+        table.add_column(column, justify="left" if column == "example" else "right")
+
+    for name in args.examples:
+        path = Path(args.cassette_dir) / f"{name}.jsonl.gz"
+        recorded = record(name, path, args.live, args.ttft) if args.record or not path.exists() else None
+        result = replay(name, path, args.runs)
+        table.add_row(
+            name,
+            f"{recorded:.2f}" if recorded is not None else "-",
+            f"{percentile(result['wall'], 50) * 1000:.1f}",
+            f"{percentile(result['wall'], 95) * 1000:.1f}",
+            f"{sum(result['cpu']) / len(result['cpu']) * 1000:.1f}",
+            str(result["errors"]),
+            f"{result['misses']:.0f}",
+            f"{path.stat().st_size / 1024:.1f}",
+        )
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Run Scheduler Simulation
+
+Simulates agent runs as sleeps on a backend that can serve `--capacity` runs
+at once (the model endpoint and tool pools), shared by:
+
+- light users, each asking a short question (`--light-seconds`) after an
+  exponentially distributed think time
+- `--noisy-tenants` noisy neighbors, each firing `--noisy-runs` heavy
+  questions (`--noisy-seconds` each) at once
+
+and compares the light users' latency (queueing included) when runs go
+straight to the backend in arrival order, through `RunScheduler` with
+per-tenant quotas and fair queueing, and through the scheduler with the
+noisy neighbors' work at batch priority.
+
+Usage:
+    uv run python -m agentic_app_quickstart.benchmarks.scheduler
+    uv run python -m agentic_app_quickstart.benchmarks.scheduler --light-users 10 --noisy-tenants 1 --seconds 30
+"""
+
+import argparse
+import asyncio
+import contextlib
+import random
+import time
+
+from rich.console import Console
+from rich.table import Table
+
+from agentic_app_quickstart.benchmarks.harness import percentile
+from agentic_app_quickstart.examples.scheduler import RunScheduler
+
+# mode: (use the scheduler, priority of the noisy neighbors)
+MODES = {
+    "arrival order": (False, "interactive"),
+    "fair scheduler": (True, "interactive"),
+    "fair scheduler, noisy as batch": (True, "batch"),
+}
+
+console = Console()
+
+
+async def simulate(mode: str, args) -> dict:
+    use_scheduler, noisy_priority = MODES[mode]
+    scheduler = RunScheduler(max_concurrency=args.capacity, tenant_concurrency=args.tenant_concurrency)
+    backend = asyncio.Semaphore(args.capacity)
+    rng = random.Random(args.seed)
+    stop = time.perf_counter() + args.seconds
+    light: list[float] = []
+    noisy: list[float] = []
+
+    async def run(tenant: str, seconds: float, priority: str, latencies: list[float]):
+        start = time.perf_counter()
+        admission = scheduler.slot(tenant, priority) if use_scheduler else contextlib.nullcontext()
+        async with admission:
+            async with backend:
+                await asyncio.sleep(seconds)
+        latencies.append(time.perf_counter() - start)
+
+    async def light_user(user: int):
+        while time.perf_counter() < stop:
+            await asyncio.sleep(rng.expovariate(1 / args.think_seconds))
+            await run(f"light-{user}", args.light_seconds * rng.lognormvariate(0, 0.3), "interactive", light)
+
+    async def noisy_neighbor(neighbor: int):
+        await asyncio.gather(
+            *(
+                run(f"noisy-{neighbor}", args.noisy_seconds * rng.lognormvariate(0, 0.3), noisy_priority, noisy)
+                for _ in range(args.noisy_runs)
+            )
+        )
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(noisy_neighbor(neighbor) for neighbor in range(args.noisy_tenants)),
+        *(light_user(user) for user in range(args.light_users)),
+    )
+    return {"mode": mode, "light": light, "noisy": noisy, "seconds": time.perf_counter() - started}
+
+
+def print_report(results: list[dict], args):
+    table = Table(
+        title=f"{args.light_users} light users ({args.light_seconds:g}s questions) and {args.noisy_tenants} "
+        f"neighbors firing {args.noisy_runs} x {args.noisy_seconds:g}s runs each, capacity {args.capacity}"
+    )
+    for column in ("admission", "light p50 s", "light p95 s", "light p99 s", "light runs", "noisy p50 s", "total s"):
+        table.add_column(column, justify="left" if column == "admission" else "right")
+    for r in results:
+        table.add_row(
+            r["mode"],
+            f"{percentile(r['light'], 50):.2f}",
+            f"{percentile(r['light'], 95):.2f}",
+            f"{percentile(r['light'], 99):.2f}",
+            str(len(r["light"])),
+            f"{percentile(r['noisy'], 50):.2f}",
+            f"{r['seconds']:.1f}",
+        )
+    console.print(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=20.0, help="How long light users keep asking")
+    parser.add_argument("--capacity", type=int, default=4, help="Runs the backend serves at once")
+    parser.add_argument("--tenant-concurrency", type=int, default=2)
+    parser.add_argument("--light-users", type=int, default=6)
+    parser.add_argument("--light-seconds", type=float, default=0.3)
+    parser.add_argument("--think-seconds", type=float, default=1.0)
+    parser.add_argument("--noisy-tenants", type=int, default=2)
+    parser.add_argument("--noisy-runs", type=int, default=20, help="Runs fired by each noisy neighbor")
+    parser.add_argument("--noisy-seconds", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = [asyncio.run(simulate(mode, args)) for mode in MODES]
+    print_report(results, args)
+
+
+if __name__ == "__main__":
+    main()
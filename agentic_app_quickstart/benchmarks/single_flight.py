@@ -0,0 +1,118 @@
+"""
+Single-Flight Benchmark
+
+Waves of `--users` users ask the CSV analyzer the same question about the same
+file at the same moment, against the mock server. Runs once with every model
+request and tool call executed, and once with identical concurrent calls
+coalesced by `SingleFlightModel` and `with_single_flight` tools.
+
+Reports run latency, the model requests the server received, tool executions
+and the calls the single-flight layer coalesced.
+
+Usage:
+    uv run python -m agentic_app_quickstart.benchmarks.single_flight
+    uv run python -m agentic_app_quickstart.benchmarks.single_flight --users 32 --waves 10
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from rich.console import Console
+from rich.table import Table
+
+from agentic_app_quickstart.benchmarks.examples import EXAMPLES, load_example, prepare_environment, run_example
+from agentic_app_quickstart.benchmarks.harness import percentile
+from agentic_app_quickstart.benchmarks.mock_llm import MockLLM
+from agentic_app_quickstart.benchmarks.mock_server import LatencyProfile, MockServer
+
+EXAMPLE = "csv_analyzer"
+
+console = Console()
+
+
+def tool_executions() -> float:
+    from agentic_app_quickstart.examples.executor import TOOL_SECONDS
+
+    return sum(value for name, _, value in TOOL_SECONDS.samples() if name.endswith("_count"))
+
+
+def coalesced() -> dict[str, float]:
+    from agentic_app_quickstart.examples.singleflight import SINGLE_FLIGHT_CALLS
+
+    counts = {"model": 0.0, "tool": 0.0}
+    for _, labels, value in SINGLE_FLIGHT_CALLS.samples():
+        if labels["result"] == "coalesced":
+            counts[labels["kind"]] += value
+    return counts
+
+
+async def waves(agent, users: int, count: int, pause: float) -> tuple[list[float], int]:
+    latencies: list[float] = []
+    errors = 0
+
+    async def user(run_id: int):
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            await run_example(EXAMPLE, agent, run_id=run_id)
+        except Exception:
+            errors += 1
+            return
+        latencies.append(time.perf_counter() - start)
+
+    for wave in range(count):
+        await asyncio.gather(*(user(wave * users + i) for i in range(users)))
+        await asyncio.sleep(pause)
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=16, help="Users asking the same question at once")
+    parser.add_argument("--waves", type=int, default=5)
+    parser.add_argument("--pause", type=float, default=0.2, help="Seconds between waves")
+    parser.add_argument("--ttft", default="lognormal:-1.5,0.3", help="Mock time to first token, seconds")
+    args = parser.parse_args()
+
+    tool_arguments = EXAMPLES[EXAMPLE].tool_arguments
+    table = Table(title=f"{args.waves} waves of {args.users} identical {EXAMPLE} questions")
+    columns = ("single flight", "p50 ms", "p95 ms", "failed", "model requests", "tool runs", "coalesced model", "coalesced tool")
+    for column in columns:
+        table.add_column(column, justify="left" if column == "single flight" else "right")
+
+    for enabled in (False, True):
+        with MockServer(MockLLM(tool_arguments=tool_arguments), LatencyProfile.parse(args.ttft)) as server:
+            flag = "1" if enabled else "0"
+            os.environ.update(
+                OPENAI_API_ENDPOINT=server.base_url, SINGLE_FLIGHT_MODELS=flag, SINGLE_FLIGHT_TOOLS=flag
+            )
+            prepare_environment()
+            from agentic_app_quickstart.examples.helpers import get_model
+            from agentic_app_quickstart.week_2.solution.config.settings import get_settings
+
+            get_settings.cache_clear()
+            agent = load_example(EXAMPLE, get_model)
+            tools, shared = tool_executions(), coalesced()
+            latencies, errors = asyncio.run(waves(agent, args.users, args.waves, args.pause))
+            tools = tool_executions() - tools
+            shared = {kind: value - shared[kind] for kind, value in coalesced().items()}
+            requests = server.llm.requests
+
+        table.add_row(
+            "on" if enabled else "off",
+            f"{percentile(latencies, 50) * 1000:.0f}" if latencies else "-",
+            f"{percentile(latencies, 95) * 1000:.0f}" if latencies else "-",
+            str(errors),
+            str(requests),
+            f"{tools:.0f}",
+            f"{shared['model']:.0f}",
+            f"{shared['tool']:.0f}",
+        )
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
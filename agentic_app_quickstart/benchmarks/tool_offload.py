@@ -0,0 +1,129 @@
+"""
+Tool Offload Benchmark
+
+Runs the CSV analyzer for several concurrent users on a generated CSV large
+enough that `count_unique` takes a noticeable time, once with the tools on the
+event loop (`TOOL_EXECUTOR=inline`) and once offloaded to the thread pool.
+While the users run, an event loop lag monitor measures how long timers are
+held up, which is what every other conversation in the process would feel.
+
+Reports event loop lag (p50/p99/max) and run latency for each mode.
+
+Usage:
+    uv run python -m agentic_app_quickstart.benchmarks.tool_offload
+    uv run python -m agentic_app_quickstart.benchmarks.tool_offload --rows 2000000 --users 16
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+from datetime import date, timedelta
+
+import polars as pl
+from rich.console import Console
+from rich.table import Table
+
+from agentic_app_quickstart.benchmarks.examples import EXAMPLES, load_example, prepare_environment
+from agentic_app_quickstart.benchmarks.harness import drive
+from agentic_app_quickstart.benchmarks.mock_llm import MockLLM
+from agentic_app_quickstart.benchmarks.mock_server import LatencyProfile, MockServer
+from agentic_app_quickstart.week_2.solution.monitoring.event_loop import LoopLagMonitor
+
+MODES = ["inline", "thread"]
+
+console = Console()
+
+
+def write_csv(path: str, rows: int, seed: int = 0):
+    rng = random.Random(seed)
+    pl.DataFrame({
+        "order_id": range(rows),
+        "date": [date(2024, 1, 1) + timedelta(days=rng.randrange(365)) for _ in range(rows)],
+        "product": [f"product-{rng.randrange(rows // 10 or 1)}" for _ in range(rows)],
+        "region": [rng.choice(["north", "south", "east", "west"]) for _ in range(rows)],
+        "amount": [round(rng.uniform(1, 500), 2) for _ in range(rows)],
+    }).write_csv(path)
+
+
+async def run_mode(mode: str, users: int, runs: int) -> dict:
+    from agentic_app_quickstart.examples.executor import get_tool_executor
+    from agentic_app_quickstart.examples.helpers import get_model
+
+    get_tool_executor().inline = mode == "inline"
+    agent = load_example("csv_analyzer", get_model)
+
+    monitor = LoopLagMonitor(interval=0.005)
+    monitor.start()
+    stats = await drive("csv_analyzer", agent, concurrency=users, runs=runs)
+    await monitor.stop()
+
+    p50, p99 = monitor.histogram.percentiles([0.5, 0.99])
+    stats.update(
+        mode=mode,
+        lag_p50_ms=p50 / 1000,
+        lag_p99_ms=p99 / 1000,
+        lag_max_ms=(monitor.histogram.max or 0) / 1000,
+    )
+    return stats
+
+
+def print_report(results: list[dict], rows: int, users: int):
+    table = Table(title=f"CSV analyzer, {rows:,} rows, {users} concurrent users")
+    for column in ("tools", "lag p50 ms", "lag p99 ms", "lag max ms", "run p50 ms", "run p95 ms", "runs/s", "errors"):
+        table.add_column(column, justify="left" if column == "tools" else "right")
+    for r in results:
+        table.add_row(
+            r["mode"],
+            f"{r['lag_p50_ms']:.1f}",
+            f"{r['lag_p99_ms']:.1f}",
+            f"{r['lag_max_ms']:.1f}",
+            f"{r['p50_ms']:.0f}",
+            f"{r['p95_ms']:.0f}",
+            f"{r['throughput_rps']:.2f}",
+            str(r["errors"]),
+        )
+    console.print(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--runs", type=int, default=24)
+    parser.add_argument("--ttft", default="constant:0.05", help="Mock time to first token, seconds")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_path = os.path.join(workdir, "large_sales.csv")
+        write_csv(csv_path, args.rows)
+
+        # Point the example's prompt and the mock's tool calls at the large file
+        spec = EXAMPLES["csv_analyzer"]
+        spec.prompts = [f"File path: {csv_path}\nUser question: How many unique products are there?"]
+        spec.tool_arguments = {
+            "get_headers": {"file_path": csv_path},
+            "count_unique": {"file_path": csv_path, "target_column": "product"},
+            "plan_query": {"file_path": csv_path, "plan": {
+                "filters": [], "group_by": ["region"], "select": [], "sort": [], "limit": None,
+                "aggregates": [{"column": "amount", "func": "sum", "alias": None}],
+            }},
+            "estimate_stat": {"file_path": csv_path, "column": "amount", "stat": "mean"},
+            "resample": {"file_path": csv_path, "column": "amount", "every": "1mo", "agg": "sum"},
+            "moving_average": {"file_path": csv_path, "column": "amount", "window": "7d", "group_by": "region"},
+            "period_growth": {"file_path": csv_path, "column": "amount", "every": "1w", "group_by": "region"},
+            "seasonal_summary": {"file_path": csv_path, "column": "amount", "season": "weekday"},
+        }
+
+        llm = MockLLM(tool_arguments=spec.tool_arguments)
+        with MockServer(llm, LatencyProfile.parse(args.ttft)) as server:
+            os.environ["OPENAI_API_ENDPOINT"] = server.base_url
+            prepare_environment()
+            results = [asyncio.run(run_mode(mode, args.users, args.runs)) for mode in MODES]
+
+    print_report(results, args.rows, args.users)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Tracing Overhead Benchmark
+
+Measures how much the OpenInference instrumentation set up by
+`get_tracing_provider()` adds to each run of the example agents. Every example
+is driven by the in-process `MockLLM`, so no network or collector is needed and
+the numbers isolate the cost of tracing itself.
+
+For each example, payload size and sink the benchmark reports, per run:
+- wall-clock latency (p50) and the latency added over tracing disabled
+- CPU time, and the CPU added over tracing disabled
+- peak Python allocations (tracemalloc)
+- bytes written by the file sink
+
+Usage:
+    uv run python -m agentic_app_quickstart.benchmarks.tracing_overhead
+    uv run python -m agentic_app_quickstart.benchmarks.tracing_overhead \
+        --examples csv_analyzer handoffs --payload-bytes 1024 131072 --runs 50
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from agents import set_trace_processors, set_tracing_disabled
+from openinference.instrumentation.openai_agents import OpenAIAgentsInstrumentor
+from rich.console import Console
+from rich.table import Table
+
+from agentic_app_quickstart.benchmarks.examples import (
+    EXAMPLES,
+    load_example,
+    prepare_environment,
+    run_example,
+)
+from agentic_app_quickstart.benchmarks.mock_llm import MockLLM
+from agentic_app_quickstart.week_2.solution.monitoring.sinks import (
+    FileSpanExporter,
+    InMemorySpanExporter,
+)
+
+SINKS = ["off", "memory", "file"]
+
+console = Console()
+
+
+class TracingSetup:
+    """Switches the agents SDK between tracing disabled and a given sink."""
+
+    def __init__(self, sink: str, workdir: str):
+        self.sink = sink
+        self.workdir = workdir
+        self.provider = None
+        self.exporter = None
+
+    def __enter__(self):
+        # Imported lazily so `prepare_environment()` runs before helpers loads
+        from agentic_app_quickstart.examples.helpers import get_tracing_provider
+
+        instrumentor = OpenAIAgentsInstrumentor()
+        if instrumentor.is_instrumented_by_opentelemetry:
+            instrumentor.uninstrument()
+        set_trace_processors([])
+
+        if self.sink == "off":
+            set_tracing_disabled(True)
+            return self
+
+        if self.sink == "file":
+            self.exporter = FileSpanExporter(os.path.join(self.workdir, "spans.ndjson.gz"))
+        else:
+            self.exporter = InMemorySpanExporter()
+
+        self.provider = get_tracing_provider(
+            project_name="tracing_overhead_benchmark",
+            sink=self.exporter,
+            set_global_tracer_provider=False,
+        )
+        set_tracing_disabled(False)
+        return self
+
+    def bytes_written(self) -> int:
+        if self.sink != "file":
+            return 0
+        self.provider.force_flush()
+        return os.path.getsize(self.exporter.file_path)
+
+    def reset(self):
+        if self.provider is not None:
+            self.provider.force_flush()
+        if isinstance(self.exporter, InMemorySpanExporter):
+            self.exporter.clear()
+
+    def __exit__(self, *exc):
+        if self.provider is not None:
+            OpenAIAgentsInstrumentor().uninstrument()
+            self.provider.shutdown()
+        set_tracing_disabled(True)
+        set_trace_processors([])
+
+
+async def measure(name: str, agent, setup: TracingSetup, runs: int, warmup: int) -> dict:
+    """
+    Time `runs` runs of an example under the active tracing setup.
+
+    Args:
+        name (str): Example name
+        agent (Agent): Starting agent
+        setup (TracingSetup): Active tracing configuration
+        runs (int): Measured runs
+        warmup (int): Unmeasured runs executed first
+
+    Returns:
+        dict: Per-run latency, CPU, allocation and bytes written
+    """
+    for i in range(warmup):
+        await run_example(name, agent, run_id=-i - 1)
+        setup.reset()
+
+    start_bytes = setup.bytes_written()
+    latencies, cpu_times = [], []
+    for i in range(runs):
+        wall, cpu = time.perf_counter(), time.process_time()
+        await run_example(name, agent, run_id=i)
+        latencies.append(time.perf_counter() - wall)
+        cpu_times.append(time.process_time() - cpu)
+        setup.reset()
+    bytes_per_run = (setup.bytes_written() - start_bytes) / runs
+
+    # Allocation pass, kept separate because tracemalloc skews timings
+    peaks = []
+    tracemalloc.start()
+    for i in range(min(runs, 5)):
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        await run_example(name, agent, run_id=runs + i)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - baseline)
+        setup.reset()
+    tracemalloc.stop()
+
+    return {
+        "latency_ms": statistics.median(latencies) * 1000,
+        "cpu_ms": statistics.mean(cpu_times) * 1000,
+        "alloc_kib": statistics.mean(peaks) / 1024,
+        "bytes_per_run": bytes_per_run,
+    }
+
+
+async def run_benchmark(examples: list[str], payloads: list[int], runs: int, warmup: int) -> list[dict]:
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in examples:
+            mock = MockLLM(tool_arguments=EXAMPLES[name].tool_arguments)
+            agent = load_example(name, lambda role: mock.model())
+
+            for payload in payloads:
+                mock.reply_bytes = payload
+                baseline = None
+                for sink in SINKS:
+                    with TracingSetup(sink, workdir) as setup:
+                        stats = await measure(name, agent, setup, runs, warmup)
+                    if sink == "off":
+                        baseline = stats
+                    stats.update(
+                        example=name,
+                        payload_bytes=payload,
+                        sink=sink,
+                        added_latency_ms=stats["latency_ms"] - baseline["latency_ms"],
+                        added_cpu_ms=stats["cpu_ms"] - baseline["cpu_ms"],
+                    )
+                    results.append(stats)
+    return results
+
+
+def print_report(results: list[dict]):
+    table = Table(title="Tracing overhead per run")
+    for column in (
+        "example", "payload", "sink", "p50 ms", "+ms", "cpu ms", "+cpu ms", "alloc KiB", "bytes out"
+    ):
+        table.add_column(column, justify="left" if column in ("example", "sink") else "right")
+
+    for r in results:
+        table.add_row(
+            r["example"],
+            str(r["payload_bytes"]),
+            r["sink"],
+            f"{r['latency_ms']:.2f}",
+            f"{r['added_latency_ms']:+.2f}",
+            f"{r['cpu_ms']:.2f}",
+            f"{r['added_cpu_ms']:+.2f}",
+            f"{r['alloc_kib']:.0f}",
+            f"{r['bytes_per_run']:.0f}",
+        )
+    console.print(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--examples", nargs="+", default=list(EXAMPLES), choices=list(EXAMPLES))
+    parser.add_argument("--payload-bytes", nargs="+", type=int, default=[256, 16_384, 131_072])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--json", dest="json_path", help="Also write raw results to this file")
+    args = parser.parse_args()
+
+    prepare_environment()
+    results = asyncio.run(run_benchmark(args.examples, args.payload_bytes, args.runs, args.warmup))
+    print_report(results)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
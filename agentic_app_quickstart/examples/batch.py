@@ -0,0 +1,233 @@
+"""
+Batch runner for example agents.
+
+Runs an agent over every prompt in a JSONL or Parquet file with at most
+`--concurrency` runs in flight, instead of the examples' interactive
+`input()` loops. Each input row needs a prompt (`--prompt-field`, "prompt" by
+default) and may have an `id`; rows without one are numbered by position.
+
+Results are appended to the output JSONL as soon as each run finishes, one
+line per prompt:
+
+    {"id": "42", "status": "ok", "output": "...", "agent": "TechSupportAgent", "seconds": 1.8}
+
+`status` is "ok", "blocked" (an input guardrail tripped) or "error". The
+output file doubles as the checkpoint: when the runner is started again with
+the same output, prompts that already have an "ok" or "blocked" line are
+skipped and failed ones are retried, so an interrupted overnight run resumes
+where it stopped. Progress (prompts done, failures, throughput) is printed every
+`--progress-seconds`.
+
+Usage:
+    uv run python -m agentic_app_quickstart.examples.batch handoffs prompts.jsonl results.jsonl
+    uv run python -m agentic_app_quickstart.examples.batch \\
+        agentic_app_quickstart.examples.week_2.03_streamlit:data_analyzer_agent \\
+        questions.parquet answers.jsonl --concurrency 32 --timeout 120
+
+Agents are named by alias (see `AGENTS`) or as "module:attribute".
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import time
+from collections.abc import Iterator
+
+import polars as pl
+from agents import Agent, InputGuardrailTripwireTriggered
+from pydantic import BaseModel
+
+from agentic_app_quickstart.examples.loops import run_with_loop_guard
+from agentic_app_quickstart.examples.models import run_deadline
+from agentic_app_quickstart.examples.ratelimit import rate_priority
+from agentic_app_quickstart.week_2.solution.monitoring.metering import metering_session
+
+AGENTS = {
+    "data_analyzer": "agentic_app_quickstart.examples.week_2.03_streamlit:data_analyzer_agent",
+    "handoffs": "agentic_app_quickstart.examples.week_1.05_handoffs:reception_agent",
+    "music_guru": "agentic_app_quickstart.examples.week_1.04_guardrails:agent",
+}
+
+DONE_STATUSES = ("ok", "blocked")
+
+
+def load_agent(name: str) -> Agent:
+    """
+    Import the agent named by an alias in `AGENTS` or by "module:attribute".
+
+    Args:
+        name (str): Alias or "module:attribute"
+
+    Returns:
+        Agent: The starting agent
+    """
+    module_name, _, attribute = AGENTS.get(name, name).partition(":")
+    if not attribute:
+        raise ValueError(f"Unknown agent {name!r}; use one of {', '.join(AGENTS)} or 'module:attribute'")
+    agent = getattr(importlib.import_module(module_name), attribute)
+    if not isinstance(agent, Agent):
+        raise ValueError(f"{name!r} is a {type(agent).__name__}, not an Agent")
+    return agent
+
+
+def read_prompts(path: str, prompt_field: str = "prompt") -> Iterator[tuple[str, str]]:
+    """
+    Yield (id, prompt) pairs from a JSONL or Parquet file.
+
+    Args:
+        path (str): Input file; ".parquet" files are read with Polars, anything else as JSONL
+        prompt_field (str): Field holding the prompt
+
+    Yields:
+        tuple[str, str]: The row's `id` (or its position) and prompt
+    """
+    if path.endswith(".parquet"):
+        columns = pl.read_parquet_schema(path)
+        rows = pl.read_parquet(path, columns=[c for c in ("id", prompt_field) if c in columns]).iter_rows(named=True)
+    else:
+        rows = (json.loads(line) for line in open(path, encoding="utf-8") if line.strip())
+    for position, row in enumerate(rows):
+        yield str(row.get("id", position)), row[prompt_field]
+
+
+def completed_ids(output_path: str) -> set[str]:
+    """Ids that already have a final result in the output file; a torn last line is ignored."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("status") in DONE_STATUSES:
+                done.add(record["id"])
+    return done
+
+
+def _output(value):
+    return value.model_dump() if isinstance(value, BaseModel) else value
+
+
+async def run_batch(
+    agent: Agent,
+    input_path: str,
+    output_path: str,
+    concurrency: int = 8,
+    prompt_field: str = "prompt",
+    timeout: float | None = None,
+    max_turns: int = 10,
+    progress_seconds: float = 10.0,
+    batch_name: str = "batch",
+) -> dict:
+    """
+    Run `agent` over every prompt not yet completed in `output_path`.
+
+    Args:
+        agent (Agent): Starting agent
+        input_path (str): JSONL or Parquet prompts
+        output_path (str): JSONL results, appended to and used as the checkpoint
+        concurrency (int): Runs in flight at once
+        prompt_field (str): Input field holding the prompt
+        timeout (float, optional): Seconds before a run counts as failed
+        max_turns (int): Passed to `Runner.run`; runs that loop stop early (see `examples/loops.py`)
+        progress_seconds (float): Interval of progress reports
+        batch_name (str): Metering session the runs' token usage is attributed to
+
+    Returns:
+        dict: Counts of ok, blocked, failed and skipped prompts, elapsed seconds and throughput
+    """
+    done = completed_ids(output_path)
+    pending = ((id, prompt) for id, prompt in read_prompts(input_path, prompt_field) if id not in done)
+    stats = {"ok": 0, "blocked": 0, "error": 0, "skipped": len(done)}
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    torn = False
+    if os.path.exists(output_path) and os.path.getsize(output_path):
+        with open(output_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            torn = f.read(1) != b"\n"
+    output = open(output_path, "a", encoding="utf-8")
+    if torn:
+        # A crash left a partial last line; start the next record on a fresh one
+        output.write("\n")
+
+    async def worker():
+        for id, prompt in pending:
+            record = {"id": id}
+            start = time.perf_counter()
+            try:
+                # The deadline also stops model retries and hedges that could not finish in time;
+                # batch priority leaves rate limit budget for interactive users
+                with metering_session(batch_name), run_deadline(timeout), rate_priority("batch"):
+                    result = await asyncio.wait_for(run_with_loop_guard(agent, prompt, max_turns=max_turns), timeout)
+                record.update(status="ok", output=_output(result.final_output), agent=result.last_agent.name)
+            except InputGuardrailTripwireTriggered as e:
+                record.update(status="blocked", output=_output(e.guardrail_result.output.output_info))
+            except Exception as e:
+                record.update(status="error", error=f"{type(e).__name__}: {e}")
+            record["seconds"] = round(time.perf_counter() - start, 3)
+            stats[record["status"]] += 1
+            output.write(json.dumps(record, default=str) + "\n")
+            output.flush()
+
+    async def report():
+        while True:
+            await asyncio.sleep(progress_seconds)
+            finished = stats["ok"] + stats["blocked"] + stats["error"]
+            elapsed = time.perf_counter() - started
+            print(
+                f"[{batch_name}] {finished} done ({stats['error']} failed) in {elapsed:.0f}s, "
+                f"{finished / elapsed:.2f} prompts/s"
+            )
+
+    started = time.perf_counter()
+    reporter = asyncio.create_task(report())
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        reporter.cancel()
+        output.close()
+
+    elapsed = time.perf_counter() - started
+    finished = stats["ok"] + stats["blocked"] + stats["error"]
+    stats.update(seconds=round(elapsed, 1), prompts_per_second=round(finished / elapsed, 2) if elapsed else 0.0)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("agent", help=f"One of {', '.join(AGENTS)}, or module:attribute")
+    parser.add_argument("input", help="JSONL or Parquet file of prompts")
+    parser.add_argument("output", help="JSONL results file; also the checkpoint for resuming")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--prompt-field", default="prompt")
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds per prompt")
+    parser.add_argument("--max-turns", type=int, default=10)
+    parser.add_argument("--progress-seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    agent = load_agent(args.agent)
+    batch_name = f"batch-{os.path.basename(args.output)}"
+    stats = asyncio.run(run_batch(
+        agent,
+        args.input,
+        args.output,
+        concurrency=args.concurrency,
+        prompt_field=args.prompt_field,
+        timeout=args.timeout,
+        max_turns=args.max_turns,
+        progress_seconds=args.progress_seconds,
+        batch_name=batch_name,
+    ))
+    print(
+        f"[{batch_name}] {stats['ok']} ok, {stats['blocked']} blocked, {stats['error']} failed, "
+        f"{stats['skipped']} already done; {stats['seconds']}s, {stats['prompts_per_second']} prompts/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
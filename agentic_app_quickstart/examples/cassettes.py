@@ -0,0 +1,285 @@
+"""
+Record and replay of model traffic.
+
+Every example talks to the model endpoint through `AsyncOpenAI`, so a change
+in our own agent or tool code is hard to measure through the network's noise.
+`CassetteTransport` sits under the OpenAI client (`get_client()` installs it
+when `CASSETTE_MODE` is set):
+
+- "record": requests go to the endpoint as usual, and every exchange is
+  appended to the cassette (`CASSETTE_PATH`, gzip-compressed JSON lines): the
+  request body, the response status, headers and body chunks, and when the
+  headers and each chunk arrived. Streamed responses are recorded chunk by
+  chunk as the caller reads them.
+- "replay": nothing leaves the process. Requests are matched to recordings by
+  method, path and body (not the host, so a recording against one endpoint
+  replays for any), and served with the recorded timings times
+  `CASSETTE_LATENCY`: 1 for the original latency, 0 to measure our own
+  overhead alone. Identical requests get their recordings in order, and the
+  last one again once they run out. A request that matches no recording
+  exactly but differs only in tool results (a tool returning the current
+  time, say) gets the recording of the same conversation; one that matches
+  nothing gets a 404 naming the cassette.
+
+Exchanges are counted in `agent_cassette_requests_total{mode,outcome}`, where
+`outcome` is "recorded", "replayed", "loose" or "miss".
+
+Example:
+    CASSETTE_MODE=record CASSETTE_PATH=traces/handoffs.jsonl.gz uv run python .../05_handoffs.py
+    CASSETTE_MODE=replay CASSETTE_PATH=traces/handoffs.jsonl.gz CASSETTE_LATENCY=0 uv run python .../05_handoffs.py
+"""
+
+import asyncio
+import atexit
+import functools
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+
+import httpx
+
+from agentic_app_quickstart.week_2.solution.config.settings import CassetteSettings, get_settings
+from agentic_app_quickstart.week_2.solution.monitoring.metrics import REGISTRY
+
+CASSETTE_REQUESTS = REGISTRY.counter(
+    "agent_cassette_requests_total",
+    "Model HTTP requests recorded to or replayed from a cassette, by outcome",
+    ["mode", "outcome"],
+)
+
+# Not replayed: the body is stored decoded, and connection details belong to the original exchange
+_SKIPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive", "date"}
+
+
+def _request_payload(request: httpx.Request):
+    body = request.content
+    if not body:
+        return None
+    try:
+        return json.loads(body)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return body.decode("utf-8", "surrogateescape")
+
+
+def _without_tool_results(payload):
+    """The request body with the content of tool results blanked out."""
+    if not isinstance(payload, dict):
+        return payload
+    payload = dict(payload)
+    if isinstance(payload.get("messages"), list):
+        payload["messages"] = [
+            {**message, "content": None} if isinstance(message, dict) and message.get("role") == "tool" else message
+            for message in payload["messages"]
+        ]
+    if isinstance(payload.get("input"), list):
+        payload["input"] = [
+            {**item, "output": None} if isinstance(item, dict) and item.get("type") == "function_call_output" else item
+            for item in payload["input"]
+        ]
+    return payload
+
+
+def _digest(method: str, path: str, payload) -> str:
+    text = json.dumps([method, path, payload], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def request_keys(request: httpx.Request) -> tuple[str, str]:
+    """Identity of a request on replay: method, path and body, exactly and without tool results."""
+    payload = _request_payload(request)
+    method, path = request.method, request.url.path
+    return _digest(method, path, payload), _digest(method, path, _without_tool_results(payload))
+
+
+class Cassette:
+    """
+    A cassette file, loaded for replay or written while recording.
+
+    Args:
+        path (str): gzip-compressed JSON lines, one exchange per line
+        mode (str): "record" or "replay"
+        latency_scale (float): Multiplier of the recorded timings on replay
+    """
+
+    def __init__(self, path: str, mode: str, latency_scale: float = 1.0):
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._exchanges: dict[str, list[dict]] = defaultdict(list)
+        self._loose: dict[str, list[dict]] = defaultdict(list)
+        self._served: Counter[tuple[str, str]] = Counter()
+        self._file = None
+        self._started = False
+        self._lock = threading.Lock()
+        if mode == "replay":
+            self._load()
+
+    @classmethod
+    def from_settings(cls, settings: CassetteSettings) -> "Cassette":
+        return cls(settings.path, settings.mode, settings.latency_scale)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"No cassette at {self.path}; record one with CASSETTE_MODE=record")
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    exchange = json.loads(line)
+                    self._exchanges[exchange["key"]].append(exchange)
+                    self._loose[exchange["loose_key"]].append(exchange)
+
+    def __len__(self) -> int:
+        """Number of exchanges loaded for replay."""
+        return sum(len(exchanges) for exchanges in self._exchanges.values())
+
+    def next(self, key: str, loose_key: str | None = None) -> tuple[dict | None, str]:
+        """
+        The next recorded exchange for a request.
+
+        Args:
+            key (str): Exact request key
+            loose_key (str, optional): Key without tool results, tried when the exact key has no recording
+
+        Returns:
+            tuple[dict | None, str]: The exchange, or None, and "replayed", "loose" or "miss"
+        """
+        with self._lock:
+            for outcome, index, k in (("replayed", self._exchanges, key), ("loose", self._loose, loose_key)):
+                exchanges = index.get(k) if k else None
+                if exchanges:
+                    position = min(self._served[outcome, k], len(exchanges) - 1)
+                    self._served[outcome, k] += 1
+                    return exchanges[position], outcome
+            return None, "miss"
+
+    def append(self, exchange: dict):
+        """Write a recorded exchange; the first one of the process replaces the old file."""
+        line = json.dumps(exchange, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._file = gzip.open(self.path, "at" if self._started else "wt", encoding="utf-8")
+                if not self._started:
+                    atexit.register(self.close)
+                self._started = True
+            self._file.write(line)
+
+    def close(self):
+        """Finish the file; exchanges recorded after this are appended to it."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class _RecordingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, exchange: dict, start: float, cassette: Cassette):
+        self.stream = stream
+        self.exchange = exchange
+        self.start = start
+        self.cassette = cassette
+        self.complete = False
+
+    async def __aiter__(self):
+        chunks = self.exchange["chunks"]
+        async for chunk in self.stream:
+            chunks.append([round(time.monotonic() - self.start, 4), chunk.decode("utf-8", "surrogateescape")])
+            yield chunk
+        self.complete = True
+
+    async def aclose(self):
+        await self.stream.aclose()
+        if self.complete:
+            # Responses abandoned halfway are not worth replaying
+            self.cassette.append(self.exchange)
+            CASSETTE_REQUESTS.inc(mode="record", outcome="recorded")
+
+
+class _ReplayStream(httpx.AsyncByteStream):
+    def __init__(self, chunks: list, start: float, scale: float):
+        self.chunks = chunks
+        self.start = start
+        self.scale = scale
+
+    async def __aiter__(self):
+        for offset, text in self.chunks:
+            delay = self.start + offset * self.scale - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield text.encode("utf-8", "surrogateescape")
+
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport recording exchanges to, or replaying them from, a cassette.
+
+    Args:
+        cassette (Cassette): Where exchanges are recorded or replayed from
+        transport (httpx.AsyncBaseTransport, optional): Sends requests while
+            recording, a fresh `httpx.AsyncHTTPTransport` by default
+    """
+
+    def __init__(self, cassette: Cassette, transport: httpx.AsyncBaseTransport | None = None):
+        self.cassette = cassette
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key, loose_key = request_keys(request)
+        start = time.monotonic()
+        if self.cassette.mode == "replay":
+            return await self._replay(request, key, loose_key, start)
+
+        # Plain bodies, so chunks are stored as text
+        request.headers["accept-encoding"] = "identity"
+        response = await self.transport.handle_async_request(request)
+        exchange = {
+            "key": key,
+            "loose_key": loose_key,
+            "method": request.method,
+            "path": request.url.path,
+            "request": _request_payload(request),
+            "status": response.status_code,
+            "headers": [
+                [name, value] for name, value in response.headers.items() if name.lower() not in _SKIPPED_HEADERS
+            ],
+            "headers_at": round(time.monotonic() - start, 4),
+            "chunks": [],
+        }
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_RecordingStream(response.stream, exchange, start, self.cassette),
+            extensions=response.extensions,
+        )
+
+    async def _replay(self, request: httpx.Request, key: str, loose_key: str, start: float) -> httpx.Response:
+        exchange, outcome = self.cassette.next(key, loose_key)
+        CASSETTE_REQUESTS.inc(mode="replay", outcome=outcome)
+        if exchange is None:
+            message = f"No recorded response for {request.method} {request.url.path} in {self.cassette.path}"
+            return httpx.Response(404, json={"error": {"message": message, "type": "cassette_miss"}})
+
+        scale = self.cassette.latency_scale
+        if exchange["headers_at"] * scale > 0:
+            await asyncio.sleep(exchange["headers_at"] * scale)
+        return httpx.Response(
+            exchange["status"],
+            headers=exchange["headers"],
+            stream=_ReplayStream(exchange["chunks"], start, scale),
+        )
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+@functools.cache
+def get_cassette() -> Cassette | None:
+    """The process-wide cassette configured by `CASSETTE_*`, None when off; `get_cassette.cache_clear()` reloads."""
+    settings = get_settings().cassette
+    if settings.mode == "off":
+        return None
+    return Cassette.from_settings(settings)
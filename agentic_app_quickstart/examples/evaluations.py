@@ -0,0 +1,311 @@
+"""
+Bulk upload of evaluation results to Phoenix.
+
+The judge scripts in `week_3` classify hundreds of spans with `llm_classify`;
+posting each label back on its own would take one round-trip per span.
+`EvaluationSink` collects judge outputs keyed by eval name and span id (a
+later result for the same span replaces the earlier one) and, on `flush()`,
+uploads them to Phoenix's `/v1/evaluations` in chunks of
+`EVAL_UPLOAD_CHUNK_ROWS` rows:
+
+- each chunk is one Arrow IPC stream in the format `phoenix.Client.log_evaluations`
+  sends, with its buffers compressed by `EVAL_UPLOAD_COMPRESSION` (Phoenix reads
+  compressed IPC as-is, but ignores Content-Encoding on Arrow bodies)
+- at most `EVAL_UPLOAD_CONCURRENCY` uploads are in flight at once
+- connection errors, timeouts, 408, 429 and 5xx are retried
+  `EVAL_UPLOAD_RETRIES` times with full-jitter exponential backoff, or after
+  the server's Retry-After
+
+A chunk that still fails is written to `EVAL_UPLOAD_SPOOL` as the exact body
+that would have been sent, so no result is lost, and `resend_spooled()`
+uploads those files later. Once a chunk fails for lack of a reachable
+endpoint, the rest of the flush goes straight to the spool instead of
+waiting out its retries too; without any endpoint everything is spooled.
+
+The endpoint is `EVAL_UPLOAD_ENDPOINT`, or `PHOENIX_ENDPOINT` without its
+`/v1/traces` suffix; `PHOENIX_API_KEY` is sent as a bearer token. Rows are
+counted in `agent_eval_rows_total{eval_name,outcome}` ("uploaded", "spooled"
+or "resent") and uploads in `agent_eval_uploads_total{result}` ("ok",
+"retried", "failed").
+
+Example:
+    >>> sink = EvaluationSink()
+    >>> sink.add_dataframe("Toxicity", result_df)   # indexed by context.span_id
+    >>> report = await sink.flush()
+"""
+
+import asyncio
+import os
+import random
+import re
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+
+import httpx
+import pandas as pd
+import pyarrow as pa
+from phoenix.trace import SpanEvaluations
+
+from agentic_app_quickstart.examples.models import RETRYABLE_STATUS, _retry_after
+from agentic_app_quickstart.week_2.solution.config.settings import EvaluationUploadSettings, get_settings
+from agentic_app_quickstart.week_2.solution.monitoring.metrics import REGISTRY
+
+EVAL_ROWS = REGISTRY.counter(
+    "agent_eval_rows_total",
+    "Evaluation rows uploaded to Phoenix, spooled to disk, or resent from the spool",
+    ["eval_name", "outcome"],
+)
+EVAL_UPLOADS = REGISTRY.counter(
+    "agent_eval_uploads_total",
+    "Evaluation upload attempts, by result",
+    ["result"],
+)
+EVAL_UPLOAD_BYTES = REGISTRY.counter(
+    "agent_eval_upload_bytes_total",
+    "Bytes of evaluation upload bodies sent to Phoenix",
+)
+
+COLUMNS = ("label", "score", "explanation")
+
+
+class EndpointUnavailable(ConnectionError):
+    """No evaluation endpoint is configured, or it could not be reached."""
+
+
+@dataclass(frozen=True)
+class UploadReport:
+    """
+    Outcome of a `flush()` or `resend_spooled()`.
+
+    Attributes:
+        uploaded (int): Rows Phoenix accepted
+        spooled (int): Rows written to the spool instead
+        requests (int): HTTP requests sent, retries included
+        bytes (int): Body bytes sent
+        seconds (float): Wall time
+    """
+
+    uploaded: int = 0
+    spooled: int = 0
+    requests: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+
+def evaluations_endpoint(settings=None) -> str | None:
+    """Phoenix base URL for evaluation uploads, None when none is configured."""
+    settings = settings or get_settings()
+    endpoint = settings.evaluations.endpoint or settings.phoenix_endpoint
+    if not endpoint:
+        return None
+    return re.sub(r"/v1/traces/?$", "", endpoint.rstrip("/"))
+
+
+def encode_chunk(eval_name: str, rows: list[tuple], compression: str = "zstd") -> bytes:
+    """
+    One upload body: an Arrow IPC stream of `SpanEvaluations`.
+
+    Args:
+        eval_name (str): Name the evaluations are shown under in Phoenix
+        rows (list[tuple]): `(span_id, label, score, explanation)` tuples
+        compression (str): "zstd", "lz4" or "none"
+
+    Returns:
+        bytes: The request body
+    """
+    dataframe = pd.DataFrame(rows, columns=("context.span_id", *COLUMNS)).set_index("context.span_id")
+    # Columns the judge left empty are not sent at all
+    dataframe = dataframe.dropna(axis="columns", how="all")
+    table = SpanEvaluations(eval_name=eval_name, dataframe=dataframe).to_pyarrow_table()
+    options = pa.ipc.IpcWriteOptions(compression=None if compression == "none" else compression)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+class EvaluationSink:
+    """
+    Batches judge results and uploads them to Phoenix in bulk.
+
+    Args:
+        endpoint (str, optional): Phoenix base URL, defaults to `evaluations_endpoint()`
+        api_key (str, optional): Defaults to `PHOENIX_API_KEY`
+        settings (EvaluationUploadSettings, optional): Defaults to `get_settings().evaluations`
+        transport (httpx.AsyncBaseTransport, optional): Transport of the HTTP client, for tests
+    """
+
+    def __init__(
+        self,
+        endpoint: str | None = None,
+        api_key: str | None = None,
+        settings: EvaluationUploadSettings | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.settings = settings or get_settings().evaluations
+        self.endpoint = endpoint or evaluations_endpoint()
+        self.api_key = api_key or get_settings().phoenix_api_key
+        self.transport = transport
+        self._pending: dict[str, dict[str, tuple]] = defaultdict(dict)
+
+    def __len__(self) -> int:
+        """Rows waiting for the next flush."""
+        return sum(len(rows) for rows in self._pending.values())
+
+    def add(self, eval_name: str, span_id: str, label=None, score=None, explanation=None):
+        """Queue one evaluation of a span, replacing a queued one of the same name and span."""
+        self._pending[eval_name][str(span_id)] = (label, score, explanation)
+
+    def add_dataframe(self, eval_name: str, dataframe: pd.DataFrame, span_ids=None):
+        """
+        Queue a judge's results, such as the output of `llm_classify`.
+
+        Args:
+            eval_name (str): Name the evaluations are shown under in Phoenix
+            dataframe (pd.DataFrame): Results with any of the columns label,
+                score and explanation
+            span_ids (Sequence[str], optional): Span of each row, defaults to the index
+        """
+        span_ids = dataframe.index if span_ids is None else span_ids
+        columns = [dataframe[c] if c in dataframe.columns else [None] * len(dataframe) for c in COLUMNS]
+        pending = self._pending[eval_name]
+        for span_id, *values in zip(span_ids, *columns):
+            pending[str(span_id)] = tuple(None if pd.isna(v) else v for v in values)
+
+    def _chunks(self, pending: dict[str, dict[str, tuple]]):
+        size = self.settings.chunk_rows
+        for eval_name, rows in pending.items():
+            rows = [(span_id, *values) for span_id, values in rows.items()]
+            for start in range(0, len(rows), size):
+                yield eval_name, rows[start:start + size]
+
+    def _client(self) -> httpx.AsyncClient:
+        headers = {"content-type": "application/x-pandas-arrow"}
+        if self.api_key:
+            headers["authorization"] = f"Bearer {self.api_key}"
+        return httpx.AsyncClient(
+            base_url=self.endpoint or "http://unavailable",
+            headers=headers,
+            timeout=self.settings.timeout_seconds,
+            transport=self.transport,
+        )
+
+    async def _post(self, client: httpx.AsyncClient, body: bytes, stats: dict) -> None:
+        """POST one body, retrying transient failures; raises if it was not accepted."""
+        if self.endpoint is None:
+            raise EndpointUnavailable("No evaluation endpoint; set PHOENIX_ENDPOINT or EVAL_UPLOAD_ENDPOINT")
+        for attempt in range(self.settings.max_retries + 1):
+            stats["requests"] += 1
+            stats["bytes"] += len(body)
+            EVAL_UPLOAD_BYTES.inc(len(body))
+            delay = None
+            try:
+                response = await client.post("v1/evaluations", content=body)
+                if response.status_code not in RETRYABLE_STATUS:
+                    response.raise_for_status()
+                    EVAL_UPLOADS.inc(result="ok")
+                    return
+                error = httpx.HTTPStatusError(
+                    f"Phoenix answered {response.status_code}", request=response.request, response=response
+                )
+                delay = _retry_after(error)
+            except httpx.TransportError as e:
+                error = EndpointUnavailable(f"{self.endpoint} unreachable: {e!r}")
+            if attempt == self.settings.max_retries:
+                EVAL_UPLOADS.inc(result="failed")
+                raise error
+            EVAL_UPLOADS.inc(result="retried")
+            if delay is None:
+                delay = random.uniform(0, self.settings.backoff_seconds * 2**attempt)
+            await asyncio.sleep(delay)
+
+    def _spool(self, eval_name: str, body: bytes) -> str:
+        os.makedirs(self.settings.spool_path, exist_ok=True)
+        name = re.sub(r"[^\w.-]+", "_", eval_name)
+        path = os.path.join(self.settings.spool_path, f"{name}-{uuid.uuid4().hex}.arrows")
+        with open(path + ".tmp", "wb") as f:
+            f.write(body)
+        os.replace(path + ".tmp", path)
+        return path
+
+    async def flush(self) -> UploadReport:
+        """
+        Upload every queued row, spooling the chunks that could not be uploaded.
+
+        Returns:
+            UploadReport: What was uploaded and spooled
+        """
+        pending, self._pending = self._pending, defaultdict(dict)
+        start = time.perf_counter()
+        stats = {"uploaded": 0, "spooled": 0, "requests": 0, "bytes": 0}
+        semaphore = asyncio.Semaphore(self.settings.concurrency)
+        down = self.endpoint is None
+
+        async def upload(client: httpx.AsyncClient, eval_name: str, rows: list[tuple]):
+            nonlocal down
+            # Encode under the semaphore: at most `concurrency` chunks are held
+            # encoded at once, and chunks are sent in the order they were queued
+            async with semaphore:
+                body = await asyncio.to_thread(encode_chunk, eval_name, rows, self.settings.compression)
+                try:
+                    if down and self.endpoint:
+                        raise EndpointUnavailable(f"{self.endpoint} is unavailable")
+                    await self._post(client, body, stats)
+                except Exception as e:
+                    # Whatever went wrong, the chunk is kept rather than lost with the rest of the flush
+                    down = down or isinstance(e, EndpointUnavailable)
+                    path = self._spool(eval_name, body)
+                    print(f"Could not upload {len(rows)} {eval_name} evaluations ({e}); kept in {path}")
+                    stats["spooled"] += len(rows)
+                    EVAL_ROWS.inc(len(rows), eval_name=eval_name, outcome="spooled")
+                    return
+            stats["uploaded"] += len(rows)
+            EVAL_ROWS.inc(len(rows), eval_name=eval_name, outcome="uploaded")
+
+        async with self._client() as client:
+            await asyncio.gather(*(upload(client, name, rows) for name, rows in self._chunks(pending)))
+        return UploadReport(**stats, seconds=time.perf_counter() - start)
+
+    async def resend_spooled(self) -> UploadReport:
+        """
+        Upload the spooled chunks, deleting each file once Phoenix accepted it.
+
+        Files that cannot be read as evaluations are skipped and left in place.
+
+        Returns:
+            UploadReport: Rows resent, and rows still spooled
+        """
+        directory = self.settings.spool_path
+        paths = sorted(
+            os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".arrows")
+        ) if os.path.isdir(directory) else []
+        start = time.perf_counter()
+        stats = {"uploaded": 0, "spooled": 0, "requests": 0, "bytes": 0}
+        semaphore = asyncio.Semaphore(self.settings.concurrency)
+
+        async def resend(client: httpx.AsyncClient, path: str):
+            try:
+                with open(path, "rb") as f:
+                    body = f.read()
+                evaluations = SpanEvaluations.from_pyarrow_reader(pa.ipc.open_stream(body))
+            except Exception as e:
+                # A truncated or corrupt file must not hold back the others; it stays for inspection
+                print(f"Skipping unreadable spool file {path} ({e!r})")
+                return
+            eval_name, rows = evaluations.eval_name, len(evaluations.dataframe)
+            async with semaphore:
+                try:
+                    await self._post(client, body, stats)
+                except Exception as e:
+                    print(f"Could not resend {path} ({e})")
+                    stats["spooled"] += rows
+                    return
+            os.remove(path)
+            stats["uploaded"] += rows
+            EVAL_ROWS.inc(rows, eval_name=eval_name, outcome="resent")
+
+        async with self._client() as client:
+            await asyncio.gather(*(resend(client, path) for path in paths))
+        return UploadReport(**stats, seconds=time.perf_counter() - start)
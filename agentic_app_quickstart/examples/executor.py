@@ -0,0 +1,183 @@
+"""
+Off-event-loop execution for function tools.
+
+The agents SDK calls synchronous `@function_tool` functions directly on the
+event loop, so a large `pl.read_csv` blocks every other conversation the
+process is serving. `offloaded_tool` is a drop-in replacement for
+`function_tool` that runs the function in a pool instead:
+
+- "thread": for work that releases the GIL, such as Polars and file I/O
+- "process": for pure-Python, CPU-bound work. The function must be defined at
+  module level in an importable module, and its arguments and result must be
+  picklable.
+
+Each call has a timeout (the tool's own, else `TOOL_TIMEOUT`). When a call
+times out or the run is cancelled, work still waiting in the pool is
+cancelled. A thread that is already running cannot be interrupted and
+finishes in the background. Timeouts surface to the model as a tool error,
+like any other exception.
+
+Set `TOOL_EXECUTOR=inline` to run every tool on the event loop again.
+
+Example:
+    >>> @offloaded_tool(pool="thread", timeout=30)
+    ... def count_unique(file_path: str, target_column: str) -> int:
+    ...     ...
+"""
+
+import asyncio
+import functools
+import importlib
+import inspect
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable
+
+from agents import function_tool
+from agents.tool import FunctionTool
+
+from agentic_app_quickstart.week_2.solution.config.settings import ToolSettings, get_settings
+from agentic_app_quickstart.week_2.solution.monitoring.metrics import REGISTRY
+
+THREAD, PROCESS = "thread", "process"
+
+TOOL_SECONDS = REGISTRY.summary(
+    "agent_tool_seconds",
+    "Function tool execution time, including time queued in the pool",
+    ["tool", "pool"],
+)
+TOOL_TIMEOUTS = REGISTRY.counter(
+    "agent_tool_timeouts_total",
+    "Function tool calls that exceeded their timeout",
+    ["tool"],
+)
+TOOLS_IN_FLIGHT = REGISTRY.gauge(
+    "agent_tools_in_flight",
+    "Function tool calls submitted to a pool and not yet finished",
+    ["pool"],
+)
+
+# (module, qualname) -> undecorated function, used to find it in pool processes
+_FUNCTIONS: dict[tuple[str, str], Callable] = {}
+
+
+class ToolTimeoutError(TimeoutError):
+    """Raised when a tool call exceeds its timeout."""
+
+
+def _call_registered(key: tuple[str, str], args: tuple, kwargs: dict):
+    """Entry point in pool processes; the decorated name no longer refers to the function."""
+    func = _FUNCTIONS.get(key)
+    if func is None:
+        importlib.import_module(key[0])
+        func = _FUNCTIONS[key]
+    return func(*args, **kwargs)
+
+
+class ToolExecutor:
+    """
+    Runs synchronous tool functions in thread or process pools.
+
+    Pools are created on first use.
+
+    Args:
+        settings (ToolSettings): Mode, pool sizes and default timeout
+    """
+
+    def __init__(self, settings: ToolSettings):
+        self.settings = settings
+        self.inline = settings.executor == "inline"
+        self._threads: ThreadPoolExecutor | None = None
+        self._processes: ProcessPoolExecutor | None = None
+
+    def _pool(self, pool: str) -> Executor:
+        if pool == THREAD:
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(self.settings.thread_workers, thread_name_prefix="tool")
+            return self._threads
+        if pool == PROCESS:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(self.settings.process_workers)
+            return self._processes
+        raise ValueError(f"Unknown pool {pool!r}, expected {THREAD!r} or {PROCESS!r}")
+
+    async def run(self, func, args: tuple, kwargs: dict, pool: str = THREAD, timeout: float | None = None):
+        """
+        Call `func(*args, **kwargs)` off the event loop.
+
+        Args:
+            func (Callable): The undecorated tool function
+            args (tuple): Positional arguments
+            kwargs (dict): Keyword arguments
+            pool (str): "thread" or "process"
+            timeout (float, optional): Seconds, defaults to the settings
+
+        Returns:
+            Any: The function's result
+
+        Raises:
+            ToolTimeoutError: If the call takes longer than the timeout
+        """
+        name = func.__name__
+        if self.inline:
+            return func(*args, **kwargs)
+
+        if pool == PROCESS:
+            call = functools.partial(_call_registered, (func.__module__, func.__qualname__), args, kwargs)
+        else:
+            call = functools.partial(func, *args, **kwargs)
+
+        timeout = timeout or self.settings.timeout_seconds
+        start = time.perf_counter()
+        TOOLS_IN_FLIGHT.inc(pool=pool)
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._pool(pool), call)
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            TOOL_TIMEOUTS.inc(tool=name)
+            raise ToolTimeoutError(f"Tool {name} timed out after {timeout:g}s") from None
+        finally:
+            TOOLS_IN_FLIGHT.dec(pool=pool)
+            TOOL_SECONDS.observe(time.perf_counter() - start, tool=name, pool=pool)
+
+    def shutdown(self, wait: bool = True):
+        for executor in (self._threads, self._processes):
+            if executor is not None:
+                executor.shutdown(wait=wait, cancel_futures=True)
+        self._threads = self._processes = None
+
+
+@functools.cache
+def get_tool_executor() -> ToolExecutor:
+    """Process-wide executor built from `get_settings().tools`."""
+    return ToolExecutor(get_settings().tools)
+
+
+def offloaded_tool(func=None, *, pool: str = THREAD, timeout: float | None = None, **tool_kwargs) -> FunctionTool:
+    """
+    Like `@function_tool`, but the function runs in a thread or process pool.
+
+    Args:
+        func (Callable): Synchronous tool function; omit to use with arguments
+        pool (str): "thread" or "process"
+        timeout (float, optional): Per-call timeout in seconds
+        **tool_kwargs: Passed on to `function_tool`
+
+    Returns:
+        FunctionTool: The tool, or a decorator producing it
+    """
+    if pool not in (THREAD, PROCESS):
+        raise ValueError(f"Unknown pool {pool!r}, expected {THREAD!r} or {PROCESS!r}")
+
+    def decorate(f) -> FunctionTool:
+        if inspect.iscoroutinefunction(f):
+            raise TypeError(f"{f.__name__} is already async; use @function_tool")
+        _FUNCTIONS[(f.__module__, f.__qualname__)] = f
+
+        @functools.wraps(f)
+        async def invoke(*args, **kwargs):
+            return await get_tool_executor().run(f, args, kwargs, pool=pool, timeout=timeout)
+
+        return function_tool(invoke, **tool_kwargs)
+
+    return decorate(func) if func is not None else decorate
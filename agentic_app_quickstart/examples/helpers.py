@@ -1,16 +1,58 @@
-from openai import AsyncOpenAI
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from agents import ModelSettings
 from agents.models.openai_chatcompletions import OpenAIChatCompletionsModel
 import os
-from phoenix.otel import register
+from phoenix.evals import OpenAIModel
+from phoenix.otel import HTTPSpanExporter, TracerProvider
+from openinference.instrumentation.openai_agents import OpenAIAgentsInstrumentor
+from openinference.semconv.resource import ResourceAttributes
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace.export import SpanExporter
 from dotenv import load_dotenv
+from agentic_app_quickstart.examples.cassettes import CassetteTransport, get_cassette
+from agentic_app_quickstart.examples.loops import LoopGuardModel
+from agentic_app_quickstart.examples.models import CircuitBreakerModel, ConfiguredModel, ResilientModel
+from agentic_app_quickstart.examples.ratelimit import (
+    RateLimitedModel,
+    estimate_request_tokens,
+    get_rate_limiter,
+)
+from agentic_app_quickstart.examples.singleflight import SingleFlightModel
+from agentic_app_quickstart.week_2.solution.config.settings import get_settings
+from agentic_app_quickstart.week_2.solution.monitoring import latency
+from agentic_app_quickstart.week_2.solution.monitoring.sinks import (
+    FileSpanExporter,
+    InMemorySpanExporter,
+)
+from agentic_app_quickstart.week_2.solution.monitoring.metering import MeteredModel
+from agentic_app_quickstart.week_2.solution.monitoring.payload import PayloadPolicy
+from agentic_app_quickstart.week_2.solution.monitoring.sampling import (
+    BatchPolicy,
+    SamplingPolicy,
+    build_span_processor,
+)
 
 
 load_dotenv()
 
 
-def get_client():
-    api_key = os.getenv("OPENAI_API_KEY")
-    base_url = os.getenv("OPENAI_API_ENDPOINT")
+def get_client(
+    timeout: float | None = None,
+    max_retries: int | None = None,
+    base_url: str | None = None,
+    api_key: str | None = None,
+):
+    settings = get_settings()
+    api_key = api_key or settings.openai_api_key
+    base_url = base_url or settings.openai_api_endpoint
+    cassette = get_cassette()
+    if cassette is not None and cassette.mode == "replay":
+        # Replayed requests never reach the endpoint
+        api_key = api_key or "cassette-replay"
 
     if not api_key:
         raise ValueError(
@@ -22,25 +64,195 @@ def get_client():
     if not base_url:
         print("Warning: OPENAI_API_ENDPOINT not set, using default OpenAI endpoint")
 
-    return AsyncOpenAI(api_key=api_key, base_url=base_url)
+    options = {}
+    if timeout is not None:
+        options["timeout"] = timeout
+    if max_retries is not None:
+        options["max_retries"] = max_retries
+    if cassette is not None:
+        # Record or replay model traffic (see examples/cassettes.py)
+        options["http_client"] = DefaultAsyncHttpxClient(transport=CassetteTransport(cassette))
+    return AsyncOpenAI(api_key=api_key, base_url=base_url, **options)
+
+
+def rate_limit_key(base_url: str | None, model: str) -> str:
+    """Rate limit bucket key of a model on an endpoint; quotas are per model and API host."""
+    return f"{urlsplit(base_url).netloc if base_url else 'api.openai.com'}/{model}"
+
 
+def get_model(role: str = "agent"):
+    """
+    Create the chat model for an agent role.
 
-def get_model():
+    The model name, request timeout and optional output token cap come from
+    the role's entry in the settings (see `week_2/solution/config/settings.py`),
+    so cheap models can serve guardrails and routing. Slow requests are hedged and
+    transient failures retried by `ResilientModel`, and a circuit breaker fails
+    fast or switches to `MODEL_FALLBACK` / `MODEL_FALLBACK_ENDPOINT` while the
+    endpoint is unhealthy (see `examples/models.py`). Requests wait for the
+    shared `RATE_LIMIT_*` budget of their endpoint and model (see
+    `examples/ratelimit.py`). Runs that loop get a corrective note from their
+    `LoopMonitor` (see `examples/loops.py`). Identical concurrent requests are
+    sent once (see `examples/singleflight.py`). Token usage of every response is
+    metered per agent, session, model and role (see `monitoring/metering.py`).
+
+    Args:
+        role (str): "agent", "guardrail", "router", "specialist", "analyst" or "judge"
+
+    Returns:
+        Model: The configured, metered model
+    """
+    settings = get_settings()
+    config = settings.role(role)
     model = OpenAIChatCompletionsModel(
-        model="gpt-4.1",
-        openai_client=get_client(),
+        model=config.model,
+        # Retries are done by ResilientModel, which also honors run deadlines
+        openai_client=get_client(timeout=config.timeout_seconds, max_retries=0),
+    )
+    breaker = settings.breaker
+    if breaker.enabled:
+        fallback = None
+        if breaker.has_fallback:
+            fallback = OpenAIChatCompletionsModel(
+                model=breaker.fallback_model or config.model,
+                openai_client=get_client(
+                    timeout=config.timeout_seconds,
+                    max_retries=0,
+                    base_url=breaker.fallback_endpoint,
+                    api_key=breaker.fallback_api_key,
+                ),
+            )
+        model = CircuitBreakerModel(model, name=config.model, settings=breaker, fallback=fallback)
+    limiter = get_rate_limiter()
+    if limiter.enabled:
+        # Outside the breaker, so waiting for budget is not mistaken for a slow endpoint
+        model = RateLimitedModel(model, rate_limit_key(settings.openai_api_endpoint, config.model), limiter)
+    model = ResilientModel(model, name=config.model, settings=settings.resilience)
+    if settings.single_flight.models:
+        # Outside retries and rate limits, so followers spend neither
+        model = SingleFlightModel(model, name=config.model)
+    if config.max_tokens:
+        model = ConfiguredModel(model, ModelSettings(max_tokens=config.max_tokens))
+
+    return MeteredModel(LoopGuardModel(model), model_name=config.model, role=role)
+
+
+@dataclass
+class RateLimitedOpenAIModel(OpenAIModel):
+    """Phoenix evals model whose requests wait for the shared rate limiter as batch work."""
+
+    def _rate_limit(self, kwargs: dict) -> tuple[str, int]:
+        key = rate_limit_key(self.base_url, self.model)
+        return key, estimate_request_tokens(None, kwargs.get("messages") or kwargs.get("prompt") or "", self.max_tokens)
+
+    async def _async_rate_limited_completion(self, **kwargs):
+        await get_rate_limiter().acquire(*self._rate_limit(kwargs), priority="batch")
+        return await super()._async_rate_limited_completion(**kwargs)
+
+    def _rate_limited_completion(self, **kwargs):
+        get_rate_limiter().acquire_sync(*self._rate_limit(kwargs), priority="batch")
+        return super()._rate_limited_completion(**kwargs)
+
+
+def get_judge_model() -> OpenAIModel:
+    """
+    Create the Phoenix evals model for LLM-as-judge evaluations (`llm_classify`).
+
+    It uses the "judge" role's model, timeout and output token cap (if set),
+    and its requests draw from the same rate limit budget as the agents at batch
+    priority, so running evaluations does not starve interactive chat.
+
+    Returns:
+        OpenAIModel: The judge model
+    """
+    settings = get_settings()
+    config = settings.role("judge")
+    options = {"max_tokens": config.max_tokens} if config.max_tokens is not None else {}
+    return RateLimitedOpenAIModel(
+        base_url=settings.openai_api_endpoint,
+        api_key=settings.openai_api_key,
+        model=config.model,
+        request_timeout=config.timeout_seconds,
+        **options,
     )
 
-    return model
 
+def get_tracing_provider(
+    project_name: str = "llm_as_judge_example",
+    sink: str | SpanExporter | None = None,
+    file_path: str | None = None,
+    set_global_tracer_provider: bool = True,
+    sampling: SamplingPolicy | None = None,
+    batching: BatchPolicy | None = None,
+    payload: PayloadPolicy | None = None,
+):
+    """
+    Create a tracer provider and auto-instrument the openai-agents SDK.
+
+    By default spans are sent to Phoenix (`PHOENIX_ENDPOINT`). The sink can also
+    be chosen with the `TRACING_SINK` environment variable, which lets the
+    examples run fully offline:
+
+    - "phoenix": HTTP/protobuf export to the Phoenix collector
+    - "file": gzip-compressed OTLP/JSON lines (see `FileSpanExporter`)
+    - "memory": finished spans are kept in an `InMemorySpanExporter`
+    - any `SpanExporter` instance, used as-is
+
+    Spans are exported in batches from a background thread. Head/tail sampling,
+    the batch queue and attribute size caps are configured through
+    `SamplingPolicy`, `BatchPolicy` (see `monitoring/sampling.py`) and
+    `PayloadPolicy` (see `monitoring/payload.py`), which default to reading
+    their environment variables. The per-run latency breakdown metrics in
+    `monitoring/latency.py` are registered alongside the instrumentation.
+
+    Args:
+        project_name (str): Phoenix project the spans belong to
+        sink (str | SpanExporter, optional): Where spans go, defaults to
+            `TRACING_SINK` or "phoenix"
+        file_path (str, optional): Output file for the "file" sink, defaults to
+            `TRACING_FILE_PATH` or `traces/<project_name>.ndjson.gz`
+        set_global_tracer_provider (bool): Register the provider globally
+        sampling (SamplingPolicy, optional): Head and tail sampling policy
+        batching (BatchPolicy, optional): Export queue and batch policy
+        payload (PayloadPolicy, optional): Attribute size caps and projection
 
-def get_tracing_provider(project_name: str = "llm_as_judge_example"):
+    Returns:
+        TracerProvider: The configured tracer provider
+    """
+    sink = sink or os.getenv("TRACING_SINK", "phoenix")
+    sampling = sampling or SamplingPolicy.from_env()
+    batching = batching or BatchPolicy.from_env()
+    payload = payload or PayloadPolicy.from_env()
 
-    tracing_provider = register(
-        endpoint=os.getenv("PHOENIX_ENDPOINT"),
-        project_name=project_name,
-        protocol="http/protobuf",
-        auto_instrument=True
+    if sink == "phoenix":
+        exporter = HTTPSpanExporter(endpoint=get_settings().phoenix_endpoint)
+    elif sink == "file":
+        file_path = file_path or os.getenv(
+            "TRACING_FILE_PATH", os.path.join("traces", f"{project_name}.ndjson.gz")
+        )
+        exporter = FileSpanExporter(file_path)
+    elif sink == "memory":
+        exporter = InMemorySpanExporter()
+    elif isinstance(sink, SpanExporter):
+        exporter = sink
+    else:
+        raise ValueError(
+            f"Unknown tracing sink {sink!r}. Use 'phoenix', 'file', 'memory' or a SpanExporter."
+        )
+
+    tracing_provider = TracerProvider(
+        resource=Resource.create({ResourceAttributes.PROJECT_NAME: project_name}),
+        sampler=sampling.sampler(),
+        verbose=False,
     )
+    tracing_provider.add_span_processor(
+        build_span_processor(exporter, sampling, batching, payload, name=project_name)
+    )
+
+    if set_global_tracer_provider:
+        trace.set_tracer_provider(tracing_provider)
+
+    OpenAIAgentsInstrumentor().instrument(tracer_provider=tracing_provider)
+    latency.install()
 
     return tracing_provider
@@ -0,0 +1,251 @@
+"""
+Detection of runaway agent runs.
+
+Handoff graphs like reception ⇄ specialist in `week_1/05_handoffs.py`, and
+tool-using agents like the data analyzer, sometimes bounce between agents or
+repeat the same tool call until `max_turns`, paying for a longer prompt on
+every bounce. `LoopMonitor` is a set of run hooks that watches the run's
+trajectory and notices, in constant time per step:
+
+- repeated tool calls: the same tool returning the same result
+  `max_repeats` times (the hooks do not see tool arguments, so a call is
+  identified by its tool and result)
+- handoff cycles: `max_handoff_returns` handoffs back to agents the run
+  already visited
+- no progress: `max_idle_turns` turns in a row without a new tool result or a
+  new agent
+
+What happens then depends on `LOOP_POLICY`: "abort" stops the run with
+`RunawayLoop`; "correct" (the default) adds a note telling the model it is
+looping to every later model request of the run (see `LoopGuardModel`, which
+`get_model()` installs), and aborts only if the run loops again. Both count
+`agent_runaway_loops_total{kind,action}` and estimate the tokens saved in
+`agent_runaway_tokens_saved_total{action}`: the turns left before
+`max_turns`, at the run's average tokens per turn so far (a lower bound, since
+the prompt grows with every turn).
+
+Example:
+    >>> result = await run_with_loop_guard(agent, prompt, max_turns=10)
+"""
+
+import contextvars
+from collections import Counter
+from typing import AsyncIterator
+
+from agents import Agent, AgentsException, RunContextWrapper, RunHooks, Runner
+from agents.models.interface import Model
+from agents.result import RunResult
+from agents.run import DEFAULT_MAX_TURNS
+
+from agentic_app_quickstart.week_2.solution.config.settings import LoopSettings, get_settings
+from agentic_app_quickstart.week_2.solution.monitoring.metrics import REGISTRY
+
+LOOPS_DETECTED = REGISTRY.counter(
+    "agent_runaway_loops_total",
+    "Runaway agent runs detected, by kind of loop and what was done about it",
+    ["kind", "action"],
+)
+TOKENS_SAVED = REGISTRY.counter(
+    "agent_runaway_tokens_saved_total",
+    "Estimated tokens not spent because a runaway run was stopped or corrected before max_turns",
+    ["action"],
+)
+
+_monitor: contextvars.ContextVar["LoopMonitor | None"] = contextvars.ContextVar("loop_monitor", default=None)
+
+
+class RunawayLoop(AgentsException):
+    """
+    A run was stopped because it kept looping.
+
+    Attributes:
+        kind (str): "repeated_tool_call", "handoff_cycle" or "no_progress"
+        turns (int): Model requests the run made
+        tokens_used (int): Tokens the run spent
+        tokens_saved (int): Estimated tokens the run would have spent until `max_turns`
+    """
+
+    def __init__(self, message: str, kind: str, turns: int, tokens_used: int, tokens_saved: int):
+        super().__init__(message)
+        self.kind = kind
+        self.turns = turns
+        self.tokens_used = tokens_used
+        self.tokens_saved = tokens_saved
+
+
+class LoopMonitor(RunHooks):
+    """
+    Run hooks that detect a run looping; use one instance per run.
+
+    Args:
+        settings (LoopSettings, optional): Defaults to `get_settings().loops`
+        max_turns (int): The run's `max_turns`, to estimate the tokens saved
+    """
+
+    def __init__(self, settings: LoopSettings | None = None, max_turns: int = DEFAULT_MAX_TURNS):
+        self.settings = settings or get_settings().loops
+        self.max_turns = max_turns
+        self.correction: str | None = None
+        self._calls: Counter[int] = Counter()
+        self._visited: set[str] = set()
+        self._returns = 0
+        self._turn = 0
+        self._turn_progress = False
+        self._idle_turns = 0
+
+    def _tokens(self, context: RunContextWrapper) -> tuple[int, int]:
+        """Tokens spent so far and estimated for the turns left before `max_turns`."""
+        usage = context.usage
+        if not usage.requests:
+            return usage.total_tokens, 0
+        remaining = max(0, self.max_turns - usage.requests)
+        return usage.total_tokens, remaining * usage.total_tokens // usage.requests
+
+    def _trip(self, context: RunContextWrapper, kind: str, note: str):
+        if self.settings.policy == "correct" and self.correction is None:
+            LOOPS_DETECTED.inc(kind=kind, action="corrected")
+            self.correction = note
+            # One more offence aborts the run; the turn that was caught does not count as one
+            self._idle_turns = self.settings.max_idle_turns - 1
+            self._turn_progress = True
+            return
+
+        used, saved = self._tokens(context)
+        LOOPS_DETECTED.inc(kind=kind, action="aborted")
+        TOKENS_SAVED.inc(saved, action="aborted")
+        raise RunawayLoop(
+            f"Run aborted at turn {context.usage.requests}: {note}",
+            kind=kind,
+            turns=context.usage.requests,
+            tokens_used=used,
+            tokens_saved=saved,
+        )
+
+    def _step(self, context: RunContextWrapper, progress: bool):
+        """Account for a tool result or handoff, closing the previous turn if a new one started."""
+        turn = context.usage.requests
+        if turn != self._turn:
+            if self._turn:
+                self._idle_turns = 0 if self._turn_progress else self._idle_turns + 1
+            self._turn, self._turn_progress = turn, False
+            if self._idle_turns >= self.settings.max_idle_turns:
+                self._trip(
+                    context,
+                    "no_progress",
+                    f"The last {self._idle_turns} turns produced no new information. "
+                    "Stop repeating tools or handoffs and answer the user with what you already have.",
+                )
+        self._turn_progress = self._turn_progress or progress
+
+    async def on_agent_start(self, context: RunContextWrapper, agent: Agent) -> None:
+        self._visited.add(agent.name)
+
+    async def on_tool_end(self, context: RunContextWrapper, agent: Agent, tool, result: str) -> None:
+        signature = hash((tool.name, str(result)))
+        self._calls[signature] += 1
+        count = self._calls[signature]
+        self._step(context, progress=count == 1)
+        if count >= self.settings.max_repeats:
+            self._trip(
+                context,
+                "repeated_tool_call",
+                f"You have called {tool.name} {count} times and got the same result each time. "
+                "Do not call it again; answer with the results you already have, or say what is missing.",
+            )
+
+    async def on_handoff(self, context: RunContextWrapper, from_agent: Agent, to_agent: Agent) -> None:
+        returning = to_agent.name in self._visited
+        self._visited.add(to_agent.name)
+        self._step(context, progress=not returning)
+        if returning:
+            self._returns += 1
+            if self._returns >= self.settings.max_handoff_returns:
+                self._trip(
+                    context,
+                    "handoff_cycle",
+                    f"The conversation keeps being handed between {from_agent.name} and {to_agent.name}. "
+                    "Do not hand off again; answer the user yourself, or tell them who can help.",
+                )
+
+    async def on_agent_end(self, context: RunContextWrapper, agent: Agent, output) -> None:
+        if self.correction is not None:
+            _, saved = self._tokens(context)
+            TOKENS_SAVED.inc(saved, action="corrected")
+
+
+async def run_with_loop_guard(agent: Agent, input, **kwargs) -> RunResult:
+    """
+    `Runner.run(agent, input, **kwargs)` watched by a `LoopMonitor` under `LOOP_POLICY`.
+
+    Args:
+        agent (Agent): Starting agent
+        input (str | list): Run input
+
+    Returns:
+        RunResult: The run's result
+
+    Raises:
+        RunawayLoop: The run looped and the policy stopped it
+    """
+    settings = get_settings().loops
+    if settings.policy == "off":
+        return await Runner.run(agent, input, **kwargs)
+
+    monitor = LoopMonitor(settings, max_turns=kwargs.get("max_turns", DEFAULT_MAX_TURNS))
+    token = _monitor.set(monitor)
+    try:
+        return await Runner.run(agent, input, hooks=monitor, **kwargs)
+    finally:
+        _monitor.reset(token)
+
+
+def _with_correction(input):
+    """The model input with the current run's corrective note appended, if it has one."""
+    monitor = _monitor.get()
+    if monitor is None or monitor.correction is None:
+        return input
+    items = [{"role": "user", "content": input}] if isinstance(input, str) else list(input)
+    return items + [{"role": "system", "content": monitor.correction}]
+
+
+class LoopGuardModel(Model):
+    """
+    Adds the `LoopMonitor` correction of the current run to each model request.
+
+    The note is not stored in the run's history, so it is sent again with every
+    request after the loop was detected, and never outlives the run.
+
+    Args:
+        model (Model): Model doing the work
+    """
+
+    def __init__(self, model: Model):
+        self.model = model
+
+    async def get_response(
+        self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+    ):
+        return await self.model.get_response(
+            system_instructions,
+            _with_correction(input),
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            tracing,
+            **kwargs,
+        )
+
+    def stream_response(
+        self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+    ) -> AsyncIterator:
+        return self.model.stream_response(
+            system_instructions,
+            _with_correction(input),
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            tracing,
+            **kwargs,
+        )
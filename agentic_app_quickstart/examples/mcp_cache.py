@@ -0,0 +1,299 @@
+"""
+TTL cache for MCP tool calls.
+
+Repeated questions make an agent call the same MCP tool with the same
+arguments, e.g. the notebook's DataFetcherAgent fetching the same meteoblue
+page for every forecast question, and each call costs network latency and
+the tokens of the page. `CachedMCPServer` wraps any MCP server (including an
+`MCPServerPool`) and answers such calls from a cache:
+
+- the key is the tool name plus its normalized arguments: arguments equal to
+  the tool's schema default or None are dropped, strings are stripped, and
+  URLs lose their fragment and get a lowercase host and sorted query
+- each tool has its own TTL; tools without one are never cached, and
+  neither are error results
+- with `revalidate={"fetch": "url"}`, the ETag / Last-Modified of the URL in
+  that argument are stored with the result; once the TTL has passed, a
+  conditional HEAD request checks the page, and a 304 keeps the cached
+  result for another TTL instead of calling the tool
+- entries live in SQLite (in memory unless `MCP_CACHE_PATH` is set), bounded
+  to `MCP_CACHE_MAX_MB`, least recently used first out
+
+Example:
+    >>> fetch = CachedMCPServer(fetch_pool, ttls={"fetch": 600}, revalidate={"fetch": "url"})
+    >>> agent = Agent(name="DataFetcherAgent", mcp_servers=[fetch], ...)
+
+Lookups are counted as `agent_mcp_cache_requests_total{server,tool,result}`,
+with result "hit", "revalidated", "miss" or "bypass".
+
+Environment variables (read through `get_settings().mcp_cache`):
+    MCP_CACHE_PATH=traces/mcp_cache.sqlite
+    MCP_CACHE_MAX_MB=64
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+from agents.mcp import MCPServer
+from mcp.types import CallToolResult, GetPromptResult, ListPromptsResult, Tool as MCPTool
+
+from agentic_app_quickstart.week_2.solution.config.settings import get_settings
+from agentic_app_quickstart.week_2.solution.monitoring.metrics import REGISTRY
+
+CACHE_REQUESTS = REGISTRY.counter(
+    "agent_mcp_cache_requests_total",
+    "MCP tool calls looked up in the response cache, by result",
+    ["server", "tool", "result"],
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    tool TEXT NOT NULL,
+    result TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    etag TEXT,
+    last_modified TEXT
+) WITHOUT ROWID
+"""
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def _normalize_url(value: str) -> str:
+    parts = urlsplit(value.strip())
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(parts.scheme.lower()):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), host, parts.path or "/", query, ""))
+
+
+def normalize_arguments(arguments: dict[str, Any] | None, schema: dict | None = None) -> dict[str, Any]:
+    """
+    Canonical form of tool arguments, so equivalent calls share a cache entry.
+
+    Args:
+        arguments (dict, optional): Arguments as sent by the model
+        schema (dict, optional): The tool's input schema, for default values
+
+    Returns:
+        dict: Arguments without defaults or None values, with normalized strings and URLs
+    """
+    properties = (schema or {}).get("properties", {})
+    normalized = {}
+    for name, value in (arguments or {}).items():
+        if value is None or ("default" in properties.get(name, {}) and properties[name]["default"] == value):
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+            if value.lower().startswith(("http://", "https://")):
+                value = _normalize_url(value)
+        normalized[name] = value
+    return normalized
+
+
+def cache_key(tool_name: str, arguments: dict[str, Any]) -> str:
+    payload = json.dumps([tool_name, arguments], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class MCPResponseCache:
+    """
+    SQLite store of MCP tool results, bounded by total size.
+
+    Args:
+        db_path (str): SQLite file, or ":memory:"
+        max_bytes (int): Total size of stored results before the least recently used are evicted
+    """
+
+    def __init__(self, db_path: str = ":memory:", max_bytes: int = 64 << 20):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = None
+
+    @classmethod
+    def from_env(cls) -> "MCPResponseCache":
+        settings = get_settings().mcp_cache
+        return cls(db_path=settings.path, max_bytes=settings.max_bytes)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            if self.db_path != ":memory:":
+                os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute(_SCHEMA)
+        return self._db
+
+    def get(self, key: str) -> dict | None:
+        """The entry for `key`, expired or not, as a dict of its columns."""
+        with self._lock:
+            db = self._connection()
+            row = db.execute(
+                "SELECT result, expires_at, etag, last_modified FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            with db:
+                db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+        result, expires_at, etag, last_modified = row
+        return {"result": result, "expires_at": expires_at, "etag": etag, "last_modified": last_modified}
+
+    def put(self, key: str, tool: str, result: str, ttl: float, etag: str | None = None, last_modified: str | None = None):
+        now = time.time()
+        size = len(result.encode())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            db = self._connection()
+            with db:
+                db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, tool, result, size, now + ttl, now, etag, last_modified),
+                )
+                self._evict(db)
+
+    def extend(self, key: str, ttl: float):
+        """Keep an entry for another `ttl` seconds after it was revalidated."""
+        with self._lock:
+            db = self._connection()
+            with db:
+                db.execute("UPDATE responses SET expires_at = ? WHERE key = ?", (time.time() + ttl, key))
+
+    def _evict(self, db: sqlite3.Connection):
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall():
+            db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self._lock:
+            db = self._connection()
+            with db:
+                db.execute("DELETE FROM responses")
+
+
+class CachedMCPServer(MCPServer):
+    """
+    An MCP server whose tool calls are answered from `cache` while fresh.
+
+    Args:
+        server (MCPServer): The server to forward to; connecting and cleaning
+            up the wrapper does the same to it
+        ttls (dict[str, float]): Seconds to cache each tool's results; other tools are not cached
+        revalidate (dict[str, str], optional): Tool name -> argument holding the
+            URL to revalidate with ETag / Last-Modified once the TTL has passed
+        cache (MCPResponseCache, optional): Defaults to `MCPResponseCache.from_env()`
+        revalidate_timeout_seconds (float): Timeout of validator HEAD requests
+    """
+
+    def __init__(
+        self,
+        server: MCPServer,
+        ttls: dict[str, float],
+        revalidate: dict[str, str] | None = None,
+        cache: MCPResponseCache | None = None,
+        revalidate_timeout_seconds: float = 5.0,
+    ):
+        super().__init__(use_structured_content=server.use_structured_content)
+        self.server = server
+        self.ttls = ttls
+        self.revalidate = revalidate or {}
+        self.cache = cache or MCPResponseCache.from_env()
+        self.revalidate_timeout_seconds = revalidate_timeout_seconds
+        self._schemas: dict[str, dict] = {}
+        self._http: httpx.AsyncClient | None = None
+
+    @property
+    def name(self) -> str:
+        return self.server.name
+
+    async def connect(self):
+        await self.server.connect()
+
+    async def cleanup(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        await self.server.cleanup()
+
+    async def list_tools(self, run_context=None, agent=None) -> list[MCPTool]:
+        tools = await self.server.list_tools(run_context, agent)
+        self._schemas.update({tool.name: tool.inputSchema for tool in tools})
+        return tools
+
+    async def _validators(self, url: str, etag: str | None = None, last_modified: str | None = None) -> tuple[int, str | None, str | None]:
+        """HEAD `url`, conditionally when validators are given; returns (status, etag, last_modified)."""
+        if self._http is None:
+            self._http = httpx.AsyncClient(follow_redirects=True, timeout=self.revalidate_timeout_seconds)
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        try:
+            response = await self._http.head(url, headers=headers)
+        except httpx.HTTPError:
+            return 0, None, None
+        return response.status_code, response.headers.get("etag"), response.headers.get("last-modified")
+
+    async def call_tool(self, tool_name: str, arguments: dict[str, Any] | None) -> CallToolResult:
+        ttl = self.ttls.get(tool_name)
+        if not ttl:
+            CACHE_REQUESTS.inc(server=self.name, tool=tool_name, result="bypass")
+            return await self.server.call_tool(tool_name, arguments)
+
+        normalized = normalize_arguments(arguments, self._schemas.get(tool_name))
+        key = cache_key(tool_name, normalized)
+        url_argument = self.revalidate.get(tool_name)
+        url = normalized.get(url_argument) if url_argument else None
+
+        # SQLite may wait on a lock or the disk; keep that off the event loop
+        entry = await asyncio.to_thread(self.cache.get, key)
+        if entry is not None:
+            if entry["expires_at"] > time.time():
+                CACHE_REQUESTS.inc(server=self.name, tool=tool_name, result="hit")
+                return CallToolResult.model_validate_json(entry["result"])
+            if url and (entry["etag"] or entry["last_modified"]):
+                status, etag, _ = await self._validators(url, entry["etag"], entry["last_modified"])
+                if status == 304 or (status == 200 and etag and etag == entry["etag"]):
+                    await asyncio.to_thread(self.cache.extend, key, ttl)
+                    CACHE_REQUESTS.inc(server=self.name, tool=tool_name, result="revalidated")
+                    return CallToolResult.model_validate_json(entry["result"])
+
+        CACHE_REQUESTS.inc(server=self.name, tool=tool_name, result="miss")
+        if url:
+            # Fetch the validators alongside the call so they add no latency
+            result, (status, etag, last_modified) = await asyncio.gather(
+                self.server.call_tool(tool_name, arguments), self._validators(url)
+            )
+            if status != 200:
+                etag = last_modified = None
+        else:
+            result = await self.server.call_tool(tool_name, arguments)
+            etag = last_modified = None
+
+        if not result.isError:
+            await asyncio.to_thread(self.cache.put, key, tool_name, result.model_dump_json(), ttl, etag, last_modified)
+        return result
+
+    async def list_prompts(self) -> ListPromptsResult:
+        return await self.server.list_prompts()
+
+    async def get_prompt(self, name: str, arguments: dict[str, Any] | None = None) -> GetPromptResult:
+        return await self.server.get_prompt(name, arguments)
@@ -0,0 +1,266 @@
+"""
+Pooled, long-lived MCP servers.
+
+`async with MCPServerStdio(...)` around every request spawns the server
+process, negotiates the session and lists its tools each time, and all of
+that is paid again by the next request. `MCPServerPool` keeps `size` warm
+server processes per config instead and leases one for every tool call:
+
+- servers are started once, on the first `connect()`, and stay up until `cleanup()`
+- the tool list is fetched once and shared by every server in the pool
+- idle servers are pinged every `health_interval_seconds`; a server that fails
+  a ping or a call is stopped and a fresh one started in its place
+
+The pool is itself an `MCPServer`, so an agent takes it like any other server:
+
+Example:
+    >>> fetch_pool = MCPServerPool(
+    ...     lambda: MCPServerStdio(params=MCPServerStdioParams(command="uvx", args=["mcp-server-fetch"])),
+    ...     size=2,
+    ... )
+    >>> await fetch_pool.connect()      # idempotent, cheap after the first call
+    >>> agent = Agent(name="DataFetcherAgent", mcp_servers=[fetch_pool], ...)
+
+Cold start (spawn, initialize, list tools) and warm call latency are recorded as
+
+    agent_mcp_startup_seconds{server}
+    agent_mcp_call_seconds{server,tool}
+    agent_mcp_lease_wait_seconds{server}
+    agent_mcp_restarts_total{server}
+    agent_mcp_servers_ready{server}
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable
+
+from agents.exceptions import UserError
+from agents.mcp import MCPServer
+from mcp.types import CallToolResult, GetPromptResult, ListPromptsResult, Tool as MCPTool
+
+from agentic_app_quickstart.week_2.solution.monitoring.metrics import REGISTRY
+
+STARTUP_SECONDS = REGISTRY.summary(
+    "agent_mcp_startup_seconds",
+    "Time to spawn an MCP server, initialize its session and list its tools",
+    ["server"],
+)
+CALL_SECONDS = REGISTRY.summary(
+    "agent_mcp_call_seconds",
+    "MCP tool call latency on a warm pooled server",
+    ["server", "tool"],
+)
+LEASE_WAIT_SECONDS = REGISTRY.summary(
+    "agent_mcp_lease_wait_seconds",
+    "Time a call waited for an idle pooled MCP server",
+    ["server"],
+)
+RESTARTS = REGISTRY.counter(
+    "agent_mcp_restarts_total",
+    "Pooled MCP servers restarted after a failed call, ping or start",
+    ["server"],
+)
+SERVERS_READY = REGISTRY.gauge(
+    "agent_mcp_servers_ready",
+    "Pooled MCP servers started and connected",
+    ["server"],
+)
+
+
+class _Slot:
+    """One pooled server, owned by the task that started it."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.server: MCPServer | None = None
+        self.broken = asyncio.Event()
+        self.task: asyncio.Task | None = None
+
+
+class MCPServerPool(MCPServer):
+    """
+    A fixed number of warm MCP servers of one config, leased per call.
+
+    Each server is connected and cleaned up by its own long-lived task, since
+    the MCP stdio client must be closed by the task that opened it.
+
+    Args:
+        factory (Callable[[], MCPServer]): Creates a new, unconnected server
+        size (int): Servers kept running
+        name (str, optional): Name used in metrics; defaults to the first server's name
+        health_interval_seconds (float): Seconds between pings of idle servers
+        ping_timeout_seconds (float): A ping slower than this counts as failed
+        restart_backoff_seconds (float): Wait before retrying a server that failed to start
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], MCPServer],
+        size: int = 2,
+        name: str | None = None,
+        health_interval_seconds: float = 30.0,
+        ping_timeout_seconds: float = 5.0,
+        restart_backoff_seconds: float = 1.0,
+    ):
+        super().__init__()
+        self.factory = factory
+        self.size = size
+        self.health_interval_seconds = health_interval_seconds
+        self.ping_timeout_seconds = ping_timeout_seconds
+        self.restart_backoff_seconds = restart_backoff_seconds
+        self._name = name
+        self._slots = [_Slot(i) for i in range(size)]
+        self._idle: asyncio.Queue[_Slot] | None = None
+        self._tools: list[MCPTool] | None = None
+        self._health_task: asyncio.Task | None = None
+        self._closed = False
+        self._connect_lock = asyncio.Lock()
+
+    @property
+    def name(self) -> str:
+        return self._name or "mcp-pool"
+
+    async def connect(self):
+        """Start the servers and wait until at least one is ready; no-op when already started."""
+        async with self._connect_lock:
+            if self._idle is not None:
+                return
+            self._closed = False
+            self._idle = asyncio.Queue()
+            first_ready = asyncio.get_running_loop().create_future()
+            for slot in self._slots:
+                slot.task = asyncio.create_task(self._own(slot, first_ready), name=f"{self.name}-{slot.index}")
+            self._health_task = asyncio.create_task(self._check_health(), name=f"{self.name}-health")
+            try:
+                await first_ready
+            except BaseException:
+                await self.cleanup()
+                raise
+
+    async def _own(self, slot: _Slot, first_ready: asyncio.Future):
+        """Keep one server running: start it, wait until it breaks, stop it, repeat."""
+        while not self._closed:
+            server = self.factory()
+            if self._name is None:
+                self._name = server.name
+            started = time.perf_counter()
+            try:
+                await server.connect()
+                if self._tools is None:
+                    self._tools = await server.list_tools()
+            except Exception as e:
+                await server.cleanup()
+                RESTARTS.inc(server=self.name)
+                if not first_ready.done():
+                    # Nothing has started yet, most likely a bad config: fail connect()
+                    first_ready.set_exception(e)
+                    return
+                print(f"Error occurred while starting MCP server {self.name}: {e}")
+                await asyncio.sleep(self.restart_backoff_seconds)
+                continue
+
+            STARTUP_SECONDS.observe(time.perf_counter() - started, server=self.name)
+            SERVERS_READY.inc(server=self.name)
+            slot.server = server
+            slot.broken.clear()
+            self._idle.put_nowait(slot)
+            if not first_ready.done():
+                first_ready.set_result(None)
+
+            await slot.broken.wait()
+
+            slot.server = None
+            SERVERS_READY.dec(server=self.name)
+            await server.cleanup()
+            if not self._closed:
+                RESTARTS.inc(server=self.name)
+
+    async def _ping(self, server: MCPServer) -> bool:
+        session = getattr(server, "session", None)
+        if session is None:
+            return False
+        try:
+            await asyncio.wait_for(session.send_ping(), self.ping_timeout_seconds)
+            return True
+        except Exception:
+            return False
+
+    async def _check_health(self):
+        while not self._closed:
+            await asyncio.sleep(self.health_interval_seconds)
+            # Only idle servers are pinged; a busy one proves itself by its call
+            for _ in range(self._idle.qsize()):
+                try:
+                    slot = self._idle.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if await self._ping(slot.server):
+                    self._idle.put_nowait(slot)
+                else:
+                    print(f"MCP server {self.name} #{slot.index} failed a health check, restarting")
+                    slot.broken.set()
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[MCPServer]:
+        """
+        Borrow an idle, connected server for the duration of the block.
+
+        A server whose call raises is restarted instead of being returned to
+        the pool. A caller that is cancelled (a run deadline, `wait_for`)
+        returns its server, which is still healthy.
+        """
+        if self._idle is None or self._closed:
+            raise UserError("Pool not connected. Make sure you call `connect()` first.")
+        waited = time.perf_counter()
+        slot = await self._idle.get()
+        LEASE_WAIT_SECONDS.observe(time.perf_counter() - waited, server=self.name)
+        try:
+            yield slot.server
+        except Exception:
+            slot.broken.set()
+            raise
+        except BaseException:
+            # Cancelled while the call was in flight; the session drops its late reply
+            self._idle.put_nowait(slot)
+            raise
+        else:
+            self._idle.put_nowait(slot)
+
+    async def list_tools(self, run_context=None, agent=None) -> list[MCPTool]:
+        """The tool list of the first server started, shared by the whole pool."""
+        if self._tools is None:
+            raise UserError("Pool not connected. Make sure you call `connect()` first.")
+        return self._tools
+
+    def invalidate_tools_cache(self):
+        """Fetch the tool list again on the next server (re)start."""
+        self._tools = None
+
+    async def call_tool(self, tool_name: str, arguments: dict[str, Any] | None) -> CallToolResult:
+        async with self.lease() as server:
+            started = time.perf_counter()
+            result = await server.call_tool(tool_name, arguments)
+            CALL_SECONDS.observe(time.perf_counter() - started, server=self.name, tool=tool_name)
+            return result
+
+    async def list_prompts(self) -> ListPromptsResult:
+        async with self.lease() as server:
+            return await server.list_prompts()
+
+    async def get_prompt(self, name: str, arguments: dict[str, Any] | None = None) -> GetPromptResult:
+        async with self.lease() as server:
+            return await server.get_prompt(name, arguments)
+
+    async def cleanup(self):
+        """Stop every server and the health checks."""
+        self._closed = True
+        if self._health_task is not None:
+            self._health_task.cancel()
+        for slot in self._slots:
+            slot.broken.set()
+        await asyncio.gather(*(slot.task for slot in self._slots if slot.task is not None), return_exceptions=True)
+        for slot in self._slots:
+            slot.task = None
+        self._idle = None
+        self._health_task = None
@@ -0,0 +1,379 @@
+"""
+Relevance-retrieved conversation memory.
+
+`SQLiteSession` sends a conversation's whole history with every request, so a
+long relationship with a user costs more with every turn although most of it
+has nothing to do with the question at hand. `RetrievalSession` is a session
+that sends only:
+
+- the latest `MEMORY_RECENT_TURNS` turns, in order, and
+- up to `MEMORY_TOP_K` older turns most similar to the request, by cosine
+  similarity of hashed n-gram vectors (words, word pairs and character
+  trigrams hashed into `MEMORY_DIM` signed buckets), computed locally with
+  NumPy; only turns with a similarity of at least `MEMORY_MIN_SIMILARITY` are
+  sent, in their original order, followed by a note that the rest was left out
+
+A turn is what one run adds to the session: the user's input with the
+agent's replies, tool calls and tool results, so tool calls always travel
+with their results. Turns and their vectors are stored in SQLite
+(`MEMORY_PATH`), one row per turn as it is added; the vectors of a session
+are loaded into one matrix on first use, and only the items of the turns sent
+are read back.
+
+The request to retrieve for is set with `recall()`; without one, only the
+recent turns are sent. Turns sent and left out are counted in
+`agent_memory_turns_total{source}` ("retrieved", "recent" or "omitted"), and
+the time to pick them in `agent_memory_retrieval_seconds`.
+
+Example:
+    >>> session = RetrievalSession("user-42")
+    >>> with recall(prompt):
+    ...     result = await Runner.run(agent, prompt, session=session)
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+import numpy as np
+from agents.memory.session import SessionABC
+
+from agentic_app_quickstart.week_2.solution.config.settings import MemorySettings, get_settings
+from agentic_app_quickstart.week_2.solution.monitoring.metrics import REGISTRY
+
+MEMORY_TURNS = REGISTRY.counter(
+    "agent_memory_turns_total",
+    "Stored conversation turns sent to the model as recent or retrieved, or left out",
+    ["source"],
+)
+MEMORY_RETRIEVAL_SECONDS = REGISTRY.summary(
+    "agent_memory_retrieval_seconds",
+    "Time to pick and load the turns of a session sent with a request",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memory_turns (
+    session_id TEXT NOT NULL,
+    turn INTEGER NOT NULL,
+    items TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    PRIMARY KEY (session_id, turn)
+)
+"""
+
+_WORD = re.compile(r"\w+")
+# Too common to tell turns apart
+_STOPWORDS = frozenset(
+    "a an and are as at be but by can did do does for from had has have he her his how i if in is it its me my "
+    "no not of on or our she so that the their them there they this to up was we were what when which who why "
+    "will with you your".split()
+)
+# Long tool results say little more about a turn than their start
+_MAX_TOOL_TEXT = 2000
+
+_query: contextvars.ContextVar[str | None] = contextvars.ContextVar("memory_query", default=None)
+
+
+@contextlib.contextmanager
+def recall(query: str):
+    """Retrieve the turns relevant to `query` for session reads inside the block."""
+    token = _query.set(query)
+    try:
+        yield
+    finally:
+        _query.reset(token)
+
+
+def _features(text: str) -> list[str]:
+    words = [w for w in _WORD.findall(text.lower()) if len(w) > 1 and w not in _STOPWORDS]
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"<{word}>"
+        features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return features
+
+
+def embed(text: str, dim: int) -> np.ndarray:
+    """
+    Unit-length hashed n-gram vector of `text`.
+
+    Args:
+        text (str): Text to embed
+        dim (int): Number of hash buckets
+
+    Returns:
+        np.ndarray: float32 vector of length `dim`, all zeros for text without words
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    features = _features(text)
+    if not features:
+        return vector
+    hashes = np.fromiter((zlib.crc32(f.encode()) for f in features), dtype=np.uint32, count=len(features))
+    signs = np.where(hashes >> 31, -1.0, 1.0).astype(np.float32)
+    np.add.at(vector, (hashes % dim).astype(np.intp), signs)
+    # Sublinear counts, so a word repeated in a long tool result does not drown the rest
+    vector = np.sign(vector) * np.log1p(np.abs(vector))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def turn_text(items: list) -> str:
+    """The text of a turn's items that is worth matching on: messages, tool calls and results."""
+    parts = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        content = item.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        elif isinstance(content, list):
+            parts.extend(part.get("text") or "" for part in content if isinstance(part, dict))
+        if item.get("type") == "function_call":
+            parts.append(f"{item.get('name', '')} {item.get('arguments', '')}")
+        elif item.get("type") == "function_call_output":
+            parts.append(str(item.get("output", ""))[:_MAX_TOOL_TEXT])
+    return "\n".join(parts)
+
+
+class TurnIndex:
+    """
+    The vectors of one session's turns, as rows of a growing matrix.
+
+    Args:
+        dim (int): Width of the vectors
+    """
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.size = 0
+        self._vectors = np.empty((0, dim), dtype=np.float32)
+        self._turns = np.empty(0, dtype=np.int64)
+
+    @property
+    def turns(self) -> np.ndarray:
+        """Turn numbers, ascending."""
+        return self._turns[:self.size]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the index, spare capacity included."""
+        return self._vectors.nbytes + self._turns.nbytes
+
+    def extend(self, turns: np.ndarray, vectors: np.ndarray):
+        """Add turns numbered after every turn already indexed."""
+        needed = self.size + len(turns)
+        if needed > len(self._turns):
+            capacity = max(needed, 2 * len(self._turns), 64)
+            grown = np.empty((capacity, self.dim), dtype=np.float32)
+            grown[:self.size] = self._vectors[:self.size]
+            numbers = np.empty(capacity, dtype=np.int64)
+            numbers[:self.size] = self._turns[:self.size]
+            self._vectors, self._turns = grown, numbers
+        self._vectors[self.size:needed] = vectors
+        self._turns[self.size:needed] = turns
+        self.size = needed
+
+    def set_last(self, vector: np.ndarray | None):
+        """Replace the vector of the last turn, or drop the turn with None."""
+        if vector is None:
+            self.size -= 1
+        else:
+            self._vectors[self.size - 1] = vector
+
+    def search(self, query: np.ndarray, k: int, before_turn: int, min_similarity: float) -> list[int]:
+        """
+        The turns before `before_turn` most similar to `query`.
+
+        Returns:
+            list[int]: Up to `k` turn numbers, ascending
+        """
+        n = int(np.searchsorted(self.turns, before_turn))
+        if n == 0 or k <= 0:
+            return []
+        scores = self._vectors[:n] @ query
+        top = np.argpartition(-scores, k - 1)[:k] if k < n else np.arange(n)
+        top = top[scores[top] >= min_similarity]
+        return sorted(self._turns[top].tolist())
+
+
+class RetrievalSession(SessionABC):
+    """
+    Session sending the recent turns and the older turns relevant to the request.
+
+    Args:
+        session_id (str): Conversation the turns belong to
+        db_path (str, optional): SQLite file, defaults to `MEMORY_PATH`
+        settings (MemorySettings, optional): Defaults to `get_settings().memory`
+    """
+
+    def __init__(self, session_id: str, db_path: str | None = None, settings: MemorySettings | None = None):
+        self.session_id = str(session_id)
+        self.settings = settings or get_settings().memory
+        self.db_path = db_path or self.settings.path
+        self._lock = threading.Lock()
+        self._db = None
+        self._index: TurnIndex | None = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            if self.db_path != ":memory:":
+                os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, timeout=10, isolation_level=None, check_same_thread=False)
+            if self.db_path != ":memory:":
+                # One commit per turn; WAL with NORMAL sync keeps that cheap without risking corruption
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(_SCHEMA)
+        return self._db
+
+    def _loaded_index(self) -> TurnIndex:
+        if self._index is None:
+            rows = self._connection().execute(
+                "SELECT turn, vector FROM memory_turns WHERE session_id = ? ORDER BY turn", (self.session_id,)
+            ).fetchall()
+            index = TurnIndex(self.settings.dim)
+            if rows:
+                turns, blobs = zip(*rows)
+                vectors = np.frombuffer(b"".join(blobs), dtype=np.float32)
+                if vectors.size != len(rows) * index.dim:
+                    raise ValueError(
+                        f"Memory vectors in {self.db_path} do not have MEMORY_DIM={index.dim} dimensions"
+                    )
+                index.extend(np.array(turns, dtype=np.int64), vectors.reshape(len(rows), index.dim))
+            self._index = index
+        return self._index
+
+    @property
+    def index(self) -> TurnIndex:
+        """The session's vector index, loaded on first use."""
+        with self._lock:
+            return self._loaded_index()
+
+    def _items(self, turns: list[int]) -> list[list]:
+        if not turns:
+            return []
+        placeholders = ",".join("?" * len(turns))
+        rows = self._connection().execute(
+            f"SELECT items FROM memory_turns WHERE session_id = ? AND turn IN ({placeholders}) ORDER BY turn",
+            (self.session_id, *turns),
+        ).fetchall()
+        return [json.loads(items) for (items,) in rows]
+
+    def _select(self, query: str | None) -> list:
+        start = time.perf_counter()
+        with self._lock:
+            index = self._loaded_index()
+            turns = index.turns
+            recent = turns[max(0, len(turns) - self.settings.recent_turns):].tolist()
+            retrieved = []
+            if query and recent:
+                retrieved = index.search(
+                    embed(query, index.dim), self.settings.top_k, recent[0], self.settings.min_similarity
+                )
+            old, new = self._items(retrieved), self._items(recent)
+        omitted = len(turns) - len(recent) - len(retrieved)
+        MEMORY_TURNS.inc(len(retrieved), source="retrieved")
+        MEMORY_TURNS.inc(len(recent), source="recent")
+        MEMORY_TURNS.inc(omitted, source="omitted")
+        MEMORY_RETRIEVAL_SECONDS.observe(time.perf_counter() - start)
+
+        items = [item for turn in old for item in turn]
+        if omitted:
+            note = f"{omitted} earlier turns of this conversation are left out"
+            if retrieved:
+                note += f"; the {len(retrieved)} turns before this note were picked as relevant to the request"
+            items.append({"role": "system", "content": note + "."})
+        return items + [item for turn in new for item in turn]
+
+    def _latest(self, limit: int) -> list:
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT items FROM memory_turns WHERE session_id = ? ORDER BY turn DESC", (self.session_id,)
+            )
+            items: list = []
+            for (turn,) in rows:
+                items[:0] = json.loads(turn)
+                if len(items) >= limit:
+                    break
+        return items[-limit:] if limit else []
+
+    async def get_items(self, limit: int | None = None) -> list:
+        """
+        Items to send with the next request.
+
+        Args:
+            limit (int, optional): Return the latest `limit` items instead,
+                like other sessions do
+
+        Returns:
+            list: Retrieved turns, a note on what was left out, and the recent turns
+        """
+        if limit is not None:
+            return await asyncio.to_thread(self._latest, limit)
+        return await asyncio.to_thread(self._select, _query.get())
+
+    def _add(self, items: list):
+        vector = embed(turn_text(items), self.settings.dim)
+        with self._lock:
+            index = self._loaded_index()
+            turn = int(index.turns[-1]) + 1 if index.size else 0
+            self._connection().execute(
+                "INSERT INTO memory_turns VALUES (?, ?, ?, ?)",
+                (self.session_id, turn, json.dumps(items), vector.tobytes()),
+            )
+            index.extend(np.array([turn]), vector[None, :])
+
+    async def add_items(self, items: list) -> None:
+        """Store the items of one run as a turn."""
+        if items:
+            await asyncio.to_thread(self._add, items)
+
+    def _pop(self):
+        with self._lock:
+            index = self._loaded_index()
+            if not index.size:
+                return None
+            turn = int(index.turns[-1])
+            db = self._connection()
+            (raw,) = db.execute(
+                "SELECT items FROM memory_turns WHERE session_id = ? AND turn = ?", (self.session_id, turn)
+            ).fetchone()
+            items = json.loads(raw)
+            item = items.pop()
+            if items:
+                vector = embed(turn_text(items), index.dim)
+                db.execute(
+                    "UPDATE memory_turns SET items = ?, vector = ? WHERE session_id = ? AND turn = ?",
+                    (json.dumps(items), vector.tobytes(), self.session_id, turn),
+                )
+                index.set_last(vector)
+            else:
+                db.execute("DELETE FROM memory_turns WHERE session_id = ? AND turn = ?", (self.session_id, turn))
+                index.set_last(None)
+            return item
+
+    async def pop_item(self):
+        """Remove and return the most recent item."""
+        return await asyncio.to_thread(self._pop)
+
+    def _clear(self):
+        with self._lock:
+            self._connection().execute("DELETE FROM memory_turns WHERE session_id = ?", (self.session_id,))
+            self._index = TurnIndex(self.settings.dim)
+
+    async def clear_session(self) -> None:
+        """Forget every turn of the session."""
+        await asyncio.to_thread(self._clear)
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,522 @@
+"""
+Model wrappers used by `get_model()`.
+
+Each wrapper implements the agents SDK `Model` interface around another model,
+so they can be stacked:
+
+    MeteredModel(LoopGuardModel(ConfiguredModel(SingleFlightModel(ResilientModel(RateLimitedModel(
+        CircuitBreakerModel(OpenAIChatCompletionsModel(...))))))))
+
+(`RateLimitedModel` is in `examples/ratelimit.py`, `LoopGuardModel` in `examples/loops.py`,
+`SingleFlightModel` in `examples/singleflight.py`.)
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import email.utils
+import random
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable
+
+import openai
+from agents import ModelSettings
+from agents.models.interface import Model
+
+from agentic_app_quickstart.week_2.solution.config.settings import BreakerSettings, ResilienceSettings
+from agentic_app_quickstart.week_2.solution.monitoring.histogram import RollingHistogram
+from agentic_app_quickstart.week_2.solution.monitoring.metrics import REGISTRY
+
+HEDGES = REGISTRY.counter(
+    "agent_model_hedges_total",
+    "Duplicate model requests sent after the first was slower than the hedge threshold, by winner",
+    ["model", "winner"],
+)
+HEDGE_THRESHOLD = REGISTRY.gauge(
+    "agent_model_hedge_threshold_seconds",
+    "Current latency after which a model request is hedged",
+    ["model"],
+)
+RETRIES = REGISTRY.counter(
+    "agent_model_retries_total",
+    "Model requests retried after a transient failure, by reason",
+    ["model", "reason"],
+)
+DEADLINES_EXCEEDED = REGISTRY.counter(
+    "agent_model_deadline_exceeded_total",
+    "Model requests abandoned because the run's deadline passed",
+    ["model"],
+)
+BREAKER_STATE = REGISTRY.gauge(
+    "agent_model_breaker_state",
+    "Circuit breaker state of a model endpoint: 0 closed, 1 half-open, 2 open",
+    ["model"],
+)
+BREAKER_TRANSITIONS = REGISTRY.counter(
+    "agent_model_breaker_transitions_total",
+    "Circuit breaker state changes of a model endpoint",
+    ["model", "from_state", "to_state"],
+)
+BREAKER_REJECTED = REGISTRY.counter(
+    "agent_model_breaker_rejected_total",
+    "Model requests kept from an endpoint with an open breaker, by where they went instead",
+    ["model", "route"],
+)
+
+_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar("run_deadline", default=None)
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class DeadlineExceeded(TimeoutError):
+    """The run's deadline passed before a model response arrived."""
+
+
+class CircuitOpen(RuntimeError):
+    """The model endpoint's circuit breaker is open and no fallback is configured."""
+
+
+@contextlib.contextmanager
+def run_deadline(seconds: float | None):
+    """
+    Give every model request inside the block a shared deadline.
+
+    Requests are cut off when it passes, and no retry or hedge is started
+    that could not finish in time. Nested deadlines keep the earlier one.
+
+    Example:
+        >>> with run_deadline(30):
+        ...     result = await Runner.run(agent, prompt)
+    """
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_seconds() -> float | None:
+    """Seconds left before the current run's deadline, None without one."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def _retry_after(error: Exception) -> float | None:
+    """Delay requested by the server in Retry-After(-Ms), if any."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    if "retry-after-ms" in headers:
+        with contextlib.suppress(ValueError):
+            return float(headers["retry-after-ms"]) / 1000
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    with contextlib.suppress(ValueError):
+        return float(value)
+    # An HTTP date; anything unreadable falls back to the jittered backoff
+    with contextlib.suppress(ValueError, TypeError):
+        parsed = email.utils.parsedate_to_datetime(value)
+        return max(0.0, parsed.timestamp() - time.time())
+    return None
+
+
+def _retry_reason(error: Exception) -> str | None:
+    """Why `error` is worth retrying, or None if it is not."""
+    if isinstance(error, openai.APITimeoutError):
+        return "timeout"
+    if isinstance(error, openai.APIConnectionError):
+        return "connection"
+    if isinstance(error, openai.APIStatusError) and error.status_code in RETRYABLE_STATUS:
+        return str(error.status_code)
+    return None
+
+
+class ConfiguredModel(Model):
+    """
+    Applies default `ModelSettings` (such as a role's `max_tokens`) to every call.
+
+    Settings given on the agent take precedence over the defaults.
+
+    Args:
+        model (Model): Model doing the work
+        defaults (ModelSettings): Settings used where the agent sets none
+    """
+
+    def __init__(self, model: Model, defaults: ModelSettings):
+        self.model = model
+        self.defaults = defaults
+
+    async def get_response(
+        self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+    ):
+        return await self.model.get_response(
+            system_instructions,
+            input,
+            self.defaults.resolve(model_settings),
+            tools,
+            output_schema,
+            handoffs,
+            tracing,
+            **kwargs,
+        )
+
+    def stream_response(
+        self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+    ) -> AsyncIterator:
+        return self.model.stream_response(
+            system_instructions,
+            input,
+            self.defaults.resolve(model_settings),
+            tools,
+            output_schema,
+            handoffs,
+            tracing,
+            **kwargs,
+        )
+
+
+class _LatencyStats:
+    """Recent latencies and hedge counts of one model name."""
+
+    def __init__(self):
+        self.latency = RollingHistogram(window_seconds=300, slots=10)
+        self.threshold: float | None = None
+        self.threshold_at = 0.0
+        self.requests = 0
+        self.hedged = 0
+
+
+class ResilientModel(Model):
+    """
+    Bounds the tail latency of model requests with hedging, retries and deadlines.
+
+    - Hedging: once `hedge_min_samples` recent responses have been seen, a
+      request still running after their `hedge_quantile` latency (at least
+      `hedge_min_seconds`) gets a duplicate; the first to finish wins and the
+      other is cancelled. At most `hedge_budget` of requests are hedged, so an
+      endpoint that is slow for everyone is not sent twice the traffic.
+    - Retries: connection errors, timeouts, 408, 409, 429 and 5xx responses
+      are retried up to `max_retries` times with full-jitter exponential
+      backoff, or after the server's Retry-After when it sends one.
+    - Deadlines: within `run_deadline()`, requests are cut off when the run's
+      deadline passes, and a retry whose backoff would outlast it is not made.
+
+    Streamed responses are retried only until their first event and are not
+    hedged. The OpenAI client's own retries should be off (`max_retries=0`).
+    Latency history and the hedge budget are shared by all wrappers of the
+    same model name, so every agent on a model learns its threshold together.
+
+    Args:
+        model (Model): Model doing the work
+        name (str): Model name used in metrics
+        settings (ResilienceSettings): Hedging and retry policy
+    """
+
+    _stats_by_name: dict[str, _LatencyStats] = {}
+
+    def __init__(self, model: Model, name: str, settings: ResilienceSettings):
+        self.model = model
+        self.name = name
+        self.settings = settings
+        self._model_stats = self._stats_by_name.setdefault(name, _LatencyStats())
+
+    def hedge_threshold(self) -> float | None:
+        """Seconds after which to hedge, recomputed at most once a second; None while warming up."""
+        stats = self._model_stats
+        now = time.monotonic()
+        if now - stats.threshold_at >= 1.0:
+            stats.threshold_at = now
+            snapshot = stats.latency.snapshot()
+            if snapshot.total_count >= self.settings.hedge_min_samples:
+                quantile = snapshot.percentile(self.settings.hedge_quantile) / 1e6
+                stats.threshold = max(self.settings.hedge_min_seconds, quantile)
+                HEDGE_THRESHOLD.set(stats.threshold, model=self.name)
+        return stats.threshold
+
+    async def _with_deadline(self, call: Awaitable):
+        remaining = remaining_seconds()
+        if remaining is None:
+            return await call
+        try:
+            async with asyncio.timeout(remaining):
+                return await call
+        except TimeoutError as e:
+            DEADLINES_EXCEEDED.inc(model=self.name)
+            raise DeadlineExceeded(f"Run deadline passed while waiting for {self.name}") from e
+
+    async def _hedged(self, call: Callable[[], Awaitable]):
+        stats = self._model_stats
+        stats.requests += 1
+        threshold = self.hedge_threshold() if self.settings.hedge else None
+        if threshold is None:
+            return await call()
+
+        primary = asyncio.ensure_future(call())
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=threshold)
+            remaining = remaining_seconds()
+            if done or stats.hedged >= self.settings.hedge_budget * stats.requests or (
+                remaining is not None and remaining <= 0
+            ):
+                return await primary
+
+            stats.hedged += 1
+            hedge = asyncio.ensure_future(call())
+            tasks.add(hedge)
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                # A failed request loses to one that may still succeed
+                winner = next((task for task in done if task.exception() is None), None)
+                if winner is None and not tasks:
+                    winner = done.pop()
+                if winner is not None:
+                    HEDGES.inc(model=self.name, winner="hedge" if winner is hedge else "primary")
+                    return winner.result()
+        finally:
+            for task in (primary, *tasks):
+                task.cancel()
+
+    async def _retrying(self, call: Callable[[], Awaitable]):
+        for attempt in range(self.settings.max_retries + 1):
+            try:
+                return await call()
+            except Exception as e:
+                reason = _retry_reason(e)
+                if reason is None or attempt == self.settings.max_retries:
+                    raise
+                delay = _retry_after(e)
+                if delay is None:
+                    cap = min(self.settings.backoff_max_seconds, self.settings.backoff_seconds * 2**attempt)
+                    delay = random.uniform(0, cap)
+                remaining = remaining_seconds()
+                if remaining is not None and delay >= remaining:
+                    raise
+                RETRIES.inc(model=self.name, reason=reason)
+                await asyncio.sleep(delay)
+
+    async def get_response(
+        self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+    ):
+        async def attempt():
+            started = time.perf_counter()
+            response = await self.model.get_response(
+                system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+            )
+            self._model_stats.latency.record(round((time.perf_counter() - started) * 1e6))
+            return response
+
+        return await self._with_deadline(self._retrying(lambda: self._hedged(attempt)))
+
+    async def stream_response(
+        self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+    ) -> AsyncIterator:
+        def open_stream():
+            return self.model.stream_response(
+                system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+            )
+
+        async def first_event():
+            stream = open_stream()
+            return stream, await anext(stream)
+
+        stream, event = await self._with_deadline(self._retrying(first_event))
+        yield event
+        while True:
+            try:
+                event = await self._with_deadline(anext(stream))
+            except StopAsyncIteration:
+                return
+            yield event
+
+
+BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open state of one model endpoint.
+
+    While closed, the outcomes of the last `window_seconds` are kept; once
+    there are `min_requests` of them and the share of failed or slow ones
+    reaches its threshold, the breaker opens. After `open_seconds` it lets
+    `half_open_probes` requests through: the first to finish closes the
+    breaker if it was fast and succeeded, and opens it again otherwise.
+
+    Args:
+        name (str): Model name used in metrics
+        settings (BreakerSettings): Thresholds
+    """
+
+    def __init__(self, name: str, settings: BreakerSettings):
+        self.name = name
+        self.settings = settings
+        self.state = "closed"
+        self.opened_at = 0.0
+        self._outcomes: deque[tuple[float, bool, bool]] = deque()
+        self._failed = 0
+        self._slow = 0
+        self._probes = 0
+        self._lock = threading.Lock()
+        BREAKER_STATE.set(BREAKER_STATES["closed"], model=name)
+
+    def _transition(self, state: str):
+        BREAKER_TRANSITIONS.inc(model=self.name, from_state=self.state, to_state=state)
+        BREAKER_STATE.set(BREAKER_STATES[state], model=self.name)
+        self.state = state
+        self._probes = 0
+        if state == "open":
+            self.opened_at = time.monotonic()
+        elif state == "closed":
+            self._outcomes.clear()
+            self._failed = self._slow = 0
+
+    def allow(self) -> bool:
+        """Whether a request may go to the endpoint; counts it as a probe while half-open."""
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.settings.open_seconds:
+                    return False
+                self._transition("half_open")
+            if self.state == "half_open":
+                if self._probes >= self.settings.half_open_probes:
+                    return False
+                self._probes += 1
+            return True
+
+    def retry_in(self) -> float:
+        """Seconds until an open breaker probes the endpoint again."""
+        return max(0.0, self.opened_at + self.settings.open_seconds - time.monotonic())
+
+    def record(self, failed: bool, seconds: float):
+        """Count the outcome of a request that `allow()` let through."""
+        slow = seconds >= self.settings.slow_seconds
+        with self._lock:
+            if self.state == "half_open":
+                self._transition("open" if failed or slow else "closed")
+                return
+            if self.state == "open":
+                # Let through before the breaker tripped; says nothing new
+                return
+
+            now = time.monotonic()
+            self._outcomes.append((now, failed, slow))
+            self._failed += failed
+            self._slow += slow
+            while self._outcomes[0][0] < now - self.settings.window_seconds:
+                _, old_failed, old_slow = self._outcomes.popleft()
+                self._failed -= old_failed
+                self._slow -= old_slow
+
+            requests = len(self._outcomes)
+            if requests >= self.settings.min_requests and (
+                self._failed >= self.settings.error_rate * requests
+                or self._slow >= self.settings.slow_rate * requests
+            ):
+                self._transition("open")
+
+    def abandon(self):
+        """Release the probe of a request that was cancelled before it told anything."""
+        with self._lock:
+            if self.state == "half_open":
+                self._probes = max(0, self._probes - 1)
+
+
+class CircuitBreakerModel(Model):
+    """
+    Fails fast, or routes to a fallback model, while the endpoint is unhealthy.
+
+    Requests that fail with a transient error (connection errors, timeouts,
+    408, 409, 5xx) or take longer than `slow_seconds` count against the
+    endpoint (see `CircuitBreaker`). While the breaker is open, requests go to
+    `fallback` when one is given, and raise `CircuitOpen` immediately
+    otherwise, instead of queueing behind timeouts. Other errors, such as a
+    400 for a bad request or a 429 for an exhausted quota, say nothing about
+    the endpoint's health.
+
+    Placed inside `ResilientModel`, every attempt is counted, and retries made
+    after the breaker trips go straight to the fallback. The breaker is shared
+    by all wrappers of the same model name.
+
+    Args:
+        model (Model): Model doing the work
+        name (str): Model name used in metrics
+        settings (BreakerSettings): Thresholds
+        fallback (Model, optional): Model used while the breaker is open
+    """
+
+    _breakers: dict[str, CircuitBreaker] = {}
+
+    def __init__(self, model: Model, name: str, settings: BreakerSettings, fallback: Model | None = None):
+        self.model = model
+        self.name = name
+        self.fallback = fallback
+        if name not in self._breakers:
+            self._breakers[name] = CircuitBreaker(name, settings)
+        self.breaker = self._breakers[name]
+
+    def _rejected(self) -> Model:
+        if self.fallback is None:
+            BREAKER_REJECTED.inc(model=self.name, route="failed")
+            raise CircuitOpen(
+                f"Circuit breaker for {self.name} is open; retrying the endpoint in {self.breaker.retry_in():.0f}s"
+            )
+        BREAKER_REJECTED.inc(model=self.name, route="fallback")
+        return self.fallback
+
+    def _settle(self, error: BaseException | None, started: float):
+        seconds = time.perf_counter() - started
+        if isinstance(error, asyncio.CancelledError):
+            # A hedge that lost or a run that gave up; only its slowness counts
+            if seconds < self.breaker.settings.slow_seconds:
+                self.breaker.abandon()
+                return
+            failed = False
+        else:
+            # A 429 is the key's quota, not the endpoint's health; the rate limiter handles it
+            failed = error is not None and _retry_reason(error) not in (None, "429")
+        self.breaker.record(failed, seconds)
+
+    async def get_response(self, *args, **kwargs):
+        if not self.breaker.allow():
+            return await self._rejected().get_response(*args, **kwargs)
+
+        started = time.perf_counter()
+        try:
+            response = await self.model.get_response(*args, **kwargs)
+        except BaseException as e:
+            self._settle(e, started)
+            raise
+        self._settle(None, started)
+        return response
+
+    async def stream_response(self, *args, **kwargs) -> AsyncIterator:
+        if not self.breaker.allow():
+            async for event in self._rejected().stream_response(*args, **kwargs):
+                yield event
+            return
+
+        # The endpoint is judged by its time to first event
+        started = time.perf_counter()
+        stream = self.model.stream_response(*args, **kwargs)
+        try:
+            event = await anext(stream)
+        except StopAsyncIteration:
+            self._settle(None, started)
+            return
+        except BaseException as e:
+            self._settle(e, started)
+            raise
+        self._settle(None, started)
+        yield event
+        async for event in stream:
+            yield event
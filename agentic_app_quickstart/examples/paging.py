@@ -0,0 +1,252 @@
+"""
+Paged, size-bounded tool results.
+
+Whatever a tool returns is pasted into the model context. A tool that returns
+thousands of rows, or the headers of a 2,000-column file, can add tens of
+thousands of tokens to every following model call. `with_paging` wraps an
+agent's tools so that a result over the agent's token budget is replaced by
+its first page plus a cursor:
+
+    {"page": 1, "pages": 12, "cursor": "Qk3v...", "items": [...],
+     "note": "Result truncated. Call fetch_more(cursor, page) for pages 2-12."}
+
+The full result stays in a server-side `ResultStore`, and the `fetch_more`
+tool, added to the agent's tools, returns any other page. Lists are paged by
+item, everything else by characters of its text form. Tokens are estimated as
+4 characters each.
+
+Cursors are random 128-bit tokens, and each belongs to the session that
+created it (`metering_session()`, else the trace's `group_id`): a cursor
+passed in from another session is unknown, so one user's results never reach
+another user's conversation.
+
+Example:
+    >>> agent = Agent(
+    ...     name="DataAnalyzerAgent",
+    ...     tools=with_paging([get_headers, count_unique], budget_tokens=500),
+    ...     ...
+    ... )
+
+Budgets default to `TOOL_RESULT_BUDGET_TOKENS`; cursors expire after
+`TOOL_RESULT_TTL` seconds.
+"""
+
+import dataclasses
+import json
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from agents import function_tool
+from agents.tool import FunctionTool, Tool
+
+from agentic_app_quickstart.week_2.solution.config.settings import get_settings
+from agentic_app_quickstart.week_2.solution.monitoring.metering import current_session
+from agentic_app_quickstart.week_2.solution.monitoring.metrics import REGISTRY
+
+PAGED_RESULTS = REGISTRY.counter(
+    "agent_tool_results_paged_total",
+    "Tool results over their token budget that were replaced by a first page",
+    ["tool"],
+)
+TOKENS_WITHHELD = REGISTRY.counter(
+    "agent_tool_result_tokens_withheld_total",
+    "Estimated tokens kept out of the model context by paging",
+    ["tool"],
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _dumps(value) -> str:
+    return value if isinstance(value, str) else json.dumps(value, default=str)
+
+
+def paginate(value, budget_tokens: int) -> list:
+    """
+    Split a tool result into pages of at most about `budget_tokens` each.
+
+    Args:
+        value (Any): The tool's return value
+        budget_tokens (int): Token budget per page
+
+    Returns:
+        list: Pages; lists of items for list results, strings otherwise
+    """
+    if isinstance(value, (list, tuple)):
+        pages, page, used = [], [], 0
+        for item in value:
+            cost = estimate_tokens(_dumps(item)) + 1
+            if page and used + cost > budget_tokens:
+                pages.append(page)
+                page, used = [], 0
+            page.append(item)
+            used += cost
+        return pages + [page] if page or not pages else pages
+
+    text = _dumps(value)
+    size = budget_tokens * 4
+    pages = []
+    while text:
+        cut = len(text) if len(text) <= size else (text.rfind("\n", 0, size) + 1 or size)
+        pages.append(text[:cut])
+        text = text[cut:]
+    return pages or [""]
+
+
+class ResultStore:
+    """
+    Server-side pages of truncated tool results, keyed by cursor.
+
+    Bounded by count, least recently used first, and by age. Each entry
+    belongs to a session and is only returned to it.
+
+    Args:
+        max_cursors (int): Cursors kept at once
+        ttl_seconds (float): Lifetime of a cursor
+    """
+
+    def __init__(self, max_cursors: int = 256, ttl_seconds: float = 900.0):
+        self.max_cursors = max_cursors
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, str | None, str, list]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, tool: str, pages: list, session: str | None = None) -> str:
+        """
+        Keep `pages` for `session` and return their cursor.
+
+        Args:
+            tool (str): Name of the tool that produced them
+            pages (list): The pages
+            session (str, optional): Owner of the cursor, None for calls outside any session
+
+        Returns:
+            str: An unguessable cursor
+        """
+        cursor = secrets.token_urlsafe(16)
+        with self._lock:
+            self._entries[cursor] = (time.monotonic(), session, tool, pages)
+            while len(self._entries) > self.max_cursors:
+                self._entries.popitem(last=False)
+        return cursor
+
+    def get(self, cursor: str, session: str | None = None) -> tuple[str, list] | None:
+        """
+        The tool name and pages behind `cursor`, if it exists, has not expired and belongs to `session`.
+        """
+        with self._lock:
+            entry = self._entries.get(cursor)
+            if entry is None:
+                return None
+            created, owner, tool, pages = entry
+            if owner != session:
+                return None
+            if time.monotonic() - created > self.ttl_seconds:
+                del self._entries[cursor]
+                return None
+            self._entries.move_to_end(cursor)
+            return tool, pages
+
+
+RESULTS = ResultStore(ttl_seconds=get_settings().tools.result_ttl_seconds)
+
+
+def _page_payload(cursor: str, pages: list, page: int) -> dict:
+    payload = {"page": page, "pages": len(pages), "cursor": cursor}
+    payload["items" if isinstance(pages[page - 1], list) else "text"] = pages[page - 1]
+    if page < len(pages):
+        payload["note"] = (
+            f"Result truncated. Call fetch_more(cursor, page) for pages {page + 1}-{len(pages)}."
+        )
+    return payload
+
+
+def paged(tool: FunctionTool, budget_tokens: int | None = None, store: ResultStore = RESULTS) -> FunctionTool:
+    """
+    Copy of `tool` whose results over `budget_tokens` are replaced by a first page and a cursor.
+
+    Args:
+        tool (FunctionTool): Tool to wrap
+        budget_tokens (int, optional): Defaults to `TOOL_RESULT_BUDGET_TOKENS`
+        store (ResultStore): Where full results are kept; give the agent
+            `fetch_more_tool(store)` so it can read them
+
+    Returns:
+        FunctionTool: The wrapped tool
+    """
+    budget = budget_tokens or get_settings().tools.result_budget_tokens
+    invoke = tool.on_invoke_tool
+
+    async def on_invoke_tool(ctx, input: str):
+        result = await invoke(ctx, input)
+        text = _dumps(result)
+        if estimate_tokens(text) <= budget:
+            return result
+
+        pages = paginate(result, budget)
+        cursor = store.put(tool.name, pages, current_session())
+        payload = json.dumps(_page_payload(cursor, pages, 1), default=str)
+        PAGED_RESULTS.inc(tool=tool.name)
+        TOKENS_WITHHELD.inc(estimate_tokens(text) - estimate_tokens(payload), tool=tool.name)
+        return payload
+
+    return dataclasses.replace(tool, on_invoke_tool=on_invoke_tool)
+
+
+def fetch_more_tool(store: ResultStore = RESULTS) -> FunctionTool:
+    """
+    Build the `fetch_more` tool that reads pages from `store`.
+
+    Args:
+        store (ResultStore): Store the agent's paged tools put their results in
+
+    Returns:
+        FunctionTool: The `fetch_more` tool
+    """
+
+    @function_tool
+    def fetch_more(cursor: str, page: int) -> str:
+        """
+        Fetch another page of a tool result that was truncated.
+
+        Args:
+            cursor (str): The cursor returned with the truncated result
+            page (int): Page number to fetch, starting at 1
+
+        Returns:
+            str: The page, as JSON
+        """
+        entry = store.get(cursor, current_session())
+        if entry is None:
+            return f"Cursor {cursor!r} is unknown or has expired; call the original tool again."
+        _, pages = entry
+        if not 1 <= page <= len(pages):
+            return f"Page {page} is out of range; cursor {cursor!r} has pages 1-{len(pages)}."
+        return json.dumps(_page_payload(cursor, pages, page), default=str)
+
+    return fetch_more
+
+
+fetch_more = fetch_more_tool(RESULTS)
+
+
+def with_paging(
+    tools: list[Tool], budget_tokens: int | None = None, store: ResultStore = RESULTS
+) -> list[Tool]:
+    """
+    Wrap an agent's function tools with `paged` and add a `fetch_more` reading the same store.
+
+    Args:
+        tools (list[Tool]): The agent's tools; non-function tools are kept as-is
+        budget_tokens (int, optional): Token budget per tool result for this agent
+        store (ResultStore): Where full results are kept
+
+    Returns:
+        list[Tool]: Tools to give the agent
+    """
+    wrapped = [paged(t, budget_tokens, store) if isinstance(t, FunctionTool) else t for t in tools]
+    return wrapped + [fetch_more if store is RESULTS else fetch_more_tool(store)]
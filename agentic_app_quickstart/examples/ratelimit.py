@@ -0,0 +1,441 @@
+"""
+Client-side rate limiting of model requests.
+
+Guardrails, routers, specialists, the data analyst and evaluation judges all
+spend the same API key's budget. Left alone, a burst runs into 429s, and the
+retries of every caller then land at the same moment. `RateLimiter` keeps one
+token bucket for requests and one for tokens per key (an endpoint and model),
+and makes callers wait for budget before they send:
+
+- each bucket holds `burst_seconds` worth of its per-minute rate and refills
+  continuously; a request takes one request and its estimated tokens, and the
+  estimate is corrected with the usage of the response
+- callers wait in priority order: "interactive" requests (the default) are
+  served before "batch" ones (`rate_priority("batch")`), and batch work may
+  not spend the last `batch_reserve` of a bucket, so chat stays responsive
+  while judges and batch runs soak up the rest
+- a 429 empties the key's buckets for the server's Retry-After, so no caller
+  sends into a rate limit the server already reported
+- with `RATE_LIMIT_PATH` set, the buckets live in a SQLite file that every
+  worker process on the machine shares; the priority queue is per event loop,
+  while the batch reserve also holds across processes
+
+Waiting is measured as `agent_rate_limit_wait_seconds{key,priority}`.
+
+Example:
+    >>> with rate_priority("batch"):
+    ...     result = await Runner.run(agent, prompt)
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import functools
+import heapq
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable
+
+import openai
+from agents.models.interface import Model
+
+from agentic_app_quickstart.examples.models import _retry_after
+from agentic_app_quickstart.examples.paging import estimate_tokens
+from agentic_app_quickstart.week_2.solution.config.settings import RateLimitSettings, get_settings
+from agentic_app_quickstart.week_2.solution.monitoring.metrics import REGISTRY
+
+RATE_LIMIT_WAIT = REGISTRY.summary(
+    "agent_rate_limit_wait_seconds",
+    "Time model requests waited for rate limit budget",
+    ["key", "priority"],
+)
+RATE_LIMIT_THROTTLED = REGISTRY.counter(
+    "agent_rate_limit_throttled_total",
+    "Model requests that had to wait for rate limit budget",
+    ["key", "priority"],
+)
+RATE_LIMIT_WAITING = REGISTRY.gauge(
+    "agent_rate_limit_waiting",
+    "Model requests currently waiting for rate limit budget",
+    ["key"],
+)
+RATE_LIMIT_PENALTIES = REGISTRY.counter(
+    "agent_rate_limit_penalties_total",
+    "429 responses that emptied a key's buckets",
+    ["key"],
+)
+
+PRIORITIES = ("interactive", "batch")
+
+# Output tokens assumed for a request without max_tokens, until its usage is known
+DEFAULT_OUTPUT_TOKENS = 512
+
+_priority: contextvars.ContextVar[str] = contextvars.ContextVar("rate_priority", default="interactive")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    key TEXT PRIMARY KEY,
+    requests REAL NOT NULL,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID
+"""
+
+
+@contextlib.contextmanager
+def rate_priority(priority: str):
+    """
+    Give every model request inside the block a rate limit priority.
+
+    Example:
+        >>> with rate_priority("batch"):
+        ...     await run_batch(agent, "prompts.jsonl", "results.jsonl")
+    """
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority {priority!r}; use one of {', '.join(PRIORITIES)}")
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    """The priority set by the innermost `rate_priority()`, "interactive" outside any."""
+    return _priority.get()
+
+
+@dataclass
+class Bucket:
+    """Levels of a key's request and token buckets at `updated_at` (wall clock)."""
+
+    requests: float
+    tokens: float
+    updated_at: float
+
+
+class MemoryBuckets:
+    """Buckets of this process."""
+
+    def __init__(self):
+        self._buckets: dict[str, Bucket] = {}
+        self._lock = threading.Lock()
+
+    def transact(self, key: str, update: Callable[[Bucket | None], tuple[Bucket, float]]) -> float:
+        """Replace the bucket of `key` with `update(bucket)[0]` atomically and return `[1]`."""
+        with self._lock:
+            bucket, result = update(self._buckets.get(key))
+            self._buckets[key] = bucket
+            return result
+
+    async def transact_async(self, key: str, update: Callable[[Bucket | None], tuple[Bucket, float]]) -> float:
+        """`transact`; memory buckets are only ever locked briefly, so this runs inline."""
+        return self.transact(key, update)
+
+
+class SQLiteBuckets:
+    """
+    Buckets in a SQLite file, shared by every process that opens it.
+
+    Args:
+        db_path (str): SQLite file
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._db = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, timeout=10, isolation_level=None, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(_SCHEMA)
+        return self._db
+
+    def transact(self, key: str, update: Callable[[Bucket | None], tuple[Bucket, float]]) -> float:
+        """Replace the bucket of `key` with `update(bucket)[0]` atomically and return `[1]`."""
+        with self._lock:
+            db = self._connection()
+            # IMMEDIATE takes the write lock up front, so two processes cannot both spend the same budget
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute("SELECT requests, tokens, updated_at FROM buckets WHERE key = ?", (key,)).fetchone()
+                bucket, result = update(Bucket(*row) if row else None)
+                db.execute(
+                    "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?)",
+                    (key, bucket.requests, bucket.tokens, bucket.updated_at),
+                )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            return result
+
+    async def transact_async(self, key: str, update: Callable[[Bucket | None], tuple[Bucket, float]]) -> float:
+        """`transact` on a worker thread, so waiting for another process's write lock does not stall the event loop."""
+        return await asyncio.to_thread(self.transact, key, update)
+
+
+class RateLimiter:
+    """
+    Token buckets for requests and tokens per key, with prioritized waiting.
+
+    Args:
+        requests_per_minute (float): Request budget per key, 0 for unlimited
+        tokens_per_minute (float): Token budget per key, 0 for unlimited
+        burst_seconds (float): Bucket size, in seconds of the rate
+        batch_reserve (float): Share of each bucket batch requests may not spend
+        buckets (MemoryBuckets | SQLiteBuckets, optional): Where bucket levels
+            are kept, defaults to this process's memory
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0.0,
+        tokens_per_minute: float = 0.0,
+        burst_seconds: float = 10.0,
+        batch_reserve: float = 0.2,
+        buckets: MemoryBuckets | SQLiteBuckets | None = None,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.batch_reserve = batch_reserve
+        # At least one request's worth, or a low rate would never admit anything
+        self.request_capacity = max(1.0, requests_per_minute * burst_seconds / 60)
+        self.token_capacity = tokens_per_minute * burst_seconds / 60
+        self.buckets = buckets or MemoryBuckets()
+        self._queues: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._queues_lock = threading.Lock()
+        self._order = itertools.count()
+
+    @classmethod
+    def from_settings(cls, settings: RateLimitSettings) -> "RateLimiter":
+        return cls(
+            requests_per_minute=settings.requests_per_minute,
+            tokens_per_minute=settings.tokens_per_minute,
+            burst_seconds=settings.burst_seconds,
+            batch_reserve=settings.batch_reserve,
+            buckets=SQLiteBuckets(settings.path) if settings.path else MemoryBuckets(),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.requests_per_minute or self.tokens_per_minute)
+
+    def _refilled(self, bucket: Bucket | None, now: float) -> Bucket:
+        if bucket is None:
+            return Bucket(self.request_capacity, self.token_capacity, now)
+        elapsed = max(0.0, now - bucket.updated_at)
+        return Bucket(
+            min(self.request_capacity, bucket.requests + elapsed * self.requests_per_minute / 60),
+            min(self.token_capacity, bucket.tokens + elapsed * self.tokens_per_minute / 60),
+            now,
+        )
+
+    def try_acquire(self, key: str, tokens: int = 0, priority: str = "interactive") -> float:
+        """
+        Take one request and `tokens` from the buckets of `key` if they hold enough.
+
+        Args:
+            key (str): Bucket key
+            tokens (int): Estimated tokens of the request
+            priority (str): "interactive" or "batch"; batch may not spend the reserve
+
+        Returns:
+            float: 0.0 if the budget was taken, else seconds until it will be there
+        """
+        return self.buckets.transact(key, self._take(tokens, priority))
+
+    def _take(self, tokens: int, priority: str) -> Callable[[Bucket | None], tuple[Bucket, float]]:
+        reserve = self.batch_reserve if priority == "batch" else 0.0
+
+        def update(bucket: Bucket | None) -> tuple[Bucket, float]:
+            bucket = self._refilled(bucket, time.time())
+            wait = 0.0
+            for level, capacity, rate, need in (
+                (bucket.requests, self.request_capacity, self.requests_per_minute, 1.0),
+                (bucket.tokens, self.token_capacity, self.tokens_per_minute, tokens),
+            ):
+                if not rate:
+                    continue
+                # A request larger than the bucket goes into debt rather than waiting forever
+                need = min(need, capacity * (1 - reserve)) + capacity * reserve
+                if level < need:
+                    wait = max(wait, (need - level) * 60 / rate)
+            if wait == 0.0:
+                bucket.requests -= 1
+                bucket.tokens -= tokens
+            return bucket, wait
+
+        return update
+
+    async def acquire(self, key: str, tokens: int = 0, priority: str | None = None) -> float:
+        """
+        Wait until the buckets of `key` have budget for the request, then take it.
+
+        Waiters of one event loop are served in priority order, first come
+        first served within a priority.
+
+        Args:
+            key (str): Bucket key
+            tokens (int): Estimated tokens of the request
+            priority (str, optional): Defaults to the `rate_priority()` in effect
+
+        Returns:
+            float: Seconds waited
+        """
+        if not self.enabled:
+            return 0.0
+        priority = priority or _priority.get()
+        started = time.monotonic()
+        queue = self._queue(key)
+        if not queue and await self.buckets.transact_async(key, self._take(tokens, priority)) == 0.0:
+            RATE_LIMIT_WAIT.observe(0.0, key=key, priority=priority)
+            return 0.0
+
+        waiter = (PRIORITIES.index(priority), next(self._order), asyncio.Event())
+        head = queue[0] if queue else None
+        heapq.heappush(queue, waiter)
+        if head is not None and queue[0] is waiter:
+            # Overtake a lower priority head waiting for budget
+            head[2].set()
+
+        RATE_LIMIT_THROTTLED.inc(key=key, priority=priority)
+        RATE_LIMIT_WAITING.inc(key=key)
+        try:
+            while True:
+                waiter[2].clear()
+                if queue[0] is waiter:
+                    wait = await self.buckets.transact_async(key, self._take(tokens, priority))
+                    if wait == 0.0:
+                        break
+                    with contextlib.suppress(TimeoutError):
+                        await asyncio.wait_for(waiter[2].wait(), wait)
+                else:
+                    await waiter[2].wait()
+        finally:
+            RATE_LIMIT_WAITING.dec(key=key)
+            queue.remove(waiter)
+            heapq.heapify(queue)
+            if queue:
+                queue[0][2].set()
+
+        waited = time.monotonic() - started
+        RATE_LIMIT_WAIT.observe(waited, key=key, priority=priority)
+        return waited
+
+    def _queue(self, key: str) -> list:
+        with self._queues_lock:
+            queues = self._queues.setdefault(asyncio.get_running_loop(), {})
+        return queues.setdefault(key, [])
+
+    def acquire_sync(self, key: str, tokens: int = 0, priority: str | None = None) -> float:
+        """Blocking `acquire()` for synchronous callers; no priority queue, only the batch reserve."""
+        if not self.enabled:
+            return 0.0
+        priority = priority or _priority.get()
+        started = time.monotonic()
+        while (wait := self.try_acquire(key, tokens, priority)) > 0:
+            time.sleep(wait)
+        waited = time.monotonic() - started
+        if waited:
+            RATE_LIMIT_THROTTLED.inc(key=key, priority=priority)
+        RATE_LIMIT_WAIT.observe(waited, key=key, priority=priority)
+        return waited
+
+    async def settle(self, key: str, estimated: int, actual: int):
+        """Correct the token bucket of `key` once a request's real usage is known."""
+        if not self.tokens_per_minute or actual == estimated:
+            return
+
+        def update(bucket: Bucket | None) -> tuple[Bucket, float]:
+            bucket = self._refilled(bucket, time.time())
+            bucket.tokens = min(self.token_capacity, bucket.tokens + estimated - actual)
+            return bucket, 0.0
+
+        await self.buckets.transact_async(key, update)
+
+    async def penalize(self, key: str, seconds: float):
+        """Empty the buckets of `key` for `seconds`, after the server answered 429."""
+        if not self.enabled:
+            return
+        RATE_LIMIT_PENALTIES.inc(key=key)
+
+        def update(bucket: Bucket | None) -> tuple[Bucket, float]:
+            bucket = self._refilled(bucket, time.time())
+            bucket.requests = min(bucket.requests, -seconds * self.requests_per_minute / 60)
+            bucket.tokens = min(bucket.tokens, -seconds * self.tokens_per_minute / 60)
+            return bucket, 0.0
+
+        await self.buckets.transact_async(key, update)
+
+
+@functools.cache
+def get_rate_limiter() -> RateLimiter:
+    """The process-wide limiter configured by `RATE_LIMIT_*`; call `get_rate_limiter.cache_clear()` to reload."""
+    return RateLimiter.from_settings(get_settings().rate_limit)
+
+
+def estimate_request_tokens(system_instructions: str | None, input, max_tokens: int | None = None, tools=()) -> int:
+    """Rough token count of a request: its prompt, tool schemas and output cap."""
+    text = system_instructions or ""
+    text += input if isinstance(input, str) else json.dumps(input, default=str)
+    for tool in tools or ():
+        text += json.dumps(getattr(tool, "params_json_schema", None) or {}) + (getattr(tool, "description", "") or "")
+    return estimate_tokens(text) + (max_tokens or DEFAULT_OUTPUT_TOKENS)
+
+
+class RateLimitedModel(Model):
+    """
+    Waits for rate limit budget before each request to a model.
+
+    Args:
+        model (Model): Model doing the work
+        key (str): Bucket key; models sharing an endpoint's quota share a key
+        limiter (RateLimiter, optional): Defaults to `get_rate_limiter()`
+    """
+
+    def __init__(self, model: Model, key: str, limiter: RateLimiter | None = None):
+        self.model = model
+        self.key = key
+        self.limiter = limiter or get_rate_limiter()
+
+    async def get_response(
+        self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+    ):
+        estimate = estimate_request_tokens(system_instructions, input, model_settings.max_tokens, tools)
+        await self.limiter.acquire(self.key, estimate)
+        try:
+            response = await self.model.get_response(
+                system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+            )
+        except openai.RateLimitError as e:
+            await self.limiter.penalize(self.key, _retry_after(e) or 1.0)
+            raise
+        await self.limiter.settle(self.key, estimate, response.usage.total_tokens)
+        return response
+
+    async def stream_response(
+        self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+    ) -> AsyncIterator:
+        estimate = estimate_request_tokens(system_instructions, input, model_settings.max_tokens, tools)
+        await self.limiter.acquire(self.key, estimate)
+        stream = self.model.stream_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+        )
+        try:
+            async for event in stream:
+                if event.type == "response.completed" and event.response.usage:
+                    await self.limiter.settle(self.key, estimate, event.response.usage.total_tokens)
+                yield event
+        except openai.RateLimitError as e:
+            await self.limiter.penalize(self.key, _retry_after(e) or 1.0)
+            raise
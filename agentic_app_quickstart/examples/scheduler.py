@@ -0,0 +1,236 @@
+"""
+Fair admission of agent runs between tenants.
+
+Every `Runner.run` used to start as soon as it was called, so one Streamlit or
+Gradio user firing a dozen heavy data-analysis questions took the model
+endpoint and the tool pools from everyone else. `RunScheduler` sits in front
+of `Runner.run`:
+
+- at most `max_concurrency` runs are in flight in the process, and at most
+  `tenant_concurrency` per tenant (a browser session, a user, a batch job)
+- when a slot frees up, waiting "interactive" runs go before "batch" ones;
+  within a priority, the next run comes from the tenant that has used the
+  least of its fair share so far (weighted fair queueing, with `weights`
+  giving some tenants a bigger share)
+- a tenant's usage is measured in run-seconds, so a user whose questions take
+  ten times as long gets a tenth as many of them through while others wait;
+  a tenant that was idle rejoins at the current virtual time and does not
+  bank credit for the time it was away
+
+Runs are admitted across threads too, since Streamlit runs every session in
+its own thread and event loop. Queue time is measured as
+`agent_run_queue_seconds{priority}`.
+
+Example:
+    >>> scheduler = get_scheduler()
+    >>> result = await scheduler.run(agent, prompt, tenant=session_id)
+"""
+
+import asyncio
+import functools
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from agents import Agent
+from agents.result import RunResult
+
+from agentic_app_quickstart.examples.loops import run_with_loop_guard
+from agentic_app_quickstart.examples.ratelimit import PRIORITIES, current_priority, rate_priority
+from agentic_app_quickstart.week_2.solution.config.settings import SchedulerSettings, get_settings
+from agentic_app_quickstart.week_2.solution.monitoring.metrics import REGISTRY
+
+RUN_QUEUE_SECONDS = REGISTRY.summary(
+    "agent_run_queue_seconds",
+    "Time agent runs waited for the scheduler to admit them",
+    ["priority"],
+)
+RUNS_QUEUED = REGISTRY.gauge(
+    "agent_runs_queued",
+    "Agent runs waiting for the scheduler",
+    ["priority"],
+)
+RUNS_RUNNING = REGISTRY.gauge(
+    "agent_runs_running",
+    "Agent runs admitted by the scheduler and still in flight",
+)
+
+# Run-seconds charged on admission before a tenant has finished any run
+DEFAULT_RUN_SECONDS = 5.0
+
+
+class _Waiter:
+    def __init__(self, loop: asyncio.AbstractEventLoop, priority: str):
+        self.loop = loop
+        self.future = loop.create_future()
+        self.priority = priority
+        self.admitted = False
+        self.queued_at = time.monotonic()
+
+
+class _Tenant:
+    def __init__(self, weight: float):
+        self.weight = weight
+        self.running = 0
+        self.virtual_time = 0.0
+        self.run_seconds = DEFAULT_RUN_SECONDS
+        self.queues: dict[str, deque[_Waiter]] = {priority: deque() for priority in PRIORITIES}
+
+    @property
+    def idle(self) -> bool:
+        return not self.running and not any(self.queues.values())
+
+
+class RunScheduler:
+    """
+    Admits agent runs with per-tenant quotas and weighted fair queueing.
+
+    Args:
+        max_concurrency (int): Runs in flight at once across all tenants
+        tenant_concurrency (int): Runs in flight at once per tenant
+        weights (dict[str, float], optional): Share per tenant, 1 by default
+    """
+
+    def __init__(self, max_concurrency: int = 16, tenant_concurrency: int = 2, weights: dict[str, float] | None = None):
+        self.max_concurrency = max_concurrency
+        self.tenant_concurrency = tenant_concurrency
+        self.weights = weights or {}
+        self.running = 0
+        self._tenants: dict[str, _Tenant] = {}
+        self._virtual_time = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: SchedulerSettings) -> "RunScheduler":
+        return cls(settings.max_concurrency, settings.tenant_concurrency, dict(settings.tenant_weights))
+
+    def _dispatch(self):
+        """Admit waiting runs while there are free slots; called with the lock held."""
+        while self.running < self.max_concurrency:
+            for priority in PRIORITIES:
+                candidates = [
+                    (tenant.virtual_time, name)
+                    for name, tenant in self._tenants.items()
+                    if tenant.queues[priority] and tenant.running < self.tenant_concurrency
+                ]
+                if candidates:
+                    break
+            else:
+                return
+
+            _, name = min(candidates)
+            tenant = self._tenants[name]
+            waiter = tenant.queues[priority].popleft()
+            waiter.admitted = True
+            tenant.running += 1
+            self.running += 1
+            # Start-time fair queueing: the system's virtual time follows the run admitted last
+            self._virtual_time = max(self._virtual_time, tenant.virtual_time)
+            tenant.virtual_time += tenant.run_seconds / tenant.weight
+            RUNS_QUEUED.dec(priority=priority)
+            RUNS_RUNNING.set(self.running)
+            waiter.loop.call_soon_threadsafe(_wake, waiter.future)
+
+    def _release(self, name: str, seconds: float | None):
+        """Free a tenant's slot and charge it for the run's real duration; called with the lock held."""
+        tenant = self._tenants[name]
+        tenant.running -= 1
+        self.running -= 1
+        RUNS_RUNNING.set(self.running)
+        if seconds is not None:
+            # Correct the estimate charged on admission, then learn from this run
+            tenant.virtual_time += (seconds - tenant.run_seconds) / tenant.weight
+            tenant.run_seconds = 0.8 * tenant.run_seconds + 0.2 * seconds
+        if tenant.idle and tenant.virtual_time <= self._virtual_time:
+            del self._tenants[name]
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, tenant: str, priority: str | None = None):
+        """
+        Wait for the scheduler to admit a run of `tenant`, and hold the slot for the block.
+
+        Args:
+            tenant (str): Who the run is for
+            priority (str, optional): "interactive" or "batch", defaults to the
+                `rate_priority()` in effect
+        """
+        priority = priority or current_priority()
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}; use one of {', '.join(PRIORITIES)}")
+        waiter = _Waiter(asyncio.get_running_loop(), priority)
+
+        with self._lock:
+            state = self._tenants.get(tenant)
+            if state is None:
+                state = self._tenants[tenant] = _Tenant(self.weights.get(tenant, 1.0))
+            if state.idle:
+                # No credit for time spent away
+                state.virtual_time = max(state.virtual_time, self._virtual_time)
+            state.queues[priority].append(waiter)
+            RUNS_QUEUED.inc(priority=priority)
+            self._dispatch()
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.admitted:
+                    self._release(tenant, None)
+                else:
+                    state.queues[priority].remove(waiter)
+                    RUNS_QUEUED.dec(priority=priority)
+                    if state.idle and state.virtual_time <= self._virtual_time:
+                        self._tenants.pop(tenant, None)
+            raise
+
+        started = time.monotonic()
+        RUN_QUEUE_SECONDS.observe(started - waiter.queued_at, priority=priority)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._release(tenant, time.monotonic() - started)
+
+    async def run(self, agent: Agent, input, tenant: str, priority: str | None = None, **kwargs) -> RunResult:
+        """
+        `Runner.run(agent, input, **kwargs)` once the scheduler admits it.
+
+        The run's model requests get the same priority from the rate limiter,
+        and the run is watched for loops (see `run_with_loop_guard`).
+
+        Args:
+            agent (Agent): Starting agent
+            input (str | list): Run input
+            tenant (str): Who the run is for
+            priority (str, optional): "interactive" or "batch", defaults to the
+                `rate_priority()` in effect
+
+        Returns:
+            RunResult: The run's result
+        """
+        priority = priority or current_priority()
+        async with self.slot(tenant, priority):
+            with rate_priority(priority):
+                return await run_with_loop_guard(agent, input, **kwargs)
+
+    def queued(self) -> dict[str, int]:
+        """Number of waiting runs per tenant."""
+        with self._lock:
+            return {
+                name: sum(len(queue) for queue in tenant.queues.values())
+                for name, tenant in self._tenants.items()
+                if any(tenant.queues.values())
+            }
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+@functools.cache
+def get_scheduler() -> RunScheduler:
+    """The process-wide scheduler configured by `RUN_*`; call `get_scheduler.cache_clear()` to reload."""
+    return RunScheduler.from_settings(get_settings().scheduler)
@@ -0,0 +1,269 @@
+"""
+Single-flight coalescing of identical concurrent calls.
+
+When several users ask the same question about the same dataset at the same
+moment, or a guardrail checks identical inputs concurrently, each caller used
+to send its own model request and run its own Polars scan. `SingleFlight`
+lets the first caller of a key (the leader) do the work while identical calls
+that arrive before it finishes wait for its result instead:
+
+- `SingleFlightModel` (installed by `get_model()`) keys a request on the
+  model, instructions, input, resolved settings, tools, output schema and
+  handoffs; followers get a copy of the leader's response whose usage counts
+  the request but no tokens, so metering only sees the tokens paid for, and
+  followers spend no retries or rate limit budget
+- `single_flight_tool` / `with_single_flight` key a function tool call on
+  its name and arguments; only use them for tools whose result depends on
+  their arguments alone, since followers never see their own tool context;
+  dataset tools take a `file_path`, so pass paths from `save_upload`, which
+  gives every copy of the same upload one path
+
+Calls are coalesced across threads and event loops, so Streamlit sessions
+share flights too. Only calls in flight at the same time are shared; nothing
+is cached after the leader finishes. A leader's error is raised to its
+followers as well, but if the leader is cancelled or its run's deadline
+passes, a follower takes over. Streamed model responses are not coalesced.
+
+Outcomes are counted in `agent_single_flight_calls_total{kind,name,result}`,
+where `result` is "executed" or "coalesced".
+
+Example:
+    >>> agent = Agent(..., tools=with_paging(with_single_flight([get_headers, count_unique])))
+"""
+
+import asyncio
+import contextlib
+import copy
+import dataclasses
+import hashlib
+import json
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from agents import Usage
+from agents.models.interface import Model
+from agents.tool import FunctionTool, Tool
+
+from agentic_app_quickstart.examples.models import DeadlineExceeded, remaining_seconds
+from agentic_app_quickstart.week_2.solution.config.settings import get_settings
+from agentic_app_quickstart.week_2.solution.monitoring.metrics import REGISTRY
+
+SINGLE_FLIGHT_CALLS = REGISTRY.counter(
+    "agent_single_flight_calls_total",
+    "Model requests and tool calls that executed, or were coalesced into an identical call in flight",
+    ["kind", "name", "result"],
+)
+
+# Sent to followers when their leader gave up, so one of them retries as the new leader
+_RETRY = object()
+
+
+class _Flight:
+    def __init__(self):
+        self.waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+
+def _resolve(future: asyncio.Future, outcome):
+    if not future.done():
+        future.set_result(outcome)
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time, sharing its outcome with identical callers.
+
+    Args:
+        kind (str): "model" or "tool", for the metrics
+    """
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self._flights: dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def in_flight(self) -> int:
+        """Number of keys with a call in flight."""
+        with self._lock:
+            return len(self._flights)
+
+    def _finish(self, key: str, flight: _Flight, outcome):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            waiters, flight.waiters = flight.waiters, []
+        for loop, future in waiters:
+            with contextlib.suppress(RuntimeError):  # the follower's loop has closed
+                loop.call_soon_threadsafe(_resolve, future, outcome)
+
+    async def do(self, key: str, call: Callable[[], Awaitable], name: str, share: Callable[[Any], Any] = copy.deepcopy):
+        """
+        Await `call()`, or the outcome of an identical call already in flight.
+
+        Args:
+            key (str): Identity of the call
+            call (Callable[[], Awaitable]): Does the work when this caller leads
+            name (str): Model or tool name, for the metrics
+            share (Callable, optional): Turns the leader's result into a follower's
+
+        Returns:
+            Any: The result
+
+        Raises:
+            DeadlineExceeded: The run's deadline passed while waiting for the leader
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                if flight is None:
+                    flight = self._flights[key] = _Flight()
+                    break
+                future = loop.create_future()
+                flight.waiters.append((loop, future))
+
+            try:
+                outcome = await asyncio.wait_for(future, remaining_seconds())
+            except asyncio.TimeoutError:
+                self._leave(flight, future)
+                raise DeadlineExceeded(
+                    f"Run deadline passed while waiting for an identical {self.kind} call"
+                ) from None
+            except asyncio.CancelledError:
+                self._leave(flight, future)
+                raise
+            if outcome is _RETRY:
+                continue
+
+            SINGLE_FLIGHT_CALLS.inc(kind=self.kind, name=name, result="coalesced")
+            ok, value = outcome
+            if not ok:
+                raise value
+            return share(value)
+
+        SINGLE_FLIGHT_CALLS.inc(kind=self.kind, name=name, result="executed")
+        try:
+            result = await call()
+        except (asyncio.CancelledError, DeadlineExceeded):
+            # The leader's own run gave up; followers may still have time
+            self._finish(key, flight, _RETRY)
+            raise
+        except Exception as e:
+            self._finish(key, flight, (False, e))
+            raise
+        self._finish(key, flight, (True, result))
+        return result
+
+    def _leave(self, flight: _Flight, future: asyncio.Future):
+        with self._lock:
+            flight.waiters = [(loop, f) for loop, f in flight.waiters if f is not future]
+
+
+MODEL_FLIGHTS = SingleFlight("model")
+TOOL_FLIGHTS = SingleFlight("tool")
+
+
+def _digest(payload) -> str:
+    text = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def model_request_key(
+    model_name: str, system_instructions, input, model_settings, tools, output_schema, handoffs, **kwargs
+) -> str:
+    """Identity of a model request: everything that goes into it."""
+    return _digest({
+        "model": model_name,
+        "instructions": system_instructions,
+        "input": input,
+        "settings": model_settings.to_json_dict(),
+        "tools": [[tool.name, getattr(tool, "params_json_schema", None)] for tool in tools],
+        "output": None if output_schema is None else [output_schema.name(), output_schema.json_schema()],
+        "handoffs": [handoff.tool_name for handoff in handoffs],
+        "previous_response_id": kwargs.get("previous_response_id"),
+        "prompt": kwargs.get("prompt"),
+    })
+
+
+def _follower_response(response):
+    """The leader's response for a follower: one request, no tokens of its own."""
+    return dataclasses.replace(copy.deepcopy(response), usage=Usage(requests=1))
+
+
+class SingleFlightModel(Model):
+    """
+    Coalesces identical concurrent requests to a model into one.
+
+    Args:
+        model (Model): Model doing the work
+        name (str): Model name, part of the request key
+        flights (SingleFlight, optional): Defaults to the process-wide `MODEL_FLIGHTS`
+    """
+
+    def __init__(self, model: Model, name: str, flights: SingleFlight = MODEL_FLIGHTS):
+        self.model = model
+        self.name = name
+        self.flights = flights
+
+    async def get_response(
+        self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+    ):
+        key = model_request_key(
+            self.name, system_instructions, input, model_settings, tools, output_schema, handoffs, **kwargs
+        )
+        return await self.flights.do(
+            key,
+            lambda: self.model.get_response(
+                system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+            ),
+            name=self.name,
+            share=_follower_response,
+        )
+
+    def stream_response(
+        self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+    ) -> AsyncIterator:
+        return self.model.stream_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+        )
+
+
+def _arguments_key(input: str) -> Any:
+    try:
+        return json.loads(input or "{}")
+    except json.JSONDecodeError:
+        return input
+
+
+def single_flight_tool(tool: FunctionTool, flights: SingleFlight = TOOL_FLIGHTS) -> FunctionTool:
+    """
+    Copy of `tool` whose identical concurrent calls share one execution.
+
+    Args:
+        tool (FunctionTool): Tool whose result depends only on its arguments
+        flights (SingleFlight, optional): Defaults to the process-wide `TOOL_FLIGHTS`
+
+    Returns:
+        FunctionTool: The wrapped tool, which calls `tool` directly while `SINGLE_FLIGHT_TOOLS=0`
+    """
+    invoke = tool.on_invoke_tool
+
+    async def on_invoke_tool(ctx, input: str):
+        if not get_settings().single_flight.tools:
+            return await invoke(ctx, input)
+        key = _digest([tool.name, _arguments_key(input)])
+        return await flights.do(key, lambda: invoke(ctx, input), name=tool.name)
+
+    return dataclasses.replace(tool, on_invoke_tool=on_invoke_tool)
+
+
+def with_single_flight(tools: list[Tool]) -> list[Tool]:
+    """
+    Wrap an agent's function tools with `single_flight_tool`; `SINGLE_FLIGHT_TOOLS=0` turns it off.
+
+    Args:
+        tools (list[Tool]): The agent's tools; non-function tools are kept as-is
+
+    Returns:
+        list[Tool]: Tools to give the agent
+    """
+    return [single_flight_tool(t) if isinstance(t, FunctionTool) else t for t in tools]
@@ -0,0 +1,71 @@
+"""
+Uploaded files on disk.
+
+The agent's tools read datasets by path, so a Streamlit upload has to be
+written to disk first. Streamlit reruns the whole script on every
+interaction, and writing the upload to a fresh temporary directory on each
+rerun gives the same dataset a new path every time: the profile and series
+caches in the tools, which key on the path, never hit, and the directories
+pile up. `save_upload` writes an upload once and hands back the same path for
+as long as the session keeps the same upload.
+
+Uploads are stored by content under `<tmp>/agentic-uploads/<sha256>/<name>`,
+so users who upload the same dataset get the same path as well. Tool calls
+are coalesced on their arguments (see `with_single_flight`), and with one path
+per dataset their concurrent questions about it share a flight and a cache
+entry instead of each scanning their own copy.
+
+Example:
+    >>> uploaded_file = st.sidebar.file_uploader("Upload a file")
+    >>> if uploaded_file is not None:
+    ...     file_path = save_upload(uploaded_file, st.session_state)
+"""
+
+import hashlib
+import os
+import tempfile
+from typing import MutableMapping, Protocol
+
+UPLOAD_DIR = os.path.join(tempfile.gettempdir(), "agentic-uploads")
+
+
+class Upload(Protocol):
+    """What `save_upload` needs from a Streamlit `UploadedFile`."""
+
+    name: str
+    file_id: str
+
+    def getbuffer(self) -> memoryview: ...
+
+
+def save_upload(uploaded_file: Upload, state: MutableMapping) -> str:
+    """
+    Path of `uploaded_file` on disk, writing it only the first time it is seen.
+
+    Args:
+        uploaded_file (Upload): The upload, e.g. from `st.file_uploader`
+        state (MutableMapping): Per-session state, e.g. `st.session_state`; the
+            path is kept under "tmp_file_path" and the upload's id under "upload_file_id"
+
+    Returns:
+        str: Path of the file, named like the upload and the same for identical uploads
+    """
+    path = state.get("tmp_file_path")
+    if state.get("upload_file_id") == uploaded_file.file_id and path and os.path.exists(path):
+        return path
+
+    content = uploaded_file.getbuffer()
+    directory = os.path.join(UPLOAD_DIR, hashlib.sha256(content).hexdigest())
+    path = os.path.join(directory, os.path.basename(uploaded_file.name))
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        # Write under a temporary name, so a session uploading the same file
+        # concurrently never reads it half-written
+        fd, partial = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, "wb") as file:
+            file.write(content)
+        os.replace(partial, path)
+
+    state["tmp_file_path"] = path
+    state["upload_file_id"] = uploaded_file.file_id
+    return path
@@ -7,6 +7,7 @@ With memory, agents can remember previous parts of the conversation and maintain
 Key concepts:
 - Session: A storage mechanism that preserves conversation history
 - SQLiteSession: A session implementation using SQLite database for storage
+- RetrievalSession: A session that sends only the recent and the relevant parts of a long history
 - Persistent conversations: The agent remembers what was said before
 - Session ID: A unique identifier to separate different conversations
 
@@ -20,19 +21,24 @@ Use cases:
 - Educational tutors that build on previous lessons
 """
 
-from agents import Agent, Runner, SQLiteSession, set_tracing_disabled
+from agents import Agent, Runner, set_tracing_disabled
 import asyncio
 from agentic_app_quickstart.examples.helpers import get_model
+from agentic_app_quickstart.examples.memory import RetrievalSession, recall
+from agentic_app_quickstart.week_2.solution.monitoring.metering import metering_session
 
 # Disable detailed logging for cleaner output
 set_tracing_disabled(True)
 
 # Create a session to store conversation memory
-# SQLiteSession stores the conversation history in a SQLite database
-# - If no db_path is specified, it uses an in-memory database (lost when program ends)
-# - To persist conversations, specify a path: SQLiteSession(db_path="conversations.db")
+# SQLiteSession(session_id=123) would send the entire history with every message,
+# which gets slow and expensive as a conversation grows. RetrievalSession stores
+# every turn too, but only sends the latest few plus the older ones relevant
+# to the new message (see examples/memory.py)
+# - Turns are kept in a SQLite file (MEMORY_PATH, traces/memory.sqlite by default),
+#   so the agent still remembers after a restart
 # - session_id helps separate different conversations (useful for multiple users)
-session = SQLiteSession(session_id=123)
+session = RetrievalSession(session_id="123")
 
 # Create an agent designed for ongoing conversations
 agent = Agent(
@@ -47,7 +53,7 @@ async def main():
     Main function that runs a continuous conversation loop.
 
     The agent will:
-    1. Remember everything from previous messages in this session
+    1. Remember the recent messages, and earlier ones relevant to your question
     2. Use that context to provide more relevant responses
     3. Build rapport and continuity across multiple interactions
 
@@ -69,11 +75,14 @@ async def main():
         # Run the agent with the session (memory) included
         # The session parameter is what enables memory - without it,
         # each interaction would be independent
-        result = await Runner.run(
-            starting_agent=agent,
-            input=prompt,
-            session=session,  # This is the key to enabling memory!
-        )
+        # metering_session attributes the tokens used to this conversation,
+        # and recall tells the session which earlier turns are relevant
+        with metering_session(session.session_id), recall(prompt):
+            result = await Runner.run(
+                starting_agent=agent,
+                input=prompt,
+                session=session,  # This is the key to enabling memory!
+            )
 
         # Print the agent's response
         print(f"\nAgent: {result.final_output}\n")
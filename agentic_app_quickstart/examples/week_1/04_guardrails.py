@@ -57,7 +57,7 @@ class MusicQuestionOutput(BaseModel):
 input_guardrail_agent = Agent(
     name="Guardrail Check",
     instructions="A guardrail that ensures that the user is asking questions about Music.",
-    model=get_model(),
+    model=get_model(role="guardrail"),  # Metered separately from the main agent
     output_type=MusicQuestionOutput,  # Forces structured output using our Pydantic model
 )
 
@@ -19,8 +19,9 @@ Use cases:
 """
 
 import asyncio
-from agents import Agent, Runner, set_tracing_disabled
+from agents import Agent, set_tracing_disabled
 from agentic_app_quickstart.examples.helpers import get_model
+from agentic_app_quickstart.examples.loops import run_with_loop_guard
 
 # Disable detailed logging for cleaner output
 set_tracing_disabled(True)
@@ -44,7 +45,7 @@ reception_agent = Agent(
 
     If a user needs specialized help, use the appropriate handoff function.
     At the start of the conversation, mention which type of agent you are.""",
-    model=get_model(),
+    model=get_model(role="router"),
 )
 
 # 2. Technical Support Agent - Handles technical issues
@@ -61,7 +62,7 @@ tech_support_agent = Agent(
     If the issue is not technical, transfer back to reception.
     At the start of the conversation, mention which type of agent you are.
     """,
-    model=get_model(),
+    model=get_model(role="specialist"),
 )
 
 # 3. Sales Agent - Handles product and sales inquiries
@@ -77,7 +78,7 @@ sales_agent = Agent(
     Be enthusiastic, informative, and help users make the best choice.
     If the question is not sales-related, transfer back to reception.
     At the start of the conversation, mention which type of agent you are.""",
-    model=get_model(),
+    model=get_model(role="specialist"),
 )
 
 # 4. Billing Agent - Handles payment and account issues
@@ -93,7 +94,7 @@ billing_agent = Agent(
     Be helpful and professional with financial matters.
     If the question is not billing-related, transfer back to reception.
     At the start of the conversation, mention which type of agent you are.""",
-    model=get_model(),
+    model=get_model(role="specialist"),
 )
 
 
@@ -142,8 +143,8 @@ async def run_conversation_with_handoffs():
             break
 
         try:
-            # Run the current agent
-            result = await Runner.run(starting_agent=current_agent, input=user_input)
+            # Run the current agent; a reception <-> specialist ping-pong is stopped early
+            result = await run_with_loop_guard(current_agent, user_input)
             response = result.final_output
 
             # Display the agent's response
@@ -43,7 +43,7 @@ reception_agent = Agent(
 
     If a user needs specialized help, use the appropriate handoff function.
     At the start of the conversation, mention which type of agent you are.""",
-    model=get_model(),
+    model=get_model(role="router"),
 )
 
 # 2. Technical Support Agent - Handles technical issues
@@ -60,7 +60,7 @@ tech_support_agent = Agent(
     If the issue is not technical, transfer back to reception.
     At the start of the conversation, mention which type of agent you are.
     """,
-    model=get_model(),
+    model=get_model(role="specialist"),
 )
 
 # 3. Sales Agent - Handles product and sales inquiries
@@ -76,7 +76,7 @@ sales_agent = Agent(
     Be enthusiastic, informative, and help users make the best choice.
     If the question is not sales-related, transfer back to reception.
     At the start of the conversation, mention which type of agent you are.""",
-    model=get_model(),
+    model=get_model(role="specialist"),
 )
 
 # 4. Billing Agent - Handles payment and account issues
@@ -92,7 +92,7 @@ billing_agent = Agent(
     Be helpful and professional with financial matters.
     If the question is not billing-related, transfer back to reception.
     At the start of the conversation, mention which type of agent you are.""",
-    model=get_model(),
+    model=get_model(role="specialist"),
 )
 
 
@@ -1,6 +1,7 @@
-from agents import Agent, Runner
+from agents import Agent
 import gradio as gr
 from agentic_app_quickstart.examples.helpers import get_model, get_tracing_provider
+from agentic_app_quickstart.examples.scheduler import get_scheduler
 
 
 tracing_provider = get_tracing_provider()
@@ -11,9 +12,9 @@ agent = Agent(
 )
 
 # Define the Gradio chat interface function as async
-async def chat_with_agent(message, history):
-    # Run the agent asynchronously
-    result = await Runner.run(agent, message)
+async def chat_with_agent(message, history, request: gr.Request):
+    # Run the agent asynchronously, taking turns fairly with other browser sessions
+    result = await get_scheduler().run(agent, message, tenant=request.session_hash)
     # Return just the agent's response - ChatInterface handles history automatically
     return result.final_output
 
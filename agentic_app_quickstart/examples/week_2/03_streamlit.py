@@ -12,14 +12,29 @@ Dependencies:
     - asyncio: For asynchronous execution of agent operations
 """
 
-from agents import Agent, Runner, function_tool
+from agents import Agent
+from agentic_app_quickstart.examples.executor import offloaded_tool
 from agentic_app_quickstart.examples.helpers import get_model, get_tracing_provider
+from agentic_app_quickstart.examples.paging import with_paging
+from agentic_app_quickstart.examples.scheduler import get_scheduler
+from agentic_app_quickstart.examples.singleflight import with_single_flight
+from agentic_app_quickstart.examples.uploads import save_upload
+from agentic_app_quickstart.week_1.solution.tools import (
+    estimate_stat,
+    get_profile,
+    moving_average,
+    period_growth,
+    plan_query,
+    resample,
+    seasonal_summary,
+)
+from agentic_app_quickstart.week_2.solution.monitoring.metering import metering_session
+from agentic_app_quickstart.week_2.solution.monitoring.turns import record_turns
 from textwrap import dedent
 import polars as pl
 import streamlit as st
 import asyncio
-import tempfile
-import os
+import uuid
 
 
 # Initialize tracing provider for monitoring agent interactions
@@ -28,8 +43,10 @@ tracing_provider = get_tracing_provider()
 
 ### AGENTIC FUNCTIONALITY
 # This section defines the AI agent and its tools for data analysis
+# The tools run in a thread pool (Polars releases the GIL) so reading a large
+# file does not block other users' conversations on the event loop
 
-@function_tool
+@offloaded_tool(pool="thread")
 def get_headers(file_path: str) -> list[str]:
     """
     Get the column headers from a CSV file.
@@ -59,7 +76,7 @@ def get_headers(file_path: str) -> list[str]:
         raise e
 
 
-@function_tool
+@offloaded_tool(pool="thread")
 def count_unique(file_path: str, target_column: str, extension: str = "csv") -> int:
     """
     Count the number of unique values in a specified column of a CSV file.
@@ -113,20 +130,56 @@ def count_unique(file_path: str, target_column: str, extension: str = "csv") ->
     return num_unique
 
 
+# Filters, grouping, aggregates, sorting and limits in one tool call, compiled
+# into a single lazy Polars query
+run_query_plan = offloaded_tool(plan_query, pool="thread")
+
+# Sampled count, sum, mean and distinct-count estimates with confidence
+# intervals, for files too large to scan while the user waits
+estimate_column_stat = offloaded_tool(estimate_stat, pool="thread")
+
+# Resampling, moving averages, period-over-period growth and seasonal summaries
+# for date-indexed files; each file is parsed and sorted by date once
+resample_series = offloaded_tool(resample, pool="thread")
+moving_average_series = offloaded_tool(moving_average, pool="thread")
+period_growth_series = offloaded_tool(period_growth, pool="thread")
+seasonal_summary_series = offloaded_tool(seasonal_summary, pool="thread")
+
+
 # Define instructions for the AI agent's behavior and capabilities
 instructions = dedent("""
     You are a data analyst agent specialized in CSV file analysis.
     
     Your primary task is to help users count unique values for columns in CSV files.
-    You will receive a file path to a CSV file and a question from the user about
-    unique value counts in specific columns.
+    You will receive a file path to a CSV file, a profile of the dataset (columns,
+    dtypes, row count, null rates, approximate distinct counts and sample values)
+    and a question from the user about unique value counts in specific columns.
 
     Follow this step-by-step process:
         1. Analyze the user's question to identify the target column for analysis
-        2. Use the `get_headers` function to retrieve available column headers from the CSV file
+        2. Find the column in the dataset profile; only use the `get_headers` function
+           if there is no profile or the profile does not list the columns you need
         3. Execute the appropriate function to calculate unique values in the specified column
         4. Provide a clear, informative response to the user
 
+    For questions that need filtering, grouping, aggregates or sorting, use the
+    `plan_query` function with one plan that answers the whole question, rather
+    than several smaller tool calls.
+
+    For exploratory questions on very large files (millions of rows), where an
+    approximate answer is enough, use the `estimate_stat` function. Its answers
+    can be estimates: always tell the user whether a number is exact or
+    estimated, and give the confidence interval for estimates. `count_unique`
+    and `plan_query` always give exact answers.
+
+    For questions about how values change over time in files with a date column
+    (e.g. weather or sales), use the time series functions: `resample` for
+    totals or averages per day, week, month or quarter, `moving_average` for
+    smoothed trends, `period_growth` for period-over-period change, and
+    `seasonal_summary` for patterns by month, quarter, weekday or hour across
+    the whole file. Narrow the dates with `start` and `end` rather than
+    filtering the results yourself.
+
     Always use the provided tools to gather information and perform calculations.
     Be helpful and provide context about your findings when possible.
 """)    
@@ -135,8 +188,23 @@ instructions = dedent("""
 data_analyzer_agent = Agent(
     name="DataAnalyzerAgent",
     instructions=instructions,
-    model=get_model(),  # Get the configured language model
-    tools=[get_headers, count_unique]  # Available tools for the agent to use
+    model=get_model(role="analyst"),  # Get the language model configured for data analysis
+    # Available tools for the agent to use; large results (e.g. the headers of a
+    # very wide file) are paged and the rest fetched with fetch_more, and users
+    # asking about the same file at once share one scan
+    tools=with_paging(
+        with_single_flight([
+            get_headers,
+            count_unique,
+            run_query_plan,
+            estimate_column_stat,
+            resample_series,
+            moving_average_series,
+            period_growth_series,
+            seasonal_summary_series,
+        ]),
+        budget_tokens=1000,
+    ),
 )
 
 ### STREAMLIT INTERFACE
@@ -164,23 +232,20 @@ async def main():
         # Display success message with filename
         st.sidebar.success(f"Uploaded: {uploaded_file.name}")
 
-        # Save uploaded file to temporary location for processing
-        # This allows the agent to access the file via file path
-        # Preserve the original filename by using a temporary directory
-        import os
-        
-        # Create a temporary directory
-        temp_dir = tempfile.mkdtemp()
-        
-        # Create the full path with the original filename
-        tmp_file_path = os.path.join(temp_dir, uploaded_file.name)
-        
-        # Write the file content to the temporary file with original name
-        with open(tmp_file_path, 'wb') as tmp_file:
-            tmp_file.write(uploaded_file.getbuffer())
-            
-        # Store file path in session state for persistence across interactions
-        st.session_state.tmp_file_path = tmp_file_path
+        # Save uploaded file to disk once per upload, so the agent can access it
+        # via file path; reruns reuse the path, which keeps the profile and
+        # series caches warm across questions
+        tmp_file_path = save_upload(uploaded_file, st.session_state)
+
+        # Profile the dataset once per upload; the profile goes into every prompt
+        # so the agent can skip the get_headers round-trip
+        if st.session_state.get("profile_file_id") != uploaded_file.file_id:
+            try:
+                st.session_state.profile = get_profile(tmp_file_path).to_prompt()
+            except Exception as e:
+                print(f"Error occurred while profiling file {tmp_file_path}: {e}")
+                st.session_state.profile = None
+            st.session_state.profile_file_id = uploaded_file.file_id
 
     # === CHAT HISTORY MANAGEMENT ===
     # Initialize chat history in session state if it doesn't exist
@@ -188,10 +253,22 @@ async def main():
     if "chat_history" not in st.session_state:
         st.session_state.chat_history = []
 
+    # Identify this browser session so token usage can be metered per session
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+
     # === MAIN INTERFACE ===
     # Set the main title for the application
     st.title("Agentic Unique Values Analyzer")
 
+    # Show how many model turns the last question took
+    if "last_turns" in st.session_state:
+        turns = st.session_state.last_turns
+        st.sidebar.caption(
+            f"Last question: {turns['model_turns']} model turns, "
+            f"{turns['turns_saved']} saved by the dataset profile"
+        )
+
     # Display all previous chat messages from session state
     # This creates a persistent chat interface
     for message in st.session_state.chat_history:
@@ -217,21 +294,29 @@ async def main():
             return
         
         # Create formatted prompt for the AI agent
-        # Include both file path and user question for context
+        # Include the file path, the dataset profile and the user question for context
+        profile = st.session_state.get("profile")
         prompt_template = dedent("""
             File path: {file_path}
+            Dataset profile:
+            {profile}
             User question: {user_question}
         """).format(
             file_path=st.session_state.tmp_file_path, 
+            profile=profile or "Not available",
             user_question=user_input
         )
 
         # Execute the agent with the formatted prompt
-        # This runs asynchronously to handle the AI processing
-        result = await Runner.run(
-            starting_agent=data_analyzer_agent, 
-            input=prompt_template
-        )
+        # The scheduler shares the agent fairly between browser sessions, so one
+        # user's burst of heavy questions does not hold up everyone else
+        with metering_session(st.session_state.session_id):
+            result = await get_scheduler().run(
+                data_analyzer_agent,
+                prompt_template,
+                tenant=st.session_state.session_id,
+            )
+        st.session_state.last_turns = record_turns(result, profiled=profile is not None)
         
         # Add agent response to chat history
         st.session_state.chat_history.append({
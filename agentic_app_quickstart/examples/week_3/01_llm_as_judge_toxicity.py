@@ -3,13 +3,17 @@ from phoenix.evals import HallucinationEvaluator
 from phoenix.evals import (
     TOXICITY_PROMPT_RAILS_MAP,
     TOXICITY_PROMPT_TEMPLATE,
-    OpenAIModel,
     llm_classify,
 )
+import asyncio
 import os
 
+import pandas as pd
 from dotenv import load_dotenv
 
+from agentic_app_quickstart.examples.evaluations import EvaluationSink
+from agentic_app_quickstart.examples.helpers import get_judge_model
+
 load_dotenv()
 
 def get_data(project_name: str = "agentic_app_quickstart"):
@@ -25,6 +29,7 @@ def get_data(project_name: str = "agentic_app_quickstart"):
 
 
     # 2. Convert spans/traces into dataset examples format expected by Phoenix
+    # Indexed by span id, which llm_classify keeps, so results can be logged back on their spans
     dataset_examples = []
     for _, row in spans_df.iterrows():
         example = {
@@ -33,17 +38,13 @@ def get_data(project_name: str = "agentic_app_quickstart"):
         }
         dataset_examples.append(example)
 
-    return dataset_examples
+    return pd.DataFrame(dataset_examples, index=pd.Index(spans_df.index, name="context.span_id"))
 
 
 def evaluate(eval_df):
 
     print(f"TEMPLATE: {TOXICITY_PROMPT_TEMPLATE}")
-    model = OpenAIModel(
-        base_url=os.getenv("OPENAI_API_ENDPOINT"),
-        api_key=os.getenv("OPENAI_API_KEY"),
-        model="gpt-4.1"
-    )
+    model = get_judge_model()
 
     #It will remove text such as ",,," or "..."
     #Will ensure the binary value expected from the template is returned 
@@ -65,6 +66,12 @@ def main():
     evaluations = evaluate(eval_df = df)
     print(evaluations)
 
+    # Upload the labels to Phoenix in a few bulk requests instead of one per span
+    sink = EvaluationSink()
+    sink.add_dataframe("Toxicity", evaluations)
+    report = asyncio.run(sink.flush())
+    print(f"Uploaded {report.uploaded} evaluations in {report.requests} requests, {report.spooled} kept on disk")
+
 if __name__ == "__main__":
 
     main()
@@ -0,0 +1,1066 @@
+"""
+Data tools shared by the week 1 agent and the Streamlit data analyzer.
+
+Dataset profiles:
+    `get_profile(path)` computes, once per file version, the column names,
+    dtypes, row count, null rates, approximate distinct counts and a few
+    sample values, using a single lazy Polars scan. `DatasetProfile.to_prompt()`
+    renders it compactly so it can go into the prompt at upload time, and the
+    model can skip the `get_headers` discovery round-trip.
+
+Query plans:
+    `plan_query(file_path, plan)` lets the model answer a question that needs
+    filters, grouping, aggregates, sorting and a limit in a single tool call
+    instead of a chain of small ones. The plan is validated against the cached
+    profile's schema, every problem is reported at once, and it is compiled
+    into one lazy Polars query, so the optimizer pushes the filters and the
+    column selection down into the CSV scan.
+
+Sampled estimates:
+    `estimate_stat(file_path, column, stat)` answers count, sum, mean and
+    distinct-count questions on files too large to scan interactively. It reads
+    random blocks of the file, without replacement, and refines the estimate
+    and its confidence interval after every block until the interval is within
+    the requested precision or the time budget is spent. If every block gets
+    read, the answer is exact, and the result says which of the two it is.
+    Blocks are cut at line breaks, so quoted fields spanning several lines are
+    not supported.
+
+Time series:
+    `resample`, `moving_average`, `period_growth` and `seasonal_summary` answer
+    time-window questions on date-indexed files (weather, sales) with Polars'
+    `group_by_dynamic` and `rolling`. `get_series(path)` parses the date column
+    and sorts the file by it once per file version and keeps the frame, so
+    repeated questions about the same file neither re-parse nor re-sort it, and
+    `start`/`end` windows are cut by binary search on the sorted dates.
+"""
+
+import calendar
+import io
+import math
+import os
+import random
+import re
+import statistics
+import threading
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Literal
+
+import polars as pl
+from pydantic import BaseModel, Field
+
+
+@dataclass(frozen=True)
+class ColumnProfile:
+    """
+    Summary of one column.
+
+    Attributes:
+        name (str): Column name
+        dtype (pl.DataType): Polars dtype
+        null_rate (float): Fraction of null values
+        approx_distinct (int): Approximate number of distinct values (HyperLogLog)
+        samples (tuple[str, ...]): A few distinct non-null values
+    """
+
+    name: str
+    dtype: pl.DataType
+    null_rate: float
+    approx_distinct: int
+    samples: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class DatasetProfile:
+    """
+    Summary of a CSV file, computed once per file version.
+
+    Attributes:
+        path (str): Absolute path of the file
+        rows (int): Number of rows
+        columns (tuple[ColumnProfile, ...]): One entry per column, in file order
+    """
+
+    path: str
+    rows: int
+    columns: tuple[ColumnProfile, ...]
+
+    @property
+    def schema(self) -> dict[str, pl.DataType]:
+        return {column.name: column.dtype for column in self.columns}
+
+    def to_prompt(self, max_columns: int = 60, max_sample_chars: int = 24) -> str:
+        """
+        Compact text form for the model's context.
+
+        Args:
+            max_columns (int): Columns listed before the rest are summarized
+            max_sample_chars (int): Sample values are cut to this length
+
+        Returns:
+            str: One header line plus one line per column
+        """
+        lines = [f"Dataset {os.path.basename(self.path)}: {self.rows:,} rows, {len(self.columns)} columns"]
+        for column in self.columns[:max_columns]:
+            samples = ", ".join(s[:max_sample_chars] for s in column.samples)
+            lines.append(
+                f"- {column.name} ({column.dtype}; {column.null_rate:.0%} null; "
+                f"~{column.approx_distinct:,} distinct) e.g. {samples}"
+            )
+        if len(self.columns) > max_columns:
+            lines.append(f"- ... {len(self.columns) - max_columns} more columns, use get_headers to list them")
+        return "\n".join(lines)
+
+
+def profile_dataset(file_path: str, sample_values: int = 3) -> DatasetProfile:
+    """
+    Profile a CSV file with one lazy scan for the aggregates and a short head read for samples.
+
+    Args:
+        file_path (str): Path to the CSV file
+        sample_values (int): Sample values kept per column
+
+    Returns:
+        DatasetProfile: The profile
+    """
+    scan = pl.scan_csv(file_path, infer_schema_length=10_000)
+    schema = scan.collect_schema()
+
+    stats = scan.select(
+        pl.len().alias("__rows__"),
+        *(pl.col(name).null_count().alias(f"{name}__nulls") for name in schema),
+        *(pl.col(name).approx_n_unique().alias(f"{name}__distinct") for name in schema),
+    ).collect()
+    head = scan.head(200).collect()
+
+    rows = stats["__rows__"][0]
+    columns = []
+    for name, dtype in schema.items():
+        samples = head[name].drop_nulls().unique(maintain_order=True).head(sample_values)
+        columns.append(
+            ColumnProfile(
+                name=name,
+                dtype=dtype,
+                null_rate=stats[f"{name}__nulls"][0] / rows if rows else 0.0,
+                approx_distinct=int(stats[f"{name}__distinct"][0]),
+                samples=tuple(str(value) for value in samples),
+            )
+        )
+    return DatasetProfile(path=os.path.abspath(file_path), rows=rows, columns=tuple(columns))
+
+
+_profiles: OrderedDict[tuple, DatasetProfile] = OrderedDict()
+_profiles_lock = threading.Lock()
+
+
+def get_profile(file_path: str, max_cached: int = 32) -> DatasetProfile:
+    """
+    Cached `profile_dataset`; the cache key includes the file's size and mtime,
+    so a re-uploaded file is profiled again.
+
+    Args:
+        file_path (str): Path to the CSV file
+        max_cached (int): Profiles kept, least recently used first out
+
+    Returns:
+        DatasetProfile: The profile
+    """
+    stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    with _profiles_lock:
+        profile = _profiles.get(key)
+        if profile is not None:
+            _profiles.move_to_end(key)
+            return profile
+
+    profile = profile_dataset(file_path)
+    with _profiles_lock:
+        _profiles[key] = profile
+        while len(_profiles) > max_cached:
+            _profiles.popitem(last=False)
+    return profile
+
+
+class Filter(BaseModel):
+    """A row filter; all filters of a plan must match."""
+
+    column: str
+    op: Literal["==", "!=", ">", ">=", "<", "<=", "in", "not_in", "contains", "is_null", "is_not_null"]
+    value: str | float | bool | list[str] | list[float] | None = Field(
+        None, description="Compared value; a list for in/not_in, omitted for is_null/is_not_null"
+    )
+
+
+class Aggregate(BaseModel):
+    """An aggregate, per group when the plan has `group_by`, else over all rows."""
+
+    column: str = Field(description='Column to aggregate, or "*" with func "count" for the row count')
+    func: Literal["count", "n_unique", "sum", "mean", "median", "min", "max", "std"]
+    alias: str | None = Field(None, description="Output column name, defaults to <column>_<func>")
+
+
+class Sort(BaseModel):
+    """A sort key; must name a column of the result."""
+
+    column: str
+    descending: bool
+
+
+class QueryPlan(BaseModel):
+    """
+    A query over one CSV file, executed as: filters, then group_by + aggregates
+    (or aggregates alone, or the `select` columns), then sort, then limit.
+    """
+
+    filters: list[Filter]
+    group_by: list[str]
+    aggregates: list[Aggregate]
+    select: list[str] = Field(description="Columns to return when there are no aggregates; empty for all")
+    sort: list[Sort]
+    limit: int | None = Field(None, description="Maximum rows to return, at most 1000")
+
+
+class PlanError(ValueError):
+    """A query plan that does not fit the dataset; the message lists every problem."""
+
+
+MAX_PLAN_ROWS = 1000
+
+_COMPARISONS = {
+    "==": "eq",
+    "!=": "ne",
+    ">": "gt",
+    ">=": "ge",
+    "<": "lt",
+    "<=": "le",
+}
+_NUMERIC_FUNCS = {"sum", "mean", "median", "std"}
+
+
+def _parse_literal(value, dtype: pl.DataType):
+    """
+    The model's JSON value as a value of the column's dtype, e.g. "2024-01-15" as a Date.
+
+    Numbers are never truncated: a fractional number for an integer column is
+    returned as a float, and the column is compared as Float64.
+
+    Raises:
+        ValueError: If the value does not parse to the dtype
+    """
+    if isinstance(value, bool) and dtype != pl.Boolean:
+        raise ValueError
+    if dtype.is_integer() or dtype.is_float():
+        if isinstance(value, str):
+            value = float(value) if any(c in value.lower() for c in ".en") else int(value)
+        if not isinstance(value, (int, float)):
+            raise ValueError
+        if dtype.is_float():
+            return float(value)
+        return int(value) if isinstance(value, int) or value.is_integer() else float(value)
+    if dtype == pl.String:
+        if not isinstance(value, (str, int, float)):
+            raise ValueError
+        return str(value)
+    if dtype == pl.Boolean:
+        if isinstance(value, str) and value.lower() in ("true", "false"):
+            return value.lower() == "true"
+        if not isinstance(value, bool):
+            raise ValueError
+        return value
+    if not isinstance(value, str) and dtype in (pl.Date, pl.Datetime):
+        raise ValueError
+    try:
+        if dtype == pl.Date:
+            return pl.Series([value]).str.to_date()[0]
+        if dtype == pl.Datetime:
+            return pl.Series([value]).str.to_datetime().cast(dtype)[0]
+        return pl.Series([value]).cast(dtype, strict=True)[0]
+    except pl.exceptions.PolarsError:
+        raise ValueError from None
+
+
+def _filter_expr(f: Filter, dtype: pl.DataType, problems: list[str]) -> pl.Expr | None:
+    column = pl.col(f.column)
+    if f.op == "is_null":
+        return column.is_null()
+    if f.op == "is_not_null":
+        return column.is_not_null()
+    if f.value is None:
+        problems.append(f"filter on {f.column!r} with op {f.op!r} needs a value")
+        return None
+    if f.op not in ("in", "not_in") and isinstance(f.value, list):
+        problems.append(f"filter on {f.column!r} with op {f.op!r} takes a single value, not a list")
+        return None
+    if f.op == "contains":
+        if dtype != pl.String:
+            problems.append(f"filter op 'contains' needs a text column; {f.column!r} is {dtype}")
+            return None
+        return column.str.contains(str(f.value), literal=True)
+
+    values = f.value if isinstance(f.value, list) else [f.value]
+    parsed = []
+    for value in values:
+        try:
+            parsed.append(_parse_literal(value, dtype))
+        except (ValueError, TypeError):
+            problems.append(f"filter value {value!r} for {f.column!r} is not a valid {dtype}")
+    if len(parsed) < len(values):
+        return None
+    if any(isinstance(value, float) for value in parsed) and dtype.is_integer():
+        # Compare as floats rather than truncate, so quantity >= 2.5 does not match 2
+        column, dtype = column.cast(pl.Float64), pl.Float64
+        parsed = [float(value) for value in parsed]
+
+    if f.op in ("in", "not_in"):
+        expr = column.is_in(pl.Series(parsed, dtype=dtype))
+        return expr if f.op == "in" else ~expr
+    return getattr(column, _COMPARISONS[f.op])(pl.lit(parsed[0], dtype=dtype))
+
+
+def _aggregate_expr(a: Aggregate, schema: dict[str, pl.DataType], problems: list[str]) -> pl.Expr | None:
+    name = a.alias or (f"{a.column}_{a.func}" if a.column != "*" else "count")
+    if a.column == "*":
+        if a.func != "count":
+            problems.append(f'aggregate "*" only supports func "count", not {a.func!r}')
+            return None
+        return pl.len().alias(name)
+    if a.func in _NUMERIC_FUNCS and not schema[a.column].is_numeric():
+        problems.append(f"aggregate {a.func!r} needs a numeric column; {a.column!r} is {schema[a.column]}")
+        return None
+    return getattr(pl.col(a.column), a.func)().alias(name)
+
+
+def compile_plan(plan: QueryPlan, file_path: str) -> pl.LazyFrame:
+    """
+    Validate `plan` against the file's cached profile and build the lazy query.
+
+    The scan reuses the profile's schema, so the CSV is not inferred again.
+
+    Args:
+        plan (QueryPlan): The plan
+        file_path (str): Path to the CSV file
+
+    Returns:
+        pl.LazyFrame: The query, limited to at most `MAX_PLAN_ROWS` + 1 rows
+
+    Raises:
+        PlanError: If the plan names unknown columns or does not fit their dtypes
+    """
+    schema = get_profile(file_path).schema
+    available = ", ".join(schema)
+    problems = []
+
+    referenced = [f.column for f in plan.filters] + plan.group_by + plan.select
+    referenced += [a.column for a in plan.aggregates if a.column != "*"]
+    for column in dict.fromkeys(referenced):
+        if column not in schema:
+            problems.append(f"unknown column {column!r}")
+    if problems:
+        raise PlanError("; ".join(problems) + f". Available columns: {available}")
+
+    predicates = [_filter_expr(f, schema[f.column], problems) for f in plan.filters]
+    aggregates = [_aggregate_expr(a, schema, problems) for a in plan.aggregates]
+    if plan.group_by and not plan.aggregates:
+        problems.append("group_by needs at least one aggregate")
+
+    if plan.aggregates:
+        output = plan.group_by + [a.meta.output_name() for a in aggregates if a is not None]
+    else:
+        output = plan.select or list(schema)
+    duplicates = [name for name, count in Counter(output).items() if count > 1]
+    if duplicates:
+        problems.append(
+            f"result columns must have unique names, {', '.join(map(repr, duplicates))} appear more than once; "
+            "give aggregates distinct aliases"
+        )
+    for key in plan.sort:
+        if key.column not in output:
+            problems.append(f"sort column {key.column!r} is not in the result columns ({', '.join(output)})")
+    if plan.limit is not None and plan.limit < 1:
+        problems.append("limit must be at least 1")
+    if problems:
+        raise PlanError("; ".join(problems))
+
+    query = pl.scan_csv(file_path, schema=schema)
+    if predicates:
+        query = query.filter(*predicates)
+    if plan.group_by:
+        # Groups in order of appearance, so ties come out the same on every call
+        query = query.group_by(plan.group_by, maintain_order=True).agg(aggregates)
+    elif plan.aggregates:
+        query = query.select(aggregates)
+    elif plan.select:
+        query = query.select(plan.select)
+    if plan.sort:
+        query = query.sort(
+            [key.column for key in plan.sort],
+            descending=[key.descending for key in plan.sort],
+            nulls_last=True,
+            maintain_order=True,
+        )
+    limit = min(plan.limit or MAX_PLAN_ROWS, MAX_PLAN_ROWS)
+    return query.head(limit + 1)
+
+
+def plan_query(file_path: str, plan: QueryPlan) -> dict:
+    """
+    Answer a question about a CSV file with one query: filter rows, group and aggregate, sort and limit.
+
+    Prefer this over several smaller tool calls. Column names must match the
+    dataset profile exactly. Dates can be compared as "YYYY-MM-DD" strings.
+
+    Args:
+        file_path (str): Absolute path to the CSV file
+        plan (QueryPlan): The query to run
+
+    Returns:
+        dict: `columns`, `rows` (one dict per row) and `truncated`, true when
+            more rows matched than the limit
+
+    Example:
+        >>> plan_query("/path/to/sales.csv", QueryPlan(
+        ...     filters=[Filter(column="customer_state", op="==", value="CA")],
+        ...     group_by=["product"],
+        ...     aggregates=[Aggregate(column="quantity", func="sum", alias="units")],
+        ...     select=[], sort=[Sort(column="units", descending=True)], limit=5,
+        ... ))
+        {'columns': ['product', 'units'], 'rows': [{'product': 'Laptop', 'units': 14}, ...], 'truncated': False}
+    """
+    limit = min(plan.limit or MAX_PLAN_ROWS, MAX_PLAN_ROWS)
+    df = compile_plan(plan, file_path).collect()
+    return {
+        "columns": df.columns,
+        "rows": df.head(limit).to_dicts(),
+        "truncated": df.height > limit,
+        "exact": True,
+    }
+
+
+MIN_SAMPLE_BLOCKS = 8
+
+
+class BlockSampler:
+    """
+    Random access to a CSV file in blocks of about `block_bytes`.
+
+    A line belongs to the block its first byte falls in, so every line is read
+    exactly once when all blocks are read.
+
+    Args:
+        file_path (str): Path to the CSV file
+        block_bytes (int): Target size of a block
+        seed (int, optional): Seed for the block order
+        pilot_blocks (int): Blocks whose residuals set the variance of later intervals
+    """
+
+    def __init__(self, file_path: str, block_bytes: int = 1 << 20, seed: int | None = None):
+        self.file_path = file_path
+        self.block_bytes = block_bytes
+        self.schema = pl.scan_csv(file_path, infer_schema_length=10_000).collect_schema()
+        with open(file_path, "rb") as f:
+            self.header = f.readline()
+        self.data_bytes = os.path.getsize(file_path) - len(self.header)
+        self.blocks = max(1, -(-self.data_bytes // block_bytes))
+        self._rng = random.Random(seed)
+
+    def read_block(self, index: int, columns: list[str] | None = None) -> tuple[pl.DataFrame, int]:
+        """The rows of block `index` and the bytes they take, which sum to `data_bytes` over all blocks."""
+        start = len(self.header) + index * self.block_bytes
+        end = min(start + self.block_bytes, len(self.header) + self.data_bytes)
+        with open(self.file_path, "rb") as f:
+            # Skip the rest of the line that started in the previous block, or the header
+            f.seek(start - 1)
+            f.readline()
+            position = f.tell()
+            data = f.read(max(0, end - position)) if position < end else b""
+            if data and not data.endswith(b"\n"):
+                data += f.readline()
+        frame = pl.read_csv(io.BytesIO(self.header + data), schema=self.schema, columns=columns)
+        return frame, len(data)
+
+    def shuffled(self) -> list[int]:
+        order = list(range(self.blocks))
+        self._rng.shuffle(order)
+        return order
+
+
+@dataclass(frozen=True)
+class Estimate:
+    """
+    A statistic estimated from a sample of blocks, or computed exactly.
+
+    Attributes:
+        stat (str): "count", "sum", "mean" or "n_unique"
+        value (float): The estimate
+        low (float): Lower end of the confidence interval
+        high (float): Upper end of the confidence interval
+        exact (bool): Whether every row was read
+        confidence (float): Confidence level of the interval
+        rows_read (int): Rows read so far
+        blocks_read (int): Blocks read so far
+        fraction_read (float): Fraction of the file's blocks read
+    """
+
+    stat: str
+    value: float
+    low: float
+    high: float
+    exact: bool
+    confidence: float
+    rows_read: int
+    blocks_read: int
+    fraction_read: float
+
+    @property
+    def relative_error(self) -> float:
+        return (self.high - self.low) / 2 / abs(self.value) if self.value else float("inf")
+
+    def to_dict(self) -> dict:
+        return {
+            "stat": self.stat,
+            "value": self.value,
+            "exact": self.exact,
+            "confidence_interval": None if self.exact else [self.low, self.high],
+            "confidence": None if self.exact else self.confidence,
+            "fraction_of_file_read": round(self.fraction_read, 4),
+        }
+
+
+def _t_quantile(p: float, df: int) -> float:
+    """Quantile of Student's t distribution (Cornish-Fisher expansion; exact for 1 and 2 degrees of freedom)."""
+    if df == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if df == 2:
+        return (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+    z = statistics.NormalDist().inv_cdf(p)
+    return (
+        z
+        + (z**3 + z) / (4 * df)
+        + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * df**2)
+        + (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / (384 * df**3)
+        + (79 * z**9 + 776 * z**7 + 1482 * z**5 - 1920 * z**3 - 945 * z) / (92160 * df**4)
+    )
+
+
+def iter_estimates(
+    file_path: str,
+    column: str,
+    stat: Literal["count", "sum", "mean", "n_unique"],
+    confidence: float = 0.95,
+    block_bytes: int = 1 << 20,
+    seed: int | None = None,
+    pilot_blocks: int = MIN_SAMPLE_BLOCKS,
+) -> Iterator[Estimate]:
+    """
+    Yield a refined estimate after every block read, ending with the exact value.
+
+    Blocks are cluster samples drawn without replacement. Blocks differ in
+    size (the last one is partial, and lines are cut at line breaks), so
+    totals are ratio estimates, values per byte read times the file's data
+    bytes, and the mean is values per non-null count. Both have a Student t
+    interval from the blocks' residuals with finite population correction;
+    with only a few blocks read, a normal interval would be too narrow.
+    Distinct counts use the GEE estimator, whose interval runs from the values
+    seen so far to every singleton standing for N/n distinct values.
+
+    After the first `pilot_blocks` blocks, the residual variance is kept from
+    that pilot (Stein's two-stage procedure), so stopping once the interval is
+    narrow enough does not favour samples whose variance happens to look
+    small, and the interval keeps its coverage.
+
+    Args:
+        file_path (str): Path to the CSV file
+        column (str): Column to summarize
+        stat (str): "count" (non-null values), "sum", "mean" or "n_unique"
+        confidence (float): Confidence level of the intervals
+        block_bytes (int): Target size of a block
+        seed (int, optional): Seed for the block order
+        pilot_blocks (int): Blocks whose residuals set the variance of later intervals
+
+    Yields:
+        Estimate: One per block read
+
+    Raises:
+        ValueError: If the column does not exist or the statistic needs a numeric column
+    """
+    sampler = BlockSampler(file_path, block_bytes, seed)
+    if column not in sampler.schema:
+        raise ValueError(f"Unknown column {column!r}. Available columns: {', '.join(sampler.schema)}")
+    if stat in ("sum", "mean") and not sampler.schema[column].is_numeric():
+        raise ValueError(f"{stat!r} needs a numeric column; {column!r} is {sampler.schema[column]}")
+
+    total = sampler.blocks
+    counts, sums, sizes, rows_read = [], [], [], 0
+    spread = None
+    frequencies: Counter = Counter()
+
+    for read, index in enumerate(sampler.shuffled(), start=1):
+        frame, size = sampler.read_block(index, [column])
+        values = frame[column]
+        sizes.append(size)
+        rows_read += len(values)
+        counts.append(len(values) - values.null_count())
+        if stat in ("sum", "mean"):
+            sums.append(values.sum() or 0)
+        elif stat == "n_unique":
+            frequencies.update(dict(values.drop_nulls().value_counts().iter_rows()))
+
+        exact = read == total
+        fpc = 1 - read / total
+        if stat == "n_unique":
+            seen = len(frequencies)
+            singletons = sum(1 for f in frequencies.values() if f == 1)
+            scale = total / read
+            value = seen - singletons + scale**0.5 * singletons
+            low, high = seen, seen - singletons + scale * singletons
+        else:
+            # Ratio of two block totals: values per non-null count for the
+            # mean, values per byte (times the data bytes) for count and sum
+            units, base = (sums, counts) if stat == "mean" else (counts if stat == "count" else sums, sizes)
+            scale = 1 if stat == "mean" else sampler.data_bytes
+            ratio = sum(units) / sum(base) if sum(base) else float("nan")
+            value = ratio * scale
+            if read > 1 and sum(base) and (read <= pilot_blocks or spread is None):
+                mean_base = sum(base) / read
+                residuals = sum((u - ratio * b) ** 2 for u, b in zip(units, base)) / (read - 1)
+                spread = _t_quantile((1 + confidence) / 2, read - 1) * residuals**0.5 / mean_base
+            if spread is not None:
+                half = scale * spread * (fpc / read) ** 0.5
+            else:
+                half = float("inf")
+            low, high = value - half, value + half
+
+        if exact:
+            low = high = value = (len(frequencies) if stat == "n_unique" else value)
+        yield Estimate(stat, value, low, high, exact, confidence, rows_read, read, read / total)
+
+
+def estimate_stat(
+    file_path: str,
+    column: str,
+    stat: Literal["count", "sum", "mean", "n_unique"],
+    precision: float = 0.01,
+    time_budget_seconds: float = 2.0,
+) -> dict:
+    """
+    Estimate a column statistic on a large CSV file from a random sample, with a 95% confidence interval.
+
+    Faster than an exact answer on large files. Sampling stops once the
+    interval's half-width is within `precision` of the estimate or the time
+    budget is spent; small files are read completely and the answer is exact.
+    Tell the user whether the answer is exact or estimated.
+
+    Args:
+        file_path (str): Absolute path to the CSV file
+        column (str): Name of the column
+        stat (str): "count" (non-null values), "sum", "mean" or "n_unique" (distinct values)
+        precision (float): Target relative half-width of the interval, e.g. 0.01 for ±1%
+        time_budget_seconds (float): Stop sampling after this many seconds
+
+    Returns:
+        dict: `value`, `exact`, `confidence_interval` ([low, high], null when
+            exact), `confidence` and `fraction_of_file_read`
+
+    Example:
+        >>> estimate_stat("/path/to/big.csv", "amount", "mean")
+        {'stat': 'mean', 'value': 250.3, 'exact': False, 'confidence_interval': [248.1, 252.5], ...}
+    """
+    deadline = time.monotonic() + time_budget_seconds
+    for estimate in iter_estimates(file_path, column, stat):
+        if estimate.exact or estimate.blocks_read >= MIN_SAMPLE_BLOCKS and estimate.relative_error <= precision:
+            break
+        if time.monotonic() >= deadline:
+            break
+    return estimate.to_dict()
+
+
+@dataclass(frozen=True)
+class SeriesFrame:
+    """
+    A CSV file parsed and sorted by its date column, cached per file version.
+
+    Attributes:
+        path (str): Absolute path of the file
+        date_column (str): Column the rows are sorted by, of dtype Date or Datetime
+        frame (pl.DataFrame): Every row with a date, oldest first
+    """
+
+    path: str
+    date_column: str
+    frame: pl.DataFrame
+
+    def window(self, start: str | None = None, end: str | None = None) -> pl.DataFrame:
+        """Rows dated from `start` up to and including `end` ("YYYY-MM-DD"), cut by binary search."""
+        dates = self.frame[self.date_column]
+        first, last = 0, self.frame.height
+        if start:
+            first = dates.search_sorted(_date_value(start, dates.dtype), side="left")
+        if end and dates.dtype == pl.Datetime and len(end) <= 10:
+            # A bare date includes the whole day
+            last = dates.search_sorted(_date_value(end, dates.dtype) + timedelta(days=1), side="left")
+        elif end:
+            last = dates.search_sorted(_date_value(end, dates.dtype), side="right")
+        return self.frame.slice(first, max(0, last - first))
+
+
+_DURATION = re.compile(r"^(\d+(ns|us|ms|s|m|h|d|w|mo|q|y))+$")
+_SERIES_AGGREGATES = ("sum", "mean", "median", "min", "max", "count", "std")
+_SEASONS = {
+    "month": lambda d: d.dt.month(),
+    "quarter": lambda d: d.dt.quarter(),
+    "weekday": lambda d: d.dt.weekday(),
+    "day_of_month": lambda d: d.dt.day(),
+    "hour": lambda d: d.dt.hour(),
+}
+
+
+def _date_value(value: str, dtype: pl.DataType):
+    try:
+        parsed = pl.Series([value]).str.to_datetime(strict=False)
+    except pl.exceptions.ComputeError:
+        parsed = pl.Series([None])
+    if parsed.null_count():
+        raise ValueError(f"Cannot read {value!r} as a date; use YYYY-MM-DD")
+    return parsed.cast(dtype)[0]
+
+
+def _parse_dates(column: pl.Series) -> pl.Series | None:
+    """The column as Date, or Datetime if it has times, None if it does not hold dates."""
+    if column.dtype in (pl.Date, pl.Datetime):
+        return column
+    if column.dtype != pl.String:
+        return None
+    for parse in (lambda c: c.str.to_date(strict=False), lambda c: c.str.to_datetime(strict=False)):
+        try:
+            parsed = parse(column)
+        except pl.exceptions.ComputeError:
+            # No date format fits the values
+            continue
+        if parsed.null_count() == column.null_count() and parsed.null_count() < len(column):
+            return parsed
+    return None
+
+
+def _find_date_column(profile: DatasetProfile) -> str:
+    for column in profile.columns:
+        if column.dtype in (pl.Date, pl.Datetime):
+            return column.name
+    for column in profile.columns:
+        if column.dtype == pl.String and column.samples and _parse_dates(pl.Series(column.samples)) is not None:
+            return column.name
+    raise ValueError(
+        f"{os.path.basename(profile.path)} has no date column. Columns: {', '.join(profile.schema)}"
+    )
+
+
+def load_series(file_path: str, date_column: str | None = None) -> SeriesFrame:
+    """
+    Read a CSV file with its date column parsed, sorted oldest first.
+
+    Args:
+        file_path (str): Path to the CSV file
+        date_column (str, optional): Defaults to the first column holding dates
+
+    Returns:
+        SeriesFrame: The sorted frame
+
+    Raises:
+        ValueError: If the file has no such column, or it does not hold dates
+    """
+    profile = get_profile(file_path)
+    date_column = date_column or _find_date_column(profile)
+    if date_column not in profile.schema:
+        raise ValueError(f"Unknown column {date_column!r}. Available columns: {', '.join(profile.schema)}")
+    frame = pl.read_csv(file_path, schema=profile.schema)
+    dates = _parse_dates(frame[date_column])
+    if dates is None:
+        raise ValueError(f"Column {date_column!r} does not hold dates")
+    frame = frame.with_columns(dates).drop_nulls(date_column).sort(date_column, maintain_order=True)
+    return SeriesFrame(path=profile.path, date_column=date_column, frame=frame)
+
+
+_series: OrderedDict[tuple, SeriesFrame] = OrderedDict()
+_series_lock = threading.Lock()
+
+
+def get_series(file_path: str, date_column: str | None = None, max_cached: int = 8) -> SeriesFrame:
+    """
+    Cached `load_series`; like `get_profile`, the key includes the file's size and mtime.
+
+    Args:
+        file_path (str): Path to the CSV file
+        date_column (str, optional): Defaults to the first column holding dates
+        max_cached (int): Frames kept, least recently used first out
+
+    Returns:
+        SeriesFrame: The sorted frame
+    """
+    stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns, date_column)
+    with _series_lock:
+        series = _series.get(key)
+        if series is not None:
+            _series.move_to_end(key)
+            return series
+
+    series = load_series(file_path, date_column)
+    with _series_lock:
+        _series[key] = series
+        while len(_series) > max_cached:
+            _series.popitem(last=False)
+    return series
+
+
+def _check_series_args(
+    series: SeriesFrame, column: str, agg: str, group_by: str | None, durations: dict[str, str]
+) -> None:
+    schema = series.frame.schema
+    problems = []
+    if column != "*" and column not in schema:
+        problems.append(f"unknown column {column!r}")
+    elif column == "*" and agg != "count":
+        problems.append('column "*" only supports agg "count"')
+    elif agg not in ("count", "min", "max") and column != "*" and not schema[column].is_numeric():
+        problems.append(f"agg {agg!r} needs a numeric column; {column!r} is {schema[column]}")
+    if agg not in _SERIES_AGGREGATES:
+        problems.append(f"agg must be one of {', '.join(_SERIES_AGGREGATES)}, not {agg!r}")
+    if group_by is not None and group_by not in schema:
+        problems.append(f"unknown group_by column {group_by!r}")
+    for name, value in durations.items():
+        if not _DURATION.match(value):
+            problems.append(f"{name} {value!r} is not a duration such as 7d, 2w, 1mo, 1q or 1y")
+    if problems:
+        raise ValueError("; ".join(problems) + f". Available columns: {', '.join(schema)}")
+
+
+def _series_agg(column: str, agg: str, alias: str) -> pl.Expr:
+    if column == "*":
+        return pl.len().alias(alias)
+    return getattr(pl.col(column), agg)().alias(alias)
+
+
+def _series_result(df: pl.DataFrame) -> dict:
+    """Rows for the model: dates as text, floats rounded, at most `MAX_PLAN_ROWS`."""
+    df = df.with_columns(
+        pl.col(pl.Date).cast(pl.String),
+        pl.col(pl.Datetime).dt.to_string("%Y-%m-%d %H:%M:%S"),
+        pl.col(pl.Float32, pl.Float64).round(4),
+    )
+    return {
+        "columns": df.columns,
+        "rows": df.head(MAX_PLAN_ROWS).to_dicts(),
+        "truncated": df.height > MAX_PLAN_ROWS,
+    }
+
+
+def resample(
+    file_path: str,
+    column: str,
+    every: str = "1mo",
+    agg: Literal["sum", "mean", "median", "min", "max", "count", "std"] = "mean",
+    group_by: str | None = None,
+    start: str | None = None,
+    end: str | None = None,
+    date_column: str | None = None,
+) -> dict:
+    """
+    Aggregate a column of a date-indexed CSV file per calendar period, e.g. monthly revenue or weekly mean temperature.
+
+    Args:
+        file_path (str): Absolute path to the CSV file
+        column (str): Column to aggregate, or "*" with agg "count" for rows per period
+        every (str): Period length: 1d, 1w, 1mo, 1q, 1y, or multiples such as 2w
+        agg (str): Aggregate per period
+        group_by (str, optional): Column to split the series by, e.g. city
+        start (str, optional): First date to include, "YYYY-MM-DD"
+        end (str, optional): Last date to include, "YYYY-MM-DD"
+        date_column (str, optional): Defaults to the file's first date column
+
+    Returns:
+        dict: `columns`, `rows` (one per group and period with data, labelled by
+            the period's first day) and `truncated`
+
+    Example:
+        >>> resample("/path/to/weather.csv", "temperature", every="1w", agg="mean", group_by="city")
+        {'columns': ['city', 'date', 'temperature_mean'], 'rows': [{'city': 'Chicago', 'date': '2024-01-01', ...}], ...}
+    """
+    series = get_series(file_path, date_column)
+    _check_series_args(series, column, agg, group_by, {"every": every})
+    name = f"{column}_{agg}" if column != "*" else "count"
+    df = series.window(start, end).group_by_dynamic(
+        series.date_column, every=every, group_by=group_by, start_by="window"
+    ).agg(_series_agg(column, agg, name))
+    return _series_result(df)
+
+
+def moving_average(
+    file_path: str,
+    column: str,
+    window: str = "7d",
+    group_by: str | None = None,
+    start: str | None = None,
+    end: str | None = None,
+    date_column: str | None = None,
+) -> dict:
+    """
+    Trailing moving average of a column over a time window, e.g. the 7-day average temperature per city.
+
+    Each row's average covers the rows dated within `window` up to and
+    including it, so gaps in the dates shorten the window rather than
+    stretching it.
+
+    Args:
+        file_path (str): Absolute path to the CSV file
+        column (str): Numeric column to average
+        window (str): Window length, e.g. 3d, 7d, 4w, 1mo
+        group_by (str, optional): Column to compute separate averages for, e.g. city
+        start (str, optional): First date to return, "YYYY-MM-DD"; earlier rows still fill its window
+        end (str, optional): Last date to return, "YYYY-MM-DD"
+        date_column (str, optional): Defaults to the file's first date column
+
+    Returns:
+        dict: `columns`, `rows` (date, group, value, moving average and the
+            number of rows in its window) and `truncated`
+
+    Example:
+        >>> moving_average("/path/to/weather.csv", "temperature", window="3d")
+        {'columns': ['date', 'temperature', 'temperature_avg_3d', 'window_rows'], 'rows': [...], ...}
+    """
+    series = get_series(file_path, date_column)
+    _check_series_args(series, column, "mean", group_by, {"window": window})
+    date = series.date_column
+    df = series.window(None, end).rolling(date, period=window, group_by=group_by).agg(
+        pl.col(column).last(),
+        pl.col(column).mean().alias(f"{column}_avg_{window}"),
+        pl.col(column).count().alias("window_rows"),
+    )
+    if start:
+        df = df.filter(pl.col(date) >= _date_value(start, df.schema[date]))
+    return _series_result(df)
+
+
+def period_growth(
+    file_path: str,
+    column: str,
+    every: str = "1mo",
+    agg: Literal["sum", "mean", "median", "min", "max", "count", "std"] = "sum",
+    group_by: str | None = None,
+    start: str | None = None,
+    end: str | None = None,
+    date_column: str | None = None,
+) -> dict:
+    """
+    Period-over-period change of a column, e.g. month-over-month sales growth per product.
+
+    Values are aggregated per period as in `resample`; periods without rows
+    count as 0 for sum and count, and as missing otherwise, so growth is always
+    against the period right before.
+
+    Args:
+        file_path (str): Absolute path to the CSV file
+        column (str): Column to aggregate, or "*" with agg "count" for rows per period
+        every (str): Period length: 1d, 1w, 1mo, 1q, 1y, or multiples such as 2w
+        agg (str): Aggregate per period
+        group_by (str, optional): Column to compute separate growth for, e.g. product
+        start (str, optional): First date to include, "YYYY-MM-DD"
+        end (str, optional): Last date to include, "YYYY-MM-DD"
+        date_column (str, optional): Defaults to the file's first date column
+
+    Returns:
+        dict: `columns`, `rows` (period value, `change` from the previous
+            period and `growth` as a fraction, null for the first period or
+            after a 0) and `truncated`
+
+    Example:
+        >>> period_growth("/path/to/sales.csv", "quantity", every="1mo", agg="sum")
+        {'columns': ['date', 'quantity_sum', 'change', 'growth'], 'rows': [..., {'date': '2024-02-01', 'quantity_sum': 18, 'change': -34, 'growth': -0.6538}], ...}
+    """
+    series = get_series(file_path, date_column)
+    _check_series_args(series, column, agg, group_by, {"every": every})
+    date = series.date_column
+    name = f"{column}_{agg}" if column != "*" else "count"
+    keys = [group_by] if group_by else []
+    df = series.window(start, end).group_by_dynamic(
+        date, every=every, group_by=group_by, start_by="window"
+    ).agg(_series_agg(column, agg, name))
+    # Fill in empty periods, so each row is compared with the period right before it
+    df = df.sort(*keys, date).upsample(date, every=every, group_by=group_by, maintain_order=True)
+    if group_by:
+        df = df.with_columns(pl.col(group_by).forward_fill())
+    if agg in ("sum", "count"):
+        df = df.with_columns(pl.col(name).fill_null(0))
+    previous = pl.col(name).shift(1)
+    if group_by:
+        previous = previous.over(group_by)
+    df = df.with_columns(
+        (pl.col(name) - previous).alias("change"),
+        pl.when(previous != 0).then(pl.col(name) / previous - 1).alias("growth"),
+    )
+    return _series_result(df.select(*keys, date, name, "change", "growth"))
+
+
+def seasonal_summary(
+    file_path: str,
+    column: str,
+    season: Literal["month", "quarter", "weekday", "day_of_month", "hour"] = "month",
+    group_by: str | None = None,
+    start: str | None = None,
+    end: str | None = None,
+    date_column: str | None = None,
+) -> dict:
+    """
+    Summarize a column by season across all years, e.g. mean precipitation per month or sales per weekday.
+
+    Args:
+        file_path (str): Absolute path to the CSV file
+        column (str): Numeric column to summarize, or "*" for row counts only
+        season (str): "month", "quarter", "weekday" (1 = Monday), "day_of_month" or
+            "hour" (only for dates with times)
+        group_by (str, optional): Column to summarize separately, e.g. city
+        start (str, optional): First date to include, "YYYY-MM-DD"
+        end (str, optional): Last date to include, "YYYY-MM-DD"
+        date_column (str, optional): Defaults to the file's first date column
+
+    Returns:
+        dict: `columns`, `rows` (one per group and season, with its name for
+            months and weekdays, and the mean, min, max and count) and `truncated`
+
+    Example:
+        >>> seasonal_summary("/path/to/weather.csv", "precipitation", season="weekday")
+        {'columns': ['weekday', 'name', 'precipitation_mean', ...], 'rows': [{'weekday': 1, 'name': 'Monday', ...}], ...}
+    """
+    series = get_series(file_path, date_column)
+    _check_series_args(series, column, "count" if column == "*" else "mean", group_by, {})
+    if season not in _SEASONS:
+        raise ValueError(f"season must be one of {', '.join(_SEASONS)}, not {season!r}")
+    if season == "hour" and series.frame.schema[series.date_column] != pl.Datetime:
+        raise ValueError(
+            f"season 'hour' needs timestamps; {series.date_column!r} holds dates only. "
+            "Use 'weekday', 'day_of_month', 'month' or 'quarter'"
+        )
+    keys = ([group_by] if group_by else []) + [season]
+    aggregates = [pl.len().alias("count")]
+    if column != "*":
+        aggregates = [
+            pl.col(column).mean().alias(f"{column}_mean"),
+            pl.col(column).min().alias(f"{column}_min"),
+            pl.col(column).max().alias(f"{column}_max"),
+            pl.col(column).count().alias("count"),
+        ]
+    df = (
+        series.window(start, end)
+        .with_columns(_SEASONS[season](pl.col(series.date_column)).alias(season))
+        .group_by(keys, maintain_order=True)
+        .agg(aggregates)
+        .sort(keys)
+    )
+    names = {"month": calendar.month_name, "weekday": [None, *calendar.day_name]}.get(season)
+    if names is not None:
+        df = df.with_columns(
+            pl.col(season).map_elements(lambda n: names[n], return_dtype=pl.String).alias("name")
+        ).select(*keys, "name", pl.exclude(*keys, "name"))
+    return _series_result(df)
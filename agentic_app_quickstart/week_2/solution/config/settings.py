@@ -0,0 +1,601 @@
+"""
+Application settings.
+
+All configuration the examples need is read here, once, into typed
+dataclasses; `get_settings()` caches the result for the life of the process.
+Call `get_settings.cache_clear()` after changing the environment to reload.
+
+Models are assigned per role rather than per agent. Each role (guardrail
+classifier, reception router, specialist, data analyst, judge) points at a
+model tier and has its own request timeout, so cheap and fast models can
+handle guardrails and routing while specialists keep the strongest model.
+Output is not capped by default, since a cap cuts answers off mid-sentence;
+set `ROLE_<ROLE>_MAX_TOKENS` to opt a role into one.
+
+Environment variables:
+    OPENAI_API_KEY, OPENAI_API_ENDPOINT, PHOENIX_ENDPOINT, PHOENIX_API_KEY
+    MODEL_TIER_<TIER>=gpt-4.1-mini          # model behind a tier
+    ROLE_<ROLE>_TIER=fast                   # tier used by a role
+    ROLE_<ROLE>_TIMEOUT=15                  # request timeout in seconds
+    ROLE_<ROLE>_MAX_TOKENS=256              # output token cap, unset or 0 for none
+    SINGLE_MODEL=gpt-4.1                    # use one model for every role
+    TOOL_EXECUTOR=offload                   # or "inline" to run tools on the event loop
+    TOOL_THREAD_WORKERS=8, TOOL_PROCESS_WORKERS=4, TOOL_TIMEOUT=60
+    TOOL_RESULT_BUDGET_TOKENS=1000, TOOL_RESULT_TTL=900    # see examples/paging.py
+    MODEL_HEDGE=1, MODEL_HEDGE_QUANTILE=0.95, MODEL_HEDGE_MIN_SECONDS=1, MODEL_HEDGE_BUDGET=0.1
+    MODEL_MAX_RETRIES=3, MODEL_RETRY_BACKOFF=0.5           # see ResilientModel in examples/models.py
+    MODEL_BREAKER=1, MODEL_BREAKER_ERROR_RATE=0.5, MODEL_BREAKER_SLOW_SECONDS=20, MODEL_BREAKER_OPEN_SECONDS=30
+    MODEL_FALLBACK=gpt-4.1-mini, MODEL_FALLBACK_ENDPOINT=..., MODEL_FALLBACK_API_KEY=...   # see CircuitBreakerModel
+    RATE_LIMIT_RPM=500, RATE_LIMIT_TPM=200000, RATE_LIMIT_PATH=traces/rate_limit.sqlite    # see examples/ratelimit.py
+    RATE_LIMIT_BURST_SECONDS=10, RATE_LIMIT_BATCH_RESERVE=0.2
+    RUN_MAX_CONCURRENCY=16, RUN_TENANT_CONCURRENCY=2, RUN_TENANT_WEIGHTS=alice=2,bob=1   # see examples/scheduler.py
+    LOOP_POLICY=correct, LOOP_MAX_REPEATS=3, LOOP_MAX_HANDOFF_RETURNS=2, LOOP_MAX_IDLE_TURNS=3  # see examples/loops.py
+    SINGLE_FLIGHT_MODELS=1, SINGLE_FLIGHT_TOOLS=1          # see examples/singleflight.py
+    CASSETTE_MODE=replay, CASSETTE_PATH=traces/cassette.jsonl.gz, CASSETTE_LATENCY=0   # see examples/cassettes.py
+    EVAL_UPLOAD_ENDPOINT=..., EVAL_UPLOAD_CHUNK_ROWS=1000, EVAL_UPLOAD_CONCURRENCY=4      # see examples/evaluations.py
+    EVAL_UPLOAD_RETRIES=3, EVAL_UPLOAD_BACKOFF=0.5, EVAL_UPLOAD_TIMEOUT=30
+    EVAL_UPLOAD_COMPRESSION=zstd, EVAL_UPLOAD_SPOOL=traces/evaluations
+    MEMORY_PATH=traces/memory.sqlite, MEMORY_TOP_K=4, MEMORY_RECENT_TURNS=4    # see examples/memory.py
+    MEMORY_MIN_SIMILARITY=0.1, MEMORY_DIM=512
+    MCP_CACHE_PATH=traces/mcp_cache.sqlite, MCP_CACHE_MAX_MB=64    # see examples/mcp_cache.py
+
+Example:
+    >>> from agentic_app_quickstart.week_2.solution.config.settings import get_settings
+    >>> get_settings().role("guardrail").model
+    'gpt-4.1-mini'
+"""
+
+import functools
+import os
+from dataclasses import dataclass, field, replace
+
+from dotenv import load_dotenv
+
+TIERS = {
+    "small": "gpt-4.1-nano",
+    "fast": "gpt-4.1-mini",
+    "strong": "gpt-4.1",
+}
+
+
+@dataclass(frozen=True)
+class RoleSettings:
+    """
+    Model configuration for one agent role.
+
+    Attributes:
+        tier (str): Key in `Settings.tiers`
+        model (str): Model name resolved from the tier
+        timeout_seconds (float): Request timeout
+        max_tokens (int | None): Cap on output tokens, None for the model default
+    """
+
+    tier: str
+    model: str
+    timeout_seconds: float
+    max_tokens: int | None = None
+
+
+@dataclass(frozen=True)
+class ToolSettings:
+    """
+    How function tools are executed (see `examples/executor.py`).
+
+    Attributes:
+        executor (str): "offload" runs tools in the thread or process pool they
+            ask for, "inline" runs them on the event loop
+        thread_workers (int): Size of the thread pool
+        process_workers (int): Size of the process pool
+        timeout_seconds (float): Default per-call timeout
+        result_budget_tokens (int): Tool results over this are paged
+        result_ttl_seconds (float): Lifetime of the cursor of a paged result
+    """
+
+    executor: str = "offload"
+    thread_workers: int = min(32, (os.cpu_count() or 1) + 4)
+    process_workers: int = os.cpu_count() or 1
+    timeout_seconds: float = 60.0
+    result_budget_tokens: int = 1000
+    result_ttl_seconds: float = 900.0
+
+    @classmethod
+    def from_env(cls) -> "ToolSettings":
+        defaults = cls()
+        executor = os.getenv("TOOL_EXECUTOR", defaults.executor)
+        if executor not in ("offload", "inline"):
+            raise ValueError(f"TOOL_EXECUTOR={executor!r} must be 'offload' or 'inline'")
+        return cls(
+            executor=executor,
+            thread_workers=int(os.getenv("TOOL_THREAD_WORKERS", defaults.thread_workers)),
+            process_workers=int(os.getenv("TOOL_PROCESS_WORKERS", defaults.process_workers)),
+            timeout_seconds=float(os.getenv("TOOL_TIMEOUT", defaults.timeout_seconds)),
+            result_budget_tokens=int(
+                os.getenv("TOOL_RESULT_BUDGET_TOKENS", defaults.result_budget_tokens)
+            ),
+            result_ttl_seconds=float(os.getenv("TOOL_RESULT_TTL", defaults.result_ttl_seconds)),
+        )
+
+
+@dataclass(frozen=True)
+class ResilienceSettings:
+    """
+    Hedging and retries of model requests (see `ResilientModel` in `examples/models.py`).
+
+    Attributes:
+        hedge (bool): Send a duplicate request when the first is slower than usual
+        hedge_quantile (float): Latency quantile of recent requests after which to hedge
+        hedge_min_seconds (float): Never hedge earlier than this
+        hedge_min_samples (int): Recent requests needed before the quantile is trusted
+        hedge_budget (float): Maximum fraction of requests that may be hedged
+        max_retries (int): Retries of a failed request (connection errors, 408, 409, 429, 5xx)
+        backoff_seconds (float): Base of the exponential backoff, before jitter
+        backoff_max_seconds (float): Cap on one backoff
+    """
+
+    hedge: bool = True
+    hedge_quantile: float = 0.95
+    hedge_min_seconds: float = 1.0
+    hedge_min_samples: int = 20
+    hedge_budget: float = 0.1
+    max_retries: int = 3
+    backoff_seconds: float = 0.5
+    backoff_max_seconds: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "ResilienceSettings":
+        defaults = cls()
+        return cls(
+            hedge=os.getenv("MODEL_HEDGE", "1").lower() not in ("0", "false", "no"),
+            hedge_quantile=float(os.getenv("MODEL_HEDGE_QUANTILE", defaults.hedge_quantile)),
+            hedge_min_seconds=float(os.getenv("MODEL_HEDGE_MIN_SECONDS", defaults.hedge_min_seconds)),
+            hedge_min_samples=defaults.hedge_min_samples,
+            hedge_budget=float(os.getenv("MODEL_HEDGE_BUDGET", defaults.hedge_budget)),
+            max_retries=int(os.getenv("MODEL_MAX_RETRIES", defaults.max_retries)),
+            backoff_seconds=float(os.getenv("MODEL_RETRY_BACKOFF", defaults.backoff_seconds)),
+            backoff_max_seconds=defaults.backoff_max_seconds,
+        )
+
+
+@dataclass(frozen=True)
+class BreakerSettings:
+    """
+    Circuit breaker around the model endpoint (see `CircuitBreakerModel` in `examples/models.py`).
+
+    Attributes:
+        enabled (bool): Trip the breaker when the endpoint degrades
+        window_seconds (float): Period over which error and slow rates are measured
+        min_requests (int): Requests in the window before the breaker may trip
+        error_rate (float): Fraction of failed requests that trips the breaker
+        slow_seconds (float): Requests slower than this count as slow
+        slow_rate (float): Fraction of slow requests that trips the breaker
+        open_seconds (float): Time the breaker stays open before probing the endpoint
+        half_open_probes (int): Requests let through at once while probing
+        fallback_model (str | None): Model to use while the breaker is open
+        fallback_endpoint (str | None): Base URL of the fallback, None for the primary endpoint
+        fallback_api_key (str | None): Key for the fallback endpoint, None for the primary key
+    """
+
+    enabled: bool = True
+    window_seconds: float = 60.0
+    min_requests: int = 10
+    error_rate: float = 0.5
+    slow_seconds: float = 20.0
+    slow_rate: float = 0.5
+    open_seconds: float = 30.0
+    half_open_probes: int = 1
+    fallback_model: str | None = None
+    fallback_endpoint: str | None = None
+    fallback_api_key: str | None = None
+
+    @classmethod
+    def from_env(cls) -> "BreakerSettings":
+        defaults = cls()
+        return cls(
+            enabled=os.getenv("MODEL_BREAKER", "1").lower() not in ("0", "false", "no"),
+            window_seconds=float(os.getenv("MODEL_BREAKER_WINDOW", defaults.window_seconds)),
+            min_requests=int(os.getenv("MODEL_BREAKER_MIN_REQUESTS", defaults.min_requests)),
+            error_rate=float(os.getenv("MODEL_BREAKER_ERROR_RATE", defaults.error_rate)),
+            slow_seconds=float(os.getenv("MODEL_BREAKER_SLOW_SECONDS", defaults.slow_seconds)),
+            slow_rate=float(os.getenv("MODEL_BREAKER_SLOW_RATE", defaults.slow_rate)),
+            open_seconds=float(os.getenv("MODEL_BREAKER_OPEN_SECONDS", defaults.open_seconds)),
+            half_open_probes=defaults.half_open_probes,
+            fallback_model=os.getenv("MODEL_FALLBACK") or None,
+            fallback_endpoint=os.getenv("MODEL_FALLBACK_ENDPOINT") or None,
+            fallback_api_key=os.getenv("MODEL_FALLBACK_API_KEY") or None,
+        )
+
+    @property
+    def has_fallback(self) -> bool:
+        return bool(self.fallback_model or self.fallback_endpoint)
+
+
+@dataclass(frozen=True)
+class RateLimitSettings:
+    """
+    Client-side rate limit of model requests (see `examples/ratelimit.py`).
+
+    Attributes:
+        requests_per_minute (float): Request budget per key, 0 for unlimited
+        tokens_per_minute (float): Token budget per key, 0 for unlimited
+        burst_seconds (float): Budget that may be spent at once, in seconds of the rate
+        batch_reserve (float): Share of the burst that batch work may not use,
+            kept for interactive requests
+        path (str | None): SQLite file shared by worker processes, None to
+            limit within this process only
+    """
+
+    requests_per_minute: float = 0.0
+    tokens_per_minute: float = 0.0
+    burst_seconds: float = 10.0
+    batch_reserve: float = 0.2
+    path: str | None = None
+
+    @classmethod
+    def from_env(cls) -> "RateLimitSettings":
+        defaults = cls()
+        return cls(
+            requests_per_minute=float(os.getenv("RATE_LIMIT_RPM", defaults.requests_per_minute)),
+            tokens_per_minute=float(os.getenv("RATE_LIMIT_TPM", defaults.tokens_per_minute)),
+            burst_seconds=float(os.getenv("RATE_LIMIT_BURST_SECONDS", defaults.burst_seconds)),
+            batch_reserve=float(os.getenv("RATE_LIMIT_BATCH_RESERVE", defaults.batch_reserve)),
+            path=os.getenv("RATE_LIMIT_PATH") or None,
+        )
+
+
+@dataclass(frozen=True)
+class SchedulerSettings:
+    """
+    Admission of agent runs (see `examples/scheduler.py`).
+
+    Attributes:
+        max_concurrency (int): Runs in flight at once across all tenants
+        tenant_concurrency (int): Runs in flight at once per tenant
+        tenant_weights (dict[str, float]): Share of a tenant relative to the
+            default weight of 1
+    """
+
+    max_concurrency: int = 16
+    tenant_concurrency: int = 2
+    tenant_weights: dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_env(cls) -> "SchedulerSettings":
+        defaults = cls()
+        weights = {}
+        for item in os.getenv("RUN_TENANT_WEIGHTS", "").split(","):
+            tenant, _, weight = item.partition("=")
+            if tenant.strip():
+                weights[tenant.strip()] = float(weight)
+        return cls(
+            max_concurrency=int(os.getenv("RUN_MAX_CONCURRENCY", defaults.max_concurrency)),
+            tenant_concurrency=int(os.getenv("RUN_TENANT_CONCURRENCY", defaults.tenant_concurrency)),
+            tenant_weights=weights,
+        )
+
+
+LOOP_POLICIES = ("off", "abort", "correct")
+
+
+@dataclass(frozen=True)
+class LoopSettings:
+    """
+    Detection of runaway agent runs (see `examples/loops.py`).
+
+    Attributes:
+        policy (str): "off", "abort" to stop a run at the first loop, or
+            "correct" to tell the model it is looping and stop the run only
+            if it loops again
+        max_repeats (int): Identical tool calls (same tool, same result) in a run
+        max_handoff_returns (int): Handoffs back to an agent the run already visited
+        max_idle_turns (int): Consecutive turns without a new tool result or agent
+    """
+
+    policy: str = "correct"
+    max_repeats: int = 3
+    max_handoff_returns: int = 2
+    max_idle_turns: int = 3
+
+    @classmethod
+    def from_env(cls) -> "LoopSettings":
+        defaults = cls()
+        policy = os.getenv("LOOP_POLICY", defaults.policy)
+        if policy not in LOOP_POLICIES:
+            raise ValueError(f"LOOP_POLICY={policy!r} is not one of {list(LOOP_POLICIES)}")
+        return cls(
+            policy=policy,
+            max_repeats=int(os.getenv("LOOP_MAX_REPEATS", defaults.max_repeats)),
+            max_handoff_returns=int(os.getenv("LOOP_MAX_HANDOFF_RETURNS", defaults.max_handoff_returns)),
+            max_idle_turns=int(os.getenv("LOOP_MAX_IDLE_TURNS", defaults.max_idle_turns)),
+        )
+
+
+@dataclass(frozen=True)
+class SingleFlightSettings:
+    """
+    Coalescing of identical concurrent calls (see `examples/singleflight.py`).
+
+    Attributes:
+        models (bool): Share one model request between identical concurrent requests
+        tools (bool): Share one execution between identical concurrent tool calls
+    """
+
+    models: bool = True
+    tools: bool = True
+
+    @classmethod
+    def from_env(cls) -> "SingleFlightSettings":
+        return cls(
+            models=os.getenv("SINGLE_FLIGHT_MODELS", "1").lower() not in ("0", "false", "no"),
+            tools=os.getenv("SINGLE_FLIGHT_TOOLS", "1").lower() not in ("0", "false", "no"),
+        )
+
+
+CASSETTE_MODES = ("off", "record", "replay")
+
+
+@dataclass(frozen=True)
+class CassetteSettings:
+    """
+    Recording and replay of model HTTP traffic (see `examples/cassettes.py`).
+
+    Attributes:
+        mode (str): "off", "record" to save every exchange, or "replay" to
+            serve recorded responses instead of calling the endpoint
+        path (str): Cassette file, gzip-compressed JSON lines
+        latency_scale (float): Multiplier of the recorded timings on replay,
+            1 for the original latency, 0 to answer at once
+    """
+
+    mode: str = "off"
+    path: str = "traces/cassette.jsonl.gz"
+    latency_scale: float = 1.0
+
+    @classmethod
+    def from_env(cls) -> "CassetteSettings":
+        defaults = cls()
+        mode = os.getenv("CASSETTE_MODE", defaults.mode)
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"CASSETTE_MODE={mode!r} is not one of {list(CASSETTE_MODES)}")
+        return cls(
+            mode=mode,
+            path=os.getenv("CASSETTE_PATH", defaults.path),
+            latency_scale=float(os.getenv("CASSETTE_LATENCY", defaults.latency_scale)),
+        )
+
+
+EVAL_UPLOAD_COMPRESSIONS = ("zstd", "lz4", "none")
+
+
+@dataclass(frozen=True)
+class EvaluationUploadSettings:
+    """
+    Bulk upload of judge results to Phoenix (see `examples/evaluations.py`).
+
+    Attributes:
+        endpoint (str | None): Phoenix base URL, None to derive it from `PHOENIX_ENDPOINT`
+        chunk_rows (int): Evaluations per upload
+        concurrency (int): Uploads in flight at once
+        max_retries (int): Retries of a failed upload (connection errors, 408, 429, 5xx)
+        backoff_seconds (float): Base of the exponential backoff, before jitter
+        timeout_seconds (float): Timeout of one upload
+        compression (str): Arrow IPC buffer compression, "zstd", "lz4" or "none"
+        spool_path (str): Directory where uploads that failed are kept for `resend_spooled()`
+    """
+
+    endpoint: str | None = None
+    chunk_rows: int = 1000
+    concurrency: int = 4
+    max_retries: int = 3
+    backoff_seconds: float = 0.5
+    timeout_seconds: float = 30.0
+    compression: str = "zstd"
+    spool_path: str = "traces/evaluations"
+
+    @classmethod
+    def from_env(cls) -> "EvaluationUploadSettings":
+        defaults = cls()
+        compression = os.getenv("EVAL_UPLOAD_COMPRESSION", defaults.compression)
+        if compression not in EVAL_UPLOAD_COMPRESSIONS:
+            raise ValueError(
+                f"EVAL_UPLOAD_COMPRESSION={compression!r} is not one of {list(EVAL_UPLOAD_COMPRESSIONS)}"
+            )
+        chunk_rows = int(os.getenv("EVAL_UPLOAD_CHUNK_ROWS", defaults.chunk_rows))
+        concurrency = int(os.getenv("EVAL_UPLOAD_CONCURRENCY", defaults.concurrency))
+        if chunk_rows < 1 or concurrency < 1:
+            raise ValueError("EVAL_UPLOAD_CHUNK_ROWS and EVAL_UPLOAD_CONCURRENCY must be at least 1")
+        return cls(
+            endpoint=os.getenv("EVAL_UPLOAD_ENDPOINT") or None,
+            chunk_rows=chunk_rows,
+            concurrency=concurrency,
+            max_retries=int(os.getenv("EVAL_UPLOAD_RETRIES", defaults.max_retries)),
+            backoff_seconds=float(os.getenv("EVAL_UPLOAD_BACKOFF", defaults.backoff_seconds)),
+            timeout_seconds=float(os.getenv("EVAL_UPLOAD_TIMEOUT", defaults.timeout_seconds)),
+            compression=compression,
+            spool_path=os.getenv("EVAL_UPLOAD_SPOOL", defaults.spool_path),
+        )
+
+
+@dataclass(frozen=True)
+class MemorySettings:
+    """
+    Relevance-retrieved conversation memory (see `examples/memory.py`).
+
+    Attributes:
+        path (str): SQLite file holding every session's turns and vectors,
+            ":memory:" to keep them for the life of the process only
+        top_k (int): Older turns retrieved per request
+        recent_turns (int): Latest turns always sent, in order
+        min_similarity (float): Cosine similarity an older turn needs to be retrieved
+        dim (int): Width of the hashed n-gram vectors; changing it needs a new `path`
+    """
+
+    path: str = "traces/memory.sqlite"
+    top_k: int = 4
+    recent_turns: int = 4
+    min_similarity: float = 0.1
+    dim: int = 512
+
+    @classmethod
+    def from_env(cls) -> "MemorySettings":
+        defaults = cls()
+        dim = int(os.getenv("MEMORY_DIM", defaults.dim))
+        if dim < 16:
+            raise ValueError(f"MEMORY_DIM={dim} must be at least 16")
+        return cls(
+            path=os.getenv("MEMORY_PATH", defaults.path),
+            top_k=int(os.getenv("MEMORY_TOP_K", defaults.top_k)),
+            recent_turns=int(os.getenv("MEMORY_RECENT_TURNS", defaults.recent_turns)),
+            min_similarity=float(os.getenv("MEMORY_MIN_SIMILARITY", defaults.min_similarity)),
+            dim=dim,
+        )
+
+
+@dataclass(frozen=True)
+class McpCacheSettings:
+    """
+    Cache of MCP tool results (see `examples/mcp_cache.py`).
+
+    Attributes:
+        path (str): SQLite file shared by worker processes, ":memory:" to cache
+            within this process only
+        max_mb (float): Total size of cached results before the least recently
+            used are evicted
+    """
+
+    path: str = ":memory:"
+    max_mb: float = 64.0
+
+    @classmethod
+    def from_env(cls) -> "McpCacheSettings":
+        defaults = cls()
+        max_mb = float(os.getenv("MCP_CACHE_MAX_MB", defaults.max_mb))
+        if max_mb <= 0:
+            raise ValueError(f"MCP_CACHE_MAX_MB={max_mb} must be positive")
+        return cls(
+            path=os.getenv("MCP_CACHE_PATH") or defaults.path,
+            max_mb=max_mb,
+        )
+
+    @property
+    def max_bytes(self) -> int:
+        return int(self.max_mb * (1 << 20))
+
+
+# role: (tier, timeout_seconds)
+DEFAULT_ROLES = {
+    "agent": ("strong", 60.0),
+    "guardrail": ("fast", 15.0),
+    "router": ("fast", 15.0),
+    "specialist": ("strong", 60.0),
+    "analyst": ("strong", 120.0),
+    "judge": ("strong", 60.0),
+}
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Typed view of the environment.
+
+    Attributes:
+        openai_api_key (str | None): Key for the OpenAI-compatible endpoint
+        openai_api_endpoint (str | None): Base URL, None for the OpenAI default
+        phoenix_endpoint (str | None): Phoenix collector URL
+        phoenix_api_key (str | None): Phoenix API key
+        tiers (dict[str, str]): Model name per tier
+        roles (dict[str, RoleSettings]): Model configuration per role
+        tools (ToolSettings): Function tool execution
+        resilience (ResilienceSettings): Hedging and retries of model requests
+        breaker (BreakerSettings): Circuit breaker and fallback model
+        rate_limit (RateLimitSettings): Client-side request and token budgets
+        scheduler (SchedulerSettings): Admission of agent runs per tenant
+        loops (LoopSettings): Detection of runaway agent runs
+        single_flight (SingleFlightSettings): Coalescing of identical concurrent calls
+        cassette (CassetteSettings): Recording and replay of model traffic
+        evaluations (EvaluationUploadSettings): Bulk upload of judge results
+        memory (MemorySettings): Relevance-retrieved conversation memory
+        mcp_cache (McpCacheSettings): Cache of MCP tool results
+    """
+
+    openai_api_key: str | None = None
+    openai_api_endpoint: str | None = None
+    phoenix_endpoint: str | None = None
+    phoenix_api_key: str | None = None
+    tiers: dict[str, str] = field(default_factory=lambda: dict(TIERS))
+    roles: dict[str, RoleSettings] = field(
+        default_factory=lambda: {
+            role: RoleSettings(tier, TIERS[tier], timeout)
+            for role, (tier, timeout) in DEFAULT_ROLES.items()
+        }
+    )
+    tools: ToolSettings = field(default_factory=ToolSettings)
+    resilience: ResilienceSettings = field(default_factory=ResilienceSettings)
+    breaker: BreakerSettings = field(default_factory=BreakerSettings)
+    rate_limit: RateLimitSettings = field(default_factory=RateLimitSettings)
+    scheduler: SchedulerSettings = field(default_factory=SchedulerSettings)
+    loops: LoopSettings = field(default_factory=LoopSettings)
+    single_flight: SingleFlightSettings = field(default_factory=SingleFlightSettings)
+    cassette: CassetteSettings = field(default_factory=CassetteSettings)
+    evaluations: EvaluationUploadSettings = field(default_factory=EvaluationUploadSettings)
+    memory: MemorySettings = field(default_factory=MemorySettings)
+    mcp_cache: McpCacheSettings = field(default_factory=McpCacheSettings)
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        load_dotenv()
+        tiers = {
+            tier: os.getenv(f"MODEL_TIER_{tier.upper()}", model) for tier, model in TIERS.items()
+        }
+
+        roles = {}
+        for role, (tier, timeout) in DEFAULT_ROLES.items():
+            prefix = f"ROLE_{role.upper()}_"
+            tier = os.getenv(prefix + "TIER", tier)
+            if tier not in tiers:
+                raise ValueError(f"{prefix}TIER={tier!r} is not one of {list(tiers)}")
+            max_tokens = int(os.getenv(prefix + "MAX_TOKENS") or 0) or None
+            roles[role] = RoleSettings(
+                tier=tier,
+                model=tiers[tier],
+                timeout_seconds=float(os.getenv(prefix + "TIMEOUT", timeout)),
+                max_tokens=max_tokens,
+            )
+
+        settings = cls(
+            openai_api_key=os.getenv("OPENAI_API_KEY"),
+            openai_api_endpoint=os.getenv("OPENAI_API_ENDPOINT"),
+            phoenix_endpoint=os.getenv("PHOENIX_ENDPOINT"),
+            phoenix_api_key=os.getenv("PHOENIX_API_KEY"),
+            tiers=tiers,
+            roles=roles,
+            tools=ToolSettings.from_env(),
+            resilience=ResilienceSettings.from_env(),
+            breaker=BreakerSettings.from_env(),
+            rate_limit=RateLimitSettings.from_env(),
+            scheduler=SchedulerSettings.from_env(),
+            loops=LoopSettings.from_env(),
+            single_flight=SingleFlightSettings.from_env(),
+            cassette=CassetteSettings.from_env(),
+            evaluations=EvaluationUploadSettings.from_env(),
+            memory=MemorySettings.from_env(),
+            mcp_cache=McpCacheSettings.from_env(),
+        )
+        single_model = os.getenv("SINGLE_MODEL")
+        return settings.single_model(single_model) if single_model else settings
+
+    def role(self, name: str) -> RoleSettings:
+        """Settings for a role; unknown roles fall back to "agent"."""
+        return self.roles.get(name) or self.roles["agent"]
+
+    def single_model(self, model: str) -> "Settings":
+        """Copy of these settings with every role on one model, keeping timeouts and caps."""
+        return replace(
+            self,
+            roles={name: replace(role, model=model) for name, role in self.roles.items()},
+        )
+
+
+@functools.cache
+def get_settings() -> Settings:
+    """Load the settings on first use and return the cached instance."""
+    return Settings.from_env()
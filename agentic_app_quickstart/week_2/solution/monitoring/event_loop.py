@@ -0,0 +1,70 @@
+"""
+Event loop lag.
+
+A coroutine that asks to sleep for `interval` and wakes up late was kept
+waiting by something else running on the loop, typically synchronous work
+such as a tool reading a large CSV. `LoopLagMonitor` measures that delay
+continuously and records it as
+
+    agent_event_loop_lag_seconds
+
+so the effect of blocking tools on every other conversation in the process is
+visible on the metrics endpoint.
+
+Example:
+    >>> monitor = LoopLagMonitor()
+    >>> monitor.start()          # inside a running event loop
+    >>> ...
+    >>> await monitor.stop()
+    >>> monitor.histogram.percentile(0.99) / 1e6   # seconds
+"""
+
+import asyncio
+import time
+
+from agentic_app_quickstart.week_2.solution.monitoring.histogram import HdrHistogram
+from agentic_app_quickstart.week_2.solution.monitoring.metrics import REGISTRY
+
+LOOP_LAG = REGISTRY.summary(
+    "agent_event_loop_lag_seconds",
+    "Delay between when a timer was due and when the event loop ran it",
+)
+
+
+class LoopLagMonitor:
+    """
+    Samples event loop lag every `interval` seconds.
+
+    Besides the shared summary, every sample goes to `histogram` (in
+    microseconds) for the lifetime of the monitor, which benchmarks can read.
+
+    Args:
+        interval (float): Seconds between samples
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.histogram = HdrHistogram()
+        self._task: asyncio.Task | None = None
+
+    async def _run(self):
+        while True:
+            due = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - due)
+            self.histogram.record(round(lag * 1e6))
+            LOOP_LAG.observe(lag)
+
+    def start(self) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="loop-lag-monitor")
+        return self._task
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
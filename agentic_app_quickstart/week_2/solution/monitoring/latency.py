@@ -0,0 +1,200 @@
+"""
+Per-run latency breakdown.
+
+`LatencyBreakdownProcessor` is an agents SDK tracing processor that splits
+every run (one trace, i.e. one `Runner.run`) into:
+
+- model: time in LLM calls (generation and response spans)
+- tool: time in function tools
+- guardrail: time in input and output guardrails
+- overhead: wall-clock time not covered by any of the above, i.e. the
+  framework itself, sessions, hooks and scheduling
+- total: the whole run
+
+and counts the handoffs taken. Spans nested inside an already counted span
+(such as the classifier agent a guardrail runs) are attributed to the outer
+one. Input guardrails run concurrently with the first model call, so the
+components can add up to more than `total`; overhead is computed from the
+union of the counted intervals and is never negative.
+
+Results go to the metrics registry as rolling-window summaries:
+
+    agent_run_latency_seconds{agent, component}
+    agent_run_handoffs{agent}
+
+`install()` registers the processor with the agents SDK. It must run after
+`OpenAIAgentsInstrumentor().instrument()`, which replaces all processors;
+`get_tracing_provider()` takes care of this. Like any tracing processor it
+only sees runs while tracing is enabled, so the week 1 examples, which call
+`set_tracing_disabled(True)`, are not measured. Serve the metrics with
+`monitoring/server.py`.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from agents import add_trace_processor
+from agents.tracing import (
+    AgentSpanData,
+    FunctionSpanData,
+    GenerationSpanData,
+    GuardrailSpanData,
+    HandoffSpanData,
+    ResponseSpanData,
+    Span,
+    Trace,
+    TracingProcessor,
+    get_trace_provider,
+)
+
+from agentic_app_quickstart.week_2.solution.monitoring.metrics import REGISTRY
+
+MODEL, TOOL, GUARDRAIL, OVERHEAD, TOTAL = "model", "tool", "guardrail", "overhead", "total"
+
+RUN_LATENCY = REGISTRY.summary(
+    "agent_run_latency_seconds",
+    "Run latency by starting agent and component, over the last minute",
+    ["agent", "component"],
+)
+RUN_HANDOFFS = REGISTRY.summary(
+    "agent_run_handoffs",
+    "Handoffs per run by starting agent, over the last minute",
+    ["agent"],
+    scale=1,
+)
+
+
+def _category(span: Span) -> str | None:
+    data = span.span_data
+    if isinstance(data, (GenerationSpanData, ResponseSpanData)):
+        return MODEL
+    if isinstance(data, FunctionSpanData):
+        return TOOL
+    if isinstance(data, GuardrailSpanData):
+        return GUARDRAIL
+    return None
+
+
+def _union_length(intervals: list[tuple[float, float]]) -> float:
+    total = 0.0
+    end = float("-inf")
+    for start, stop in sorted(intervals):
+        if stop <= end:
+            continue
+        total += stop - max(start, end)
+        end = stop
+    return total
+
+
+class _RunState:
+    __slots__ = ("started", "agent", "handoffs", "durations", "intervals", "spans")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.agent = None
+        self.handoffs = 0
+        self.durations = {MODEL: 0.0, TOOL: 0.0, GUARDRAIL: 0.0}
+        self.intervals: list[tuple[float, float]] = []
+        # span_id -> (category, parent_id, counted, start)
+        self.spans: dict[str, tuple[str | None, str | None, bool, float]] = {}
+
+
+class LatencyBreakdownProcessor(TracingProcessor):
+    """
+    Tracing processor recording the latency breakdown of every run.
+
+    Args:
+        max_pending_runs (int): Runs tracked at once; the oldest unfinished run
+            is dropped beyond this so abandoned traces cannot leak memory
+    """
+
+    def __init__(self, max_pending_runs: int = 1024):
+        self.max_pending_runs = max_pending_runs
+        self._runs: OrderedDict[str, _RunState] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def on_trace_start(self, trace: Trace) -> None:
+        with self._lock:
+            self._runs[trace.trace_id] = _RunState()
+            while len(self._runs) > self.max_pending_runs:
+                self._runs.popitem(last=False)
+
+    def on_span_start(self, span: Span) -> None:
+        with self._lock:
+            run = self._runs.get(span.trace_id)
+            if run is None:
+                return
+            if run.agent is None and isinstance(span.span_data, AgentSpanData):
+                run.agent = span.span_data.name
+
+            category = _category(span)
+            parent = span.parent_id
+            inside_counted = False
+            while parent is not None and parent in run.spans:
+                _, grandparent, counted, _ = run.spans[parent]
+                if counted:
+                    inside_counted = True
+                    break
+                parent = grandparent
+            counted = category is not None and not inside_counted
+            run.spans[span.span_id] = (category, span.parent_id, counted, time.perf_counter())
+
+    def on_span_end(self, span: Span) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            run = self._runs.get(span.trace_id)
+            if run is None:
+                return
+            if isinstance(span.span_data, HandoffSpanData):
+                run.handoffs += 1
+
+            entry = run.spans.get(span.span_id)
+            if entry is None:
+                return
+            category, _, counted, started = entry
+            if counted:
+                run.durations[category] += now - started
+                run.intervals.append((started, now))
+
+    def on_trace_end(self, trace: Trace) -> None:
+        with self._lock:
+            run = self._runs.pop(trace.trace_id, None)
+        if run is None:
+            return
+
+        total = time.perf_counter() - run.started
+        agent = run.agent or trace.name
+        for component, duration in run.durations.items():
+            RUN_LATENCY.observe(duration, agent=agent, component=component)
+        RUN_LATENCY.observe(max(0.0, total - _union_length(run.intervals)), agent=agent, component=OVERHEAD)
+        RUN_LATENCY.observe(total, agent=agent, component=TOTAL)
+        RUN_HANDOFFS.observe(run.handoffs, agent=agent)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._runs.clear()
+
+    def force_flush(self) -> None:
+        pass
+
+
+_processor: LatencyBreakdownProcessor | None = None
+
+
+def install() -> LatencyBreakdownProcessor:
+    """
+    Register the process-wide `LatencyBreakdownProcessor` with the agents SDK.
+
+    Safe to call repeatedly; the processor is created once and only added
+    again if it is no longer among the SDK's processors.
+
+    Returns:
+        LatencyBreakdownProcessor: The registered processor
+    """
+    global _processor
+    if _processor is None:
+        _processor = LatencyBreakdownProcessor()
+    if _processor not in get_trace_provider()._multi_processor._processors:
+        add_trace_processor(_processor)
+    return _processor
@@ -0,0 +1,331 @@
+"""
+Token and cost metering.
+
+`MeteredModel` wraps the model returned by `get_model()` and records the usage
+of every response (streamed or not) together with:
+
+- agent: the agent making the call, taken from the current agents SDK span
+- session: set with `metering_session()`, else the trace `group_id`, else "-"
+- model: the underlying model name
+- role: what the model is used for ("agent", "guardrail", "judge", ...), as
+  passed to `get_model(role=...)`
+
+Recording only appends a tuple to a deque, which is thread-safe without a
+lock, so the hot path never waits. A background thread drains the deque every
+`METERING_FLUSH_SECONDS`, rolls the records up per minute, agent, session,
+model and role, and upserts them into a SQLite store (in memory unless
+`METERING_DB_PATH` is set). Totals also go to the metrics registry as
+`agent_tokens_total` and `agent_cost_usd_total`, without the session label.
+
+Example:
+    >>> from agentic_app_quickstart.week_2.solution.monitoring.metering import METER
+    >>> METER.top_consumers(by="agent", limit=5)
+    >>> METER.tokens_by_role(["guardrail", "judge"])
+
+Environment variables:
+    METERING_DB_PATH=traces/metering.sqlite
+    METERING_FLUSH_SECONDS=10
+"""
+
+import atexit
+import contextlib
+import contextvars
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict, deque
+from typing import AsyncIterator
+
+from agents.models.interface import Model
+from agents.tracing import get_current_span, get_current_trace
+from agents.usage import Usage
+
+from agentic_app_quickstart.week_2.solution.monitoring.metrics import REGISTRY
+
+# USD per million tokens: (input, cached input, output)
+PRICES = {
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "o4-mini": (1.10, 0.275, 4.40),
+}
+
+DIMENSIONS = ("agent", "session", "model", "role")
+
+TOKENS = REGISTRY.counter(
+    "agent_tokens_total",
+    "Tokens used through get_model(), by agent, model, role and kind",
+    ["agent", "model", "role", "kind"],
+)
+COST = REGISTRY.counter(
+    "agent_cost_usd_total",
+    "Estimated model cost in USD, by agent, model and role",
+    ["agent", "model", "role"],
+)
+
+_session: contextvars.ContextVar[str | None] = contextvars.ContextVar("metering_session", default=None)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    minute INTEGER NOT NULL,
+    agent TEXT NOT NULL,
+    session TEXT NOT NULL,
+    model TEXT NOT NULL,
+    role TEXT NOT NULL,
+    requests INTEGER NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    cached_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    reasoning_tokens INTEGER NOT NULL,
+    cost_usd REAL NOT NULL,
+    PRIMARY KEY (minute, agent, session, model, role)
+) WITHOUT ROWID
+"""
+
+_UPSERT = """
+INSERT INTO usage VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (minute, agent, session, model, role) DO UPDATE SET
+    requests = requests + excluded.requests,
+    input_tokens = input_tokens + excluded.input_tokens,
+    cached_tokens = cached_tokens + excluded.cached_tokens,
+    output_tokens = output_tokens + excluded.output_tokens,
+    reasoning_tokens = reasoning_tokens + excluded.reasoning_tokens,
+    cost_usd = cost_usd + excluded.cost_usd
+"""
+
+
+@contextlib.contextmanager
+def metering_session(session_id):
+    """
+    Attribute all model usage inside the block to a session.
+
+    Example:
+        >>> with metering_session(session.session_id):
+        ...     result = await Runner.run(agent, prompt, session=session)
+    """
+    token = _session.set(str(session_id))
+    try:
+        yield
+    finally:
+        _session.reset(token)
+
+
+def current_session() -> str | None:
+    """The session usage is attributed to: `metering_session()`, else the trace `group_id`."""
+    return _session.get() or getattr(get_current_trace(), "group_id", None)
+
+
+def estimate_cost(model: str, input_tokens: int, cached_tokens: int, output_tokens: int) -> float:
+    """Cost in USD from `PRICES`; unknown models are counted as free."""
+    prices = PRICES.get(model)
+    if prices is None:
+        # Dated snapshots such as "gpt-4.1-2025-04-14" use the base price
+        prices = next((p for name, p in PRICES.items() if model.startswith(name + "-")), None)
+    if prices is None:
+        return 0.0
+    input_price, cached_price, output_price = prices
+    return (
+        (input_tokens - cached_tokens) * input_price
+        + cached_tokens * cached_price
+        + output_tokens * output_price
+    ) / 1_000_000
+
+
+class Meter:
+    """
+    Collects usage records and rolls them up into a SQLite store.
+
+    Args:
+        db_path (str): SQLite file, or ":memory:"
+        flush_seconds (float): Interval of the background flush
+    """
+
+    def __init__(self, db_path: str = ":memory:", flush_seconds: float = 10.0):
+        self.db_path = db_path
+        self.flush_seconds = flush_seconds
+        self._pending: deque[tuple] = deque()
+        self._db_lock = threading.Lock()
+        self._db = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_env(cls) -> "Meter":
+        return cls(
+            db_path=os.getenv("METERING_DB_PATH", ":memory:"),
+            flush_seconds=float(os.getenv("METERING_FLUSH_SECONDS", "10")),
+        )
+
+    def record(self, usage: Usage, agent: str, session: str, model: str, role: str):
+        """Queue one response's usage; never blocks."""
+        self._pending.append((
+            int(time.time() // 60) * 60,
+            agent,
+            session,
+            model,
+            role,
+            usage.requests or 1,
+            usage.input_tokens,
+            usage.input_tokens_details.cached_tokens or 0,
+            usage.output_tokens,
+            usage.output_tokens_details.reasoning_tokens or 0,
+        ))
+        if self._thread is None:
+            self._start()
+
+    def _start(self):
+        with self._db_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="metering-flush", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_seconds):
+            self.flush()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            if self.db_path != ":memory:":
+                os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute(_SCHEMA)
+        return self._db
+
+    def flush(self) -> int:
+        """
+        Move queued records into the store.
+
+        Returns:
+            int: Number of records flushed
+        """
+        rollup = defaultdict(lambda: [0, 0, 0, 0, 0])
+        count = 0
+        while True:
+            try:
+                record = self._pending.popleft()
+            except IndexError:
+                break
+            totals = rollup[record[:5]]
+            for i, value in enumerate(record[5:]):
+                totals[i] += value
+            count += 1
+
+        if not rollup:
+            return 0
+
+        rows = []
+        for (minute, agent, session, model, role), (requests, input_tokens, cached, output, reasoning) in rollup.items():
+            cost = estimate_cost(model, input_tokens, cached, output)
+            rows.append((minute, agent, session, model, role, requests, input_tokens, cached, output, reasoning, cost))
+            TOKENS.inc(input_tokens, agent=agent, model=model, role=role, kind="input")
+            TOKENS.inc(output, agent=agent, model=model, role=role, kind="output")
+            COST.inc(cost, agent=agent, model=model, role=role)
+
+        with self._db_lock:
+            db = self._connection()
+            with db:
+                db.executemany(_UPSERT, rows)
+        return count
+
+    def _query(self, sql: str, params: tuple = ()) -> list[dict]:
+        self.flush()
+        with self._db_lock:
+            cursor = self._connection().execute(sql, params)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def top_consumers(self, by: str = "agent", limit: int = 10, since: float | None = None, metric: str = "tokens") -> list[dict]:
+        """
+        Largest consumers along one dimension.
+
+        Args:
+            by (str): "agent", "session", "model" or "role"
+            limit (int): Number of rows
+            since (float, optional): Only usage after this Unix time
+            metric (str): Order by "tokens" or "cost_usd"
+
+        Returns:
+            list[dict]: One row per consumer with requests, tokens and cost
+        """
+        if by not in DIMENSIONS:
+            raise ValueError(f"Unknown dimension {by!r}, expected one of {DIMENSIONS}")
+        if metric not in ("tokens", "cost_usd"):
+            raise ValueError(f"Unknown metric {metric!r}, expected 'tokens' or 'cost_usd'")
+        return self._query(
+            f"""
+            SELECT {by}, SUM(requests) AS requests, SUM(input_tokens) AS input_tokens,
+                   SUM(cached_tokens) AS cached_tokens, SUM(output_tokens) AS output_tokens,
+                   SUM(input_tokens + output_tokens) AS tokens, SUM(cost_usd) AS cost_usd
+            FROM usage WHERE minute >= ? GROUP BY {by} ORDER BY {metric} DESC LIMIT ?
+            """,
+            (int(since or 0) // 60 * 60, limit),
+        )
+
+    def tokens_by_role(self, roles: list[str] | None = None, since: float | None = None) -> dict[str, dict]:
+        """
+        Usage per role, e.g. to see what guardrails and judges cost.
+
+        Args:
+            roles (list[str], optional): Roles to include, defaults to all
+            since (float, optional): Only usage after this Unix time
+
+        Returns:
+            dict[str, dict]: Requests, tokens and cost per role
+        """
+        rows = self.top_consumers(by="role", limit=-1, since=since)
+        return {row.pop("role"): row for row in rows if roles is None or row["role"] in roles}
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+
+
+METER = Meter.from_env()
+
+
+class MeteredModel(Model):
+    """
+    Model wrapper recording the usage of every response with a `Meter`.
+
+    Args:
+        model (Model): Model doing the work
+        model_name (str): Name used for pricing and rollups
+        role (str): What the model is used for, e.g. "agent" or "guardrail"
+        meter (Meter): Where usage is recorded
+    """
+
+    def __init__(self, model: Model, model_name: str, role: str = "agent", meter: Meter = METER):
+        self.model = model
+        self.model_name = model_name
+        self.role = role
+        self.meter = meter
+
+    def _record(self, usage: Usage):
+        span = get_current_span()
+        agent = getattr(span.span_data, "name", None) if span is not None else None
+        session = current_session() or "-"
+        self.meter.record(usage, agent or "-", session, self.model_name, self.role)
+
+    async def get_response(self, *args, **kwargs):
+        response = await self.model.get_response(*args, **kwargs)
+        self._record(response.usage)
+        return response
+
+    async def stream_response(self, *args, **kwargs) -> AsyncIterator:
+        async for event in self.model.stream_response(*args, **kwargs):
+            if event.type == "response.completed" and event.response.usage:
+                usage = event.response.usage
+                self._record(Usage(
+                    requests=1,
+                    input_tokens=usage.input_tokens,
+                    input_tokens_details=usage.input_tokens_details,
+                    output_tokens=usage.output_tokens,
+                    output_tokens_details=usage.output_tokens_details,
+                    total_tokens=usage.total_tokens,
+                ))
+            yield event
@@ -0,0 +1,260 @@
+"""
+In-process metrics registry.
+
+A deliberately small subset of the Prometheus client model: counters, gauges
+and summaries with labels, collected in a process-wide `REGISTRY` that can be
+rendered as Prometheus text or as a JSON-friendly snapshot. Everything in the
+monitoring package registers its metrics here.
+
+Summaries report quantiles over a rolling window (see `histogram.py`), while
+their `_sum` and `_count` samples are cumulative as Prometheus expects.
+
+Example:
+    >>> from agentic_app_quickstart.week_2.solution.monitoring.metrics import REGISTRY
+    >>> dropped = REGISTRY.counter("spans_dropped_total", "Spans dropped", ["reason"])
+    >>> dropped.inc(reason="queue_full")
+    >>> print(REGISTRY.render_prometheus())
+"""
+
+import threading
+from typing import Callable
+
+from agentic_app_quickstart.week_2.solution.monitoring.histogram import RollingHistogram
+
+
+def _label_key(labelnames: tuple[str, ...], labels: dict) -> tuple[str, ...]:
+    if set(labels) != set(labelnames):
+        raise ValueError(f"Expected labels {labelnames}, got {tuple(labels)}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+def _format_labels(labelnames: tuple[str, ...], key: tuple[str, ...]) -> str:
+    if not labelnames:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(name, value.replace("\\", "\\\\").replace('"', '\\"'))
+        for name, value in zip(labelnames, key)
+    )
+    return "{" + pairs + "}"
+
+
+class Metric:
+    """Base class holding the name, help text and label names of a metric."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: list[str] | tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        """Return `(sample_name, labels, value)` tuples for every label set."""
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(self.labelnames, labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class Gauge(Metric):
+    """
+    Value that can go up and down per label set.
+
+    A gauge can either be `set()` explicitly or bound to a callback with
+    `set_function()`, which is evaluated on every collection. Callbacks are
+    handy for values that already live elsewhere, such as a queue length.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float | Callable[[], float]] = {}
+
+    def set(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float], **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = function
+
+    def value(self, **labels) -> float:
+        value = self._values.get(_label_key(self.labelnames, labels), 0)
+        return value() if callable(value) else value
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            (self.name, dict(zip(self.labelnames, key)), value() if callable(value) else value)
+            for key, value in items
+        ]
+
+
+class Summary(Metric):
+    """
+    Rolling-window quantiles per label set, backed by HDR histograms.
+
+    Values are observed as floats and stored as integers of `1 / scale`, so the
+    default `scale` of 1e6 keeps seconds to the microsecond.
+
+    Args:
+        quantiles (tuple[float, ...]): Quantiles reported on collection
+        window_seconds (float): Window the quantiles cover
+        scale (float): Multiplier applied before recording
+    """
+
+    kind = "summary"
+
+    def __init__(
+        self,
+        *args,
+        quantiles: tuple[float, ...] = (0.5, 0.9, 0.95, 0.99),
+        window_seconds: float = 60.0,
+        scale: float = 1e6,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.quantiles = tuple(quantiles)
+        self.window_seconds = window_seconds
+        self.scale = scale
+        self._histograms: dict[tuple[str, ...], RollingHistogram] = {}
+        self._totals: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, RollingHistogram(self.window_seconds))
+                self._totals.setdefault(key, [0.0, 0])
+        histogram.record(round(value * self.scale))
+        with self._lock:
+            totals = self._totals[key]
+            totals[0] += value
+            totals[1] += 1
+
+    def quantile_values(self, **labels) -> dict[float, float]:
+        """Current windowed quantiles for one label set."""
+        histogram = self._histograms.get(_label_key(self.labelnames, labels))
+        if histogram is None:
+            return {q: 0.0 for q in self.quantiles}
+        values = histogram.snapshot().percentiles(list(self.quantiles))
+        return {q: v / self.scale for q, v in zip(self.quantiles, values)}
+
+    def samples(self):
+        with self._lock:
+            items = list(self._histograms.items())
+            totals = {key: tuple(value) for key, value in self._totals.items()}
+
+        samples = []
+        for key, histogram in items:
+            labels = dict(zip(self.labelnames, key))
+            values = histogram.snapshot().percentiles(list(self.quantiles))
+            for q, v in zip(self.quantiles, values):
+                samples.append((self.name, {**labels, "quantile": str(q)}, v / self.scale))
+            total, count = totals[key]
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+
+class MetricsRegistry:
+    """Collection of named metrics with get-or-create accessors."""
+
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, documentation, labelnames, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name!r} already registered with a different type or labels")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames=()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def summary(self, name: str, documentation: str, labelnames=(), **kwargs) -> Summary:
+        return self._get_or_create(Summary, name, documentation, labelnames, **kwargs)
+
+    def register(self, metric: Metric) -> Metric:
+        """Add an already-built metric (e.g. a custom subclass) to the registry."""
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name!r} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def metrics(self) -> list[Metric]:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def render_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for sample_name, labels, value in metric.samples():
+                key = tuple(str(v) for v in labels.values())
+                lines.append(f"{sample_name}{_format_labels(tuple(labels), key)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        """Return every metric as plain data, suitable for `json.dumps`."""
+        return {
+            metric.name: {
+                "type": metric.kind,
+                "help": metric.documentation,
+                "samples": [
+                    {"name": sample_name, "labels": labels, "value": value}
+                    for sample_name, labels, value in metric.samples()
+                ],
+            }
+            for metric in self.metrics()
+        }
+
+
+REGISTRY = MetricsRegistry()
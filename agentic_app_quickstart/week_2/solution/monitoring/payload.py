@@ -0,0 +1,216 @@
+"""
+Span payload size caps and attribute projection.
+
+OpenInference records full prompts and completions on every span
+(`input.value`, `output.value`, `llm.input_messages.*`, ...). With session
+memory or uploaded data in the prompt, a single span can reach hundreds of KB,
+which then has to be buffered, serialized and uploaded.
+
+`AttributeProjectionSpanProcessor` rewrites each finished span before it
+reaches the export pipeline:
+
+- attributes matching a drop pattern are removed
+- string attributes matching a hash pattern are replaced by their SHA-256
+  digest once they exceed their cap
+- any other string attribute longer than its cap is truncated on a UTF-8
+  boundary, with a marker giving the original size
+
+`input.value` and `output.value`, which the LLM-as-a-judge scripts read, get a
+larger cap of their own so evaluations still see the (truncated) text.
+Attribute patterns use shell-style wildcards, e.g. `llm.input_messages.*`.
+
+Environment variables:
+    TRACING_MAX_ATTRIBUTE_BYTES=16384
+    TRACING_MAX_IO_BYTES=65536                     # input.value / output.value
+    TRACING_DROP_ATTRIBUTES=llm.tools.*,metadata
+    TRACING_HASH_ATTRIBUTES=llm.input_messages.*
+"""
+
+import hashlib
+import os
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+
+from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor
+
+from agentic_app_quickstart.week_2.solution.monitoring.metrics import REGISTRY
+
+# Attributes read by the judge scripts in examples/week_3 and notebooks/
+JUDGE_ATTRIBUTES = ("input.value", "output.value")
+
+ATTRIBUTE_BYTES = REGISTRY.counter(
+    "agent_tracing_attribute_bytes_total",
+    "String attribute bytes seen by the payload processor, before projection",
+)
+BYTES_SAVED = REGISTRY.counter(
+    "agent_tracing_attribute_bytes_saved_total",
+    "Attribute bytes removed by the payload processor, by action",
+    ["action"],
+)
+ATTRIBUTES_PROJECTED = REGISTRY.counter(
+    "agent_tracing_attributes_projected_total",
+    "Attributes truncated, hashed or dropped, by action",
+    ["action"],
+)
+
+TRUNCATE, HASH, DROP = "truncated", "hashed", "dropped"
+
+
+def _env_list(name: str) -> tuple[str, ...]:
+    return tuple(p.strip() for p in os.getenv(name, "").split(",") if p.strip())
+
+
+def truncate_utf8(value: str, max_bytes: int) -> str:
+    """
+    Cut a string to at most `max_bytes` of UTF-8, marking the cut.
+
+    Args:
+        value (str): Original text
+        max_bytes (int): Byte budget, including the marker
+
+    Returns:
+        str: The truncated text
+    """
+    encoded = value.encode("utf-8")
+    if len(encoded) <= max_bytes:
+        return value
+    marker = f"...[truncated {len(encoded)} bytes]"
+    keep = max(0, max_bytes - len(marker))
+    return encoded[:keep].decode("utf-8", errors="ignore") + marker
+
+
+def hash_value(value: str) -> str:
+    encoded = value.encode("utf-8")
+    return f"sha256:{hashlib.sha256(encoded).hexdigest()} ({len(encoded)} bytes)"
+
+
+@dataclass
+class PayloadPolicy:
+    """
+    Per-attribute size caps and projection rules.
+
+    Attributes:
+        default_max_bytes (int): Cap for string attributes without their own
+        max_bytes (dict[str, int]): Caps per attribute pattern; the first
+            matching pattern wins
+        hash_patterns (tuple[str, ...]): Attributes replaced by a digest once
+            over their cap
+        drop_patterns (tuple[str, ...]): Attributes removed entirely
+    """
+
+    default_max_bytes: int = 16_384
+    max_bytes: dict[str, int] = field(
+        default_factory=lambda: {name: 65_536 for name in JUDGE_ATTRIBUTES}
+    )
+    hash_patterns: tuple[str, ...] = ()
+    drop_patterns: tuple[str, ...] = ()
+
+    @classmethod
+    def from_env(cls) -> "PayloadPolicy":
+        io_bytes = int(os.getenv("TRACING_MAX_IO_BYTES", "65536"))
+        return cls(
+            default_max_bytes=int(os.getenv("TRACING_MAX_ATTRIBUTE_BYTES", "16384")),
+            max_bytes={name: io_bytes for name in JUDGE_ATTRIBUTES},
+            hash_patterns=_env_list("TRACING_HASH_ATTRIBUTES"),
+            drop_patterns=_env_list("TRACING_DROP_ATTRIBUTES"),
+        )
+
+    def rule_for(self, key: str) -> tuple[str, int]:
+        """Return `(action, cap)` for an attribute key; action is applied over the cap."""
+        if any(fnmatchcase(key, p) for p in self.drop_patterns):
+            return DROP, 0
+        cap = next(
+            (limit for pattern, limit in self.max_bytes.items() if fnmatchcase(key, pattern)),
+            self.default_max_bytes,
+        )
+        if key not in JUDGE_ATTRIBUTES and any(fnmatchcase(key, p) for p in self.hash_patterns):
+            return HASH, cap
+        return TRUNCATE, cap
+
+
+class AttributeProjectionSpanProcessor(SpanProcessor):
+    """
+    Applies a `PayloadPolicy` to finished spans before passing them on.
+
+    Finished spans are read-only, so spans that need changes are re-created as
+    new `ReadableSpan`s with the projected attributes; untouched spans are
+    forwarded as they are. Rules are resolved once per attribute key.
+
+    Args:
+        downstream (SpanProcessor): Receives the projected spans
+        policy (PayloadPolicy): Caps and projection rules
+    """
+
+    def __init__(self, downstream: SpanProcessor, policy: PayloadPolicy):
+        self._downstream = downstream
+        self._policy = policy
+        self._rules: dict[str, tuple[str, int]] = {}
+
+    def _rule(self, key: str) -> tuple[str, int]:
+        rule = self._rules.get(key)
+        if rule is None:
+            rule = self._rules[key] = self._policy.rule_for(key)
+        return rule
+
+    def project(self, attributes) -> tuple[dict, bool]:
+        """
+        Apply the policy to a span's attributes.
+
+        Returns:
+            tuple[dict, bool]: The projected attributes and whether anything changed
+        """
+        projected = {}
+        changed = False
+        for key, value in attributes.items():
+            action, cap = self._rule(key)
+            if action == DROP:
+                size = len(value.encode("utf-8")) if isinstance(value, str) else 0
+                ATTRIBUTE_BYTES.inc(size)
+                BYTES_SAVED.inc(size, action=DROP)
+                ATTRIBUTES_PROJECTED.inc(action=DROP)
+                changed = True
+                continue
+
+            if isinstance(value, str):
+                size = len(value.encode("utf-8"))
+                if size > cap:
+                    value = hash_value(value) if action == HASH else truncate_utf8(value, cap)
+                    BYTES_SAVED.inc(size - len(value.encode("utf-8")), action=action)
+                    ATTRIBUTES_PROJECTED.inc(action=action)
+                    changed = True
+                ATTRIBUTE_BYTES.inc(size)
+
+            projected[key] = value
+        return projected, changed
+
+    def on_start(self, span, parent_context=None) -> None:
+        self._downstream.on_start(span, parent_context=parent_context)
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if not span.context.trace_flags.sampled or not span.attributes:
+            self._downstream.on_end(span)
+            return
+
+        attributes, changed = self.project(span.attributes)
+        if changed:
+            span = ReadableSpan(
+                name=span.name,
+                context=span.context,
+                parent=span.parent,
+                resource=span.resource,
+                attributes=attributes,
+                events=span.events,
+                links=span.links,
+                kind=span.kind,
+                status=span.status,
+                start_time=span.start_time,
+                end_time=span.end_time,
+                instrumentation_scope=span.instrumentation_scope,
+            )
+        self._downstream.on_end(span)
+
+    def shutdown(self) -> None:
+        self._downstream.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self._downstream.force_flush(timeout_millis)
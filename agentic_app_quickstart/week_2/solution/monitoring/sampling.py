@@ -0,0 +1,363 @@
+"""
+Sampling and batching policy for agent tracing.
+
+`get_tracing_provider()` builds its span pipeline from the two policies here:
+
+    sampler (head)  ->  AttributeProjectionSpanProcessor  ->  TailSamplingSpanProcessor
+                    ->  MonitoredBatchSpanProcessor  ->  exporter
+
+- Head sampling drops a configurable ratio of traces before any span is
+  recorded, so unsampled runs cost almost nothing.
+- Tail sampling buffers the spans of each trace until its root span ends and
+  then keeps every trace that errored or ran longer than `slow_run_seconds`,
+  plus a ratio of the remaining ones.
+- Export happens on a background thread through a bounded queue, so a slow or
+  unreachable collector never blocks the event loop.
+
+Dropped spans (by reason), exported spans and the export queue depth are
+published to the monitoring metrics registry.
+
+Defaults keep every trace but never block and never grow without bound. Each
+knob can be set through environment variables, e.g.:
+
+    TRACING_HEAD_RATIO=0.1            # record 10% of runs
+    TRACING_TAIL_KEEP_RATIO=0.05      # of those, keep 5% of the healthy, fast ones
+    TRACING_SLOW_RUN_SECONDS=20
+    OTEL_BSP_MAX_QUEUE_SIZE=4096      # standard OpenTelemetry batch settings
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Sequence
+
+from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    SimpleSpanProcessor,
+    SpanExporter,
+    SpanExportResult,
+)
+from opentelemetry.sdk.trace.sampling import (
+    Decision,
+    ParentBased,
+    Sampler,
+    SamplingResult,
+    TraceIdRatioBased,
+)
+from opentelemetry.trace import StatusCode
+
+from agentic_app_quickstart.week_2.solution.monitoring.metrics import REGISTRY
+from agentic_app_quickstart.week_2.solution.monitoring.payload import (
+    AttributeProjectionSpanProcessor,
+    PayloadPolicy,
+)
+
+SPANS_DROPPED = REGISTRY.counter(
+    "agent_tracing_spans_dropped_total",
+    "Spans that were not exported, by reason",
+    ["reason"],
+)
+SPANS_EXPORTED = REGISTRY.counter(
+    "agent_tracing_spans_exported_total",
+    "Spans successfully handed to the exporter",
+)
+TRACES_SAMPLED = REGISTRY.counter(
+    "agent_tracing_tail_decisions_total",
+    "Tail sampling decisions per trace, by outcome",
+    ["decision"],
+)
+QUEUE_DEPTH = REGISTRY.gauge(
+    "agent_tracing_export_queue_depth",
+    "Spans waiting in the batch export queue",
+    ["processor"],
+)
+QUEUE_CAPACITY = REGISTRY.gauge(
+    "agent_tracing_export_queue_capacity",
+    "Maximum size of the batch export queue",
+    ["processor"],
+)
+
+# Trace ids are random 128-bit integers. The head sampler (`TraceIdRatioBased`)
+# compares their low 64 bits against its ratio, so the tail decision uses the
+# high 64 bits: the two are independent and a trace survives both with
+# probability head_ratio * tail_keep_ratio.
+_TRACE_ID_BITS = 64
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _keep_by_ratio(trace_id: int, ratio: float) -> bool:
+    return (trace_id >> _TRACE_ID_BITS) < ratio * (1 << _TRACE_ID_BITS)
+
+
+@dataclass
+class SamplingPolicy:
+    """
+    Which traces to record and which to export.
+
+    Attributes:
+        head_ratio (float): Fraction of traces recorded at all (0..1)
+        tail_keep_ratio (float): Fraction of healthy, fast traces exported.
+            1.0 disables tail sampling entirely.
+        keep_errors (bool): Always export traces containing an error span
+        slow_run_seconds (float): Always export traces whose root span took
+            at least this long
+        max_pending_traces (int): Traces buffered while waiting for their root
+            span; the oldest is dropped beyond this
+        max_spans_per_trace (int): Spans buffered per trace; extra spans are
+            dropped
+    """
+
+    head_ratio: float = 1.0
+    tail_keep_ratio: float = 1.0
+    keep_errors: bool = True
+    slow_run_seconds: float = 30.0
+    max_pending_traces: int = 512
+    max_spans_per_trace: int = 256
+
+    @classmethod
+    def from_env(cls) -> "SamplingPolicy":
+        return cls(
+            head_ratio=_env_float("TRACING_HEAD_RATIO", cls.head_ratio),
+            tail_keep_ratio=_env_float("TRACING_TAIL_KEEP_RATIO", cls.tail_keep_ratio),
+            slow_run_seconds=_env_float("TRACING_SLOW_RUN_SECONDS", cls.slow_run_seconds),
+            max_pending_traces=_env_int("TRACING_MAX_PENDING_TRACES", cls.max_pending_traces),
+            max_spans_per_trace=_env_int("TRACING_MAX_SPANS_PER_TRACE", cls.max_spans_per_trace),
+        )
+
+    @property
+    def tail_sampling(self) -> bool:
+        return self.tail_keep_ratio < 1.0
+
+    def sampler(self) -> Sampler:
+        """Head sampler: ratio-based for new traces, follows the parent otherwise."""
+        return CountingSampler(ParentBased(TraceIdRatioBased(self.head_ratio)))
+
+
+@dataclass
+class BatchPolicy:
+    """
+    How finished spans are queued and exported.
+
+    Attributes:
+        enabled (bool): Export on a background thread. When False every span is
+            exported synchronously as it ends (only sensible for debugging).
+        max_queue_size (int): Spans held before new ones are dropped
+        max_export_batch_size (int): Spans sent per export call
+        schedule_delay_millis (int): Maximum time between two exports
+        export_timeout_millis (int): Time allowed for one export call
+    """
+
+    enabled: bool = True
+    max_queue_size: int = 2048
+    max_export_batch_size: int = 512
+    schedule_delay_millis: int = 5000
+    export_timeout_millis: int = 30000
+
+    @classmethod
+    def from_env(cls) -> "BatchPolicy":
+        return cls(
+            enabled=os.getenv("TRACING_BATCH", "1") not in ("0", "false", "False"),
+            max_queue_size=_env_int("OTEL_BSP_MAX_QUEUE_SIZE", cls.max_queue_size),
+            max_export_batch_size=_env_int("OTEL_BSP_MAX_EXPORT_BATCH_SIZE", cls.max_export_batch_size),
+            schedule_delay_millis=_env_int("OTEL_BSP_SCHEDULE_DELAY", cls.schedule_delay_millis),
+            export_timeout_millis=_env_int("OTEL_BSP_EXPORT_TIMEOUT", cls.export_timeout_millis),
+        )
+
+
+class CountingSampler(Sampler):
+    """Wraps a sampler and counts the root spans it drops."""
+
+    def __init__(self, delegate: Sampler):
+        self._delegate = delegate
+
+    def should_sample(self, parent_context, trace_id, name, kind=None, attributes=None, links=None, trace_state=None) -> SamplingResult:
+        result = self._delegate.should_sample(
+            parent_context, trace_id, name, kind, attributes, links, trace_state
+        )
+        if result.decision == Decision.DROP:
+            SPANS_DROPPED.inc(reason="head_sampled")
+        return result
+
+    def get_description(self) -> str:
+        return f"CountingSampler{{{self._delegate.get_description()}}}"
+
+
+class CountingSpanExporter(SpanExporter):
+    """Wraps an exporter and counts exported and failed spans."""
+
+    def __init__(self, delegate: SpanExporter):
+        self._delegate = delegate
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        try:
+            result = self._delegate.export(spans)
+        except Exception:
+            SPANS_DROPPED.inc(len(spans), reason="export_failed")
+            raise
+
+        if result == SpanExportResult.SUCCESS:
+            SPANS_EXPORTED.inc(len(spans))
+        else:
+            SPANS_DROPPED.inc(len(spans), reason="export_failed")
+        return result
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self._delegate.force_flush(timeout_millis)
+
+    def shutdown(self) -> None:
+        self._delegate.shutdown()
+
+
+class MonitoredBatchSpanProcessor(BatchSpanProcessor):
+    """
+    `BatchSpanProcessor` that reports its queue depth and queue-full drops.
+
+    The SDK queue is a bounded deque that silently discards its oldest span
+    when full; we count that case before handing the span over.
+    """
+
+    def __init__(self, span_exporter: SpanExporter, policy: BatchPolicy, name: str = "default"):
+        super().__init__(
+            span_exporter,
+            max_queue_size=policy.max_queue_size,
+            schedule_delay_millis=policy.schedule_delay_millis,
+            max_export_batch_size=policy.max_export_batch_size,
+            export_timeout_millis=policy.export_timeout_millis,
+        )
+        self._queue = self._batch_processor._queue
+        QUEUE_DEPTH.set_function(lambda: len(self._queue), processor=name)
+        QUEUE_CAPACITY.set(policy.max_queue_size, processor=name)
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if span.context.trace_flags.sampled and len(self._queue) >= self._queue.maxlen:
+            SPANS_DROPPED.inc(reason="queue_full")
+        super().on_end(span)
+
+
+class TailSamplingSpanProcessor(SpanProcessor):
+    """
+    Buffers spans per trace and decides when the root span ends.
+
+    Kept traces are replayed, in end order, into the downstream processor.
+    Memory is bounded by `max_pending_traces * max_spans_per_trace`.
+
+    Args:
+        downstream (SpanProcessor): Receives the spans of kept traces
+        policy (SamplingPolicy): Tail sampling configuration
+    """
+
+    def __init__(self, downstream: SpanProcessor, policy: SamplingPolicy):
+        self._downstream = downstream
+        self._policy = policy
+        self._pending: OrderedDict[int, list[ReadableSpan]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def on_start(self, span, parent_context=None) -> None:
+        self._downstream.on_start(span, parent_context=parent_context)
+
+    def _should_keep(self, root: ReadableSpan, spans: list[ReadableSpan]) -> str | None:
+        if self._policy.keep_errors and any(
+            s.status.status_code == StatusCode.ERROR for s in spans
+        ):
+            return "error"
+        if root.end_time and root.start_time:
+            if (root.end_time - root.start_time) / 1e9 >= self._policy.slow_run_seconds:
+                return "slow"
+        if _keep_by_ratio(root.context.trace_id, self._policy.tail_keep_ratio):
+            return "sampled"
+        return None
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if not span.context.trace_flags.sampled:
+            return
+
+        trace_id = span.context.trace_id
+        finished = None
+        with self._lock:
+            spans = self._pending.get(trace_id)
+            if spans is None:
+                if len(self._pending) >= self._policy.max_pending_traces:
+                    _, evicted = self._pending.popitem(last=False)
+                    SPANS_DROPPED.inc(len(evicted), reason="tail_buffer_full")
+                spans = self._pending[trace_id] = []
+
+            if len(spans) < self._policy.max_spans_per_trace:
+                spans.append(span)
+            else:
+                SPANS_DROPPED.inc(reason="trace_too_large")
+
+            if span.parent is None:
+                finished = self._pending.pop(trace_id)
+
+        if finished is None:
+            return
+
+        reason = self._should_keep(span, finished)
+        if reason is None:
+            TRACES_SAMPLED.inc(decision="dropped")
+            SPANS_DROPPED.inc(len(finished), reason="tail_sampled")
+            return
+
+        TRACES_SAMPLED.inc(decision=reason)
+        for buffered in finished:
+            self._downstream.on_end(buffered)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, OrderedDict()
+        for spans in pending.values():
+            SPANS_DROPPED.inc(len(spans), reason="unfinished_trace")
+        self._downstream.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self._downstream.force_flush(timeout_millis)
+
+
+def build_span_processor(
+    exporter: SpanExporter,
+    sampling: SamplingPolicy,
+    batching: BatchPolicy,
+    payload: PayloadPolicy | None = None,
+    name: str = "default",
+) -> SpanProcessor:
+    """
+    Assemble the export pipeline for a tracer provider.
+
+    Payload projection runs first, so the tail sampling buffer and the export
+    queue only ever hold capped spans.
+
+    Args:
+        exporter (SpanExporter): Final destination of the spans
+        sampling (SamplingPolicy): Tail sampling configuration
+        batching (BatchPolicy): Queue and batch configuration
+        payload (PayloadPolicy, optional): Attribute caps; None disables them
+        name (str): Label used for the queue metrics
+
+    Returns:
+        SpanProcessor: Processor to add to the tracer provider
+    """
+    exporter = CountingSpanExporter(exporter)
+
+    if batching.enabled:
+        processor = MonitoredBatchSpanProcessor(exporter, batching, name=name)
+    else:
+        processor = SimpleSpanProcessor(exporter)
+
+    if sampling.tail_sampling:
+        processor = TailSamplingSpanProcessor(processor, sampling)
+
+    if payload is not None:
+        processor = AttributeProjectionSpanProcessor(processor, payload)
+
+    return processor
@@ -0,0 +1,79 @@
+"""
+Metrics endpoint.
+
+Serves the metrics registry over HTTP from a daemon thread, so scraping never
+runs on (or waits for) the asyncio event loop that serves conversations:
+
+    GET /metrics        Prometheus text exposition format
+    GET /metrics.json   JSON snapshot of the same metrics
+
+Example:
+    >>> from agentic_app_quickstart.week_2.solution.monitoring.server import start_metrics_server
+    >>> server = start_metrics_server(port=9464)
+    >>> # curl http://127.0.0.1:9464/metrics
+    >>> server.shutdown()
+
+Environment variables:
+    METRICS_HOST=127.0.0.1
+    METRICS_PORT=9464
+"""
+
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from agentic_app_quickstart.week_2.solution.monitoring.metrics import REGISTRY, MetricsRegistry
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = REGISTRY
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            body = self.registry.render_prometheus().encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif path == "/metrics.json":
+            body = json.dumps(self.registry.snapshot()).encode("utf-8")
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(
+    port: int | None = None,
+    host: str | None = None,
+    registry: MetricsRegistry = REGISTRY,
+) -> ThreadingHTTPServer:
+    """
+    Start serving `/metrics` and `/metrics.json` on a background thread.
+
+    Args:
+        port (int, optional): Port to bind, defaults to `METRICS_PORT` or 9464;
+            0 picks a free port
+        host (str, optional): Interface to bind, defaults to `METRICS_HOST` or 127.0.0.1
+        registry (MetricsRegistry): Registry to expose
+
+    Returns:
+        ThreadingHTTPServer: The running server; call `shutdown()` to stop it
+    """
+    if port is None:
+        port = int(os.getenv("METRICS_PORT", "9464"))
+    host = host or os.getenv("METRICS_HOST", "127.0.0.1")
+
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
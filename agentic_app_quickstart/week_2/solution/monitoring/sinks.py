@@ -0,0 +1,120 @@
+"""
+Offline span sinks for the tracing provider.
+
+`get_tracing_provider()` normally ships every span to Phoenix over HTTP. The
+exporters in this module let the same instrumentation run without a live
+collector:
+
+- `FileSpanExporter`: appends spans to a gzip-compressed NDJSON file, one
+  OTLP/JSON `ExportTraceServiceRequest` per line. The file can later be
+  replayed into any OTLP collector.
+- `InMemorySpanExporter`: keeps finished spans in a list (re-exported from the
+  OpenTelemetry SDK), useful for benchmarks and notebooks.
+"""
+
+import base64
+import gzip
+import json
+import os
+import threading
+from typing import Sequence
+
+from google.protobuf.json_format import MessageToDict
+from opentelemetry.exporter.otlp.proto.common.trace_encoder import encode_spans
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+
+__all__ = ["FileSpanExporter", "InMemorySpanExporter", "read_span_file"]
+
+# OTLP/JSON encodes trace and span ids as hex strings, while the protobuf JSON
+# mapping produces base64. These are the keys we need to convert.
+_ID_KEYS = ("traceId", "spanId", "parentSpanId")
+
+
+def _hex_ids(span: dict) -> dict:
+    for key in _ID_KEYS:
+        if span.get(key):
+            span[key] = base64.b64decode(span[key]).hex()
+    for link in span.get("links", []):
+        for key in _ID_KEYS:
+            if link.get(key):
+                link[key] = base64.b64decode(link[key]).hex()
+    return span
+
+
+class FileSpanExporter(SpanExporter):
+    """
+    Span exporter that writes OTLP/JSON lines to a gzip-compressed file.
+
+    Each call to `export` appends one line holding a complete
+    `ExportTraceServiceRequest`, so the file stays valid even if the process
+    dies between batches. Reopening an existing file appends a new gzip member,
+    which `gzip.open` reads transparently.
+
+    Args:
+        file_path (str): Destination file, conventionally ending in `.ndjson.gz`
+        compresslevel (int): gzip level; the default favours CPU over ratio
+    """
+
+    def __init__(self, file_path: str, compresslevel: int = 3):
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.file_path = file_path
+        self._file = gzip.open(file_path, "at", encoding="utf-8", compresslevel=compresslevel)
+        self._lock = threading.Lock()
+        self._closed = False
+        self.spans_written = 0
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        if self._closed:
+            return SpanExportResult.FAILURE
+
+        payload = MessageToDict(encode_spans(spans))
+        for resource_spans in payload.get("resourceSpans", []):
+            for scope_spans in resource_spans.get("scopeSpans", []):
+                scope_spans["spans"] = [_hex_ids(s) for s in scope_spans.get("spans", [])]
+        line = json.dumps(payload, separators=(",", ":"))
+
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.spans_written += len(spans)
+
+        return SpanExportResult.SUCCESS
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        with self._lock:
+            if not self._closed:
+                self._file.flush()
+        return True
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if not self._closed:
+                self._file.close()
+                self._closed = True
+
+
+def read_span_file(file_path: str) -> list[dict]:
+    """
+    Read back the spans written by `FileSpanExporter`.
+
+    Args:
+        file_path (str): File produced by the exporter
+
+    Returns:
+        list[dict]: Flat list of OTLP/JSON span objects
+    """
+    spans = []
+    with gzip.open(file_path, "rt", encoding="utf-8") as f:
+        for line in f:
+            payload = json.loads(line)
+            for resource_spans in payload.get("resourceSpans", []):
+                for scope_spans in resource_spans.get("scopeSpans", []):
+                    spans.extend(scope_spans.get("spans", []))
+    return spans
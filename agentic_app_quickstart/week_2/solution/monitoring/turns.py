@@ -0,0 +1,58 @@
+"""
+Model turns per question.
+
+Every tool call the model makes costs another model round-trip. `record_turns`
+counts the model calls and tool calls of a finished run and, when the prompt
+carried a precomputed dataset profile, how many discovery calls (such as
+`get_headers`) the model no longer needed:
+
+    agent_run_model_turns{agent}
+    agent_discovery_turns_saved_total{agent}
+"""
+
+from agents import RunResult
+
+from agentic_app_quickstart.week_2.solution.monitoring.metrics import REGISTRY
+
+MODEL_TURNS = REGISTRY.summary(
+    "agent_run_model_turns",
+    "Model calls per run by final agent, over the last minute",
+    ["agent"],
+    scale=1,
+)
+TURNS_SAVED = REGISTRY.counter(
+    "agent_discovery_turns_saved_total",
+    "Discovery tool calls skipped because the prompt included a dataset profile",
+    ["agent"],
+)
+
+
+def record_turns(
+    result: RunResult,
+    profiled: bool = False,
+    discovery_tools: tuple[str, ...] = ("get_headers",),
+) -> dict:
+    """
+    Record the turns of a finished run.
+
+    Args:
+        result (RunResult): Result of `Runner.run`
+        profiled (bool): Whether the prompt included a dataset profile
+        discovery_tools (tuple[str, ...]): Tools the profile makes unnecessary
+
+    Returns:
+        dict: `model_turns`, `tool_calls` (names, in order) and `turns_saved`
+    """
+    tool_calls = [
+        item.raw_item.name
+        for item in result.new_items
+        if item.type == "tool_call_item" and hasattr(item.raw_item, "name")
+    ]
+    saved = sum(1 for tool in discovery_tools if tool not in tool_calls) if profiled else 0
+
+    agent = result.last_agent.name
+    MODEL_TURNS.observe(len(result.raw_responses), agent=agent)
+    if saved:
+        TURNS_SAVED.inc(saved, agent=agent)
+
+    return {"model_turns": len(result.raw_responses), "tool_calls": tool_calls, "turns_saved": saved}
@@ -58,40 +58,63 @@ def _(get_tracing_provider):
 @app.cell
 def _():
     from agents.mcp import MCPServerStdio, MCPServerStdioParams
-
-    mcp_fetch_server = MCPServerStdio(
-        params = MCPServerStdioParams(
-            command = "uvx",
-            args = ["mcp-server-fetch"]
+    from agentic_app_quickstart.examples.mcp_cache import CachedMCPServer
+    from agentic_app_quickstart.examples.mcp_pool import MCPServerPool
+
+    # Warm fetch servers shared by every pipeline() call, instead of one
+    # `uvx mcp-server-fetch` process started and stopped per prompt
+    mcp_fetch_server = MCPServerPool(
+        lambda: MCPServerStdio(
+            params = MCPServerStdioParams(
+                command = "uvx",
+                args = ["mcp-server-fetch"]
+            ),
+            cache_tools_list = True,
+            client_session_timeout_seconds=30
         ),
-        cache_tools_list = True,
-        client_session_timeout_seconds=30
+        size = 2
+    )
+
+    # Repeated forecast questions reuse a fetched page for 10 minutes, then
+    # revalidate it with its ETag / Last-Modified instead of fetching it again
+    cached_fetch_server = CachedMCPServer(
+        mcp_fetch_server,
+        ttls = {"fetch": 600},
+        revalidate = {"fetch": "url"}
     )
-    return (mcp_fetch_server,)
+    return cached_fetch_server, mcp_fetch_server
 
 
 @app.cell
-def _(Agent, Runner, activate_tracing, get_model, mcp_fetch_server):
+def _(
+    Agent,
+    Runner,
+    activate_tracing,
+    cached_fetch_server,
+    get_model,
+    mcp_fetch_server,
+):
     async def pipeline(prompt: str):
 
-        async with mcp_fetch_server:
+        # Starts the pool on the first call; later calls reuse the warm servers
+        await mcp_fetch_server.connect()
 
-            activate_tracing()
+        activate_tracing()
 
-            instructions = """
-                "An agent that tries to fetch data based on user's questions.
-                Fetch data from https://www.meteoblue.com if needed."
-            """
+        instructions = """
+            "An agent that tries to fetch data based on user's questions.
+            Fetch data from https://www.meteoblue.com if needed."
+        """
 
-            agent = Agent(
-                name = "DataFetcherAgent",
-                instructions = instructions,
-                mcp_servers = [mcp_fetch_server],
-                model=get_model()
-            )
+        agent = Agent(
+            name = "DataFetcherAgent",
+            instructions = instructions,
+            mcp_servers = [cached_fetch_server],
+            model=get_model()
+        )
 
-            result = await Runner.run(starting_agent=agent, input = prompt)
-            return result.final_output
+        result = await Runner.run(starting_agent=agent, input = prompt)
+        return result.final_output
     return (pipeline,)
 
 
@@ -0,0 +1,100 @@
+import asyncio
+import os
+from dataclasses import replace
+
+import httpx
+import pyarrow as pa
+from phoenix.trace import SpanEvaluations
+
+from agentic_app_quickstart.examples.evaluations import EvaluationSink
+from agentic_app_quickstart.week_2.solution.config.settings import EvaluationUploadSettings
+
+ENDPOINT = "http://phoenix.test"
+
+
+def settings(tmp_path, **overrides) -> EvaluationUploadSettings:
+    return replace(
+        EvaluationUploadSettings(),
+        chunk_rows=10,
+        max_retries=1,
+        backoff_seconds=0.0,
+        spool_path=str(tmp_path / "spool"),
+        **overrides,
+    )
+
+
+def sink_with(tmp_path, handler, **overrides) -> EvaluationSink:
+    sink = EvaluationSink(endpoint=ENDPOINT, settings=settings(tmp_path, **overrides), transport=httpx.MockTransport(handler))
+    for i in range(25):
+        sink.add("Toxicity", f"{i:016x}", "toxic" if i % 5 == 0 else "non-toxic", float(i % 5 == 0), "because")
+    return sink
+
+
+def spooled_files(tmp_path) -> list[str]:
+    directory = tmp_path / "spool"
+    return sorted(str(directory / name) for name in os.listdir(directory)) if directory.exists() else []
+
+
+class Phoenix:
+    """Accepts uploads like `/v1/evaluations` and remembers the span ids it stored."""
+
+    def __init__(self):
+        self.spans: set[str] = set()
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        evaluations = SpanEvaluations.from_pyarrow_reader(pa.ipc.open_stream(request.content))
+        self.spans.update(evaluations.dataframe.index)
+        return httpx.Response(204)
+
+
+def test_flush_uploads_every_chunk(tmp_path):
+    phoenix = Phoenix()
+    report = asyncio.run(sink_with(tmp_path, phoenix).flush())
+
+    assert (report.uploaded, report.spooled, report.requests) == (25, 0, 3)
+    assert len(phoenix.spans) == 25
+    assert spooled_files(tmp_path) == []
+
+
+def test_malformed_retry_after_spools_instead_of_raising(tmp_path):
+    def unavailable(request):
+        return httpx.Response(503, headers={"retry-after": "soon"})
+
+    report = asyncio.run(sink_with(tmp_path, unavailable).flush())
+
+    assert (report.uploaded, report.spooled) == (0, 25)
+    assert len(spooled_files(tmp_path)) == 3
+
+
+def test_unexpected_error_spools_the_chunk(tmp_path):
+    phoenix = Phoenix()
+
+    def flaky(request):
+        evaluations = SpanEvaluations.from_pyarrow_reader(pa.ipc.open_stream(request.content))
+        if f"{12:016x}" in evaluations.dataframe.index:
+            raise RuntimeError("bug in the transport")
+        return phoenix(request)
+
+    report = asyncio.run(sink_with(tmp_path, flaky).flush())
+
+    assert (report.uploaded, report.spooled) == (15, 10)
+    assert len(phoenix.spans) == 15 and f"{12:016x}" not in phoenix.spans
+    assert len(spooled_files(tmp_path)) == 1
+
+
+def test_resend_skips_corrupt_spool_files(tmp_path):
+    def down(request):
+        raise httpx.ConnectError("connection refused", request=request)
+
+    sink = sink_with(tmp_path, down)
+    asyncio.run(sink.flush())
+    corrupt = tmp_path / "spool" / "Toxicity-corrupt.arrows"
+    corrupt.write_bytes(b"not an arrow stream")
+
+    phoenix = Phoenix()
+    sink.transport = httpx.MockTransport(phoenix)
+    report = asyncio.run(sink.resend_spooled())
+
+    assert report.uploaded == 25
+    assert len(phoenix.spans) == 25
+    assert spooled_files(tmp_path) == [str(corrupt)]
@@ -0,0 +1,158 @@
+import asyncio
+import sqlite3
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import pytest
+from agents.mcp import MCPServerStdio, MCPServerStdioParams
+from mcp.types import CallToolResult, TextContent
+
+from agentic_app_quickstart.benchmarks.mcp_cache import PageHandler
+from agentic_app_quickstart.examples.mcp_cache import CACHE_REQUESTS, CachedMCPServer, MCPResponseCache, cache_key
+from agentic_app_quickstart.week_2.solution.config.settings import get_settings
+
+NAME = "test-mcp-cache"
+
+
+def stub_server() -> MCPServerStdio:
+    return MCPServerStdio(
+        params=MCPServerStdioParams(command=sys.executable, args=["-m", "agentic_app_quickstart.benchmarks.mcp_stub"]),
+        name=NAME,
+    )
+
+
+def page(result) -> str:
+    return result.content[0].text
+
+
+def lookups(result: str) -> float:
+    return CACHE_REQUESTS.value(server=NAME, tool="fetch", result=result)
+
+
+@pytest.fixture
+def pages():
+    """Local pages with ETags, answering conditional HEAD requests with 304."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def run(cached: CachedMCPServer, calls: list[dict], pause: float = 0.0) -> list[str]:
+    async def scenario():
+        await cached.connect()
+        try:
+            await cached.list_tools()
+            results = []
+            for arguments in calls:
+                results.append(page(await cached.call_tool("fetch", arguments)))
+                await asyncio.sleep(pause)
+            return results
+        finally:
+            await cached.cleanup()
+
+    return asyncio.run(scenario())
+
+
+def test_equivalent_arguments_hit_the_cache():
+    cached = CachedMCPServer(stub_server(), ttls={"fetch": 60}, cache=MCPResponseCache())
+    hits = lookups("hit")
+
+    results = run(cached, [
+        {"url": "https://Example.com/weather?b=2&a=1#today"},
+        {"url": " https://example.com/weather?a=1&b=2", "max_length": 5000, "raw": False},
+    ])
+
+    # The stub numbers its requests, so a second server call would say "request 2"
+    assert all("(request 1)" in result for result in results)
+    assert lookups("hit") == hits + 1
+
+
+def test_expired_entries_are_fetched_again():
+    cached = CachedMCPServer(stub_server(), ttls={"fetch": 0.2}, cache=MCPResponseCache())
+
+    results = run(cached, [{"url": "https://example.com/a"}] * 2, pause=0.3)
+
+    assert "(request 2)" in results[1]
+
+
+def test_expired_entries_are_revalidated_with_etags(pages):
+    cached = CachedMCPServer(
+        stub_server(), ttls={"fetch": 0.2}, revalidate={"fetch": "url"}, cache=MCPResponseCache()
+    )
+    revalidated = lookups("revalidated")
+
+    results = run(cached, [{"url": f"{pages}/weather/basel"}] * 2, pause=0.3)
+
+    assert all("(request 1)" in result for result in results)
+    assert lookups("revalidated") == revalidated + 1
+
+
+def test_tools_without_ttl_are_not_cached():
+    cached = CachedMCPServer(stub_server(), ttls={}, cache=MCPResponseCache())
+
+    results = run(cached, [{"url": "https://example.com/a"}] * 2)
+
+    assert "(request 2)" in results[1]
+
+
+def test_cache_is_bounded(tmp_path):
+    cache = MCPResponseCache(str(tmp_path / "cache.sqlite"), max_bytes=4096)
+    for i in range(100):
+        cache.put(f"key-{i}", "fetch", "x" * 200, ttl=60)
+        time.sleep(0.001)
+
+    assert cache.get("key-99") is not None
+    assert cache.get("key-0") is None
+
+
+def test_cache_is_configured_through_settings(tmp_path, monkeypatch):
+    monkeypatch.setenv("MCP_CACHE_PATH", str(tmp_path / "cache.sqlite"))
+    monkeypatch.setenv("MCP_CACHE_MAX_MB", "0.5")
+    get_settings.cache_clear()
+    try:
+        cache = MCPResponseCache.from_env()
+    finally:
+        get_settings.cache_clear()
+
+    assert (cache.db_path, cache.max_bytes) == (str(tmp_path / "cache.sqlite"), 1 << 19)
+
+
+def test_cache_lookups_do_not_block_the_event_loop(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = MCPResponseCache(path)
+    cached_result = CallToolResult(content=[TextContent(type="text", text="cached page")])
+    cache.put(cache_key("fetch", {"url": "https://example.com/a"}), "fetch", cached_result.model_dump_json(), ttl=60)
+    cached = CachedMCPServer(stub_server(), ttls={"fetch": 60}, cache=cache)
+
+    # Another process holding the write lock, as a busy worker would
+    other = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    other.execute("BEGIN IMMEDIATE")
+    release = threading.Timer(0.5, lambda: other.execute("COMMIT"))
+
+    async def scenario() -> tuple[str, float]:
+        gaps = []
+
+        async def tick():
+            last = time.monotonic()
+            while len(gaps) < 60:
+                await asyncio.sleep(0.01)
+                now = time.monotonic()
+                gaps.append(now - last)
+                last = now
+
+        ticker = asyncio.create_task(tick())
+        await asyncio.sleep(0.05)
+        release.start()
+        result = await cached.call_tool("fetch", {"url": "https://example.com/a"})
+        await ticker
+        return page(result), max(gaps)
+
+    result, longest_tick = asyncio.run(scenario())
+    release.join()
+    other.close()
+
+    assert result == "cached page"
+    assert longest_tick < 0.2
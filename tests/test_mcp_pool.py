@@ -0,0 +1,62 @@
+import asyncio
+import sys
+
+import pytest
+from agents.mcp import MCPServerStdio, MCPServerStdioParams
+
+from agentic_app_quickstart.examples.mcp_pool import RESTARTS, MCPServerPool
+
+NAME = "test-mcp-pool"
+
+
+def stub_server(fetch_delay: float = 0.0) -> MCPServerStdio:
+    return MCPServerStdio(
+        params=MCPServerStdioParams(
+            command=sys.executable,
+            args=["-m", "agentic_app_quickstart.benchmarks.mcp_stub", "--fetch-delay", str(fetch_delay)],
+        ),
+        name=NAME,
+    )
+
+
+def page(result) -> str:
+    return result.content[0].text
+
+
+def test_cancelled_lease_keeps_the_server():
+    async def scenario():
+        pool = MCPServerPool(lambda: stub_server(fetch_delay=0.3), size=1, name=NAME)
+        await pool.connect()
+        try:
+            restarts = RESTARTS.value(server=NAME)
+            with pytest.raises(TimeoutError):
+                await asyncio.wait_for(pool.call_tool("fetch", {"url": "https://example.com"}), 0.05)
+
+            # Same process: its request counter continues where the cancelled call left it
+            result = await pool.call_tool("fetch", {"url": "https://example.com"})
+            assert "(request 2)" in page(result)
+            assert RESTARTS.value(server=NAME) == restarts
+        finally:
+            await pool.cleanup()
+
+    asyncio.run(scenario())
+
+
+def test_failed_call_restarts_the_server():
+    async def scenario():
+        pool = MCPServerPool(stub_server, size=1, name=NAME)
+        await pool.connect()
+        try:
+            restarts = RESTARTS.value(server=NAME)
+            with pytest.raises(RuntimeError):
+                async with pool.lease():
+                    raise RuntimeError("call failed")
+
+            # A fresh process serves the next call
+            result = await pool.call_tool("fetch", {"url": "https://example.com"})
+            assert "(request 1)" in page(result)
+            assert RESTARTS.value(server=NAME) == restarts + 1
+        finally:
+            await pool.cleanup()
+
+    asyncio.run(scenario())
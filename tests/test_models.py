@@ -0,0 +1,68 @@
+import asyncio
+
+import httpx
+import openai
+import pytest
+from agents.models.interface import Model
+
+from agentic_app_quickstart.examples.models import ResilientModel, _retry_after
+from agentic_app_quickstart.week_2.solution.config.settings import ResilienceSettings
+
+
+def status_error(status: int, headers: dict) -> openai.APIStatusError:
+    request = httpx.Request("POST", "http://127.0.0.1/v1/chat/completions")
+    response = httpx.Response(status, headers=headers, request=request)
+    return openai.APIStatusError("upstream error", response=response, body=None)
+
+
+class FlakyModel(Model):
+    """Fails with `errors` in turn, then answers "ok"."""
+
+    def __init__(self, errors: list[Exception]):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def get_response(self, *args, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+    def stream_response(self, *args, **kwargs):
+        raise NotImplementedError
+
+
+def respond(model: Model) -> str:
+    return asyncio.run(model.get_response(None, "hi", None, [], None, [], None))
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({"retry-after": "2"}, 2.0),
+        ({"retry-after-ms": "250"}, 0.25),
+        ({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}, 0.0),
+        ({"retry-after": "soon"}, None),
+        ({"retry-after-ms": "soon"}, None),
+        ({}, None),
+    ],
+)
+def test_retry_after(headers, expected):
+    assert _retry_after(status_error(503, headers)) == expected
+
+
+def test_malformed_retry_after_is_retried_with_backoff():
+    flaky = FlakyModel([status_error(503, {"retry-after": "soon"}), status_error(429, {"retry-after": "-"})])
+    settings = ResilienceSettings(hedge=False, max_retries=3, backoff_seconds=0.01)
+
+    assert respond(ResilientModel(flaky, "test-malformed-retry-after", settings)) == "ok"
+    assert flaky.calls == 3
+
+
+def test_client_errors_are_not_retried():
+    flaky = FlakyModel([status_error(400, {"retry-after": "soon"})])
+    settings = ResilienceSettings(hedge=False, max_retries=3, backoff_seconds=0.01)
+
+    with pytest.raises(openai.APIStatusError):
+        respond(ResilientModel(flaky, "test-client-error", settings))
+    assert flaky.calls == 1
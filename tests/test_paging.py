@@ -0,0 +1,33 @@
+import asyncio
+import json
+
+from agents import function_tool
+from agents.tool_context import ToolContext
+
+from agentic_app_quickstart.examples.paging import ResultStore, with_paging
+from agentic_app_quickstart.week_2.solution.monitoring.metering import metering_session
+
+
+@function_tool
+def list_cities() -> list[str]:
+    """List many cities."""
+    return [f"city-{i}" for i in range(500)]
+
+
+def call(tool, session: str, arguments: dict) -> str:
+    async def invoke():
+        with metering_session(session):
+            return await tool.on_invoke_tool(ToolContext(context=None, tool_name=tool.name, tool_call_id="call-1"), json.dumps(arguments))
+
+    return asyncio.run(invoke())
+
+
+def test_cursors_belong_to_their_session():
+    paged, fetch_more = with_paging([list_cities], budget_tokens=100, store=ResultStore())
+
+    first = json.loads(call(paged, "alice", {}))
+    cursor = first["cursor"]
+
+    assert len(cursor) >= 22
+    assert json.loads(call(fetch_more, "alice", {"cursor": cursor, "page": 2}))["page"] == 2
+    assert "unknown" in call(fetch_more, "bob", {"cursor": cursor, "page": 2})
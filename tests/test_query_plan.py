@@ -0,0 +1,25 @@
+from pathlib import Path
+
+import pytest
+
+from agentic_app_quickstart.week_1.solution import tools
+from agentic_app_quickstart.week_1.solution.tools import Aggregate, PlanError, QueryPlan, compile_plan
+
+WEATHER_CSV = str(Path(tools.__file__).parent / "data" / "weather_data.csv")
+
+
+def plan(**fields) -> QueryPlan:
+    return QueryPlan(**{"filters": [], "group_by": [], "aggregates": [], "select": [], "sort": [], "limit": None, **fields})
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        {"aggregates": [Aggregate(column="temperature", func="max", alias="t"), Aggregate(column="temperature", func="min", alias="t")]},
+        {"group_by": ["city"], "aggregates": [Aggregate(column="temperature", func="mean", alias="city")]},
+        {"select": ["city", "city"]},
+    ],
+)
+def test_duplicate_result_columns_are_a_plan_error(fields):
+    with pytest.raises(PlanError, match="unique names, 'city'|unique names, 't'"):
+        compile_plan(plan(**fields), WEATHER_CSV)
@@ -0,0 +1,44 @@
+import asyncio
+import sqlite3
+import threading
+import time
+
+from agentic_app_quickstart.examples.ratelimit import RateLimiter, SQLiteBuckets
+
+
+def test_shared_buckets_do_not_block_the_event_loop(tmp_path):
+    path = str(tmp_path / "buckets.sqlite")
+    limiter = RateLimiter(requests_per_minute=600, buckets=SQLiteBuckets(path))
+    limiter.try_acquire("key")
+
+    # Another process holding the write lock, as a busy worker would
+    other = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    other.execute("BEGIN IMMEDIATE")
+    release = threading.Timer(0.5, lambda: other.execute("COMMIT"))
+
+    async def scenario() -> tuple[float, float]:
+        gaps = []
+
+        async def tick():
+            last = time.monotonic()
+            while len(gaps) < 60:
+                await asyncio.sleep(0.01)
+                now = time.monotonic()
+                gaps.append(now - last)
+                last = now
+
+        ticker = asyncio.create_task(tick())
+        await asyncio.sleep(0.05)
+        release.start()
+        started = time.monotonic()
+        await limiter.acquire("key")
+        elapsed = time.monotonic() - started
+        await ticker
+        return elapsed, max(gaps)
+
+    elapsed, longest_tick = asyncio.run(scenario())
+    release.join()
+    other.close()
+
+    assert elapsed >= 0.4
+    assert longest_tick < 0.2
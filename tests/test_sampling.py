@@ -0,0 +1,18 @@
+import random
+
+from opentelemetry.sdk.trace.sampling import TraceIdRatioBased
+
+from agentic_app_quickstart.week_2.solution.monitoring.sampling import _keep_by_ratio
+
+
+def test_tail_ratio_applies_to_head_sampled_traces():
+    rng = random.Random(0)
+    head = TraceIdRatioBased(0.1)
+    trace_ids = [rng.getrandbits(128) for _ in range(200_000)]
+
+    recorded = [t for t in trace_ids if head.should_sample(None, t, "run").decision.is_sampled()]
+    kept = [t for t in recorded if _keep_by_ratio(t, 0.05)]
+
+    # 5% of the 10% recorded, not the 50% a shared hash would keep
+    assert abs(len(kept) / len(recorded) - 0.05) < 0.01
+    assert abs(len(kept) / len(trace_ids) - 0.005) < 0.001
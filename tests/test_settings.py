@@ -0,0 +1,15 @@
+from agentic_app_quickstart.week_2.solution.config.settings import Settings, get_settings
+
+
+def test_roles_have_no_output_cap_by_default(monkeypatch):
+    for role in Settings().roles:
+        monkeypatch.delenv(f"ROLE_{role.upper()}_MAX_TOKENS", raising=False)
+    monkeypatch.setenv("ROLE_GUARDRAIL_MAX_TOKENS", "256")
+    get_settings.cache_clear()
+    try:
+        roles = get_settings().roles
+    finally:
+        get_settings.cache_clear()
+
+    assert roles["guardrail"].max_tokens == 256
+    assert all(config.max_tokens is None for name, config in roles.items() if name != "guardrail")
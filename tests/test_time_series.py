@@ -0,0 +1,49 @@
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from agentic_app_quickstart.week_1.solution import tools
+from agentic_app_quickstart.week_1.solution.tools import get_series, period_growth, resample, seasonal_summary
+
+WEATHER_CSV = str(Path(tools.__file__).parent / "data" / "weather_data.csv")
+
+
+@pytest.fixture
+def readings(tmp_path) -> str:
+    path = str(tmp_path / "readings.csv")
+    pl.DataFrame({
+        "when": ["2024-01-01 10:00", "2024-01-01 13:00", "2024-01-02 10:00", "2024-03-01 09:00"],
+        "value": [1, 2, 3, 4],
+    }).write_csv(path)
+    return path
+
+
+def test_hour_needs_timestamps():
+    with pytest.raises(ValueError, match="needs timestamps"):
+        seasonal_summary(WEATHER_CSV, "temperature", season="hour")
+
+
+def test_hour_on_timestamps(readings):
+    result = seasonal_summary(readings, "value", season="hour")
+    assert [row["hour"] for row in result["rows"]] == [9, 10, 13]
+    assert [row["count"] for row in result["rows"]] == [1, 2, 1]
+
+
+def test_series_is_parsed_sorted_and_cached(readings):
+    series = get_series(readings)
+    assert series.date_column == "when"
+    assert series.frame.schema["when"] == pl.Datetime
+    assert series.frame["when"].is_sorted()
+    assert get_series(readings) is series
+
+
+def test_growth_counts_empty_periods_as_zero(readings):
+    result = period_growth(readings, "value", every="1mo", agg="sum")
+    assert [row["value_sum"] for row in result["rows"]] == [6, 0, 4]
+    assert [row["change"] for row in result["rows"]] == [None, -6, 4]
+
+
+def test_window_includes_the_whole_end_day(readings):
+    result = resample(readings, "value", every="1d", agg="sum", end="2024-01-02")
+    assert [row["value_sum"] for row in result["rows"]] == [3, 3]
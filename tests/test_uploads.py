@@ -0,0 +1,45 @@
+from dataclasses import dataclass
+
+from agentic_app_quickstart.examples.uploads import save_upload
+from agentic_app_quickstart.week_1.solution.tools import get_series
+
+
+@dataclass
+class Upload:
+    name: str
+    file_id: str
+    content: bytes
+
+    def getbuffer(self) -> memoryview:
+        return memoryview(self.content)
+
+
+def test_reruns_reuse_the_saved_upload():
+    state = {}
+    upload = Upload("readings.csv", "id-1", b"when,value\n2024-01-01,1\n")
+
+    path = save_upload(upload, state)
+
+    assert path.endswith("readings.csv")
+    assert save_upload(upload, state) == path
+    assert save_upload(Upload("readings.csv", "id-2", b"when,value\n"), state) != path
+
+
+def test_questions_in_a_session_share_one_series():
+    state = {}
+    upload = Upload("readings.csv", "id-1", b"when,value\n2024-01-01,1\n2024-01-02,2\n")
+
+    first = get_series(save_upload(upload, state))
+    second = get_series(save_upload(upload, state))
+
+    assert second is first
+
+
+def test_sessions_uploading_the_same_file_share_its_path():
+    content = b"when,value\n2024-01-01,1\n"
+
+    first = save_upload(Upload("readings.csv", "session-1", content), {})
+    second = save_upload(Upload("readings.csv", "session-2", content), {})
+
+    assert second == first
+    assert save_upload(Upload("readings.csv", "session-3", content + b"2024-01-02,2\n"), {}) != first